@@ -0,0 +1,508 @@
+"""
+Offline benchmark suite over the parse, access, export and fetch hot paths, and the memory held by a
+decoded batch; runs on the test fixtures, a synthetically enlarged record and a local stub server
+standing in for clinicaltrials.gov
+
+    python benchmarks/suite.py [--output results.json] [--filter decode] [--repeat 5]
+    python benchmarks/suite.py --compare baseline.json results.json [--threshold 1.1]
+"""
+import argparse
+import datetime
+import gc
+import glob
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import timeit
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import xmlschema  # noqa: E402
+
+import clinical_trials  # noqa: E402
+from clinical_trials import clinical_study, connector, serialization  # noqa: E402
+from clinical_trials.clinical_study import ClinicalStudy  # noqa: E402
+from clinical_trials.columnar import ColumnarCorpus  # noqa: E402
+from clinical_trials.conformance import check_record  # noqa: E402
+from clinical_trials.corpus_store import CorpusStore, write_corpus  # noqa: E402
+from clinical_trials.design import iter_design_edges  # noqa: E402
+from clinical_trials.eligibility import extract_constraints  # noqa: E402
+from clinical_trials.facets import FacetIndex  # noqa: E402
+from clinical_trials.generated_structs import ClinicalStudyRecord  # noqa: E402
+from clinical_trials.helpers import normalize_textblock, process_eligibility  # noqa: E402
+from clinical_trials.interning import InternTable  # noqa: E402
+from clinical_trials.lazy import index_sections  # noqa: E402
+from clinical_trials.projection import Projection  # noqa: E402
+from clinical_trials.schema import get_local_schema  # noqa: E402
+from clinical_trials.structs import VariableDateStruct  # noqa: E402
+from clinical_trials.synthetic import SizeProfile, StudyGenerator  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures")
+
+# the record used for the property and aggregation benchmarks
+REFERENCE_STUDY = "NCT02348489"
+
+# times each fixture appears in the batch for the memory measurements
+MEMORY_COPIES = 20
+
+BENCHMARKS = []
+MEASUREMENTS = []
+
+
+def benchmark(name, number=10):
+    """
+    Register a benchmark; the decorated function takes the Context and returns the callable to time
+    :param str name: the benchmark name (dotted, group first)
+    :param int number: calls per timing
+    """
+    def register(setup):
+        BENCHMARKS.append((name, number, setup))
+        return setup
+    return register
+
+
+def measure(name):
+    """
+    Register a memory measurement; the decorated function takes the Context and returns the callable
+    whose allocations are traced, the result of the call is held while they are counted
+    :param str name: the measurement name (dotted, group first)
+    """
+    def register(setup):
+        MEASUREMENTS.append((name, setup))
+        return setup
+    return register
+
+
+def retained(func):
+    """
+    Trace the allocations of a call
+    :param func: the callable
+    :return: the bytes still allocated while its result is held, and the peak during the call
+    :rtype: tuple(int, int)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current, peak
+
+
+def enlarge(content, locations=5000):
+    """
+    Build a synthetic record with many locations by repeating the locations of a real one
+    :param bytes content: the XML content
+    :param int locations: number of locations in the result
+    :rtype: bytes
+    """
+    _, sections = index_sections(content)
+    spans = sections["location"]
+    blocks = [content[start:end] for start, end in spans]
+    enlarged = []
+    for offset in range(locations):
+        block = blocks[offset % len(blocks)]
+        # vary the city so the aggregations see distinct values
+        enlarged.append(re.sub(b"<city>([^<]*)</city>", b"<city>\\1 " + str(offset % 500).encode() + b"</city>", block))
+    return content[:spans[0][0]] + b"\n  ".join(enlarged) + content[spans[-1][1]:]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves the fixtures in place of clinicaltrials.gov/ct2/show
+    """
+
+    contents = {}
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        nct_id = path.rstrip("/").split("/")[-1]
+        if nct_id not in self.contents:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if "displayxml" in query:
+            body, content_type = self.contents[nct_id], "text/xml"
+        else:
+            body = '<html><a href="/ProvidedDocs/68/{0}/Prot_000.pdf" title="Study Protocol">' \
+                   'Protocol</a></html>'.format(nct_id).encode("utf-8")
+            content_type = "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Context(object):
+    """
+    The shared inputs, built once per run
+    """
+
+    def __init__(self):
+        self.contents = {}
+        for filename in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.xml"))):
+            with open(filename, "rb") as fh:
+                self.contents[os.path.splitext(os.path.basename(filename))[0]] = fh.read()
+        self.schema = get_local_schema()
+        self.large = enlarge(self.contents["NCT03211546"])
+        self.synthetic = StudyGenerator(self.schema, SizeProfile(locations=200, results=1.0), seed=0).generate(0)
+        self.data = dict((nct_id, self.schema.to_dict(content.decode("utf-8")))
+                         for nct_id, content in self.contents.items())
+        self.large_data = self.schema.to_dict(self.large.decode("utf-8"))
+        self.directory = tempfile.mkdtemp()
+        self._server = None
+        self._patched = None
+
+    def start(self):
+        """
+        Start the stub server and point the connector and the decoders at the local resources
+        """
+        StubHandler.contents = self.contents
+        self._server = HTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._patched = (connector.BASE_URL, clinical_study.get_schema)
+        connector.BASE_URL = "http://127.0.0.1:{}/ct2/show/".format(self._server.server_port)
+        clinical_study.get_schema = lambda: self.schema
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            connector.BASE_URL, clinical_study.get_schema = self._patched
+            self._server = None
+
+    def study(self, nct_id=REFERENCE_STUDY):
+        return ClinicalStudy(self.data[nct_id], b"Results are available" in self.contents[nct_id])
+
+    def large_study(self):
+        return ClinicalStudy(self.large_data)
+
+
+@benchmark("schema.construct", number=1)
+def schema_construct(context):
+    return get_local_schema
+
+
+def _register_decoders():
+    for nct_id in sorted(os.path.splitext(os.path.basename(x))[0]
+                         for x in glob.glob(os.path.join(FIXTURE_DIR, "*.xml"))):
+        benchmark("decode.from_content.{}".format(nct_id), number=5)(
+            lambda context, nct_id=nct_id: lambda: ClinicalStudy.from_content(context.contents[nct_id]))
+
+
+_register_decoders()
+
+
+@benchmark("decode.from_content.large", number=1)
+def decode_large(context):
+    return lambda: ClinicalStudy.from_content(context.large)
+
+
+@benchmark("decode.from_content.synthetic_results", number=1)
+def decode_synthetic(context):
+    return lambda: ClinicalStudy.from_content(context.synthetic)
+
+
+@benchmark("decode.from_content.interned", number=3)
+def decode_interned(context):
+    # a table shared by the batch, as in a bulk run
+    table = InternTable(context.schema)
+    return lambda: [ClinicalStudy.from_content(content, intern_table=table) for content in context.contents.values()]
+
+
+def _batch(context):
+    # a realistic batch, each fixture decoded many times as a corpus decodes many distinct records
+    return [content.decode("utf-8") for content in context.contents.values()] * MEMORY_COPIES
+
+
+@measure("memory.decode.plain")
+def memory_plain(context):
+    contents = _batch(context)
+    return lambda: [context.schema.to_dict(content) for content in contents]
+
+
+@measure("memory.decode.interned")
+def memory_interned(context):
+    contents = _batch(context)
+    # the entries of the table are allocated by the batch and counted with it
+    table = InternTable(context.schema)
+    return lambda: [table.intern_record(context.schema.to_dict(content)) for content in contents]
+
+
+@benchmark("decode.from_stream.large", number=1)
+def decode_stream_large(context):
+    return lambda: ClinicalStudy.from_stream(io.BytesIO(context.large))
+
+
+@benchmark("decode.lazy.status.large", number=5)
+def decode_lazy_large(context):
+    def run():
+        study = ClinicalStudy.from_content(context.large, lazy=True)
+        return study.nct_id, study.status, study.phase, study.trail.last_update_posted
+    return run
+
+
+@benchmark("decode.projection.status", number=5)
+def decode_projection(context):
+    projection = Projection(["nct_id", "status", "phase", "last_update_posted"], schema=context.schema)
+    return lambda: [projection.extract(content) for content in context.contents.values()]
+
+
+def _register_properties():
+    for name, value in sorted(vars(ClinicalStudy).items()):
+        if isinstance(value, property):
+            benchmark("property.{}".format(name), number=20)(
+                lambda context, name=name: lambda: getattr(context.study(), name))
+
+
+_register_properties()
+
+
+@benchmark("aggregate.study_people.large", number=3)
+def aggregate_people(context):
+    return lambda: context.large_study().study_people
+
+
+@benchmark("aggregate.cities.large", number=3)
+def aggregate_cities(context):
+    return lambda: context.large_study().cities
+
+
+@benchmark("validate.synthetic_results", number=1)
+def validate_synthetic(context):
+    return lambda: check_record(context.synthetic, context.schema)
+
+
+@benchmark("structs.record.large", number=3)
+def structs_record(context):
+    return lambda: ClinicalStudyRecord.from_dict(context.large_data)
+
+
+@benchmark("dates.parse", number=20)
+def dates_parse(context):
+    values = []
+    for data in context.data.values():
+        for key, value in data.items():
+            if key.endswith(("_date", "_submitted", "_posted", "_qc")):
+                values.append(value["$"] if isinstance(value, dict) else value)
+    return lambda: [VariableDateStruct(date_str=value).date for value in values]
+
+
+def iter_textblocks(data):
+    """
+    Walk a decoded record yielding the content of each textblock
+    :param dict data: decoded record
+    """
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "textblock":
+                yield value
+            else:
+                for textblock in iter_textblocks(value):
+                    yield textblock
+    elif isinstance(data, list):
+        for value in data:
+            for textblock in iter_textblocks(value):
+                yield textblock
+
+
+@benchmark("textblock.normalize", number=50)
+def textblock_normalize(context):
+    textblocks = [x for data in context.data.values() for x in iter_textblocks(data)]
+    return lambda: [normalize_textblock(x) for x in textblocks]
+
+
+@benchmark("textblock.normalize.paragraphs", number=50)
+def textblock_paragraphs(context):
+    textblocks = [x for data in context.data.values() for x in iter_textblocks(data)]
+    return lambda: [normalize_textblock(x, paragraphs=True) for x in textblocks]
+
+
+@benchmark("eligibility.process", number=10)
+def eligibility_process(context):
+    criteria = [study.eligibility.criteria for study in map(context.study, context.data)
+                if "eligibility" in study._data and study.eligibility.criteria]
+    return lambda: [process_eligibility(x) for x in criteria]
+
+
+@benchmark("eligibility.constraints", number=10)
+def eligibility_constraints(context):
+    return lambda: [extract_constraints(context.study(nct_id).eligibility) for nct_id in context.data
+                    if "eligibility" in context.data[nct_id]]
+
+
+@benchmark("export.corpus_store.write", number=3)
+def export_corpus_write(context):
+    path = os.path.join(context.directory, "corpus.bin")
+    return lambda: write_corpus(path, map(context.study, context.data))
+
+
+@benchmark("export.corpus_store.read", number=3)
+def export_corpus_read(context):
+    path = os.path.join(context.directory, "corpus-read.bin")
+    write_corpus(path, map(context.study, context.data))
+
+    def run():
+        with CorpusStore(path) as store:
+            return [store.data(nct_id) for nct_id in store.nct_ids()]
+    return run
+
+
+def _register_serializers():
+    for backend in serialization.BACKENDS:
+        benchmark("export.to_json.{}".format(backend), number=5)(
+            lambda context, backend=backend: lambda: [context.study(x).to_json(backend) for x in context.data])
+
+
+_register_serializers()
+
+
+@benchmark("query.iterate", number=5)
+def query_iterate(context):
+    studies = [context.study(x) for x in context.data] * 500
+    return lambda: [x.nct_id for x in studies if x.status == "Recruiting" and x.phase in ("Phase 2", "Phase 3")]
+
+
+@benchmark("query.columnar", number=5)
+def query_columnar(context):
+    corpus = ColumnarCorpus.build([context.study(x) for x in context.data] * 500)
+    return lambda: corpus.nct_ids(status="Recruiting", phase=["Phase 2", "Phase 3"])
+
+
+@benchmark("query.facets.counts", number=5)
+def query_facets(context):
+    index = FacetIndex()
+    for copy in range(500):
+        for nct_id in context.data:
+            study = context.study(nct_id)
+            study._data = dict(study._data, id_info=dict(nct_id="{}-{}".format(nct_id, copy)))
+            index.add_study(study)
+    return lambda: index.counts(dict(status=["Recruiting", "Completed"], intervention_type="Drug"))
+
+
+@benchmark("design.edges", number=5)
+def design_edges(context):
+    studies = [context.study(x) for x in context.data] * 100
+    return lambda: list(iter_design_edges(studies))
+
+
+@benchmark("fetch.get_study", number=10)
+def fetch_get_study(context):
+    return lambda: connector.get_study(REFERENCE_STUDY)
+
+
+@benchmark("fetch.get_study_documents", number=10)
+def fetch_get_study_documents(context):
+    return lambda: connector.get_study_documents(REFERENCE_STUDY)
+
+
+@benchmark("fetch.from_nctid", number=5)
+def fetch_from_nctid(context):
+    return lambda: ClinicalStudy.from_nctid(REFERENCE_STUDY)
+
+
+def run(output=None, pattern=None, repeat=5):
+    """
+    Run the benchmarks
+    :param str output: path to write the JSON results
+    :param str pattern: only run the benchmarks whose name matches this regular expression
+    :param int repeat: timings per benchmark
+    :rtype: dict
+    """
+    context = Context()
+    context.start()
+    results = {}
+    try:
+        for name, number, setup in BENCHMARKS:
+            if pattern and not re.search(pattern, name):
+                continue
+            try:
+                func = setup(context)
+                timings = [x / number for x in timeit.repeat(func, number=number, repeat=repeat)]
+            except Exception as exc:
+                results[name] = dict(error="{}: {}".format(type(exc).__name__, exc))
+                print("{:<48} {}".format(name, results[name]["error"]))
+                continue
+            results[name] = dict(min=min(timings), median=statistics.median(timings), number=number,
+                                 repeat=repeat)
+            print("{:<48} {:>12.1f} us".format(name, results[name]["min"] * 1e6))
+        for name, setup in MEASUREMENTS:
+            if pattern and not re.search(pattern, name):
+                continue
+            current, peak = retained(setup(context))
+            results[name] = dict(current=current, peak=peak)
+            print("{:<48} {:>12d} B {:>12d} B peak".format(name, current, peak))
+    finally:
+        context.stop()
+    report = dict(
+        meta=dict(
+            created=datetime.datetime.utcnow().isoformat(),
+            python=platform.python_version(),
+            platform=platform.platform(),
+            clinical_trials=clinical_trials.__version__,
+            xmlschema=xmlschema.__version__,
+        ),
+        results=results,
+    )
+    if output:
+        with open(output, "w") as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+    return report
+
+
+def compare(baseline, current, threshold=1.1):
+    """
+    Compare two result files
+    :param str baseline: path to the baseline results
+    :param str current: path to the current results
+    :param float threshold: ratio (current / baseline) above which a benchmark is reported as a regression
+    :return: the names of the regressed benchmarks
+    """
+    with open(baseline) as fh:
+        before = json.load(fh)["results"]
+    with open(current) as fh:
+        after = json.load(fh)["results"]
+    regressions = []
+    for name in sorted(set(before) & set(after)):
+        # the timings (us) and the retained memory (B) of the measurements
+        for key, scale in (("min", 1e6), ("current", 1)):
+            if key in before[name] and key in after[name]:
+                break
+        else:
+            continue
+        ratio = after[name][key] / float(before[name][key])
+        flag = ""
+        if ratio > threshold:
+            flag = "REGRESSION"
+            regressions.append(name)
+        print("{:<48} {:>12.1f} {:>12.1f} {:>7.2f}x {}".format(
+            name, before[name][key] * scale, after[name][key] * scale, ratio, flag))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--filter", help="only run the benchmarks matching this regular expression")
+    parser.add_argument("--repeat", type=int, default=5, help="timings per benchmark")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=1.1, help="regression ratio for --compare")
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(1 if compare(args.compare[0], args.compare[1], args.threshold) else 0)
+    run(args.output, args.filter, args.repeat)
@@ -0,0 +1,464 @@
+"""
+Connector for the ClinicalTrials.gov v2 JSON API; studies are requested many at a time, the pages
+are followed as a stream, and each study is mapped onto the record layout decoded from the legacy
+XML (see to_legacy) so the ClinicalStudy properties work unchanged
+"""
+import datetime
+import re
+
+import requests
+from six.moves.urllib.parse import urljoin
+
+from clinical_trials import metrics
+
+API_URL = "https://clinicaltrials.gov/api/v2/"
+
+# the list markers and backslash escapes of the markdown used for the v2 eligibility criteria
+BULLET_PATTERN = re.compile(r"^(?:[*+-]|\d+[.)])\s+")
+ESCAPE_PATTERN = re.compile(r"\\([\\`*_{}\[\]()#+\-.!<>|~])")
+
+# the most NCT IDs requested in one call, and the largest page the API serves
+BATCH_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+STATUSES = {
+    "ACTIVE_NOT_RECRUITING": "Active, not recruiting",
+    "COMPLETED": "Completed",
+    "ENROLLING_BY_INVITATION": "Enrolling by invitation",
+    "NOT_YET_RECRUITING": "Not yet recruiting",
+    "RECRUITING": "Recruiting",
+    "SUSPENDED": "Suspended",
+    "TERMINATED": "Terminated",
+    "WITHDRAWN": "Withdrawn",
+    "AVAILABLE": "Available",
+    "NO_LONGER_AVAILABLE": "No longer available",
+    "TEMPORARILY_NOT_AVAILABLE": "Temporarily not available",
+    "APPROVED_FOR_MARKETING": "Approved for marketing",
+    "WITHHELD": "Withheld",
+    "UNKNOWN": "Unknown status",
+}
+
+PHASES = {
+    "NA": "N/A",
+    "EARLY_PHASE1": "Early Phase 1",
+    "PHASE1": "Phase 1",
+    "PHASE2": "Phase 2",
+    "PHASE3": "Phase 3",
+    "PHASE4": "Phase 4",
+}
+
+AGENCY_CLASSES = {
+    "NIH": "NIH",
+    "FED": "U.S. Fed",
+    "INDUSTRY": "Industry",
+}
+
+# the values that are not the enumeration name in title case
+VALUES = {
+    "NON_RANDOMIZED": "Non-Randomized",
+    "NA": "N/A",
+    "PARALLEL": "Parallel Assignment",
+    "SINGLE_GROUP": "Single Group Assignment",
+    "CROSSOVER": "Crossover Assignment",
+    "FACTORIAL": "Factorial Assignment",
+    "SEQUENTIAL": "Sequential Assignment",
+    "CASE_CONTROL": "Case-Control",
+    "CASE_ONLY": "Case-Only",
+    "CASE_CROSSOVER": "Case-Crossover",
+    "ECOLOGIC_OR_COMMUNITY": "Ecologic or Community",
+    "FAMILY_BASED": "Family-Based",
+    "DEFINED_POPULATION": "Defined Population",
+    "NATURAL_HISTORY": "Natural History",
+    "CROSS_SECTIONAL": "Cross-Sectional",
+    "NONE": "None (Open Label)",
+    "SUB_INVESTIGATOR": "Sub-Investigator",
+    "SPONSOR_INVESTIGATOR": "Sponsor-Investigator",
+    "PROBABILITY_SAMPLE": "Probability Sample",
+    "NON_PROBABILITY_SAMPLE": "Non-Probability Sample",
+    "SAMPLES_WITH_DNA": "Samples With DNA",
+    "SAMPLES_WITHOUT_DNA": "Samples Without DNA",
+    "NONE_RETAINED": "None Retained",
+}
+
+
+def get_session():
+    """
+    A session, so the connections are reused across the requests of a stream
+    :rtype: requests.Session
+    """
+    return requests.Session()
+
+
+def _get(session, path, params=None):
+    with metrics.timer("connector.v2.{}".format(path.split("/")[0])) as timer:
+        response = session.get(urljoin(API_URL, path), params=params)
+        timer.size = len(response.content)
+    if response.status_code == 404:
+        raise ValueError("Unable to load {}".format(path))
+    response.raise_for_status()
+    return response.json()
+
+
+def get_study_json(nct_id, session=None):
+    """
+    Get a study
+    :param str nct_id: the NCT ID
+    :param requests.Session session: the session (default, a new one)
+    :rtype: dict
+    :return: the study document
+    """
+    return _get(session or get_session(), "studies/{}".format(nct_id))
+
+
+def iter_pages(params, session=None):
+    """
+    Follow the pages of a studies query
+    :param dict params: the query parameters (see the API documentation)
+    :param requests.Session session: the session (default, a new one)
+    :rtype: generator
+    :return: the studies of each page
+    """
+    session = session or get_session()
+    params = dict(params)
+    while True:
+        page = _get(session, "studies", params)
+        yield page.get("studies", [])
+        token = page.get("nextPageToken")
+        if not token:
+            break
+        params["pageToken"] = token
+
+
+def iter_studies_json(nct_ids=None, query=None, batch_size=BATCH_SIZE, page_size=MAX_PAGE_SIZE, session=None):
+    """
+    Stream studies, by NCT ID (batch_size per request) or by a search term
+    :param iterable nct_ids: the NCT IDs
+    :param str query: a search term (query.term), when no NCT IDs are given
+    :param int batch_size: NCT IDs per request
+    :param int page_size: studies per page
+    :param requests.Session session: the session (default, a new one)
+    :rtype: generator
+    :return: the study documents; the NCT IDs the API does not have are left out
+    """
+    session = session or get_session()
+    if nct_ids is None:
+        if query is None:
+            raise ValueError("Give the NCT IDs or a query")
+        for studies in iter_pages({"query.term": query, "pageSize": min(page_size, MAX_PAGE_SIZE)}, session):
+            for study in studies:
+                yield study
+        return
+    batch = []
+    for nct_id in nct_ids:
+        batch.append(nct_id)
+        if len(batch) >= batch_size:
+            for study in _iter_batch(batch, page_size, session):
+                yield study
+            batch = []
+    if batch:
+        for study in _iter_batch(batch, page_size, session):
+            yield study
+
+
+def _iter_batch(batch, page_size, session):
+    params = {"filter.ids": ",".join(batch), "pageSize": min(page_size, MAX_PAGE_SIZE)}
+    for studies in iter_pages(params, session):
+        for study in studies:
+            yield study
+
+
+def _value(value, table=None):
+    if value is None:
+        return None
+    if table is not None and value in table:
+        return table[value]
+    if value in VALUES:
+        return VALUES[value]
+    return value.replace("_", " ").title()
+
+
+def _yes_no(value):
+    if value is None:
+        return None
+    return "Yes" if value else "No"
+
+
+def _date(value):
+    """
+    Convert a v2 date (2015-01-22, or 2015-01) to the legacy format (January 22, 2015, or January 2015)
+    """
+    if value is None:
+        return None
+    parts = value.split("-")
+    if len(parts) == 3:
+        date = datetime.date(int(parts[0]), int(parts[1]), int(parts[2]))
+        return "{} {}, {}".format(date.strftime("%B"), date.day, date.year)
+    if len(parts) == 2:
+        return datetime.date(int(parts[0]), int(parts[1]), 1).strftime("%B %Y")
+    return value
+
+
+def _date_struct(struct, estimate="Anticipated"):
+    """
+    Convert a v2 date struct; ESTIMATED is 'Anticipated' for the study dates and 'Estimate' for the
+    posting dates in the legacy records
+    """
+    if not struct:
+        return None
+    date = _date(struct.get("date"))
+    if struct.get("type") is None:
+        return date
+    return {"$": date, "@type": "Actual" if struct["type"] == "ACTUAL" else estimate}
+
+
+def _agency_class(value):
+    # the legacy records have no OTHER_GOV, INDIV, NETWORK, AMBIG or UNKNOWN classes
+    if value is None:
+        return None
+    return AGENCY_CLASSES.get(value, "Other")
+
+
+def _textblock(value):
+    return None if value is None else dict(textblock=value)
+
+
+def _criteria(value):
+    """
+    Lay the markdown eligibility criteria of a v2 document out as the legacy text block: each section
+    header and each bullet a paragraph of its own (see helpers.process_eligibility), with the lines
+    continuing a bullet joined to it
+    """
+    if value is None:
+        return None
+    paragraphs = []
+    current = None
+    for line in value.split("\n"):
+        line = ESCAPE_PATTERN.sub(r"\1", line.strip())
+        match = BULLET_PATTERN.match(line)
+        if not line:
+            current = None
+        elif match:
+            current = ["          -  " + line[match.end():]]
+            paragraphs.append(current)
+        elif current is None or "Inclusion Criteria" in line or "Exclusion Criteria" in line:
+            current = ["        " + line]
+            paragraphs.append(current)
+        else:
+            current.append(line)
+    return dict(textblock="\n" + "\n\n".join(" ".join(x) for x in paragraphs) + "\n      ")
+
+
+def _contact(contact):
+    return _compact(dict(last_name=contact.get("name"), phone=contact.get("phone"),
+                         phone_ext=contact.get("phoneExt"), email=contact.get("email")))
+
+
+def _compact(record):
+    """
+    Drop the missing elements, as the legacy decoder does
+    """
+    return dict((key, value) for key, value in record.items() if value not in (None, [], {}))
+
+
+def _location(location):
+    contacts = [x for x in location.get("contacts", []) if x.get("role") in (None, "CONTACT")]
+    investigators = [x for x in location.get("contacts", []) if x.get("role") not in (None, "CONTACT")]
+    address = _compact(dict(city=location.get("city"), state=location.get("state"), zip=location.get("zip"),
+                            country=location.get("country")))
+    return _compact(dict(
+        facility=_compact(dict(name=location.get("facility"), address=address or None)),
+        status=_value(location.get("status"), STATUSES),
+        contact=_contact(contacts[0]) if contacts else None,
+        contact_backup=_contact(contacts[1]) if len(contacts) > 1 else None,
+        investigator=[_compact(dict(last_name=x.get("name"), role=_value(x.get("role")))) for x in investigators],
+    ))
+
+
+def _masking(masking):
+    if not masking or masking.get("masking") is None:
+        return None
+    value = _value(masking["masking"])
+    if masking.get("whoMasked"):
+        value = "{} ({})".format(value, ", ".join(_value(x) for x in masking["whoMasked"]))
+    return value
+
+
+def _outcomes(outcomes):
+    return [_compact(dict(measure=x.get("measure"), time_frame=x.get("timeFrame"), description=x.get("description")))
+            for x in outcomes or []]
+
+
+def _provided_documents(nct_id, documents):
+    return [_compact(dict(
+        document_type=x.get("label"),
+        document_has_protocol=_yes_no(x.get("hasProtocol")),
+        document_has_icf=_yes_no(x.get("hasIcf")),
+        document_has_sap=_yes_no(x.get("hasSap")),
+        document_date=_date(x.get("date")),
+        document_url="https://ClinicalTrials.gov/ProvidedDocs/{}/{}/{}".format(nct_id[-2:], nct_id, x.get("filename")),
+    )) for x in documents]
+
+
+def to_legacy(study):
+    """
+    Map a v2 study document onto the record layout decoded from the legacy XML.  The protocol
+    section and the derived MeSH terms are mapped; the results section is not (has_results is
+    carried by the document)
+    :param dict study: the v2 study document
+    :rtype: dict
+    """
+    protocol = study.get("protocolSection", {})
+    identification = protocol.get("identificationModule", {})
+    status = protocol.get("statusModule", {})
+    sponsors = protocol.get("sponsorCollaboratorsModule", {})
+    oversight = protocol.get("oversightModule", {})
+    description = protocol.get("descriptionModule", {})
+    conditions = protocol.get("conditionsModule", {})
+    design = protocol.get("designModule", {})
+    arms = protocol.get("armsInterventionsModule", {})
+    outcomes = protocol.get("outcomesModule", {})
+    eligibility = protocol.get("eligibilityModule", {})
+    contacts = protocol.get("contactsLocationsModule", {})
+    references = protocol.get("referencesModule", {})
+    ipd = protocol.get("ipdSharingStatementModule", {})
+    derived = study.get("derivedSection", {})
+    documents = study.get("documentSection", {}).get("largeDocumentModule", {}).get("largeDocs", [])
+    nct_id = identification.get("nctId")
+
+    design_info = design.get("designInfo", {})
+    lead_sponsor = sponsors.get("leadSponsor", {})
+    responsible = sponsors.get("responsibleParty", {})
+    enrollment = design.get("enrollmentInfo")
+    phases = design.get("phases")
+    central_contacts = contacts.get("centralContacts", [])
+    locations = contacts.get("locations", [])
+    expanded_access = design.get("expandedAccessTypes", {})
+    biospec = design.get("bioSpec", {})
+    study_type = _value(design.get("studyType"))
+    if study_type and design.get("patientRegistry"):
+        study_type = "{} [Patient Registry]".format(study_type)
+    arm_groups = arms.get("armGroups", [])
+
+    data = dict(
+        id_info=_compact(dict(
+            org_study_id=identification.get("orgStudyIdInfo", {}).get("id"),
+            secondary_id=[x.get("id") for x in identification.get("secondaryIdInfos", [])],
+            nct_id=nct_id,
+            nct_alias=identification.get("nctIdAliases", []),
+        )),
+        brief_title=identification.get("briefTitle"),
+        acronym=identification.get("acronym"),
+        official_title=identification.get("officialTitle"),
+        sponsors=_compact(dict(
+            lead_sponsor=_compact(dict(agency=lead_sponsor.get("name"),
+                                       agency_class=_agency_class(lead_sponsor.get("class")))),
+            collaborator=[_compact(dict(agency=x.get("name"), agency_class=_agency_class(x.get("class"))))
+                          for x in sponsors.get("collaborators", [])],
+        )),
+        source=identification.get("organization", {}).get("fullName"),
+        oversight_info=_compact(dict(
+            has_dmc=_yes_no(oversight.get("oversightHasDmc")),
+            is_fda_regulated_drug=_yes_no(oversight.get("isFdaRegulatedDrug")),
+            is_fda_regulated_device=_yes_no(oversight.get("isFdaRegulatedDevice")),
+            is_unapproved_device=_yes_no(oversight.get("isUnapprovedDevice")),
+            is_ppsd=_yes_no(oversight.get("isPpsd")),
+            is_us_export=_yes_no(oversight.get("isUsExport")),
+        )),
+        brief_summary=_textblock(description.get("briefSummary")),
+        detailed_description=_textblock(description.get("detailedDescription")),
+        overall_status=_value(status.get("overallStatus"), STATUSES),
+        last_known_status=_value(status.get("lastKnownStatus"), STATUSES),
+        why_stopped=status.get("whyStopped"),
+        start_date=_date_struct(status.get("startDateStruct")),
+        completion_date=_date_struct(status.get("completionDateStruct")),
+        primary_completion_date=_date_struct(status.get("primaryCompletionDateStruct")),
+        phase="/".join(_value(x, PHASES) for x in phases) if phases else None,
+        study_type=study_type,
+        has_expanded_access=_yes_no(status.get("expandedAccessInfo", {}).get("hasExpandedAccess")),
+        expanded_access_info=_compact(dict(
+            expanded_access_type_individual=_yes_no(expanded_access.get("individual")),
+            expanded_access_type_intermediate=_yes_no(expanded_access.get("intermediate")),
+            expanded_access_type_treatment=_yes_no(expanded_access.get("treatment")),
+        )),
+        study_design_info=_compact(dict(
+            allocation=_value(design_info.get("allocation")),
+            intervention_model=_value(design_info.get("interventionModel")),
+            intervention_model_description=design_info.get("interventionModelDescription"),
+            primary_purpose=_value(design_info.get("primaryPurpose")),
+            observational_model=_value(design_info.get("observationalModel")),
+            time_perspective=_value(design_info.get("timePerspective")),
+            masking=_masking(design_info.get("maskingInfo")),
+            masking_description=design_info.get("maskingInfo", {}).get("maskingDescription"),
+        )),
+        target_duration=design.get("targetDuration"),
+        primary_outcome=_outcomes(outcomes.get("primaryOutcomes")),
+        secondary_outcome=_outcomes(outcomes.get("secondaryOutcomes")),
+        other_outcome=_outcomes(outcomes.get("otherOutcomes")),
+        number_of_arms=len(arm_groups) if arm_groups and design.get("studyType") == "INTERVENTIONAL" else None,
+        number_of_groups=len(arm_groups) if arm_groups and design.get("studyType") == "OBSERVATIONAL" else None,
+        enrollment={"$": enrollment.get("count"), "@type": "Actual" if enrollment.get("type") == "ACTUAL"
+                    else "Anticipated"} if enrollment and enrollment.get("count") is not None else None,
+        condition=conditions.get("conditions", []),
+        arm_group=[_compact(dict(arm_group_label=x.get("label"), arm_group_type=_value(x.get("type")),
+                                 description=x.get("description"))) for x in arm_groups],
+        intervention=[_compact(dict(
+            intervention_type=_value(x.get("type")),
+            intervention_name=x.get("name"),
+            description=x.get("description"),
+            arm_group_label=x.get("armGroupLabels", []),
+            other_name=x.get("otherNames", []),
+        )) for x in arms.get("interventions", [])],
+        biospec_retention=_value(biospec.get("retention")),
+        biospec_descr=_textblock(biospec.get("description")),
+        eligibility=_compact(dict(
+            study_pop=_textblock(eligibility.get("studyPopulation")),
+            sampling_method=_value(eligibility.get("samplingMethod")),
+            criteria=_criteria(eligibility.get("eligibilityCriteria")),
+            gender=_value(eligibility.get("sex")),
+            gender_based=_yes_no(eligibility.get("genderBased")),
+            gender_description=eligibility.get("genderDescription"),
+            minimum_age=eligibility.get("minimumAge", "N/A"),
+            maximum_age=eligibility.get("maximumAge", "N/A"),
+            healthy_volunteers=None if eligibility.get("healthyVolunteers") is None else
+            "Accepts Healthy Volunteers" if eligibility["healthyVolunteers"] else "No",
+        )) if eligibility else None,
+        overall_official=[_compact(dict(last_name=x.get("name"), role=_value(x.get("role")),
+                                        affiliation=x.get("affiliation")))
+                          for x in contacts.get("overallOfficials", [])],
+        overall_contact=_contact(central_contacts[0]) if central_contacts else None,
+        overall_contact_backup=_contact(central_contacts[1]) if len(central_contacts) > 1 else None,
+        location=[_location(x) for x in locations],
+        location_countries=_compact(dict(country=sorted(set(x["country"] for x in locations if x.get("country"))))),
+        removed_countries=_compact(dict(country=derived.get("miscInfoModule", {}).get("removedCountries", []))),
+        link=[_compact(dict(url=x.get("url"), description=x.get("label"))) for x in references.get("seeAlsoLinks", [])],
+        reference=[_compact(dict(citation=x.get("citation"), PMID=x.get("pmid")))
+                   for x in references.get("references", []) if x.get("type") != "RESULT"],
+        results_reference=[_compact(dict(citation=x.get("citation"), PMID=x.get("pmid")))
+                           for x in references.get("references", []) if x.get("type") == "RESULT"],
+        verification_date=_date(status.get("statusVerifiedDate")),
+        study_first_submitted=_date(status.get("studyFirstSubmitDate")),
+        study_first_submitted_qc=_date(status.get("studyFirstSubmitQcDate")),
+        study_first_posted=_date_struct(status.get("studyFirstPostDateStruct"), "Estimate"),
+        results_first_submitted=_date(status.get("resultsFirstSubmitDate")),
+        results_first_submitted_qc=_date(status.get("resultsFirstSubmitQcDate")),
+        results_first_posted=_date_struct(status.get("resultsFirstPostDateStruct"), "Estimate"),
+        disposition_first_submitted=_date(status.get("dispFirstSubmitDate")),
+        disposition_first_submitted_qc=_date(status.get("dispFirstSubmitQcDate")),
+        disposition_first_posted=_date_struct(status.get("dispFirstPostDateStruct"), "Estimate"),
+        last_update_submitted=_date(status.get("lastUpdateSubmitDate")),
+        last_update_posted=_date_struct(status.get("lastUpdatePostDateStruct"), "Estimate"),
+        responsible_party=_compact(dict(
+            responsible_party_type=_value(responsible.get("type")),
+            investigator_affiliation=responsible.get("investigatorAffiliation"),
+            investigator_full_name=responsible.get("investigatorFullName"),
+            investigator_title=responsible.get("investigatorTitle"),
+        )),
+        keyword=conditions.get("keywords", []),
+        condition_browse=_compact(dict(
+            mesh_term=[x.get("term") for x in derived.get("conditionBrowseModule", {}).get("meshes", [])])),
+        intervention_browse=_compact(dict(
+            mesh_term=[x.get("term") for x in derived.get("interventionBrowseModule", {}).get("meshes", [])])),
+        patient_data=_compact(dict(sharing_ipd=_value(ipd.get("ipdSharing")), ipd_description=ipd.get("description"))),
+        provided_document_section=_compact(dict(provided_document=_provided_documents(nct_id, documents))),
+    )
+    return _compact(data)
@@ -0,0 +1,271 @@
+"""
+Connector backends, selectable at runtime, behind ClinicalStudy.from_nctid and the study documents
+lookup.  The live HTTP connector is the default; the offline backends read pre-fetched records
+from a directory of XML files, the official ZIP export or a corpus store, and never touch the
+network
+
+    set_backend(open_backend("AllPublicXML.zip"))
+    study = ClinicalStudy.from_nctid("NCT02348489")
+
+The CLINICAL_TRIALS_SOURCE environment variable selects the backend when none has been set
+"""
+import os
+import zipfile
+
+from clinical_trials import api_v2, connector, metrics
+
+ENVIRONMENT_VARIABLE = "CLINICAL_TRIALS_SOURCE"
+
+_backend = None
+_configured = False
+
+
+def _nct_id(name):
+    """
+    The NCT ID from a file or archive member name, eg NCT0000xxxx/NCT00000102.xml
+    """
+    return os.path.splitext(os.path.basename(name))[0].upper()
+
+
+class Backend(object):
+    """
+    A source of study records.  Backends with decoded set return the decoded records (get_data)
+    rather than the XML (get_study); the offline backends use the local copy of the schema
+    """
+
+    name = None
+    decoded = False
+    offline = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get_study(self, nct_id):
+        """
+        Get the XML for a study
+        :param str nct_id: the NCT ID
+        :rtype: bytes
+        """
+        raise ValueError("The {} backend does not hold XML records".format(self.name))
+
+    def get_data(self, nct_id):
+        """
+        Get the decoded record for a study
+        :param str nct_id: the NCT ID
+        :rtype: tuple(dict, bool)
+        :return: the record and the results flag
+        """
+        raise ValueError("The {} backend does not hold decoded records".format(self.name))
+
+    def get_study_documents(self, nct_id):
+        """
+        Get the study documents listed on the study page (title: link); the offline backends
+        have no study pages and find none
+        :param str nct_id: the NCT ID
+        :rtype: dict
+        """
+        return {}
+
+    def close(self):
+        pass
+
+
+class HTTPBackend(Backend):
+    """
+    The live clinicaltrials.gov connector
+    """
+
+    name = "http"
+
+    def get_study(self, nct_id):
+        return connector.get_study(nct_id)
+
+    def get_study_documents(self, nct_id):
+        return connector.get_study_documents(nct_id)
+
+
+class APIv2Backend(Backend):
+    """
+    The live ClinicalTrials.gov v2 API, mapped onto the decoded record layout (see api_v2.to_legacy)
+    """
+
+    name = "v2"
+    decoded = True
+
+    def __init__(self):
+        self._session = api_v2.get_session()
+
+    def get_data(self, nct_id):
+        study = api_v2.get_study_json(nct_id, self._session)
+        return api_v2.to_legacy(study), bool(study.get("hasResults"))
+
+    def close(self):
+        self._session.close()
+
+
+class _IndexedBackend(Backend):
+    """
+    A backend with an NCT ID index built when it is opened, so each lookup is a dict access
+    """
+
+    offline = True
+
+    def __init__(self, path):
+        self.path = path
+        self._index = self._build_index()
+
+    def _build_index(self):
+        raise NotImplementedError
+
+    def _read(self, key):
+        raise NotImplementedError
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, nct_id):
+        return nct_id.upper() in self._index
+
+    def nct_ids(self):
+        """
+        The NCT IDs held, in order
+        :rtype: list(str)
+        """
+        return sorted(self._index)
+
+    def get_study(self, nct_id):
+        key = self._index.get(nct_id.upper())
+        if key is None:
+            raise ValueError("Unable to load study {} from {}".format(nct_id, self.path))
+        with metrics.timer("connector.{}.get_study".format(self.name)) as timer:
+            content = self._read(key)
+            timer.size = len(content)
+        return content
+
+
+class DirectoryBackend(_IndexedBackend):
+    """
+    A directory (searched recursively) of XML records named by NCT ID, eg records fetched with
+    'clinical-trials fetch' or an unpacked export
+    """
+
+    name = "directory"
+
+    def _build_index(self):
+        index = {}
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                if name.endswith(".xml"):
+                    index[_nct_id(name)] = os.path.join(root, name)
+        return index
+
+    def _read(self, key):
+        with open(key, "rb") as fh:
+            return fh.read()
+
+
+class ZipBackend(_IndexedBackend):
+    """
+    The official ZIP export (AllPublicXML.zip); the index is built from the central directory,
+    without reading the members
+    """
+
+    name = "zip"
+
+    def __init__(self, path):
+        self._archive = zipfile.ZipFile(path)
+        super(ZipBackend, self).__init__(path)
+
+    def _build_index(self):
+        return dict((_nct_id(name), name) for name in self._archive.namelist() if name.endswith(".xml"))
+
+    def _read(self, key):
+        return self._archive.read(key)
+
+    def close(self):
+        self._archive.close()
+
+
+class CorpusBackend(Backend):
+    """
+    A corpus store (see clinical_trials.corpus_store); the records are already decoded
+    """
+
+    name = "corpus"
+    decoded = True
+    offline = True
+
+    def __init__(self, path):
+        from clinical_trials.corpus_store import CorpusStore
+
+        self.path = path
+        self._store = CorpusStore(path)
+
+    def __len__(self):
+        return len(self._store)
+
+    def __contains__(self, nct_id):
+        return nct_id.upper() in self._store
+
+    def nct_ids(self):
+        return list(self._store.nct_ids())
+
+    def get_data(self, nct_id):
+        with metrics.timer("connector.corpus.get_data"):
+            try:
+                return self._store.record(nct_id.upper())
+            except KeyError:
+                raise ValueError("Unable to load study {} from {}".format(nct_id, self.path))
+
+    def close(self):
+        self._store.close()
+
+
+def open_backend(source):
+    """
+    Open a backend
+    :param str source: 'http', 'v2', or the path to a directory of records, a ZIP export or a corpus store
+    :rtype: Backend
+    """
+    from clinical_trials.corpus_store import MAGIC
+
+    if source in (None, "http"):
+        return HTTPBackend()
+    if source == "v2":
+        return APIv2Backend()
+    if os.path.isdir(source):
+        return DirectoryBackend(source)
+    if os.path.isfile(source):
+        with open(source, "rb") as fh:
+            if fh.read(len(MAGIC)) == MAGIC:
+                return CorpusBackend(source)
+        if zipfile.is_zipfile(source):
+            return ZipBackend(source)
+    raise ValueError("Unable to open a backend for {}".format(source))
+
+
+def set_backend(backend):
+    """
+    Install a backend (None restores the live HTTP connector)
+    :param Backend backend: the backend
+    :return: the previous backend
+    """
+    global _backend, _configured
+    previous, _backend, _configured = _backend, backend, True
+    return previous
+
+
+def get_backend():
+    """
+    The installed backend; when none has been set, the backend for CLINICAL_TRIALS_SOURCE
+    :rtype: Backend
+    :return: the backend, or None for the live HTTP connector
+    """
+    global _backend, _configured
+    if not _configured:
+        source = os.environ.get(ENVIRONMENT_VARIABLE)
+        _backend, _configured = (open_backend(source) if source else None), True
+    return _backend
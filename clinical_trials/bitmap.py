@@ -0,0 +1,227 @@
+"""
+Compressed bitmaps of row numbers, after the Roaring layout: the rows are split into chunks of
+65536 by their high 16 bits, and each chunk is held as a sorted array of the low 16 bits while
+it is sparse, or as a 65536 bit integer once it is dense.  Intersections and unions work chunk
+by chunk, and the counts come from the chunks without building the result
+"""
+from array import array
+from bisect import bisect_left
+
+CHUNK = 1 << 16
+
+# a sparse chunk with more entries than this is held as a bitset (an array of 4096 entries is
+# the size of the bitset)
+ARRAY_LIMIT = 4096
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:  # pragma: no cover
+    def _popcount(value):
+        return bin(value).count("1")
+
+
+def _to_bits(values):
+    bits = 0
+    for value in values:
+        bits |= 1 << value
+    return bits
+
+
+def _to_array(bits):
+    values = array("H")
+    low = 0
+    while bits:
+        if bits & 0xFFFFFFFF:
+            word = bits & 0xFFFFFFFF
+            while word:
+                lowest = word & -word
+                values.append(low + lowest.bit_length() - 1)
+                word ^= lowest
+        bits >>= 32
+        low += 32
+    return values
+
+
+def _size(chunk):
+    return _popcount(chunk) if isinstance(chunk, int) else len(chunk)
+
+
+def _optimize(chunk):
+    """
+    Hold a chunk in the smaller form
+    """
+    if isinstance(chunk, int):
+        return _to_array(chunk) if _popcount(chunk) <= ARRAY_LIMIT else chunk
+    return _to_bits(chunk) if len(chunk) > ARRAY_LIMIT else chunk
+
+
+def _and(left, right):
+    if isinstance(left, int) and isinstance(right, int):
+        return left & right
+    if isinstance(left, int):
+        left, right = right, left
+    if isinstance(right, int):
+        return array("H", (x for x in left if right >> x & 1))
+    if len(left) > len(right):
+        left, right = right, left
+    members = set(right)
+    return array("H", (x for x in left if x in members))
+
+
+def _or(left, right):
+    if isinstance(left, int) or isinstance(right, int) or len(left) + len(right) > ARRAY_LIMIT:
+        left = left if isinstance(left, int) else _to_bits(left)
+        right = right if isinstance(right, int) else _to_bits(right)
+        return left | right
+    return array("H", sorted(set(left).union(right)))
+
+
+class Bitmap(object):
+    """
+    A set of non-negative integers (row numbers)
+    """
+
+    __slots__ = ("_chunks", "_bits")
+
+    def __init__(self, values=()):
+        """
+        :param iterable values: the initial members
+        """
+        self._chunks = {}
+        # the chunks as bitsets, for counting; dropped when the bitmap changes
+        self._bits = {}
+        for value in values:
+            self.add(value)
+
+    @classmethod
+    def _from_chunks(cls, chunks):
+        bitmap = cls()
+        bitmap._chunks = dict((key, _optimize(chunk)) for key, chunk in chunks.items() if _size(chunk))
+        return bitmap
+
+    @classmethod
+    def range(cls, stop):
+        """
+        The bitmap of 0 to stop - 1
+        :rtype: Bitmap
+        """
+        chunks = {}
+        for key in range(0, (stop + CHUNK - 1) // CHUNK):
+            chunks[key] = (1 << min(CHUNK, stop - key * CHUNK)) - 1
+        return cls._from_chunks(chunks)
+
+    def add(self, value):
+        key, low = value >> 16, value & 0xFFFF
+        self._bits.pop(key, None)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            self._chunks[key] = array("H", [low])
+        elif isinstance(chunk, int):
+            self._chunks[key] = chunk | 1 << low
+        else:
+            position = bisect_left(chunk, low)
+            if position == len(chunk) or chunk[position] != low:
+                chunk.insert(position, low)
+                if len(chunk) > ARRAY_LIMIT:
+                    self._chunks[key] = _to_bits(chunk)
+
+    def discard(self, value):
+        key, low = value >> 16, value & 0xFFFF
+        self._bits.pop(key, None)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return
+        if isinstance(chunk, int):
+            chunk &= ~(1 << low)
+            self._chunks[key] = _optimize(chunk)
+        else:
+            position = bisect_left(chunk, low)
+            if position < len(chunk) and chunk[position] == low:
+                del chunk[position]
+        if not _size(self._chunks[key]):
+            del self._chunks[key]
+
+    def __contains__(self, value):
+        chunk = self._chunks.get(value >> 16)
+        if chunk is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(chunk, int):
+            return bool(chunk >> low & 1)
+        position = bisect_left(chunk, low)
+        return position < len(chunk) and chunk[position] == low
+
+    def __len__(self):
+        return sum(_size(chunk) for chunk in self._chunks.values())
+
+    def __bool__(self):
+        return bool(self._chunks)
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        for key in sorted(self._chunks):
+            chunk = self._chunks[key]
+            base = key << 16
+            for low in (_to_array(chunk) if isinstance(chunk, int) else chunk):
+                yield base + low
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmap) and list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Bitmap({} members)".format(len(self))
+
+    def __and__(self, other):
+        chunks = {}
+        for key in set(self._chunks).intersection(other._chunks):
+            chunks[key] = _and(self._chunks[key], other._chunks[key])
+        return Bitmap._from_chunks(chunks)
+
+    def __or__(self, other):
+        chunks = dict(self._chunks)
+        for key, chunk in other._chunks.items():
+            chunks[key] = _or(chunks[key], chunk) if key in chunks else chunk
+        return Bitmap._from_chunks(dict((key, array("H", chunk) if isinstance(chunk, array) else chunk)
+                                        for key, chunk in chunks.items()))
+
+    def __sub__(self, other):
+        chunks = {}
+        for key, chunk in self._chunks.items():
+            if key not in other._chunks:
+                chunks[key] = array("H", chunk) if isinstance(chunk, array) else chunk
+                continue
+            bits = (chunk if isinstance(chunk, int) else _to_bits(chunk))
+            removed = other._chunks[key]
+            chunks[key] = bits & ~(removed if isinstance(removed, int) else _to_bits(removed))
+        return Bitmap._from_chunks(chunks)
+
+    def _bitset(self, key):
+        bits = self._bits.get(key)
+        if bits is None:
+            chunk = self._chunks[key]
+            bits = self._bits[key] = chunk if isinstance(chunk, int) else _to_bits(chunk)
+        return bits
+
+    def intersection_count(self, other):
+        """
+        The size of the intersection, without building it; the chunks are compared as bitsets,
+        which are kept for the next count
+        :param Bitmap other: the other bitmap
+        :rtype: int
+        """
+        return sum(_popcount(self._bitset(key) & other._bitset(key))
+                   for key in set(self._chunks).intersection(other._chunks))
+
+    def copy(self):
+        return self | Bitmap()
+
+    @property
+    def size_in_bytes(self):
+        """
+        The approximate size of the chunks
+        """
+        return sum(CHUNK // 8 if isinstance(chunk, int) else 2 * len(chunk) for chunk in self._chunks.values())
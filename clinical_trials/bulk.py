@@ -0,0 +1,738 @@
+"""
+Bulk readers, parallel decoding, checkpoints and writers, shared by the command line tool
+"""
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+import zipfile
+from xml.etree.ElementTree import ParseError
+from xml.parsers.expat import ExpatError
+
+from xmlschema import XMLSchemaException
+
+from clinical_trials import serialization
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.connector import get_study
+from clinical_trials.corpus_store import CorpusStore, CorpusWriter, MAGIC
+from clinical_trials.errors import RecordFailed
+from clinical_trials.projection import Projection
+from clinical_trials.serialization import dumps
+from clinical_trials.schema import get_registry, get_schema
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# the columns exported when no fields are given
+DEFAULT_FIELDS = (
+    "nct_id",
+    "brief_title",
+    "status",
+    "phase",
+    "study_type",
+    "conditions",
+    "keywords",
+    "countries",
+    "study_first_posted",
+    "last_update_posted",
+)
+
+def nct_id_from_name(name):
+    """
+    Get the NCT ID from an archive member or file name, eg NCT0000xxxx/NCT00000102.xml
+    :rtype: str
+    """
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def is_corpus_store(path):
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def iter_records(path):
+    """
+    Iterate over the XML records in a ZIP archive (as the official export), a directory or a file
+    :param str path: the source
+    :rtype: generator
+    :return: (NCT ID, content) pairs
+    """
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(".xml"):
+                    with open(os.path.join(root, name), "rb") as fh:
+                        yield nct_id_from_name(name), fh.read()
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith(".xml"):
+                    yield nct_id_from_name(name), archive.read(name)
+    elif os.path.isfile(path):
+        with open(path, "rb") as fh:
+            yield nct_id_from_name(path), fh.read()
+    else:
+        raise ValueError("Unable to read records from {}".format(path))
+
+
+def read_ids(path):
+    """
+    Read a list of NCT IDs, one per line ('#' starts a comment)
+    :param str path: the file ('-' for stdin)
+    :rtype: list(str)
+    """
+    fh = sys.stdin if path == "-" else open(path)
+    try:
+        ids = []
+        for line in fh:
+            line = line.split("#")[0].strip()
+            if line:
+                ids.append(line.upper())
+        return ids
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+class Checkpoint(object):
+    """
+    Append-only log of the completed NCT IDs; a rerun skips the IDs already in the log.  Each
+    batch of IDs is closed by a commit line ('@' and the output position), and the IDs after the
+    last commit line (a batch cut short) are not counted as completed
+    """
+
+    def __init__(self, filename):
+        """
+        :param str filename: path to the log (None for no checkpointing)
+        """
+        self.filename = filename
+        self.completed = set()
+        self.position = None
+        self.committed = False
+        self._fh = None
+        if filename is not None:
+            if os.path.exists(filename):
+                self._load(filename)
+            self._fh = open(filename, "a")
+
+    def _load(self, filename):
+        pending = []
+        offset = size = 0
+        with open(filename, "rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                line = line.decode("utf-8").strip()
+                if line.startswith("@"):
+                    self.completed.update(pending)
+                    pending = []
+                    self.position = int(line[1:]) if line[1:] else None
+                    self.committed = True
+                    size = offset
+                elif line:
+                    pending.append(line)
+        # drop the uncommitted tail, so the log stays well formed
+        with open(filename, "a") as fh:
+            fh.truncate(size)
+
+    def __contains__(self, nct_id):
+        return nct_id in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def mark(self, nct_ids, position=None):
+        """
+        Record IDs as completed; call once their output is flushed
+        :param iterable nct_ids: the NCT IDs
+        :param int position: the output position after the IDs were written (see Writer.position)
+        """
+        nct_ids = [x for x in nct_ids if x not in self.completed]
+        self.completed.update(nct_ids)
+        self.position = position
+        self.committed = True
+        if self._fh is not None:
+            lines = ["{}\n".format(x) for x in nct_ids]
+            lines.append("@{}\n".format("" if position is None else position))
+            self._fh.write("".join(lines))
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class Progress(object):
+    """
+    Periodic progress report on stderr (every seconds; 0 for the final report only)
+    """
+
+    def __init__(self, total=None, label="records", every=5.0, stream=None):
+        self.total = total
+        self.label = label
+        self.every = every
+        self.stream = stream or sys.stderr
+        self.count = 0
+        self.skipped = 0
+        self.started = time.time()
+        self._reported = self.started
+
+    def update(self, count=1, skipped=0):
+        self.count += count
+        self.skipped += skipped
+        now = time.time()
+        if self.every and now - self._reported >= self.every:
+            self._reported = now
+            self.report()
+
+    def report(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        total = "/{}".format(self.total) if self.total else ""
+        self.stream.write("{}{} {} ({} skipped) {:.1f}/s\n".format(
+            self.count, total, self.label, self.skipped, self.count / elapsed))
+        self.stream.flush()
+
+
+def build_structs(study):
+    """
+    Build the structs of every serialized field (see ClinicalStudy.SERIALIZED_FIELDS), so a record
+    the structs can not represent fails here; as in to_dict, a field is skipped when its section is
+    missing, so the properties that fall back to clinicaltrials.gov (the study documents) make no request
+    :param clinical_trials.ClinicalStudy study: the study
+    """
+    for name, section in ClinicalStudy.SERIALIZED_FIELDS:
+        if section is None or section in study._data:
+            value = getattr(study, name)
+            if callable(value):
+                value()
+
+
+def failure_stage(exc):
+    """
+    The stage a record failed in; 'decode' for malformed or schema invalid XML, else 'struct'
+    :rtype: str
+    """
+    if isinstance(exc, (XMLSchemaException, ParseError, ExpatError, UnicodeDecodeError)):
+        return "decode"
+    return "struct"
+
+
+_worker_schema = None
+_worker_registry = None
+_worker_fields = None
+_worker_projections = {}
+_worker_strict = False
+_worker_content = False
+
+
+def _init_worker(local_schema, fields, strict=False, with_content=False):
+    global _worker_schema, _worker_registry, _worker_fields, _worker_projections, _worker_strict, _worker_content
+    # the local schema revisions are chosen per record (see SchemaRegistry); the remote schema is the current one
+    _worker_registry = get_registry() if local_schema else None
+    _worker_schema = _worker_registry.get() if local_schema else get_schema()
+    _worker_fields = fields
+    version = _worker_registry.latest if local_schema else None
+    _worker_projections = {version: Projection(fields, schema=_worker_schema)} if fields else {}
+    _worker_strict = strict
+    _worker_content = with_content
+
+
+def _worker_decoder(content):
+    """
+    The schema of the revision a record was written against, and the projection over it
+    """
+    if _worker_registry is None:
+        version, schema = None, _worker_schema
+    else:
+        version, schema = _worker_registry.schema_for(content)
+    if _worker_fields and version not in _worker_projections:
+        _worker_projections[version] = Projection(_worker_fields, schema=schema)
+    return schema, _worker_projections.get(version)
+
+
+def _decode_worker(record):
+    nct_id, content = record
+    try:
+        schema, projection = _worker_decoder(content)
+        if projection is not None:
+            value = projection.extract(content)
+        else:
+            value = ClinicalStudy._decode(content, schema)
+            if _worker_strict:
+                build_structs(value)
+        return nct_id, value, None, content if _worker_content else None
+    except Exception as exc:
+        # the content is sent back so the caller can quarantine it
+        return nct_id, None, RecordFailed(nct_id, failure_stage(exc), type(exc).__name__, str(exc)), content
+
+
+def _failed(on_error, nct_id, content, error):
+    if on_error is None:
+        raise error
+    on_error(nct_id, content, error)
+
+
+def decode_records(records, workers=1, local_schema=True, fields=None, strict=False, on_error=None, chunksize=16,
+                   with_content=False):
+    """
+    Decode records, in a process pool when workers > 1; the output order follows the input
+    :param iterable records: (NCT ID, content) pairs
+    :param int workers: the number of processes
+    :param bool local_schema: Use the local copy of the public.xsd document
+    :param list fields: project these fields (as Projection) instead of decoding the full record
+    :param bool strict: build every struct of the decoded studies (see build_structs)
+    :param on_error: called with the NCT ID, content and RecordFailed for a record that fails,
+        which is then left out; if not given, the RecordFailed is raised
+    :param int chunksize: records sent to a worker at a time
+    :param bool with_content: yield the content of each record with its value
+    :rtype: generator
+    :return: (NCT ID, row) pairs with fields, else (NCT ID, ClinicalStudy) pairs; (NCT ID, value,
+        content) triples with_content
+    """
+    initargs = (local_schema, fields, strict, with_content)
+    if workers <= 1:
+        _init_worker(*initargs)
+        results = map(_decode_worker, records)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs)
+        results = pool.imap(_decode_worker, records, chunksize)
+    try:
+        for nct_id, value, error, content in results:
+            if error is not None:
+                _failed(on_error, nct_id, content, error)
+            elif with_content:
+                yield nct_id, value, content
+            else:
+                yield nct_id, value
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def iter_studies(path, workers=1, local_schema=True, fields=None, skip=None, strict=False, on_error=None,
+                 with_content=False):
+    """
+    Iterate over the studies in a source; a corpus store or any source read by iter_records
+    :param str path: the source
+    :param int workers: the number of decoding processes
+    :param bool local_schema: Use the local copy of the public.xsd document
+    :param list fields: project these fields instead of decoding the full record
+    :param skip: NCT IDs to leave out (eg a Checkpoint), checked before decoding
+    :param bool strict: build every struct of the decoded studies (see build_structs)
+    :param on_error: called for a record that fails (see decode_records)
+    :param bool with_content: yield the content of each record with its value (None from a corpus store)
+    :rtype: generator
+    :return: (NCT ID, ClinicalStudy) pairs, or (NCT ID, row) pairs with fields; (NCT ID, value,
+        content) triples with_content
+    """
+    skip = skip if skip is not None else ()
+    if is_corpus_store(path):
+        projection = Projection(fields, local_schema=local_schema) if fields else None
+        with CorpusStore(path) as store:
+            for nct_id in store.nct_ids():
+                if nct_id in skip:
+                    continue
+                study = store[nct_id]
+                try:
+                    if strict:
+                        build_structs(study)
+                    value = projection.values(study) if projection else study
+                except Exception as exc:
+                    # the record was decoded when the store was written, there is no XML to keep
+                    _failed(on_error, nct_id, None, RecordFailed(nct_id, "struct", type(exc).__name__, str(exc)))
+                    continue
+                yield (nct_id, value, None) if with_content else (nct_id, value)
+        return
+    records = ((nct_id, content) for nct_id, content in iter_records(path) if nct_id not in skip)
+    for item in decode_records(records, workers=workers, local_schema=local_schema, fields=fields, strict=strict,
+                               on_error=on_error, with_content=with_content):
+        yield item
+
+
+def fetch_records(nct_ids, concurrency=4):
+    """
+    Fetch records from clinicaltrials.gov, concurrency requests at a time
+    :param iterable nct_ids: the NCT IDs
+    :param int concurrency: concurrent requests
+    :rtype: generator
+    :return: (NCT ID, content or exception) pairs, in the input order
+    """
+    def fetch(nct_id):
+        try:
+            return nct_id, get_study(nct_id)
+        except Exception as exc:
+            return nct_id, exc
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for item in executor.map(fetch, nct_ids):
+            yield item
+
+
+def _scalar(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return dumps(value)
+
+
+class JSONLWriter(serialization.JSONLWriter):
+    """
+    One JSON document per line (the fields, or ClinicalStudy.to_dict for the full record); appends
+    to an existing file.  The resumable form of clinical_trials.serialization.JSONLWriter, taking
+    the NCT ID with each value as the other writers do
+    """
+
+    def __init__(self, filename, fields=None, backend=None):
+        super(JSONLWriter, self).__init__(filename, backend, append=True)
+        self.fields = fields
+
+    def position(self):
+        """
+        The output position, recorded in the checkpoint
+        :rtype: int
+        """
+        return self._fh.tell()
+
+    def truncate(self, position):
+        """
+        Drop the output written after a position (the records of a batch that was cut short)
+        :param int position: the position, as recorded in the checkpoint
+        """
+        self._fh.seek(position)
+        self._fh.truncate()
+
+    def write(self, nct_id, value):
+        super(JSONLWriter, self).write(dict(zip(self.fields, value)) if self.fields else value)
+
+    def write_all(self, values):
+        """
+        Write a stream of records
+        :param iterable values: (NCT ID, value) pairs
+        :return: the number of documents written
+        """
+        for nct_id, value in values:
+            self.write(nct_id, value)
+        return self.count
+
+    def flush(self):
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def close(self):
+        self.flush()
+        super(JSONLWriter, self).close()
+
+
+class SQLiteWriter(object):
+    """
+    A studies table, one column per field (non scalar values as JSON); rows are keyed by NCT ID
+    """
+
+    def __init__(self, filename, fields=None, table="studies"):
+        self.fields = tuple(fields or DEFAULT_FIELDS)
+        self.columns = [field.replace(".", "_") for field in self.fields]
+        if "nct_id" not in self.fields:
+            self.columns.insert(0, "nct_id")
+        self.table = table
+        self._connection = sqlite3.connect(filename)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS {} ({}, PRIMARY KEY (nct_id))".format(
+            table, ", ".join(self.columns)))
+
+    def position(self):
+        # rows are replaced by NCT ID, so a replayed batch leaves no duplicates
+        return None
+
+    def truncate(self, position):
+        pass
+
+    def write(self, nct_id, value):
+        values = [_scalar(x) for x in value]
+        if "nct_id" not in self.fields:
+            values.insert(0, nct_id)
+        self._connection.execute("INSERT OR REPLACE INTO {} ({}) VALUES ({})".format(
+            self.table, ", ".join(self.columns), ", ".join("?" * len(self.columns))), values)
+
+    def flush(self):
+        self._connection.commit()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+
+def _arrow_type(values):
+    """
+    The Parquet column type for the values of a field; text unless every value is a boolean, an
+    integer or a number (a column with no values is text)
+    """
+    kinds = set(type(x) for x in values if x is not None)
+    if kinds == {bool}:
+        return pyarrow.bool_()
+    if kinds and kinds <= {int}:
+        return pyarrow.int64()
+    if kinds and kinds <= {int, float}:
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+class ParquetWriter(object):
+    """
+    A Parquet file, one column per field (booleans and numbers typed, non scalar values as JSON);
+    needs pyarrow.  Rows are written in row groups of batch_size, and a file cannot be appended to
+    """
+
+    def __init__(self, filename, fields=None, batch_size=10000):
+        if pyarrow is None:
+            raise ValueError("Parquet export needs pyarrow (pip install clinical_trials[parquet])")
+        self.filename = filename
+        self.fields = tuple(fields or DEFAULT_FIELDS)
+        self.batch_size = batch_size
+        self._rows = []
+        self._writer = None
+
+    def write(self, nct_id, value):
+        self._rows.append([_scalar(x) for x in value])
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        columns = list(zip(*self._rows))
+        if self._writer is None:
+            # the column types are fixed by the first row group
+            schema = pyarrow.schema([(field, _arrow_type(column)) for field, column in zip(self.fields, columns)])
+            self._writer = pyarrow.parquet.ParquetWriter(self.filename, schema)
+        schema = self._writer.schema
+        arrays = []
+        for field, column in zip(schema, columns):
+            if field.type == pyarrow.string():
+                column = [x if x is None or isinstance(x, str) else str(x) for x in column]
+            arrays.append(pyarrow.array(column, type=field.type))
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+        self._rows = []
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class CorpusStoreWriter(object):
+    """
+    A binary corpus store (see clinical_trials.corpus_store); written in one pass
+    """
+
+    fields = None
+
+    def __init__(self, filename):
+        self._writer = CorpusWriter(filename)
+
+    def write(self, nct_id, value):
+        self._writer.add_study(value)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._writer.close()
+
+
+FORMATS = ("jsonl", "sqlite", "parquet", "corpus")
+
+# formats that can be resumed from a checkpoint
+RESUMABLE = ("jsonl", "sqlite")
+
+
+def open_writer(output_format, filename, fields=None):
+    """
+    Open a writer
+    :param str output_format: one of FORMATS
+    :param str filename: the output path
+    :param list fields: the fields to export (the full record for jsonl when not given)
+    """
+    if output_format == "jsonl":
+        return JSONLWriter(filename, fields)
+    if output_format == "sqlite":
+        return SQLiteWriter(filename, fields)
+    if output_format == "parquet":
+        return ParquetWriter(filename, fields)
+    if output_format == "corpus":
+        return CorpusStoreWriter(filename)
+    raise ValueError("Unknown format {}".format(output_format))
+
+
+class Quarantine(object):
+    """
+    A directory of the records that failed; the raw XML (NCT ID.xml, so the directory can be fed
+    back through iter_records) and the error (NCT ID.error.json) for each
+    """
+
+    def __init__(self, directory):
+        """
+        :param str directory: the quarantine directory (created if needed)
+        """
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, nct_id, suffix):
+        return os.path.join(self.directory, "{}{}".format(nct_id, suffix))
+
+    def add(self, nct_id, content, error):
+        """
+        Quarantine a record; a record quarantined again is replaced
+        :param str nct_id: the NCT ID
+        :param bytes content: the raw XML (None if there is none)
+        :param clinical_trials.errors.RecordFailed error: the failure
+        """
+        if content is not None:
+            with open(self._path(nct_id, ".xml.part"), "wb") as fh:
+                fh.write(content)
+            os.rename(self._path(nct_id, ".xml.part"), self._path(nct_id, ".xml"))
+        with open(self._path(nct_id, ".error.json"), "w") as fh:
+            json.dump(dict(nct_id=nct_id, stage=error.stage, error_type=error.error_type, message=error.message,
+                           quarantined=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())), fh, indent=2)
+
+    def __contains__(self, nct_id):
+        return os.path.exists(self._path(nct_id, ".error.json"))
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith(".error.json"))
+
+    def errors(self):
+        """
+        The quarantined failures, by NCT ID
+        :rtype: generator
+        :return: the error documents (nct_id, stage, error_type, message, quarantined)
+        """
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(".error.json"):
+                with open(os.path.join(self.directory, name)) as fh:
+                    yield json.load(fh)
+
+
+class PipelineStats(object):
+    """
+    The counts for a pipeline run
+    """
+
+    __slots__ = ("written", "quarantined", "skipped", "duplicates")
+
+    def __init__(self):
+        self.written = 0
+        self.quarantined = 0
+        self.skipped = 0
+        self.duplicates = 0
+
+    def __repr__(self):
+        return "<PipelineStats written={} quarantined={} skipped={} duplicates={}>".format(
+            self.written, self.quarantined, self.skipped, self.duplicates)
+
+
+class _Unprocessed(object):
+    """
+    Filters the records of a run; each NCT ID is let through once, unless the checkpoint has it
+    """
+
+    def __init__(self, checkpoint, stats):
+        self.checkpoint = checkpoint
+        self.stats = stats
+        self.seen = set()
+
+    def __contains__(self, nct_id):
+        if nct_id in self.checkpoint:
+            self.stats.skipped += 1
+            return True
+        if nct_id in self.seen:
+            self.stats.duplicates += 1
+            return True
+        self.seen.add(nct_id)
+        return False
+
+
+def run_pipeline(source, writer, checkpoint=None, quarantine=None, workers=1, local_schema=True, fields=None,
+                 strict=False, batch_size=500, progress=None):
+    """
+    Decode the records of a source into a writer, once per NCT ID.  With a checkpoint the run can
+    be resumed: the writer is first cut back to the position of the last committed batch (a new
+    checkpoint records the position the output starts at), and the IDs committed (written or
+    quarantined) are skipped.  A record that fails is quarantined rather than ending the run
+    :param str source: the source (see iter_studies)
+    :param writer: the writer (see open_writer); must be resumable to use a checkpoint
+    :param Checkpoint checkpoint: the checkpoint (default, none)
+    :param Quarantine quarantine: where the failures go (default, the first failure is raised)
+    :param int workers: the number of decoding processes
+    :param bool local_schema: Use the local copy of the public.xsd document
+    :param list fields: project these fields instead of decoding the full record
+    :param bool strict: build every struct of the decoded studies (see build_structs)
+    :param int batch_size: records per committed batch
+    :param Progress progress: the progress report
+    :rtype: PipelineStats
+    """
+    checkpoint = checkpoint if checkpoint is not None else Checkpoint(None)
+    stats = PipelineStats()
+    if checkpoint.filename is not None:
+        if not hasattr(writer, "truncate"):
+            raise ValueError("{} can not be resumed".format(type(writer).__name__))
+        if checkpoint.position is not None:
+            writer.truncate(checkpoint.position)
+        elif writer.position() is not None:
+            # a new checkpoint: the output already written is kept, and a first batch cut short is
+            # cut back to where this run started
+            checkpoint.mark([], writer.position())
+    batch = []
+
+    def commit():
+        if checkpoint.filename is not None:
+            writer.flush()
+            checkpoint.mark(batch, writer.position())
+        del batch[:]
+
+    def quarantined(nct_id, content, error):
+        if quarantine is None:
+            raise error
+        quarantine.add(nct_id, content, error)
+        stats.quarantined += 1
+        batch.append(nct_id)
+        if progress is not None:
+            progress.update(0, skipped=1)
+
+    try:
+        # the content is carried to the writer, so a record that can not be converted is quarantined with it
+        for nct_id, value, content in iter_studies(source, workers=workers, local_schema=local_schema, fields=fields,
+                                                   skip=_Unprocessed(checkpoint, stats), strict=strict,
+                                                   on_error=quarantined, with_content=True):
+            try:
+                writer.write(nct_id, value)
+            except (IOError, sqlite3.Error):
+                raise
+            except Exception as exc:
+                # the record could not be converted for the output
+                quarantined(nct_id, content, RecordFailed(nct_id, "struct", type(exc).__name__, str(exc)))
+                continue
+            stats.written += 1
+            batch.append(nct_id)
+            if progress is not None:
+                progress.update()
+            if len(batch) >= batch_size:
+                commit()
+        commit()
+    finally:
+        # an aborted run leaves the output as of the last committed batch (cut back on resume)
+        try:
+            writer.close()
+        finally:
+            checkpoint.close()
+    return stats
@@ -0,0 +1,325 @@
+"""
+Command line tool for bulk work over clinicaltrials.gov records
+
+    clinical-trials fetch ids.txt --output records/ --concurrency 8
+    clinical-trials ingest AllPublicXML.zip --output corpus.bin --workers 8
+    clinical-trials export corpus.bin --format sqlite --output studies.db --fields nct_id status phase
+    clinical-trials index corpus.bin --search search.db --locations locations.idx --xref xref.db
+    clinical-trials bench AllPublicXML.zip --limit 1000 --workers 4
+    clinical-trials validate AllPublicXML.zip --workers 8 --output conformance.json --errors errors.jsonl
+    clinical-trials codegen --check
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from xmlschema import XMLSchema
+
+from clinical_trials import codegen, metrics
+from clinical_trials.bulk import (
+    DEFAULT_FIELDS,
+    FORMATS,
+    RESUMABLE,
+    Checkpoint,
+    Progress,
+    Quarantine,
+    decode_records,
+    fetch_records,
+    is_corpus_store,
+    iter_records,
+    iter_studies,
+    open_writer,
+    read_ids,
+    run_pipeline,
+)
+from clinical_trials.conformance import check_corpus
+from clinical_trials.errors import RecordFailed
+from clinical_trials.geo import LocationIndexBuilder
+from clinical_trials.search import StudySearchIndex
+from clinical_trials.xref import CrossReferenceIndex
+
+
+def _progress(args, label, total=None):
+    return Progress(total=total, label=label, every=args.progress)
+
+
+def fetch(args):
+    """
+    Download records into a directory, one file per NCT ID; records already on disk are skipped
+    """
+    nct_ids = read_ids(args.ids)
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+    checkpoint = Checkpoint(args.checkpoint)
+    pending = [x for x in nct_ids
+               if x not in checkpoint and not os.path.exists(os.path.join(args.output, "{}.xml".format(x)))]
+    progress = _progress(args, "fetched", total=len(nct_ids))
+    progress.update(0, skipped=len(nct_ids) - len(pending))
+    failed = 0
+    try:
+        for nct_id, content in fetch_records(pending, concurrency=args.concurrency):
+            if isinstance(content, Exception):
+                failed += 1
+                sys.stderr.write("{}: {}\n".format(nct_id, content))
+                continue
+            filename = os.path.join(args.output, "{}.xml".format(nct_id))
+            with open(filename + ".part", "wb") as fh:
+                fh.write(content)
+            os.rename(filename + ".part", filename)
+            checkpoint.mark([nct_id])
+            progress.update()
+    finally:
+        checkpoint.close()
+    progress.report()
+    return 1 if failed else 0
+
+
+def _run(args, output_format, fields, label):
+    if args.checkpoint and output_format not in RESUMABLE:
+        raise ValueError("{} exports can not be resumed".format(output_format))
+    progress = _progress(args, label)
+    stats = run_pipeline(
+        args.source,
+        open_writer(output_format, args.output, fields),
+        checkpoint=Checkpoint(args.checkpoint) if args.checkpoint else None,
+        quarantine=Quarantine(args.quarantine) if args.quarantine else None,
+        workers=args.workers,
+        local_schema=not args.remote_schema,
+        fields=fields,
+        strict=args.strict,
+        batch_size=args.batch_size,
+        progress=progress,
+    )
+    progress.report()
+    sys.stderr.write("{} written, {} quarantined, {} already done, {} duplicates\n".format(
+        stats.written, stats.quarantined, stats.skipped, stats.duplicates))
+    return 0
+
+
+def ingest(args):
+    """
+    Build a binary corpus store from an archive or directory of records
+    """
+    return _run(args, "corpus", None, "ingested")
+
+
+def export(args):
+    """
+    Export studies to JSONL, SQLite, Parquet or a corpus store; JSONL and SQLite exports resume
+    from the checkpoint
+    """
+    fields = args.fields
+    if fields is None and args.format != "jsonl":
+        fields = list(DEFAULT_FIELDS)
+    if args.format == "corpus":
+        fields = None
+    return _run(args, args.format, fields, "exported")
+
+
+def index(args):
+    """
+    Build the full-text search index, the location index and/or the cross-reference index
+    """
+    if not (args.search or args.locations or args.xref):
+        raise ValueError("Nothing to build; give --search, --locations and/or --xref")
+    progress = _progress(args, "indexed")
+    search_index = StudySearchIndex(args.search) if args.search else None
+    xref_index = CrossReferenceIndex(args.xref) if args.xref else None
+    # only the geocoded points are kept, not the studies
+    locations = LocationIndexBuilder(cell_size=args.cell_size) if args.locations else None
+    try:
+        batch = []
+        for _, study in iter_studies(args.source, workers=args.workers, local_schema=not args.remote_schema):
+            progress.update()
+            if locations is not None:
+                locations.add_study(study)
+            if search_index is not None or xref_index is not None:
+                batch.append(study)
+                if len(batch) >= args.batch_size:
+                    _index_batch(batch, search_index, xref_index, args.batch_size)
+                    batch = []
+        _index_batch(batch, search_index, xref_index, args.batch_size)
+        if search_index is not None:
+            search_index.optimize()
+    finally:
+        if search_index is not None:
+            search_index.close()
+        if xref_index is not None:
+            xref_index.close()
+    if locations is not None:
+        locations.build().save(args.locations)
+    progress.report()
+    return 0
+
+
+def _index_batch(batch, search_index, xref_index, batch_size):
+    if search_index is not None:
+        search_index.add_studies(batch, batch_size=batch_size)
+    if xref_index is not None:
+        xref_index.add_studies(batch, batch_size=batch_size)
+
+
+def bench(args):
+    """
+    Time decoding a sample of records and print the per stage metrics
+    """
+    sink = metrics.get_sink()
+    if is_corpus_store(args.source):
+        raise ValueError("bench reads XML records; give an archive, directory or record")
+    records = list(itertools.islice(iter_records(args.source), args.limit))
+    size = sum(len(content) for _, content in records)
+    started = time.time()
+    count = 0
+    for _ in decode_records(records, workers=args.workers, local_schema=not args.remote_schema, fields=args.fields):
+        count += 1
+    elapsed = max(time.time() - started, 1e-9)
+    print("{} records ({} bytes) in {:.2f}s: {:.1f} records/s, {:.2f} MB/s".format(
+        count, size, elapsed, count / elapsed, size / elapsed / 1e6))
+    # the stages timed in worker processes are not collected
+    if args.workers <= 1:
+        print_summary(sink)
+    return 0
+
+
+def validate(args):
+    """
+    Check every record against the schema and print the most frequent error classes
+    """
+    progress = _progress(args, "checked")
+    report = check_corpus(args.source, workers=args.workers, local_schema=not args.remote_schema,
+                          errors=args.errors, progress=progress)
+    progress.report()
+    if args.output:
+        report.write(args.output)
+    print("{} records: {} valid, {} invalid, {} errors".format(report.records, report.valid, report.invalid,
+                                                              report.errors))
+    for name, counts in report.top(args.top):
+        print("{:>8} records {:>8} errors  {}".format(counts["records"], counts["errors"], name))
+    return 1 if report.invalid else 0
+
+
+def generate(args):
+    """
+    Generate the struct module from the schema, or check it is current
+    """
+    schema = XMLSchema(args.schema) if args.schema else None
+    if args.check:
+        if not codegen.is_current(schema, args.output):
+            sys.stderr.write("{} is out of date; run clinical-trials codegen\n".format(args.output))
+            return 1
+        return 0
+    count = codegen.write_module(schema, args.output)
+    print("{} struct classes written to {}".format(count, args.output))
+    return 0
+
+
+def print_summary(sink, stream=None):
+    """
+    Print the per stage and per cache aggregates of a MemorySink
+    """
+    stream = stream or sys.stdout
+    snapshot = sink.snapshot()
+    stream.write("{:<32} {:>10} {:>12} {:>12} {:>14}\n".format("stage", "calls", "total (s)", "mean (ms)", "bytes"))
+    for name, stats in sorted(snapshot["stages"].items()):
+        stream.write("{:<32} {:>10} {:>12.3f} {:>12.3f} {:>14}\n".format(
+            name, stats["count"], stats["total"], stats["mean"] * 1e3, stats["bytes"]))
+    for name, stats in sorted(snapshot["caches"].items()):
+        stream.write("{:<32} {:>10} hits {:>10} misses {:>6.1%}\n".format(
+            name, stats["hits"], stats["misses"], stats["ratio"]))
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(prog="clinical-trials", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metrics", action="store_true", help="print the per stage metrics when done")
+    parser.add_argument("--metrics-json", metavar="PATH", help="write the per stage metrics as JSON")
+    parser.add_argument("--prometheus", metavar="PATH", help="write the metrics for a Prometheus textfile collector")
+    parser.add_argument("--progress", type=float, default=5.0, metavar="SECONDS",
+                        help="progress report interval (0 to disable)")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    def source_command(name, func, help_text):
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("source", help="ZIP archive, directory of XML records, record or corpus store")
+        command.add_argument("--workers", type=int, default=1, help="decoding processes")
+        command.add_argument("--remote-schema", action="store_true", help="fetch the schema from clinicaltrials.gov")
+        command.set_defaults(func=func)
+        return command
+
+    def pipeline_options(command):
+        command.add_argument("--output", required=True, help="the output file")
+        command.add_argument("--quarantine", metavar="DIR", help="keep the records that fail here and carry on")
+        command.add_argument("--strict", action="store_true", help="quarantine records the structs can not build")
+        command.add_argument("--batch-size", type=int, default=500, help="records between checkpoints")
+
+    command = subparsers.add_parser("fetch", help="download records")
+    command.add_argument("ids", help="file of NCT IDs, one per line ('-' for stdin)")
+    command.add_argument("--output", required=True, help="directory for the records")
+    command.add_argument("--concurrency", type=int, default=4, help="concurrent requests")
+    command.add_argument("--checkpoint", help="log of the completed NCT IDs")
+    command.set_defaults(func=fetch)
+
+    command = source_command("ingest", ingest, "build a binary corpus store")
+    pipeline_options(command)
+    command.set_defaults(checkpoint=None)
+
+    command = source_command("export", export, "export studies")
+    pipeline_options(command)
+    command.add_argument("--format", choices=FORMATS, default="jsonl")
+    command.add_argument("--fields", nargs="+", help="ClinicalStudy properties or paths (see Projection)")
+    command.add_argument("--checkpoint", help="log of the completed NCT IDs (jsonl and sqlite)")
+
+    command = source_command("index", index, "build the search indexes")
+    command.add_argument("--search", help="the full-text index (SQLite)")
+    command.add_argument("--locations", help="the location index")
+    command.add_argument("--xref", help="the cross-reference index (SQLite)")
+    command.add_argument("--cell-size", type=float, default=1.0, help="location grid cell size in degrees")
+    command.add_argument("--batch-size", type=int, default=1000, help="studies per transaction")
+
+    command = source_command("bench", bench, "time decoding and print the metrics")
+    command.add_argument("--limit", type=int, default=100, help="records to decode")
+    command.add_argument("--fields", nargs="+", help="project these fields rather than decode the records")
+
+    command = source_command("validate", validate, "check the records against the schema")
+    command.add_argument("--output", help="write the report (JSON)")
+    command.add_argument("--errors", help="write the errors of each invalid record (JSON lines)")
+    command.add_argument("--top", type=int, default=20, help="error classes printed")
+
+    command = subparsers.add_parser("codegen", help="generate the struct module from the schema")
+    command.add_argument("--schema", help="the schema document (the local public.xsd by default)")
+    command.add_argument("--output", default=codegen.GENERATED_MODULE, help="the module path")
+    command.add_argument("--check", action="store_true", help="only check the module is current")
+    command.set_defaults(func=generate)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+    sink = None
+    if args.metrics or args.metrics_json or args.prometheus or args.command == "bench":
+        sink = metrics.PrometheusSink()
+    previous = metrics.set_sink(sink)
+    try:
+        status = args.func(args)
+    except (ValueError, IOError, RecordFailed) as exc:
+        sys.stderr.write("clinical-trials {}: {}\n".format(args.command, exc))
+        return 2
+    finally:
+        metrics.set_sink(previous)
+    if sink is not None:
+        if args.metrics and args.command != "bench":
+            print_summary(sink, sys.stderr)
+        if args.metrics_json:
+            with open(args.metrics_json, "w") as fh:
+                json.dump(sink.snapshot(), fh, indent=2, sort_keys=True)
+        if args.prometheus:
+            sink.write(args.prometheus)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
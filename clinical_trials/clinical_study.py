@@ -2,9 +2,17 @@ import os
 
 from glom import glom
 
+from clinical_trials import metrics, serialization
+from clinical_trials.api_v2 import BATCH_SIZE, iter_studies_json, to_legacy
+from clinical_trials.backends import get_backend
 from clinical_trials.connector import get_study, get_study_documents
+from clinical_trials.design import DesignGraph
+from clinical_trials.eligibility import extract_constraints
+from clinical_trials.generated_structs import ClinicalStudyRecord
 from clinical_trials.helpers import process_textblock, yes_no_enum
+from clinical_trials.lazy import LazyStudyData
 from clinical_trials.schema import get_schema, get_local_schema
+from clinical_trials.stream import CHUNK_SIZE, parse_buffer, parse_stream
 from clinical_trials.structs import (
     StudyDesignInfo,
     OversightInfo,
@@ -24,10 +32,65 @@ from clinical_trials.structs import (
     StudyOutcomes,
     PatientData,
     Reference,
-    StudyDocument, ProvidedDocument)
+    StudyDocument, ProvidedDocument, serialize)
 
 
 class ClinicalStudy:
+    # the (property, section) pairs output by to_dict; a property is left out when its section is
+    # missing from the record (None for those that are always output)
+    SERIALIZED_FIELDS = (
+        ("nct_id", None),
+        ("study_id", None),
+        ("secondary_id", None),
+        ("brief_title", None),
+        ("official_title", None),
+        ("acronym", None),
+        ("sponsor", "sponsors"),
+        ("collaborators", "sponsors"),
+        ("source", "source"),
+        ("oversight_info", "oversight_info"),
+        ("brief_summary", None),
+        ("detailed_description", None),
+        ("status", None),
+        ("last_known_status", None),
+        ("why_stopped", None),
+        ("phase", None),
+        ("study_type", None),
+        ("has_expanded_access", None),
+        ("expanded_access_info", None),
+        ("study_design", None),
+        ("outcomes", None),
+        ("number_of_arms", None),
+        ("number_of_groups", None),
+        ("enrollment_info", "enrollment"),
+        ("conditions", None),
+        ("arms", None),
+        ("interventions", None),
+        ("biospec_retention", None),
+        ("biospec_description", None),
+        ("eligibility", "eligibility"),
+        ("overall_officials", None),
+        ("overall_contact", None),
+        ("overall_contact_backup", None),
+        ("locations", None),
+        ("countries", None),
+        ("removed_countries", None),
+        ("links", None),
+        ("references", None),
+        ("results_references", None),
+        ("verification_date", "verification_date"),
+        ("completion_date", "completion_date"),
+        ("primary_completion_date", "primary_completion_date"),
+        ("trail", None),
+        ("responsible_parties", None),
+        ("keywords", None),
+        ("mesh_terms", None),
+        ("patient_data", None),
+        ("target_duration", None),
+        ("provided_docs", None),
+        ("study_documents", "study_docs"),
+    )
+
     def __init__(self, data, has_results=False):
         self.has_results = has_results
         self._data = data
@@ -36,8 +99,10 @@ class ClinicalStudy:
         self._responsible_parties = None
         self._oversight_info = None
         self._eligibility = None
+        self._eligibility_constraints = None
         self._arms = None
         self._interventions = None
+        self._design = None
         self._drug_names = []
         self._trail = None
         self._outcomes = None
@@ -47,6 +112,18 @@ class ClinicalStudy:
         self._primary_outcomes = []
         self._facilities = []
         self._provided_docs = None
+        self._textblocks = {}
+        self._record = None
+
+    @property
+    def record(self):
+        """
+        Get the whole record as the generated structs (see clinical_trials.codegen)
+        :rtype: clinical_trials.generated_structs.ClinicalStudyRecord
+        """
+        if self._record is None:
+            self._record = ClinicalStudyRecord.from_dict(self._data)
+        return self._record
 
     @property
     def provided_docs(self):
@@ -61,8 +138,7 @@ class ClinicalStudy:
 
     @property
     def biospec_description(self):
-        content = glom(self._data, "biospec_descr.textblock", default="")
-        return process_textblock(content)
+        return self._textblock("biospec_descr")
 
     @property
     def number_of_arms(self):
@@ -106,6 +182,14 @@ class ClinicalStudy:
                 glom(self._data, "expanded_access_info")
             )
 
+    @property
+    def brief_title(self):
+        return glom(self._data, "brief_title", default="")
+
+    @property
+    def official_title(self):
+        return glom(self._data, "official_title", default="")
+
     @property
     def acronym(self):
         return glom(self._data, "acronym", default=None)
@@ -208,13 +292,11 @@ class ClinicalStudy:
 
     @property
     def brief_summary(self):
-        content = glom(self._data, "brief_summary.textblock", default="")
-        return process_textblock(content)
+        return self._textblock("brief_summary")
 
     @property
     def detailed_description(self):
-        content = glom(self._data, "detailed_description.textblock", default="")
-        return process_textblock(content)
+        return self._textblock("detailed_description")
 
     @property
     def eligibility(self):
@@ -228,6 +310,16 @@ class ClinicalStudy:
             )
         return self._eligibility
 
+    @property
+    def eligibility_constraints(self):
+        """
+        Get the constraints extracted from the eligibility criteria
+        :rtype: clinical_trials.eligibility.EligibilityConstraints
+        """
+        if self._eligibility_constraints is None:
+            self._eligibility_constraints = extract_constraints(self.eligibility)
+        return self._eligibility_constraints
+
     @property
     def oversight_info(self):
         """
@@ -319,6 +411,16 @@ class ClinicalStudy:
             self._add_arms()
         return self._arms
 
+    @property
+    def design(self):
+        """
+        Get the arm / intervention design graph
+        :rtype: clinical_trials.design.DesignGraph
+        """
+        if self._design is None:
+            self._design = DesignGraph.from_study(self)
+        return self._design
+
     @property
     def overall_officials(self):
         if self._officials is None:
@@ -327,6 +429,7 @@ class ClinicalStudy:
                 self._officials.append(Investigator.from_dict(official))
         return self._officials
 
+    @metrics.timed("struct.outcomes")
     def add_outcomes(self):
         """
         Add the study outcomes
@@ -340,6 +443,7 @@ class ClinicalStudy:
                 study_outcomes.add_outcome(outcome_type, protocol_outcome)
         self._outcomes = study_outcomes
 
+    @metrics.timed("struct.trail")
     def add_study_trail(self):
         """
         Add the study trail
@@ -380,14 +484,23 @@ class ClinicalStudy:
 
     def get_arm_by_label(self, arm_label):
         """
-        Get the arm
+        Get the arm (the labels are compared ignoring case and whitespace)
         :param str arm_label: Label for the arm
-        :return:
+        :rtype: clinical_trials.structs.StudyArm
+        """
+        return self.design.arm(arm_label)
+
+    def _textblock(self, element):
+        """
+        Get the deblocked content of a textblock element, processed once per instance
+        :param str element: name of the textblock_struct element
+        :rtype: str
         """
-        for arm in self.arms:
-            if arm.arm_group_label == arm_label:
-                return arm
-        return None
+        metrics.cache_lookup("textblock", element in self._textblocks)
+        if element not in self._textblocks:
+            content = glom(self._data, "{}.textblock".format(element), default="")
+            self._textblocks[element] = process_textblock(content)
+        return self._textblocks[element]
 
     def _get_documents(self):
         """
@@ -395,7 +508,8 @@ class ClinicalStudy:
         :return:
         """
         documents = []
-        docs = get_study_documents(self.nct_id)
+        backend = get_backend()
+        docs = get_study_documents(self.nct_id) if backend is None else backend.get_study_documents(self.nct_id)
         for doc_type, link in docs.items():
             doc_id = "_".join(link.split("/")[2:])
             document = StudyDocument.from_dict(dict(doc_id=doc_id,
@@ -405,6 +519,7 @@ class ClinicalStudy:
             documents.append(document)
         return documents
 
+    @metrics.timed("struct.interventions")
     def _add_interventions(self):
         """
         Add the interventions
@@ -412,8 +527,9 @@ class ClinicalStudy:
         """
         self._interventions = []
         for inv_spec in glom(self._data, "intervention", default=[]):
-            self._interventions.append(StudyIntervention(**inv_spec))
+            self._interventions.append(StudyIntervention.from_dict(inv_spec))
 
+    @metrics.timed("struct.arms")
     def _add_arms(self):
         """
         Add the arm_groups
@@ -422,7 +538,7 @@ class ClinicalStudy:
         """
         self._arms = []
         for arm_spec in glom(self._data, "arm_group", default=[]):
-            self._arms.append(StudyArm(**arm_spec))
+            self._arms.append(StudyArm.from_dict(arm_spec))
 
     def _add_responsible_party(self, responsible_party):
         """
@@ -440,7 +556,7 @@ class ClinicalStudy:
         Add a facility
         :return:
         """
-        facility = Facility(**facility_data)
+        facility = Facility.from_dict(facility_data)
         if facility not in self._facilities:
             self._facilities.append(facility)
         return facility
@@ -450,7 +566,7 @@ class ClinicalStudy:
         Add a location
         :return:
         """
-        location = Location(**location_data)
+        location = Location.from_dict(location_data)
         if self._locations is None:
             self._locations = []
         self._locations.append(location)
@@ -462,6 +578,7 @@ class ClinicalStudy:
         """
         self._add_responsible_party(glom(self._data, "responsible_party", default={}))
 
+    @metrics.timed("struct.locations")
     def add_locations(self):
         """
         Add the locations
@@ -526,29 +643,85 @@ class ClinicalStudy:
         """
         return glom(self._data, "condition", default=[])
 
+    def to_dict(self):
+        """
+        Get the study as JSON compatible values, as typed by the properties and structs (see
+        SERIALIZED_FIELDS); the study documents are only included when they are in the record
+        :rtype: dict
+        """
+        document = dict(has_results=self.has_results)
+        for name, section in self.SERIALIZED_FIELDS:
+            if section is None or section in self._data:
+                value = getattr(self, name)
+                document[name] = serialize(value() if callable(value) else value)
+        return document
+
+    def to_json(self, backend=None, indent=False):
+        """
+        Get the study as JSON
+        :param str backend: 'orjson', 'json' or None for the fastest available
+        :param bool indent: pretty print
+        :rtype: str
+        """
+        return serialization.dumps(self.to_dict(), backend, indent)
+
     @classmethod
-    def from_nctid(cls, nct_id, local_schema=False):
+    def _decode(cls, content, schema, lazy=False, intern_table=None):
         """
-        Build a ClinicalStudy representation from a NCT ID (the API will pull the content)
+        Decode the content into a ClinicalStudy
+        """
+        if lazy:
+            data = LazyStudyData(content, schema, intern_table=intern_table)
+            return cls(data, data.has_results)
+        return cls._parse(parse_buffer, content, schema, len(content), intern_table)
+
+    @classmethod
+    def _parse(cls, parse, source, schema, size=0, intern_table=None, chunk_size=CHUNK_SIZE):
+        """
+        Parse the source incrementally (see clinical_trials.stream) and decode the tree into a ClinicalStudy
+        """
+        with metrics.timer("parse.to_dict") as timer:
+            timer.size = size
+            root, has_results = parse(source, chunk_size)
+            data = schema.to_dict(root)
+        if intern_table is not None:
+            with metrics.timer("parse.intern"):
+                data = intern_table.intern_record(data)
+        return cls(data, has_results)
+
+    @classmethod
+    def from_nctid(cls, nct_id, local_schema=False, lazy=False, intern_table=None):
+        """
+        Build a ClinicalStudy representation from a NCT ID (the installed backend will pull the content, see
+        clinical_trials.backends)
         :param str nct_id: The NCT identifier
         :param bool local_schema: Use the local copy of the public.xsd document
+        :param bool lazy: Decode each section when it is first accessed
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
         :rtype: ClinicalStudy
         :return: The parsed Clinical Study representation
         """
-        if local_schema:
+        backend = get_backend()
+        if backend is not None and backend.decoded:
+            data, has_results = backend.get_data(nct_id)
+            if intern_table is not None:
+                data = intern_table.intern_record(data)
+            return cls(data, has_results)
+        if local_schema or (backend is not None and backend.offline):
             schema = get_local_schema()
         else:
             schema = get_schema()
-        content = get_study(nct_id)
-        has_results = b"Results are available for this study" in content
-        return cls(schema.to_dict(content.decode("utf-8")), has_results)
+        content = get_study(nct_id) if backend is None else backend.get_study(nct_id)
+        return cls._decode(content, schema, lazy, intern_table)
 
     @classmethod
-    def from_file(cls, filename, local_schema=False):
+    def from_file(cls, filename, local_schema=False, lazy=False, intern_table=None):
         """
         Build a ClinicalStudy representation from a file
         :param str filename: Path to the XML from clinicaltrials.gov
         :param bool local_schema: Use the local copy of the public.xsd document
+        :param bool lazy: Decode each section when it is first accessed
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
         :rtype: ClinicalStudy
         :return: The parsed Clinical Study representation
         """
@@ -558,18 +731,20 @@ class ClinicalStudy:
             else:
                 schema = get_schema()
             with open(filename, "rb") as fh:
-                content = fh.read()
-            has_results = b"Results are available for this study" in content
-            return cls(schema.to_dict(content.decode("utf-8")), has_results)
+                if lazy:
+                    return cls._decode(fh.read(), schema, lazy, intern_table)
+                return cls._parse(parse_stream, fh, schema, os.path.getsize(filename), intern_table)
         else:
             raise ValueError("File {} not found".format(filename))
 
     @classmethod
-    def from_content(cls, content, local_schema=False):
+    def from_content(cls, content, local_schema=False, lazy=False, intern_table=None):
         """
         Build a ClinicalStudy representation from a block of content
         :param str content: Byte encoded Content containing XML from clinicaltrials.gov
         :param bool local_schema: Use the local copy of the public.xsd document
+        :param bool lazy: Decode each section when it is first accessed
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
         :rtype: ClinicalStudy
         :return: The parsed Clinical Study representation
         """
@@ -577,5 +752,61 @@ class ClinicalStudy:
             schema = get_local_schema()
         else:
             schema = get_schema()
-        has_results = b"Results are available for this study" in content
-        return cls(schema.to_dict(content.decode("utf-8")), has_results)
+        return cls._decode(content, schema, lazy, intern_table)
+
+    @classmethod
+    def from_stream(cls, stream, local_schema=False, intern_table=None, chunk_size=CHUNK_SIZE):
+        """
+        Build a ClinicalStudy representation from a file object, fed to the parser incrementally (the content is
+        never held whole)
+        :param stream: A binary file object containing XML from clinicaltrials.gov
+        :param bool local_schema: Use the local copy of the public.xsd document
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
+        :param int chunk_size: The bytes per read
+        :rtype: ClinicalStudy
+        :return: The parsed Clinical Study representation
+        """
+        schema = get_local_schema() if local_schema else get_schema()
+        return cls._parse(parse_stream, stream, schema, intern_table=intern_table, chunk_size=chunk_size)
+
+    @classmethod
+    def from_buffer(cls, buffer, local_schema=False, intern_table=None, chunk_size=CHUNK_SIZE):
+        """
+        Build a ClinicalStudy representation from a buffer, fed to the parser incrementally without copying it
+        :param buffer: The content (bytes, bytearray, memoryview or mmap.mmap) containing XML from clinicaltrials.gov
+        :param bool local_schema: Use the local copy of the public.xsd document
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
+        :param int chunk_size: The bytes per slice
+        :rtype: ClinicalStudy
+        :return: The parsed Clinical Study representation
+        """
+        schema = get_local_schema() if local_schema else get_schema()
+        return cls._parse(parse_buffer, buffer, schema, len(buffer), intern_table, chunk_size)
+
+    @classmethod
+    def from_json(cls, study, intern_table=None):
+        """
+        Build a ClinicalStudy representation from a ClinicalTrials.gov v2 API study document
+        :param dict study: the v2 study document
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
+        :rtype: ClinicalStudy
+        :return: The Clinical Study representation
+        """
+        with metrics.timer("parse.from_json"):
+            data = to_legacy(study)
+        if intern_table is not None:
+            data = intern_table.intern_record(data)
+        return cls(data, bool(study.get("hasResults")))
+
+    @classmethod
+    def iter_from_api(cls, nct_ids=None, query=None, batch_size=BATCH_SIZE, intern_table=None):
+        """
+        Stream ClinicalStudy representations from the ClinicalTrials.gov v2 API, batch_size studies per request
+        :param iterable nct_ids: The NCT identifiers
+        :param str query: A search term, when no NCT identifiers are given
+        :param int batch_size: NCT identifiers per request
+        :param clinical_trials.interning.InternTable intern_table: Shared table for interning the repeated values
+        :rtype: generator
+        """
+        for study in iter_studies_json(nct_ids, query, batch_size):
+            yield cls.from_json(study, intern_table)
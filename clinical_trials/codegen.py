@@ -0,0 +1,264 @@
+"""
+Generates clinical_trials.generated_structs from public.xsd: a slotted struct class for every
+complex type of the schema (the anonymous ones included), each with a from_dict specialized to
+the elements and attributes of the type, reading the shape of schema.to_dict.  The module is
+tagged with the version of the schema document it was generated from (the Version line of the
+public.xsd header); regenerate it when the schema changes
+
+    clinical-trials codegen [--schema public.xsd] [--check]
+"""
+import keyword
+import os
+
+from clinical_trials.schema import document_version, get_local_schema
+
+GENERATED_MODULE = os.path.join(os.path.dirname(__file__), "generated_structs.py")
+
+LINE_LENGTH = 120
+
+# the root element is an anonymous type; its struct is named after the element with this suffix
+ROOT_SUFFIX = "Record"
+
+HEADER = '''"""
+Slotted structs for every complex type of the clinicaltrials.gov schema, each with a from_dict
+specialized to the elements and attributes of the type (the shape of schema.to_dict); the keys
+the schema does not declare are ignored
+
+Generated by clinical_trials.codegen; do not edit
+"""
+
+SCHEMA_VERSION = "{version}"
+
+
+# an empty element of a complex type decodes to None, and is kept as None
+
+def _one(cls, value):
+    return None if value is None else cls.from_dict(value)
+
+
+def _many(cls, values):
+    return [None if x is None else cls.from_dict(x) for x in values] if values else []
+
+
+class SchemaStruct(object):
+    __slots__ = ()
+
+    # (attribute, key, struct class name or None, repeated) for each field
+    FIELDS = ()
+    # the type has simple content (the text is the '$' key, or the whole value with no attributes)
+    SIMPLE = False
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, x[0]) == getattr(other, x[0]) for x in self.FIELDS)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        values = ((x[0], getattr(self, x[0])) for x in self.FIELDS)
+        return "{{}}({{}})".format(type(self).__name__, ", ".join(
+            "{{}}={{!r}}".format(name, value) for name, value in values if value is not None and value != []))
+
+    def to_dict(self):
+        """
+        Get the struct in the shape of schema.to_dict (an empty element, decoded as None, is left
+        out unless it is repeated)
+        :rtype: dict
+        """
+        document = {{}}
+        for name, key, struct, repeated in self.FIELDS:
+            value = getattr(self, name)
+            if value is None or (repeated and not value):
+                continue
+            if struct is not None:
+                value = [None if x is None else x.to_dict() for x in value] if repeated else value.to_dict()
+            document[key] = value
+        if self.SIMPLE and list(document) == ["$"]:
+            return document["$"]
+        return document
+'''
+
+
+def class_name(name):
+    """
+    The class name for a schema name, eg arm_group_struct -> ArmGroupStruct
+    :param str name: the schema name
+    :rtype: str
+    """
+    return "".join(part[:1].upper() + part[1:] for part in name.split("_") if part)
+
+
+def field_name(name):
+    """
+    The attribute name for an element or attribute name
+    :rtype: str
+    """
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+class StructType(object):
+    """
+    A complex type of the schema and the fields of its struct
+    """
+
+    def __init__(self, name, xsd_type, path, classes):
+        """
+        :param str name: the class name
+        :param xsd_type: the type (xmlschema.validators.XsdComplexType)
+        :param str path: the type name, or the path to an anonymous type from the named type it is declared in
+        :param dict classes: the class names of the types, by id (shared by the types of a schema)
+        """
+        self.name = name
+        self.xsd_type = xsd_type
+        self.path = path
+        self.classes = classes
+        self.simple = xsd_type.has_simple_content()
+        # (attribute, key, xsd type of the value, repeated)
+        self.fields = []
+        for attribute in xsd_type.attributes:
+            self.fields.append((field_name(attribute), "@" + attribute, None, False))
+        if self.simple:
+            self.fields.append(("text", "$", None, False))
+        elif xsd_type.has_complex_content():
+            for element in xsd_type.content.iter_elements():
+                self.fields.append((field_name(element.name), element.name, element.type, not element.is_single()))
+        names = [x[0] for x in self.fields]
+        if len(names) != len(set(names)):
+            raise ValueError("Fields of {} clash: {}".format(path, ", ".join(names)))
+
+
+def struct_types(schema):
+    """
+    Get the complex types of a schema, in document order, each anonymous type following the type
+    it is declared in, and the root element last
+    :param xmlschema.XMLSchema schema: the schema
+    :rtype: list(StructType)
+    """
+    types = []
+    names = {}
+
+    def add(name, xsd_type, path):
+        if id(xsd_type) in names:
+            return
+        if name in names.values():
+            raise ValueError("Class name {} is used twice ({})".format(name, path))
+        names[id(xsd_type)] = name
+        struct_type = StructType(name, xsd_type, path, names)
+        types.append(struct_type)
+        for _, key, value_type, _ in struct_type.fields:
+            if value_type is not None and value_type.is_complex() and value_type.name is None:
+                add(name[:-len("Struct")] + class_name(key) if name.endswith("Struct") else name + class_name(key),
+                    value_type, "{}/{}".format(path, key))
+
+    for xsd_type in schema.types.values():
+        if xsd_type.is_complex():
+            add(class_name(xsd_type.local_name), xsd_type, xsd_type.local_name)
+    for element in schema.elements.values():
+        if element.type.is_complex() and element.type.name is None:
+            add(class_name(element.name) + ROOT_SUFFIX, element.type, element.name)
+    return types
+
+
+def _value(classes, key, value_type, repeated):
+    get = 'get("{}")'.format(key)
+    if value_type is not None and value_type.is_complex():
+        return "{}({}, {})".format("_many" if repeated else "_one", classes[id(value_type)], get)
+    if repeated:
+        return 'list(get("{}", ()))'.format(key)
+    return get
+
+
+def _wrap(indent, opening, items, closing):
+    """
+    The lines of a bracketed list, on one line when it fits
+    """
+    line = "{}{}{}{}".format(indent, opening, ", ".join(items), closing)
+    if len(line) <= LINE_LENGTH:
+        return [line]
+    return ["{}{}".format(indent, opening)] + ["{}    {},".format(indent, x) for x in items] + [indent + closing]
+
+
+def generate_class(struct_type):
+    """
+    The source of the struct class for a type
+    :param StructType struct_type: the type
+    :rtype: str
+    """
+    classes = struct_type.classes
+    names = [x[0] for x in struct_type.fields]
+    lines = ["", "", "class {}(SchemaStruct):".format(struct_type.name)]
+    lines.append('    """')
+    lines.append("    {}".format(struct_type.path))
+    lines.append('    """')
+    lines.append("")
+    slots = ['"{}"'.format(x) for x in names]
+    if len(slots) == 1:
+        slots[0] += ","
+    lines.extend(_wrap("    ", "__slots__ = (", slots, ")"))
+    lines.append("    FIELDS = (")
+    for name, key, value_type, repeated in struct_type.fields:
+        struct = '"{}"'.format(classes[id(value_type)]) if value_type is not None and value_type.is_complex() else None
+        lines.append('        ("{}", "{}", {}, {}),'.format(name, key, struct, repeated))
+    lines.append("    )")
+    if struct_type.simple:
+        lines.append("    SIMPLE = True")
+    lines.append("")
+    lines.extend(_wrap("    ", "def __init__(", ["self"] + ["{}=None".format(x) for x in names], "):"))
+    for name, _, _, repeated in struct_type.fields:
+        if repeated:
+            lines.append("        self.{0} = [] if {0} is None else {0}".format(name))
+        else:
+            lines.append("        self.{0} = {0}".format(name))
+    if not names:
+        lines.append("        pass")
+    lines.append("")
+    lines.append("    @classmethod")
+    lines.append("    def from_dict(cls, data):")
+    if struct_type.simple:
+        lines.append('        get = data.get if isinstance(data, dict) else {"$": data}.get')
+    elif names:
+        lines.append("        get = data.get")
+    lines.append("        return cls(")
+    for _, key, value_type, repeated in struct_type.fields:
+        lines.append("            {},".format(_value(classes, key, value_type, repeated)))
+    lines.append("        )")
+    return "\n".join(lines) + "\n"
+
+
+def generate(schema, version=None):
+    """
+    The source of the generated module
+    :param xmlschema.XMLSchema schema: the schema
+    :param str version: the schema version the module is tagged with (default, that of the schema document)
+    :rtype: str
+    """
+    header = HEADER.format(version=version or document_version(schema))
+    return header + "".join(generate_class(x) for x in struct_types(schema))
+
+
+def write_module(schema=None, filename=GENERATED_MODULE, version=None):
+    """
+    Generate the module
+    :param xmlschema.XMLSchema schema: the schema (the local public.xsd by default)
+    :param str filename: the module path
+    :param str version: the schema version the module is tagged with (default, that of the schema document)
+    :return: the number of struct classes
+    """
+    schema = schema or get_local_schema()
+    with open(filename, "w") as fh:
+        fh.write(generate(schema, version))
+    return len(struct_types(schema))
+
+
+def is_current(schema=None, filename=GENERATED_MODULE, version=None):
+    """
+    Check the module is the one the schema generates, tagged with the version of the schema
+    :param xmlschema.XMLSchema schema: the schema (the local public.xsd by default)
+    :param str filename: the module path
+    :param str version: the schema version the module should be tagged with (default, that of the schema document)
+    :rtype: bool
+    """
+    if not os.path.exists(filename):
+        return False
+    with open(filename) as fh:
+        return fh.read() == generate(schema or get_local_schema(), version)
@@ -0,0 +1,306 @@
+"""
+In-memory columnar view of a corpus for interactive filtering.  The scalar fields are extracted
+once into NumPy arrays (categorical codes for the enumerations, datetime64 for the dates and
+bit-packed yes/no flags) so a predicate over the whole corpus is a few vectorized comparisons
+
+    corpus = ColumnarCorpus.from_store(CorpusStore("corpus.bin"))
+    nct_ids = corpus.nct_ids(status="Recruiting", phase=["Phase 2", "Phase 3"], enrollment=(100, None))
+"""
+import datetime
+import json
+
+from glom import glom
+
+from clinical_trials.structs import parse_date
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# enumerations, stored as codes into the category list of each column ('' for missing)
+CATEGORICAL = ("status", "last_known_status", "phase", "study_type", "enrollment_type")
+
+DATES = ("start_date", "completion_date", "primary_completion_date")
+
+# yes/no flags, stored as two bit-packed arrays: the value and whether it was given
+FLAGS = (
+    "has_results",
+    "has_expanded_access",
+    "has_dmc",
+    "is_fda_regulated_drug",
+    "is_fda_regulated_device",
+    "is_unapproved_device",
+    "is_ppsd",
+    "is_us_export",
+)
+
+OVERSIGHT_FLAGS = FLAGS[2:]
+
+# enrollment count, when none is given
+MISSING = -1
+
+
+def _date(value):
+    date = parse_date(value)
+    if date is None:
+        return None
+    date = date.date
+    return date if isinstance(date, datetime.date) else None
+
+
+def _flag(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return value
+    return value == "Yes"
+
+
+def extract_row(study):
+    """
+    Extract the scalar fields of a study
+    :param clinical_trials.ClinicalStudy study: the study
+    :rtype: dict
+    """
+    data = study._data
+    enrollment = glom(data, "enrollment", default=None)
+    if isinstance(enrollment, dict):
+        count, enrollment_type = enrollment.get("$"), enrollment.get("@type", "")
+    else:
+        count, enrollment_type = enrollment, ""
+    oversight = glom(data, "oversight_info", default=None) or {}
+    row = dict(
+        nct_id=study.nct_id,
+        status=study.status,
+        last_known_status=study.last_known_status,
+        phase=study.phase,
+        study_type=study.study_type,
+        enrollment_type=enrollment_type or "",
+        enrollment=MISSING if count is None else int(count),
+        has_results=study.has_results,
+        has_expanded_access=_flag(glom(data, "has_expanded_access", default=None)),
+    )
+    for name in DATES:
+        row[name] = _date(glom(data, name, default=None))
+    for name in OVERSIGHT_FLAGS:
+        row[name] = _flag(oversight.get(name))
+    return row
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    return value
+
+
+def _datetime64(value):
+    if value is None:
+        return numpy.datetime64("NaT", "D")
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return numpy.datetime64(value, "D")
+
+
+class ColumnarCorpus(object):
+    """
+    The scalar fields of a corpus as NumPy columns, one row per study.  The predicates are keyword
+    arguments (see mask); studies are materialized on request through the loader
+    """
+
+    def __init__(self, nct_ids, columns, categories, loader=None):
+        """
+        :param list nct_ids: the NCT IDs, in row order
+        :param dict columns: the arrays, by column name
+        :param dict categories: the category names of each categorical column
+        :param callable loader: gets a ClinicalStudy by NCT ID, eg a CorpusStore
+        """
+        if numpy is None:
+            raise ValueError("The columnar corpus needs numpy (pip install clinical_trials[numpy])")
+        self._nct_ids = numpy.asarray(nct_ids, dtype=object)
+        self.columns = columns
+        self.categories = categories
+        self.loader = loader
+        self._codes = dict((name, dict((value, code) for code, value in enumerate(names)))
+                           for name, names in categories.items())
+        self._flags = {}
+
+    def __len__(self):
+        return len(self._nct_ids)
+
+    @classmethod
+    def build(cls, studies, loader=None):
+        """
+        Extract the columns from the studies
+        :param iterable studies: the studies (ClinicalStudy)
+        :param callable loader: gets a ClinicalStudy by NCT ID, for the lazily materialized results
+        :rtype: ColumnarCorpus
+        """
+        if numpy is None:
+            raise ValueError("The columnar corpus needs numpy (pip install clinical_trials[numpy])")
+        nct_ids = []
+        categories = dict((name, []) for name in CATEGORICAL)
+        codes = dict((name, {}) for name in CATEGORICAL)
+        values = dict((name, []) for name in CATEGORICAL + DATES + FLAGS + ("enrollment",))
+        for study in studies:
+            row = extract_row(study)
+            nct_ids.append(row["nct_id"])
+            for name in CATEGORICAL:
+                value = row[name] or ""
+                code = codes[name].get(value)
+                if code is None:
+                    code = codes[name][value] = len(categories[name])
+                    categories[name].append(value)
+                values[name].append(code)
+            for name in DATES + FLAGS + ("enrollment",):
+                values[name].append(row[name])
+        columns = {}
+        for name in CATEGORICAL:
+            columns[name] = numpy.array(values[name], dtype=numpy.int16 if len(categories[name]) > 127 else numpy.int8)
+        for name in DATES:
+            columns[name] = numpy.array([_datetime64(x) for x in values[name]], dtype="datetime64[D]")
+        for name in FLAGS:
+            columns[name] = numpy.packbits(numpy.array([bool(x) for x in values[name]], dtype=bool))
+            columns[name + ".known"] = numpy.packbits(numpy.array([x is not None for x in values[name]], dtype=bool))
+        columns["enrollment"] = numpy.array(values["enrollment"], dtype=numpy.int64)
+        return cls(nct_ids, columns, categories, loader)
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Extract the columns from a corpus store; the results are materialized from the store
+        :param clinical_trials.corpus_store.CorpusStore store: the store
+        :rtype: ColumnarCorpus
+        """
+        return cls.build(store, loader=store.__getitem__)
+
+    def save(self, filename):
+        """
+        Write the columns (NumPy .npz)
+        :param str filename: the path
+        """
+        meta = json.dumps(dict(categories=self.categories))
+        numpy.savez(filename, nct_ids=numpy.array(self._nct_ids, dtype=str), meta=numpy.array(meta), **self.columns)
+
+    @classmethod
+    def load(cls, filename, loader=None):
+        """
+        Read saved columns
+        :param str filename: the path
+        :param callable loader: gets a ClinicalStudy by NCT ID
+        :rtype: ColumnarCorpus
+        """
+        if numpy is None:
+            raise ValueError("The columnar corpus needs numpy (pip install clinical_trials[numpy])")
+        with numpy.load(filename) as archive:
+            meta = json.loads(str(archive["meta"]))
+            columns = dict((name, archive[name]) for name in archive.files if name not in ("nct_ids", "meta"))
+            return cls(archive["nct_ids"].tolist(), columns, meta["categories"], loader)
+
+    def flag(self, name, known=False):
+        """
+        Unpack a yes/no flag (unpacked columns are kept for the later queries)
+        :param str name: the flag, eg 'has_dmc'
+        :param bool known: get whether the flag was given, rather than its value
+        :rtype: numpy.ndarray
+        """
+        key = name + ".known" if known else name
+        if key not in self._flags:
+            if name not in FLAGS:
+                raise ValueError("Unknown flag {}".format(name))
+            self._flags[key] = numpy.unpackbits(self.columns[key], count=len(self)).view(bool)
+        return self._flags[key]
+
+    def column(self, name):
+        """
+        Get a column; the categorical columns are decoded to their names
+        :param str name: the column
+        :rtype: numpy.ndarray
+        """
+        if name in FLAGS:
+            return self.flag(name)
+        if name in CATEGORICAL:
+            return numpy.asarray(self.categories[name], dtype=object)[self.columns[name]]
+        if name not in self.columns:
+            raise ValueError("Unknown column {}".format(name))
+        return self.columns[name]
+
+    def _categorical(self, name, value):
+        values = [value] if isinstance(value, str) else value
+        codes = [self._codes[name][x] for x in values if x in self._codes[name]]
+        return numpy.isin(self.columns[name], codes)
+
+    def _range(self, name, value):
+        column = self.columns[name]
+        low, high = value if isinstance(value, tuple) else (value, value)
+        if name in DATES:
+            mask = ~numpy.isnat(column)
+            low, high = (None if x is None else _datetime64(_as_date(x)) for x in (low, high))
+        else:
+            mask = column != MISSING
+        if low is not None:
+            mask &= column >= low
+        if high is not None:
+            mask &= column <= high
+        return mask
+
+    def _flag_mask(self, name, value):
+        if value is None:
+            return ~self.flag(name, known=True)
+        values = self.flag(name)
+        return (values & self.flag(name, known=True)) if value else (~values & self.flag(name, known=True))
+
+    def mask(self, **criteria):
+        """
+        Evaluate the criteria over the whole corpus; the criteria are combined with and
+            categorical columns: a name or a list of names, eg phase=["Phase 2", "Phase 3"]
+            dates and enrollment: a value or an inclusive (low, high) range, None for an open end,
+                eg start_date=("2015-01-01", None); missing values never match
+            flags: True, False or None (not given)
+        :rtype: numpy.ndarray
+        :return: a boolean mask, one entry per row
+        """
+        mask = numpy.ones(len(self), dtype=bool)
+        for name, value in criteria.items():
+            if name in CATEGORICAL:
+                mask &= self._categorical(name, value)
+            elif name in DATES or name == "enrollment":
+                mask &= self._range(name, value)
+            elif name in FLAGS:
+                mask &= self._flag_mask(name, value)
+            else:
+                raise ValueError("Unknown column {}".format(name))
+        return mask
+
+    def count(self, mask=None, **criteria):
+        """
+        Count the matching studies
+        :param numpy.ndarray mask: a mask (eg combined from calls to mask), used with the criteria
+        :rtype: int
+        """
+        return int(numpy.count_nonzero(self._select(mask, criteria)))
+
+    def _select(self, mask, criteria):
+        selected = self.mask(**criteria)
+        if mask is not None:
+            selected &= mask
+        return selected
+
+    def nct_ids(self, mask=None, **criteria):
+        """
+        Get the NCT IDs of the matching studies
+        :param numpy.ndarray mask: a mask (eg combined from calls to mask), used with the criteria
+        :rtype: list(str)
+        """
+        return self._nct_ids[self._select(mask, criteria)].tolist()
+
+    def studies(self, mask=None, **criteria):
+        """
+        Get the matching studies, each materialized through the loader as it is reached
+        :param numpy.ndarray mask: a mask (eg combined from calls to mask), used with the criteria
+        :rtype: generator
+        """
+        if self.loader is None:
+            raise ValueError("The corpus has no loader to materialize the studies")
+        for nct_id in self.nct_ids(mask, **criteria):
+            yield self.loader(nct_id)
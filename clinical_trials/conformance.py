@@ -0,0 +1,232 @@
+"""
+Conformance checking of study records against the schema, without decoding them.  Every violation
+in a record is collected with its XPath location (validation does not stop at the first error),
+the records are checked over a process pool, and the violations are counted by error class
+across the corpus
+
+    report = check_corpus("AllPublicXML.zip", workers=8)
+    report.write("conformance.json")
+"""
+import json
+import multiprocessing
+import re
+from xml.etree.ElementTree import ParseError
+
+from clinical_trials import metrics
+from clinical_trials.bulk import is_corpus_store, iter_records
+from clinical_trials.schema import get_registry, get_schema
+from clinical_trials.stream import parse_buffer
+
+# the positions in an XPath, left out of the error class
+POSITION = re.compile(r"\[\d+\]")
+
+# the kind of the violations of records that are not well formed
+MALFORMED = "Malformed"
+
+# example NCT IDs kept per error class
+EXAMPLES = 5
+
+
+class Violation(object):
+    """
+    A schema violation in a record
+    """
+
+    __slots__ = ("path", "kind", "reason")
+
+    def __init__(self, path, kind, reason):
+        """
+        :param str path: the XPath of the element (None when the record is not well formed)
+        :param str kind: the kind of the check that failed, eg EnumerationFacets or Group (the content model)
+        :param str reason: the message
+        """
+        self.path = path
+        self.kind = kind
+        self.reason = reason
+
+    def __eq__(self, other):
+        return isinstance(other, Violation) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Violation({!r}, {!r}, {!r})".format(self.path, self.kind, self.reason)
+
+    @property
+    def error_class(self):
+        """
+        The class of the violation: the kind, at the path with the positions left out
+        :rtype: str
+        """
+        return "{}: {}".format(POSITION.sub("", self.path or "/"), self.kind)
+
+    def to_dict(self):
+        return dict(path=self.path, kind=self.kind, reason=self.reason)
+
+
+def _kind(error):
+    name = type(error.validator).__name__
+    return name[3:] if name.startswith("Xsd") else name
+
+
+def check_record(content, schema):
+    """
+    Check a record against the schema
+    :param bytes content: the XML content
+    :param xmlschema.XMLSchema schema: the schema
+    :rtype: list(Violation)
+    :return: all the violations, in document order
+    """
+    with metrics.timer("validate.record") as timer:
+        timer.size = len(content)
+        try:
+            root, _ = parse_buffer(content)
+        except ParseError as exc:
+            return [Violation(None, MALFORMED, str(exc))]
+        return [Violation(error.path, _kind(error), error.reason or error.message)
+                for error in schema.iter_errors(root)]
+
+
+_worker_schema = None
+_worker_registry = None
+
+
+def _init_worker(local_schema):
+    global _worker_schema, _worker_registry
+    # the local schema revisions are chosen per record, as when decoding (see clinical_trials.bulk)
+    _worker_registry = get_registry() if local_schema else None
+    _worker_schema = None if local_schema else get_schema()
+
+
+def _check_worker(record):
+    nct_id, content = record
+    if _worker_registry is None:
+        version, schema = None, _worker_schema
+    else:
+        version, schema = _worker_registry.schema_for(content)
+    return nct_id, version, check_record(content, schema)
+
+
+def check_records(records, workers=1, local_schema=True, chunksize=64):
+    """
+    Check records, in a process pool when workers > 1; the output order follows the input
+    :param iterable records: (NCT ID, content) pairs
+    :param int workers: the number of processes
+    :param bool local_schema: Use the local copies of the public.xsd document
+    :param int chunksize: records sent to a worker at a time
+    :rtype: generator
+    :return: (NCT ID, schema version, violations) triples; the version is None with the remote schema
+    """
+    if workers <= 1:
+        _init_worker(local_schema)
+        for record in records:
+            yield _check_worker(record)
+        return
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(local_schema,))
+    try:
+        for result in pool.imap(_check_worker, records, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+
+
+class ConformanceReport(object):
+    """
+    The counts of the records checked and of the violations by error class
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.invalid = 0
+        self.errors = 0
+        # schema version: records checked against it
+        self.versions = {}
+        # error class: dict(errors, records, kind, reason, examples)
+        self.classes = {}
+
+    @property
+    def valid(self):
+        return self.records - self.invalid
+
+    def add(self, nct_id, violations, version=None):
+        """
+        Count the violations of a record
+        :param str nct_id: the NCT ID
+        :param list violations: the violations (see check_record)
+        :param str version: the schema version the record was checked against
+        """
+        self.records += 1
+        self.versions[version] = self.versions.get(version, 0) + 1
+        if not violations:
+            return
+        self.invalid += 1
+        self.errors += len(violations)
+        seen = set()
+        for violation in violations:
+            error_class = violation.error_class
+            counts = self.classes.get(error_class)
+            if counts is None:
+                counts = self.classes[error_class] = dict(errors=0, records=0, kind=violation.kind,
+                                                          reason=violation.reason, examples=[])
+            counts["errors"] += 1
+            if error_class not in seen:
+                seen.add(error_class)
+                counts["records"] += 1
+                if len(counts["examples"]) < EXAMPLES:
+                    counts["examples"].append(nct_id)
+
+    def top(self, count=None):
+        """
+        The error classes, the most frequent first
+        :param int count: the number of classes (default, all)
+        :rtype: list(tuple(str, dict))
+        """
+        ranked = sorted(self.classes.items(), key=lambda x: (-x[1]["records"], -x[1]["errors"], x[0]))
+        return ranked[:count] if count else ranked
+
+    def to_dict(self):
+        return dict(
+            records=self.records,
+            valid=self.valid,
+            invalid=self.invalid,
+            errors=self.errors,
+            versions=dict((str(version), count) for version, count in self.versions.items()),
+            classes=[dict(counts, error_class=name) for name, counts in self.top()],
+        )
+
+    def write(self, filename):
+        """
+        Write the report as JSON
+        :param str filename: the path
+        """
+        with open(filename, "w") as fh:
+            json.dump(self.to_dict(), fh, indent=2, sort_keys=True)
+
+
+def check_corpus(source, workers=1, local_schema=True, errors=None, progress=None):
+    """
+    Check every record of an archive, a directory of records or a record
+    :param str source: the source (see clinical_trials.bulk.iter_records)
+    :param int workers: the number of processes
+    :param bool local_schema: Use the local copies of the public.xsd document
+    :param str errors: write the violations of each invalid record to this file, as JSON lines
+    :param clinical_trials.bulk.Progress progress: updated for each record
+    :rtype: ConformanceReport
+    """
+    if is_corpus_store(source):
+        raise ValueError("a corpus store holds decoded records; give an archive, directory or record")
+    report = ConformanceReport()
+    fh = open(errors, "w") if errors else None
+    try:
+        for nct_id, version, violations in check_records(iter_records(source), workers, local_schema):
+            report.add(nct_id, violations, version)
+            if violations and fh is not None:
+                fh.write(json.dumps(dict(nct_id=nct_id, version=version, errors=[x.to_dict() for x in violations])))
+                fh.write("\n")
+            if progress is not None:
+                progress.update()
+    finally:
+        if fh is not None:
+            fh.close()
+    return report
@@ -4,6 +4,8 @@ from six.moves.html_parser import HTMLParser
 
 import requests
 
+from clinical_trials import metrics
+
 
 BASE_URL = "https://clinicaltrials.gov/ct2/show/"
 
@@ -16,7 +18,9 @@ def get_study(nct_id):
     """
     t = urljoin(BASE_URL, nct_id)
     full_url = t + "?" + urlencode(dict(displayxml=True))
-    response = requests.get(full_url)
+    with metrics.timer("connector.get_study") as timer:
+        response = requests.get(full_url)
+        timer.size = len(response.content)
     if not response.status_code == 200:
         raise ValueError("Unable to load study {}".format(nct_id))
     return response.content
@@ -45,7 +49,9 @@ def get_study_documents(nct_id):
     :return:
     """
     t = urljoin(BASE_URL, nct_id)
-    response = requests.get(t)
+    with metrics.timer("connector.get_study_documents") as timer:
+        response = requests.get(t)
+        timer.size = len(response.content)
     docs = {}
     if 'ProvidedDocs' in response.text:
         # extract the content
@@ -0,0 +1,326 @@
+"""
+Compact on-disk corpus of decoded study records; the file is opened with mmap and a study is
+only decoded when it is requested by NCT ID, so many processes can share one page cached copy
+"""
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from decimal import Decimal
+
+from clinical_trials.clinical_study import ClinicalStudy
+
+MAGIC = b"CTCORPUS"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQQQ")
+HEADER_SIZE = 64
+FLOAT = struct.Struct("<d")
+
+# value tags
+NONE, FALSE, TRUE, INTEGER, STRING, LIST, DICT, REAL, DECIMAL = range(9)
+
+
+def nct_number(nct_id):
+    """
+    The numeric part of an NCT ID, used as the index key
+    :param str nct_id: the NCT ID, eg NCT01565668
+    :rtype: int
+    """
+    if not (nct_id and nct_id.upper().startswith("NCT") and nct_id[3:].isdigit()):
+        raise ValueError("Invalid NCT ID {}".format(nct_id))
+    return int(nct_id[3:])
+
+
+def _write_varint(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(buffer, position):
+    shift = result = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+
+def _pad(fh):
+    position = fh.tell()
+    if position % 8:
+        fh.write(b"\0" * (8 - position % 8))
+    return fh.tell()
+
+
+class CorpusWriter(object):
+    """
+    Writes a corpus file; the strings in all the records are stored once in a shared table
+    """
+
+    def __init__(self, filename):
+        """
+        :param str filename: path to the corpus file
+        """
+        self._fh = open(filename, "wb")
+        self._fh.write(b"\0" * HEADER_SIZE)
+        self._strings = {}
+        self._index = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _string(self, value):
+        if value not in self._strings:
+            self._strings[value] = len(self._strings)
+        return self._strings[value]
+
+    def _encode(self, buffer, value):
+        if value is None:
+            buffer.append(NONE)
+        elif value is True:
+            buffer.append(TRUE)
+        elif value is False:
+            buffer.append(FALSE)
+        elif isinstance(value, int):
+            buffer.append(INTEGER)
+            # zigzag, so small negative numbers stay short
+            _write_varint(buffer, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, str):
+            buffer.append(STRING)
+            _write_varint(buffer, self._string(value))
+        elif isinstance(value, dict):
+            buffer.append(DICT)
+            _write_varint(buffer, len(value))
+            for key, item in value.items():
+                _write_varint(buffer, self._string(key))
+                self._encode(buffer, item)
+        elif isinstance(value, (list, tuple)):
+            buffer.append(LIST)
+            _write_varint(buffer, len(value))
+            for item in value:
+                self._encode(buffer, item)
+        elif isinstance(value, float):
+            buffer.append(REAL)
+            buffer.extend(FLOAT.pack(value))
+        elif isinstance(value, Decimal):
+            buffer.append(DECIMAL)
+            _write_varint(buffer, self._string(str(value)))
+        else:
+            raise ValueError("Unable to encode value of type {}".format(type(value)))
+
+    def add_data(self, nct_id, data, has_results=False):
+        """
+        Add a decoded record
+        :param str nct_id: the NCT ID
+        :param dict data: the decoded record (ClinicalStudy._data)
+        :param bool has_results: the study has results
+        """
+        buffer = bytearray()
+        self._encode(buffer, data)
+        self._index[nct_number(nct_id)] = (self._fh.tell(), has_results)
+        self._fh.write(buffer)
+
+    def add_study(self, study):
+        """
+        Add a study
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        self.add_data(study.nct_id, study._data, study.has_results)
+
+    def close(self):
+        """
+        Write the string table and the index
+        """
+        if self._fh is None:
+            return
+        fh = self._fh
+        strings_offset = _pad(fh)
+        encoded = [value.encode("utf-8") for value in self._strings]
+        offsets = array("Q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        fh.write(offsets.tobytes())
+        for value in encoded:
+            fh.write(value)
+        index_offset = _pad(fh)
+        keys = sorted(self._index)
+        fh.write(array("Q", keys).tobytes())
+        fh.write(array("Q", [self._index[key][0] for key in keys]).tobytes())
+        fh.write(bytes(bytearray(1 if self._index[key][1] else 0 for key in keys)))
+        fh.seek(0)
+        fh.write(HEADER.pack(MAGIC, VERSION, len(keys), strings_offset, len(encoded), index_offset))
+        fh.close()
+        self._fh = None
+
+
+def write_corpus(filename, studies):
+    """
+    Write a corpus file
+    :param str filename: path to the corpus file
+    :param iterable studies: the studies (ClinicalStudy)
+    :return: the number of studies written
+    """
+    count = 0
+    with CorpusWriter(filename) as writer:
+        for study in studies:
+            writer.add_study(study)
+            count += 1
+    return count
+
+
+class CorpusStore(object):
+    """
+    Read access to a corpus file.  Opening is a header read; records are decoded on request and
+    the strings are decoded once and shared between records
+    """
+
+    def __init__(self, filename):
+        """
+        :param str filename: path to the corpus file
+        """
+        self._fh = open(filename, "rb")
+        self._buffer = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, strings_offset, string_count, index_offset = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("{} is not a corpus file".format(filename))
+        self._view = memoryview(self._buffer)
+        self._string_offsets = self._view[strings_offset:strings_offset + (string_count + 1) * 8].cast("Q")
+        self._string_base = strings_offset + (string_count + 1) * 8
+        self._strings = [None] * string_count
+        self._keys = self._view[index_offset:index_offset + count * 8].cast("Q")
+        self._offsets = self._view[index_offset + count * 8:index_offset + count * 16].cast("Q")
+        self._flags = self._view[index_offset + count * 16:index_offset + count * 17]
+        self._count = count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._buffer is not None:
+            for name in ("_string_offsets", "_keys", "_offsets", "_flags", "_view"):
+                view = getattr(self, name, None)
+                if view is not None:
+                    view.release()
+            self._buffer.close()
+            self._fh.close()
+            self._buffer = None
+
+    def __len__(self):
+        return self._count
+
+    def _position(self, nct_id):
+        try:
+            key = nct_number(nct_id)
+        except ValueError:
+            return None
+        position = bisect_left(self._keys, key)
+        if position < self._count and self._keys[position] == key:
+            return position
+        return None
+
+    def __contains__(self, nct_id):
+        return self._position(nct_id) is not None
+
+    def nct_ids(self):
+        """
+        The NCT IDs in the corpus, in order
+        :rtype: generator
+        """
+        for key in self._keys:
+            yield "NCT{:08d}".format(key)
+
+    def _string(self, index):
+        value = self._strings[index]
+        if value is None:
+            start = self._string_base + self._string_offsets[index]
+            end = self._string_base + self._string_offsets[index + 1]
+            value = self._strings[index] = self._buffer[start:end].decode("utf-8")
+        return value
+
+    def _decode(self, position):
+        buffer = self._buffer
+        tag = buffer[position]
+        position += 1
+        if tag == STRING:
+            index, position = _read_varint(buffer, position)
+            return self._string(index), position
+        if tag == DICT:
+            length, position = _read_varint(buffer, position)
+            value = {}
+            for _ in range(length):
+                index, position = _read_varint(buffer, position)
+                value[self._string(index)], position = self._decode(position)
+            return value, position
+        if tag == LIST:
+            length, position = _read_varint(buffer, position)
+            value = []
+            for _ in range(length):
+                item, position = self._decode(position)
+                value.append(item)
+            return value, position
+        if tag == INTEGER:
+            value, position = _read_varint(buffer, position)
+            return (value >> 1) if not value & 1 else -((value + 1) >> 1), position
+        if tag == NONE:
+            return None, position
+        if tag == TRUE:
+            return True, position
+        if tag == FALSE:
+            return False, position
+        if tag == REAL:
+            return FLOAT.unpack_from(buffer, position)[0], position + FLOAT.size
+        if tag == DECIMAL:
+            index, position = _read_varint(buffer, position)
+            return Decimal(self._string(index)), position
+        raise ValueError("Unexpected tag {} at {}".format(tag, position - 1))
+
+    def data(self, nct_id):
+        """
+        Get the decoded record for a study
+        :param str nct_id: the NCT ID
+        :rtype: dict
+        """
+        position = self._position(nct_id)
+        if position is None:
+            raise KeyError(nct_id)
+        return self._decode(self._offsets[position])[0]
+
+    def record(self, nct_id):
+        """
+        Get the decoded record for a study and its results flag
+        :param str nct_id: the NCT ID
+        :rtype: tuple(dict, bool)
+        """
+        position = self._position(nct_id)
+        if position is None:
+            raise KeyError(nct_id)
+        return self._decode(self._offsets[position])[0], bool(self._flags[position])
+
+    def __getitem__(self, nct_id):
+        return ClinicalStudy(*self.record(nct_id))
+
+    def get(self, nct_id, default=None):
+        """
+        Get a study
+        :param str nct_id: the NCT ID
+        :rtype: clinical_trials.ClinicalStudy
+        """
+        try:
+            return self[nct_id]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        for nct_id in self.nct_ids():
+            yield self[nct_id]
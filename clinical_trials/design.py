@@ -0,0 +1,133 @@
+"""
+The arm / intervention design of a study as a graph.  The interventions name their arms by
+arm_group_label, and the labels often differ from the arm labels in case or whitespace, so the
+labels are matched in a normalized form
+"""
+from glom import glom
+
+# the fields of the rows from iter_design_edges
+EDGE_FIELDS = ("nct_id", "arm_group_label", "arm_group_type", "intervention_type", "intervention_name")
+
+
+def normalize_label(label):
+    """
+    The matching key for an arm label: case and runs of whitespace are ignored
+    :param str label: the label
+    :rtype: str
+    """
+    return " ".join(label.split()).lower() if label else ""
+
+
+class DesignGraph(object):
+    """
+    Arms, interventions and the edges between them, built once per study
+    """
+
+    def __init__(self, arms, interventions):
+        """
+        :param list arms: the arms (clinical_trials.structs.StudyArm)
+        :param list interventions: the interventions (clinical_trials.structs.StudyIntervention)
+        """
+        self.interventions = list(interventions)
+        # normalized label: arm
+        self.arms = {}
+        for arm in arms:
+            self.arms.setdefault(normalize_label(arm.arm_group_label), arm)
+        self.arm_types = dict((key, arm.arm_group_type) for key, arm in self.arms.items())
+        self._arm_interventions = dict((key, []) for key in self.arms)
+        self._intervention_arms = []
+        # the labels given by interventions that name no arm
+        self.unmatched = []
+        for intervention in self.interventions:
+            linked = []
+            for label in intervention.arms or []:
+                key = normalize_label(label)
+                arm = self.arms.get(key)
+                if arm is None:
+                    if label not in self.unmatched:
+                        self.unmatched.append(label)
+                    continue
+                if arm not in linked:
+                    linked.append(arm)
+                    self._arm_interventions[key].append(intervention)
+            self._intervention_arms.append(linked)
+
+    @classmethod
+    def from_study(cls, study):
+        """
+        Build the graph for a study
+        :param clinical_trials.ClinicalStudy study: the study
+        :rtype: DesignGraph
+        """
+        return cls(study.arms, study.interventions)
+
+    def arm(self, label):
+        """
+        Get an arm by label
+        :param str label: the label, matched in the normalized form
+        :rtype: clinical_trials.structs.StudyArm
+        """
+        return self.arms.get(normalize_label(label))
+
+    def arm_type(self, label):
+        """
+        Get the type of an arm
+        :param str label: the label, matched in the normalized form
+        :rtype: str
+        """
+        return self.arm_types.get(normalize_label(label))
+
+    def interventions_for(self, label):
+        """
+        Get the interventions given in an arm
+        :param str label: the arm label, matched in the normalized form
+        :rtype: list(clinical_trials.structs.StudyIntervention)
+        """
+        return list(self._arm_interventions.get(normalize_label(label), []))
+
+    def arms_for(self, intervention):
+        """
+        Get the arms an intervention is given in
+        :param intervention: the intervention (StudyIntervention) or its name
+        :rtype: list(clinical_trials.structs.StudyArm)
+        """
+        arms = []
+        for offset, candidate in enumerate(self.interventions):
+            if candidate is intervention or candidate.intervention_name == intervention:
+                arms.extend(x for x in self._intervention_arms[offset] if x not in arms)
+        return arms
+
+    def edges(self):
+        """
+        The arm -> intervention edges
+        :rtype: generator
+        :return: (StudyArm, StudyIntervention) pairs
+        """
+        for offset, intervention in enumerate(self.interventions):
+            for arm in self._intervention_arms[offset]:
+                yield arm, intervention
+
+
+def iter_design_edges(studies):
+    """
+    The arm -> intervention edges of a corpus, read straight from the decoded records (no structs
+    or graphs are built); the intervention labels that name no arm give rows with no arm type
+    :param iterable studies: the studies (ClinicalStudy)
+    :rtype: generator
+    :return: rows of the EDGE_FIELDS
+    """
+    for study in studies:
+        data = study._data
+        nct_id = glom(data, "id_info.nct_id")
+        arm_types = {}
+        for arm in data.get("arm_group", []):
+            arm_types.setdefault(normalize_label(arm.get("arm_group_label")), arm.get("arm_group_type"))
+        for intervention in data.get("intervention", []):
+            seen = set()
+            for label in intervention.get("arm_group_label", []):
+                key = normalize_label(label)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield (nct_id, label, arm_types.get(key), intervention.get("intervention_type"),
+                       intervention.get("intervention_name"))
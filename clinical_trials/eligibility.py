@@ -0,0 +1,719 @@
+"""
+Rule-based extraction of machine-usable constraints from eligibility criteria, and a
+prefilter index over the extracted constraints for patient-trial matching
+"""
+import re
+from bisect import bisect_left, bisect_right
+
+from clinical_trials.helpers import process_eligibility, parse_age
+from clinical_trials.structs import CTStruct
+
+INCLUSION = "inclusion"
+EXCLUSION = "exclusion"
+
+# Lab analytes; (name, canonical unit family, pattern)
+LAB_ANALYTES = (
+    ("ANC", "count", r"absolute neutrophil count|absolute granulocyte count|\bANC\b|\bAGC\b|neutrophils?"),
+    ("PLT", "count", r"platelets?(?: count)?|\bPLT\b"),
+    ("WBC", "count", r"white blood cells?(?: count)?|\bWBC\b|leukocytes?(?: count)?"),
+    ("HGB", "hemoglobin", r"(?<!glycated )(?<!glycosylated )ha?emoglobin(?! A1c)|\bHgb\b(?! ?A1c)|\bHb\b(?! ?A1c)"),
+    ("CRCL", "clearance", r"creatinine clearance|\bCrCl\b"),
+    ("CREAT", "creatinine", r"(?:serum )?creatinine(?! clearance)"),
+    ("EGFR", "clearance", r"\beGFR\b|glomerular filtration rate"),
+    ("BILI", "bilirubin", r"(?:total )?bilirubin"),
+    ("AST", "enzyme", r"\bAST\b|\bSGOT\b|aspartate (?:amino)?transferase"),
+    ("ALT", "enzyme", r"\bALT\b|\bSGPT\b|alanine (?:amino)?transferase"),
+    ("TRANSAMINASES", "enzyme", r"transaminases?"),
+    ("HBA1C", "percent", r"\bHbA1c\b|\bA1c\b|glycated ha?emoglobin|glycosylated ha?emoglobin"),
+    ("LVEF", "percent", r"\bLVEF\b|left ventricular ejection fraction"),
+)
+
+LAB_ANALYTE_PATTERNS = tuple(
+    (name, family, re.compile(pattern, re.IGNORECASE)) for name, family, pattern in LAB_ANALYTES
+)
+
+OPERATORS = (
+    (">=", r"≥|>=|=>|greater than or equal to|at least|no less than|not less than"),
+    ("<=", r"≤|<=|=<|less than or equal to|no more than|not more than|not greater than|up to"),
+    (">", r">|greater than|more than|above|over|exceeding"),
+    ("<", r"<|less than|below|under"),
+    ("=", r"="),
+)
+
+OPERATOR_PATTERN = "|".join("(?:{})".format(pattern) for _, pattern in OPERATORS)
+OPERATOR_MAP = tuple((op, re.compile("^(?:{})$".format(pattern), re.IGNORECASE)) for op, pattern in OPERATORS)
+
+UNIT_PATTERN = (
+    r"[x×]\s*(?:the\s*)?(?:ULN|upper limit of normal)|times (?:the )?(?:ULN|upper limit of normal)|ULN|"
+    r"upper limit of normal|"
+    r"cells/mm3|cells/mm³|/mm3|/mm³|cells/[µμu]L|/[µμu]L|/L|g/dL|g/dl|g/L|mg/dL|mg/dl|[µμu]mol/L|"
+    r"mmol/L|mL/min(?:/1\.73\s*m2)?|ml/min(?:/1\.73\s*m2)?|%"
+)
+
+LAB_THRESHOLD_PATTERN = re.compile(
+    r"(?P<op>{op})\s*(?P<value>\d+(?:[.,]\d+)*)"
+    r"(?:\s*[x×*]\s*10\s*(?:\^|\*\*)?\s*(?P<exponent>\d{{1,2}}))?"
+    r"\s*(?P<unit>{unit})?".format(op=OPERATOR_PATTERN, unit=UNIT_PATTERN),
+    re.IGNORECASE,
+)
+
+# the window after an analyte mention that is searched for a threshold
+LAB_WINDOW = 120
+
+PERFORMANCE_SCALES = (
+    ("ECOG", re.compile(r"\bECOG\b|Eastern Cooperative Oncology Group|\bZubrod\b|\bWHO performance", re.IGNORECASE)),
+    ("KARNOFSKY", re.compile(r"\bKarnofsky\b|\bKPS\b", re.IGNORECASE)),
+)
+
+PERFORMANCE_RANGE_PATTERN = re.compile(r"(?<![\d.])(?P<low>\d{1,3})\s*(?:-|–|to|through)\s*(?P<high>\d{1,3})(?!\d|\.\d)")
+PERFORMANCE_BOUND_PATTERN = re.compile(r"(?P<op>{op})\s*(?P<value>\d{{1,3}})(?!\d|\.\d)".format(op=OPERATOR_PATTERN),
+                                       re.IGNORECASE)
+PERFORMANCE_LIST_PATTERN = re.compile(r"(?<![\d.])(\d)(?:\s*(?:,|or|and)\s*(\d))+(?!\d|\.\d)")
+PERFORMANCE_SINGLE_PATTERN = re.compile(r"(?:of|score|status|PS)\s*(?:of\s*)?(?P<value>\d{1,3})(?![\d.%])",
+                                        re.IGNORECASE)
+PERFORMANCE_MAXIMUM = dict(ECOG=5, KARNOFSKY=100)
+
+PREGNANCY_PATTERN = re.compile(r"\bpregnan\w*|\bbreast[- ]?feeding\b|\blactating\b|\bnursing\b", re.IGNORECASE)
+NEGATIVE_PREGNANCY_PATTERN = re.compile(
+    r"negative (?:serum |urine )?pregnancy test|\bnot (?:be )?pregnant\b|\bnon-?pregnant\b", re.IGNORECASE
+)
+
+PRIOR_THERAPY_PATTERN = re.compile(
+    r"\b(?:prior|previous|previously)\s+(?:treatment|therapy|therapies|exposure|treated)\s+(?:with|to|by)\s+"
+    r"(?P<therapy>[^.;:()\n]+)",
+    re.IGNORECASE,
+)
+THERAPY_SPLIT_PATTERN = re.compile(r"\s*(?:,|\bor\b|\band\b|/)\s*", re.IGNORECASE)
+
+# an inclusion criterion introducing alternatives (eg 'with at least 1 of the following:'); the
+# enumerated criteria after it are alternatives, as is a criterion ending in 'OR' and the next one
+DISJUNCTION_PATTERN = re.compile(
+    r"\b(?:at least (?:1|one)|any (?:(?:1|one) )?of the following|(?:1|one) of the following|either)\b[^:]*:\s*$",
+    re.IGNORECASE,
+)
+TRAILING_OR_PATTERN = re.compile(r"\bor\s*$", re.IGNORECASE)
+# an inclusion criterion with an 'or' in it (eg 'creatinine ≤ 1.5 x ULN or creatinine clearance ≥ 60 mL/min')
+# may be met by either side, so none of its constraints is a requirement on its own
+OR_PATTERN = re.compile(r"\bor\b", re.IGNORECASE)
+ENUMERATOR_PATTERN = re.compile(r"^\(?(?:(?P<digit>\d{1,2})|(?P<roman>[ivx]{1,4})|(?P<letter>[a-z]))[.)]\s|^[-*•·]\s",
+                                re.IGNORECASE)
+
+
+class Constraint(CTStruct):
+    """
+    Base for constraints extracted from the eligibility criteria
+    """
+
+    def __init__(self, criterion_type=INCLUSION, text=None, alternative=False):
+        self.criterion_type = criterion_type
+        self.text = text
+        # one of the alternatives of a disjunctive criterion; it does not exclude a study on its own
+        self.alternative = alternative
+
+    @property
+    def is_exclusion(self):
+        return self.criterion_type == EXCLUSION
+
+
+class LabThreshold(Constraint):
+    """
+    A laboratory value threshold, eg 'ANC ≥ 1500/mm3'
+    """
+
+    def __init__(self, analyte=None, operator=None, value=None, unit=None,
+                 normalized_value=None, normalized_unit=None, criterion_type=INCLUSION, text=None,
+                 alternative=False):
+        super(LabThreshold, self).__init__(criterion_type, text, alternative)
+        self.analyte = analyte
+        self.operator = operator
+        self.value = value
+        self.unit = unit
+        self.normalized_value = normalized_value
+        self.normalized_unit = normalized_unit
+
+    def test(self, value):
+        """
+        Does the value satisfy the comparison
+        :param float value: value (in the normalized unit)
+        :rtype: bool
+        """
+        return compare(value, self.operator, self.normalized_value)
+
+
+class PerformanceStatus(Constraint):
+    """
+    A performance status range, eg 'ECOG performance status of 0 to 2'
+    """
+
+    def __init__(self, scale=None, minimum=None, maximum=None, criterion_type=INCLUSION, text=None,
+                 alternative=False):
+        super(PerformanceStatus, self).__init__(criterion_type, text, alternative)
+        self.scale = scale
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def allows(self, score):
+        """
+        Is the score within the range
+        :param int score: performance status score
+        :rtype: bool
+        """
+        return self.minimum <= score <= self.maximum
+
+
+class PregnancyExclusion(Constraint):
+    """
+    Pregnant or breastfeeding subjects are not eligible
+    """
+
+
+class PriorTherapyExclusion(Constraint):
+    """
+    Subjects with prior exposure to any of the therapies are not eligible
+    """
+
+    def __init__(self, therapies=None, criterion_type=EXCLUSION, text=None, alternative=False):
+        super(PriorTherapyExclusion, self).__init__(criterion_type, text, alternative)
+        self.therapies = therapies or []
+
+
+class EligibilityConstraints(CTStruct):
+    """
+    The typed constraints extracted for a study
+    """
+
+    def __init__(self, minimum_age=None, maximum_age=None, gender=None, healthy_volunteers=None,
+                 lab_thresholds=None, performance_status=None, pregnancy_exclusions=None,
+                 prior_therapy_exclusions=None):
+        self.minimum_age = minimum_age
+        self.maximum_age = maximum_age
+        self.gender = gender
+        self.healthy_volunteers = healthy_volunteers
+        self.lab_thresholds = lab_thresholds or []
+        self.performance_status = performance_status or []
+        self.pregnancy_exclusions = pregnancy_exclusions or []
+        self.prior_therapy_exclusions = prior_therapy_exclusions or []
+
+    @property
+    def excludes_pregnancy(self):
+        # an alternative does not exclude on its own
+        return any(not x.alternative for x in self.pregnancy_exclusions)
+
+    @property
+    def excluded_therapies(self):
+        therapies = []
+        for exclusion in self.prior_therapy_exclusions:
+            if exclusion.alternative:
+                continue
+            for therapy in exclusion.therapies:
+                if therapy not in therapies:
+                    therapies.append(therapy)
+        return therapies
+
+
+class PatientProfile(CTStruct):
+    """
+    The patient attributes used to prefilter candidate studies; lab values are expressed in
+    the normalized units (see normalize_lab_value), ULN multiples in uln_multiples
+    """
+
+    def __init__(self, age=None, gender=None, ecog=None, karnofsky=None, labs=None, uln_multiples=None,
+                 pregnant=None, prior_therapies=None):
+        self.age = age
+        self.gender = gender
+        self.ecog = ecog
+        self.karnofsky = karnofsky
+        self.labs = labs or {}
+        self.uln_multiples = uln_multiples or {}
+        self.pregnant = pregnant
+        self.prior_therapies = prior_therapies or []
+
+
+def compare(value, operator, threshold):
+    """
+    Apply a normalized operator
+    :param float value: left hand side
+    :param str operator: one of >=, <=, >, <, =
+    :param float threshold: right hand side
+    :rtype: bool
+    """
+    if operator == ">=":
+        return value >= threshold
+    elif operator == "<=":
+        return value <= threshold
+    elif operator == ">":
+        return value > threshold
+    elif operator == "<":
+        return value < threshold
+    return value == threshold
+
+
+def normalize_operator(content):
+    """
+    Maps the comparator text to a normalized operator
+    :param str content: matched comparator
+    :rtype: str
+    """
+    content = " ".join(content.split())
+    for op, pattern in OPERATOR_MAP:
+        if pattern.match(content):
+            return op
+    return None
+
+
+def _number(content):
+    """
+    Parse a number, allowing for thousands separators (1,500) and decimal commas (1,5)
+    """
+    if "," in content:
+        if len(content.split(",")[-1]) == 3:
+            content = content.replace(",", "")
+        else:
+            content = content.replace(",", ".")
+    return float(content)
+
+
+def normalize_lab_value(family, value, exponent, unit):
+    """
+    Convert the value to the canonical unit for the analyte family
+      count -> 10^9/L; hemoglobin -> g/dL; creatinine, bilirubin -> mg/dL; multiples of ULN -> xULN
+    :param str family: the unit family of the analyte
+    :param float value: the parsed value
+    :param str exponent: any power of ten multiplier (eg 9 for 1.5 x 10^9/L)
+    :param str unit: the matched unit
+    :rtype: tuple(float, str)
+    :return: normalized value and unit, (None, None) if no conversion is known
+    """
+    _unit = (unit or "").replace(" ", "").replace("μ", "µ").lower()
+    if "uln" in _unit or "upperlimitofnormal" in _unit:
+        return value, "xULN"
+    if _unit.startswith("u"):
+        _unit = "µ" + _unit[1:]
+    if family == "count":
+        if exponent:
+            value = value * 10 ** int(exponent)
+            if _unit in ("/l", ""):
+                return value / 1e9, "10^9/L"
+            if _unit in ("/mm3", "/mm³", "cells/mm3", "cells/mm³", "/µl", "cells/µl"):
+                return value / 1e3, "10^9/L"
+        elif _unit in ("/mm3", "/mm³", "cells/mm3", "cells/mm³", "/µl", "cells/µl"):
+            return value / 1e3, "10^9/L"
+    elif family == "hemoglobin":
+        if _unit == "g/dl":
+            return value, "g/dL"
+        elif _unit == "g/l":
+            return value / 10.0, "g/dL"
+        elif _unit == "mmol/l":
+            return value * 1.611, "g/dL"
+    elif family in ("creatinine", "bilirubin"):
+        if _unit == "mg/dl":
+            return value, "mg/dL"
+        elif _unit == "µmol/l":
+            return value / (88.4 if family == "creatinine" else 17.1), "mg/dL"
+    elif family == "clearance":
+        if _unit.startswith("ml/min"):
+            return value, "mL/min"
+    elif family == "percent":
+        if _unit == "%":
+            return value, "%"
+    return None, None
+
+
+def extract_lab_thresholds(criterion, criterion_type=INCLUSION):
+    """
+    Extract the lab thresholds from a criterion
+    :param str criterion: text of the criterion
+    :param str criterion_type: inclusion or exclusion
+    :rtype: list(LabThreshold)
+    """
+    thresholds = []
+    for analyte, family, pattern in LAB_ANALYTE_PATTERNS:
+        for mention in pattern.finditer(criterion):
+            window = criterion[mention.end():mention.end() + LAB_WINDOW]
+            # don't attribute a threshold that follows another analyte
+            for name, _, other in LAB_ANALYTE_PATTERNS:
+                if name != analyte:
+                    following = other.search(window)
+                    if following is not None:
+                        window = window[:following.start()]
+            matches = list(LAB_THRESHOLD_PATTERN.finditer(window))
+            if not matches:
+                continue
+            # a range (eg '> 7.5 and ≤ 10.0%') shares the trailing unit
+            units = [match.group("unit") for match in matches]
+            for idx, match in enumerate(matches):
+                unit = units[idx] or next((x for x in units[idx:] if x), None)
+                value = _number(match.group("value"))
+                normalized_value, normalized_unit = normalize_lab_value(
+                    family, value, match.group("exponent"), unit
+                )
+                thresholds.append(
+                    LabThreshold(analyte=analyte,
+                                 operator=normalize_operator(match.group("op")),
+                                 value=value,
+                                 unit=unit,
+                                 normalized_value=normalized_value,
+                                 normalized_unit=normalized_unit,
+                                 criterion_type=criterion_type,
+                                 text=criterion)
+                )
+            break
+    return thresholds
+
+
+def extract_performance_status(criterion, criterion_type=INCLUSION):
+    """
+    Extract the performance status ranges from a criterion
+    :param str criterion: text of the criterion
+    :param str criterion_type: inclusion or exclusion
+    :rtype: list(PerformanceStatus)
+    """
+    statuses = []
+    for scale, pattern in PERFORMANCE_SCALES:
+        mention = pattern.search(criterion)
+        if mention is None:
+            continue
+        window = criterion[mention.end():mention.end() + LAB_WINDOW]
+        maximum = PERFORMANCE_MAXIMUM[scale]
+        low, high = None, None
+        match = PERFORMANCE_RANGE_PATTERN.search(window)
+        if match:
+            low, high = int(match.group("low")), int(match.group("high"))
+        else:
+            match = PERFORMANCE_BOUND_PATTERN.search(window)
+            if match:
+                value = int(match.group("value"))
+                op = normalize_operator(match.group("op"))
+                low, high = dict(
+                    {">=": (value, maximum), ">": (value + 1, maximum), "<=": (0, value), "<": (0, value - 1)}
+                ).get(op, (value, value))
+            else:
+                match = PERFORMANCE_LIST_PATTERN.search(window)
+                if match:
+                    values = [int(x) for x in re.findall(r"\d", match.group(0))]
+                    low, high = min(values), max(values)
+                else:
+                    match = PERFORMANCE_SINGLE_PATTERN.search(window)
+                    if match:
+                        low = high = int(match.group("value"))
+        if low is None or high > maximum or low > high:
+            continue
+        statuses.append(PerformanceStatus(scale=scale, minimum=low, maximum=high,
+                                          criterion_type=criterion_type, text=criterion))
+    return statuses
+
+
+def extract_pregnancy_exclusion(criterion, criterion_type=INCLUSION):
+    """
+    Detect whether a criterion excludes pregnant subjects
+    :param str criterion: text of the criterion
+    :param str criterion_type: inclusion or exclusion
+    :rtype: PregnancyExclusion
+    """
+    if criterion_type == EXCLUSION and PREGNANCY_PATTERN.search(criterion):
+        return PregnancyExclusion(criterion_type=criterion_type, text=criterion)
+    elif criterion_type == INCLUSION and NEGATIVE_PREGNANCY_PATTERN.search(criterion):
+        return PregnancyExclusion(criterion_type=criterion_type, text=criterion)
+    return None
+
+
+def extract_prior_therapy_exclusion(criterion, criterion_type=INCLUSION):
+    """
+    Detect whether a criterion excludes subjects with prior exposure to a therapy
+    :param str criterion: text of the criterion
+    :param str criterion_type: inclusion or exclusion
+    :rtype: PriorTherapyExclusion
+    """
+    if criterion_type != EXCLUSION:
+        return None
+    match = PRIOR_THERAPY_PATTERN.search(criterion)
+    if match is None:
+        return None
+    therapies = [x.strip().lower() for x in THERAPY_SPLIT_PATTERN.split(match.group("therapy")) if x.strip()]
+    # drop trailing qualifiers (eg 'decitabine within 30 days')
+    therapies = [re.split(r"\s+(?:within|in|during|for|prior|before)\s+", x)[0] for x in therapies]
+    therapies = [x for x in therapies if x and x not in ("any", "other")]
+    if not therapies:
+        return None
+    return PriorTherapyExclusion(therapies=therapies, criterion_type=criterion_type, text=criterion)
+
+
+def _enumerator(criterion):
+    """
+    The style of the enumerator a criterion starts with (digit, roman, letter or bullet, with the
+    case), None when it has none
+    """
+    match = ENUMERATOR_PATTERN.match(criterion)
+    if match is None:
+        return None
+    for style in ("digit", "roman", "letter"):
+        if match.group(style):
+            return style if style == "digit" else "{}-{}".format(style, match.group(style).isupper())
+    return "bullet"
+
+
+def alternatives(criteria):
+    """
+    Find the inclusion criteria that are alternatives of a disjunction: the enumerated criteria
+    following one that introduces alternatives (see DISJUNCTION_PATTERN), up to the next criterion
+    enumerated as the introducing one (or not enumerated), and the criteria either side of an 'OR'
+    :param list criteria: the inclusion criteria (see process_eligibility)
+    :rtype: set(int)
+    :return: the positions of the alternatives
+    """
+    found = set()
+    # the enumerator style of the criterion introducing the current alternatives
+    block, style = False, None
+    for idx, criterion in enumerate(criteria):
+        enumerator = _enumerator(criterion)
+        if block and (enumerator is None or enumerator == style):
+            block = False
+        if block or TRAILING_OR_PATTERN.search(criterion) or (idx and TRAILING_OR_PATTERN.search(criteria[idx - 1])):
+            found.add(idx)
+        if not block and DISJUNCTION_PATTERN.search(criterion):
+            block, style = True, enumerator
+    return found
+
+
+def extract_constraints(eligibility):
+    """
+    Extract the typed constraints from a StudyEligibility
+    :param clinical_trials.structs.StudyEligibility eligibility: the eligibility struct
+    :rtype: EligibilityConstraints
+    """
+    constraints = EligibilityConstraints(
+        minimum_age=parse_age(eligibility.minimum_age),
+        maximum_age=parse_age(eligibility.maximum_age),
+        gender=eligibility.gender,
+        healthy_volunteers=eligibility.healty_volunteers,
+    )
+    criteria = eligibility.criteria
+    if not criteria:
+        return constraints
+    processed = process_eligibility(criteria)
+    # any of the alternatives of an inclusion criterion qualifies, so none is a requirement on its own
+    # (an 'or' in an exclusion criterion joins conditions that each exclude, so those are kept)
+    disjunctive = alternatives(processed.get(INCLUSION, []))
+    for criterion_type in (INCLUSION, EXCLUSION):
+        for idx, criterion in enumerate(processed.get(criterion_type, [])):
+            alternative = bool(criterion_type == INCLUSION and (idx in disjunctive or OR_PATTERN.search(criterion)))
+            lab_thresholds = extract_lab_thresholds(criterion, criterion_type)
+            performance_status = extract_performance_status(criterion, criterion_type)
+            pregnancy = extract_pregnancy_exclusion(criterion, criterion_type)
+            prior_therapy = extract_prior_therapy_exclusion(criterion, criterion_type)
+            for constraint in lab_thresholds + performance_status + [pregnancy, prior_therapy]:
+                if constraint is not None:
+                    constraint.alternative = alternative
+            constraints.lab_thresholds.extend(lab_thresholds)
+            constraints.performance_status.extend(performance_status)
+            if pregnancy is not None:
+                constraints.pregnancy_exclusions.append(pregnancy)
+            if prior_therapy is not None:
+                constraints.prior_therapy_exclusions.append(prior_therapy)
+    return constraints
+
+
+def _allowed_scores(constraints):
+    """
+    The allowed performance status scores per scale; a study allows any score in one of its
+    inclusion ranges that is not in an exclusion range (the alternatives are left out)
+    :param EligibilityConstraints constraints: extracted constraints
+    :rtype: dict
+    """
+    allowed = {}
+    for status in constraints.performance_status:
+        if not status.is_exclusion and not status.alternative:
+            allowed.setdefault(status.scale, set()).update(range(status.minimum, status.maximum + 1))
+    for status in constraints.performance_status:
+        if status.is_exclusion and not status.alternative:
+            scores = allowed.setdefault(status.scale, set(range(PERFORMANCE_MAXIMUM[status.scale] + 1)))
+            scores.difference_update(range(status.minimum, status.maximum + 1))
+    return allowed
+
+
+class _ThresholdBank(object):
+    """
+    Sorted thresholds for one (analyte, unit, operator, criterion type)
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._values = None
+        self._ids = None
+
+    def add(self, value, nct_id):
+        self.entries.append((value, nct_id))
+        self._values = None
+
+    def remove(self, nct_id):
+        self.entries = [x for x in self.entries if x[1] != nct_id]
+        self._values = None
+
+    def _build(self):
+        if self._values is None:
+            self.entries.sort()
+            self._values = [x[0] for x in self.entries]
+            self._ids = [x[1] for x in self.entries]
+
+    def satisfied(self, operator, value):
+        """
+        The studies for which `value <operator> threshold` holds
+        """
+        self._build()
+        if operator == ">=":
+            return self._ids[:bisect_right(self._values, value)]
+        elif operator == ">":
+            return self._ids[:bisect_left(self._values, value)]
+        elif operator == "<=":
+            return self._ids[bisect_left(self._values, value):]
+        elif operator == "<":
+            return self._ids[bisect_right(self._values, value):]
+        return self._ids[bisect_left(self._values, value):bisect_right(self._values, value)]
+
+    def unsatisfied(self, operator, value):
+        """
+        The studies for which `value <operator> threshold` does not hold
+        """
+        satisfied = set(self.satisfied(operator, value))
+        return set(self._ids) - satisfied
+
+
+class EligibilityIndex(object):
+    """
+    Prefilter index over the extracted constraints; finds the candidate studies for a patient
+    without scanning the criteria text.  This is a prefilter - missing patient data never excludes
+    a study, nor does a constraint that is one of several alternatives, and the candidates should
+    be confirmed against the full criteria
+    """
+
+    def __init__(self):
+        self._ids = set()
+        self._constraints = {}
+        self._gender = {}
+        self._age = None
+        self._performance = {}
+        self._performance_constrained = {}
+        self._thresholds = {}
+        self._pregnancy = set()
+        self._therapies = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, nct_id):
+        return nct_id in self._ids
+
+    def constraints(self, nct_id):
+        """
+        The constraints indexed for a study
+        :rtype: EligibilityConstraints
+        """
+        return self._constraints.get(nct_id)
+
+    def add_study(self, study):
+        """
+        Index a study
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        self.add(study.nct_id, study.eligibility_constraints)
+
+    def add(self, nct_id, constraints):
+        """
+        Index the constraints for a study, replacing any previous entry
+        :param str nct_id: the NCT ID
+        :param EligibilityConstraints constraints: extracted constraints
+        """
+        if nct_id in self._ids:
+            self.remove(nct_id)
+        self._ids.add(nct_id)
+        self._constraints[nct_id] = constraints
+        self._gender.setdefault(constraints.gender or "All", set()).add(nct_id)
+        self._age = None
+        for scale, allowed in _allowed_scores(constraints).items():
+            self._performance_constrained.setdefault(scale, set()).add(nct_id)
+            scores = self._performance.setdefault(scale, {})
+            for score in allowed:
+                scores.setdefault(score, set()).add(nct_id)
+        for threshold in constraints.lab_thresholds:
+            if threshold.normalized_value is None or threshold.operator is None or threshold.alternative:
+                continue
+            key = (threshold.analyte, threshold.normalized_unit, threshold.operator, threshold.criterion_type)
+            self._thresholds.setdefault(key, _ThresholdBank()).add(threshold.normalized_value, nct_id)
+        if constraints.excludes_pregnancy:
+            self._pregnancy.add(nct_id)
+        for therapy in constraints.excluded_therapies:
+            self._therapies.setdefault(therapy, set()).add(nct_id)
+
+    def remove(self, nct_id):
+        """
+        Remove a study from the index
+        :param str nct_id: the NCT ID
+        """
+        if nct_id not in self._ids:
+            return
+        constraints = self._constraints.pop(nct_id)
+        self._ids.discard(nct_id)
+        self._gender.get(constraints.gender or "All", set()).discard(nct_id)
+        self._age = None
+        for scale in self._performance:
+            self._performance_constrained.get(scale, set()).discard(nct_id)
+            for ids in self._performance[scale].values():
+                ids.discard(nct_id)
+        for threshold in constraints.lab_thresholds:
+            key = (threshold.analyte, threshold.normalized_unit, threshold.operator, threshold.criterion_type)
+            if key in self._thresholds:
+                self._thresholds[key].remove(nct_id)
+        self._pregnancy.discard(nct_id)
+        for therapy in constraints.excluded_therapies:
+            self._therapies.get(therapy, set()).discard(nct_id)
+
+    def _build_age(self):
+        if self._age is None:
+            minimums = sorted((c.minimum_age or 0.0, nct_id) for nct_id, c in self._constraints.items())
+            maximums = sorted((c.maximum_age if c.maximum_age is not None else float("inf"), nct_id)
+                              for nct_id, c in self._constraints.items())
+            self._age = (
+                [x[0] for x in minimums], [x[1] for x in minimums],
+                [x[0] for x in maximums], [x[1] for x in maximums],
+            )
+        return self._age
+
+    def _age_candidates(self, age):
+        min_values, min_ids, max_values, max_ids = self._build_age()
+        old_enough = set(min_ids[:bisect_right(min_values, age)])
+        young_enough = set(max_ids[bisect_left(max_values, age):])
+        return old_enough & young_enough
+
+    def candidates(self, patient):
+        """
+        Get the candidate studies for a patient
+        :param PatientProfile patient: the patient attributes
+        :rtype: set(str)
+        :return: the NCT IDs of the candidate studies
+        """
+        candidates = set(self._ids)
+        if patient.gender in ("Female", "Male"):
+            candidates = self._gender.get("All", set()) | self._gender.get(patient.gender, set())
+        if patient.age is not None:
+            candidates &= self._age_candidates(patient.age)
+        for scale, score in (("ECOG", patient.ecog), ("KARNOFSKY", patient.karnofsky)):
+            if score is None or scale not in self._performance:
+                continue
+            constrained = self._performance_constrained.get(scale, set())
+            candidates -= constrained - self._performance[scale].get(score, set())
+        for (analyte, unit, operator, criterion_type), bank in self._thresholds.items():
+            if unit == "xULN":
+                value = patient.uln_multiples.get(analyte)
+            else:
+                value = patient.labs.get(analyte)
+            if value is None:
+                continue
+            if criterion_type == INCLUSION:
+                candidates -= bank.unsatisfied(operator, value)
+            else:
+                candidates -= set(bank.satisfied(operator, value))
+        if patient.pregnant:
+            candidates -= self._pregnancy
+        for therapy in patient.prior_therapies:
+            candidates -= self._therapies.get(therapy.lower(), set())
+        return candidates
@@ -1,2 +1,18 @@
 class StudyDefinitionInvalid(Exception):
     pass
+
+
+class RecordFailed(Exception):
+    """
+    A record could not be decoded (stage 'decode') or represented by the structs (stage 'struct')
+    """
+
+    def __init__(self, nct_id, stage, error_type, message):
+        super(RecordFailed, self).__init__(nct_id, stage, error_type, message)
+        self.nct_id = nct_id
+        self.stage = stage
+        self.error_type = error_type
+        self.message = message
+
+    def __str__(self):
+        return "{} failed in {}: {}: {}".format(self.nct_id, self.stage, self.error_type, self.message)
@@ -0,0 +1,177 @@
+"""
+Faceted counting over the corpus.  Each facet value holds a compressed bitmap of the rows (see
+clinical_trials.bitmap) of the studies that have it, so the counts for a filter set are bitmap
+intersections rather than a pass over the studies
+
+    index = FacetIndex.build(studies)
+    index.counts(dict(status="Recruiting", country=["France", "Germany"]))
+"""
+from clinical_trials import metrics
+from clinical_trials.bitmap import Bitmap
+
+FACETS = ("status", "phase", "country", "agency_class", "intervention_type")
+
+
+def facet_values(study):
+    """
+    Get the facet values of a study
+    :param clinical_trials.ClinicalStudy study: the study
+    :rtype: dict
+    :return: the set of values of each facet
+    """
+    sponsor = study._data.get("sponsors", {}).get("lead_sponsor", {})
+    return dict(
+        status=set([study.status]) if study.status else set(),
+        phase=set([study.phase]),
+        country=set(study.countries),
+        agency_class=set([sponsor["agency_class"]]) if sponsor.get("agency_class") else set(),
+        intervention_type=set(x.intervention_type for x in study.interventions if x.intervention_type),
+    )
+
+
+class FacetIndex(object):
+    """
+    A bitmap per facet value.  Studies are numbered in the order they are added; an updated study
+    keeps its row, and the row of a removed study is not reused
+    """
+
+    def __init__(self, facets=FACETS):
+        """
+        :param tuple facets: the facets indexed (see facet_values)
+        """
+        self.facets = tuple(facets)
+        self._bitmaps = dict((facet, {}) for facet in self.facets)
+        self._rows = {}
+        self._nct_ids = []
+        self._values = {}
+        self._live = Bitmap()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, nct_id):
+        return nct_id in self._rows
+
+    @classmethod
+    def build(cls, studies, facets=FACETS):
+        """
+        Index the studies
+        :param iterable studies: the studies (ClinicalStudy)
+        :param tuple facets: the facets indexed
+        :rtype: FacetIndex
+        """
+        index = cls(facets)
+        with metrics.timer("facets.build"):
+            for study in studies:
+                index.add_study(study)
+        return index
+
+    def add_study(self, study):
+        """
+        Add a study, or update it when it has been added before; only the changed values are touched
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        values = facet_values(study)
+        values = dict((facet, frozenset(values[facet])) for facet in self.facets)
+        row = self._rows.get(study.nct_id)
+        if row is None:
+            row = self._rows[study.nct_id] = len(self._nct_ids)
+            self._nct_ids.append(study.nct_id)
+            self._live.add(row)
+            previous = dict((facet, frozenset()) for facet in self.facets)
+        else:
+            previous = self._values[row]
+        for facet in self.facets:
+            bitmaps = self._bitmaps[facet]
+            for value in previous[facet] - values[facet]:
+                bitmaps[value].discard(row)
+                if not bitmaps[value]:
+                    del bitmaps[value]
+            for value in values[facet] - previous[facet]:
+                bitmaps.setdefault(value, Bitmap()).add(row)
+        self._values[row] = values
+
+    def remove_study(self, nct_id):
+        """
+        Remove a study
+        :param str nct_id: the NCT ID
+        """
+        row = self._rows.pop(nct_id, None)
+        if row is None:
+            raise KeyError(nct_id)
+        for facet, values in self._values.pop(row).items():
+            bitmaps = self._bitmaps[facet]
+            for value in values:
+                bitmaps[value].discard(row)
+                if not bitmaps[value]:
+                    del bitmaps[value]
+        self._nct_ids[row] = None
+        self._live.discard(row)
+
+    def values(self, facet):
+        """
+        The values of a facet
+        :param str facet: the facet
+        :rtype: list(str)
+        """
+        return sorted(self._facet(facet))
+
+    def _facet(self, facet):
+        if facet not in self._bitmaps:
+            raise ValueError("Unknown facet {}".format(facet))
+        return self._bitmaps[facet]
+
+    def match(self, filters=None):
+        """
+        Get the rows matching a filter set
+        :param dict filters: facet: value, or list of values (any of which matches); the facets
+            are combined with and
+        :rtype: clinical_trials.bitmap.Bitmap
+        """
+        selected = self._live
+        for facet, wanted in sorted((filters or {}).items(), key=lambda x: self._selectivity(*x)):
+            bitmaps = self._facet(facet)
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            union = Bitmap()
+            for value in wanted:
+                if value in bitmaps:
+                    union = union | bitmaps[value]
+            selected = selected & union
+            if not selected:
+                break
+        return selected
+
+    def _selectivity(self, facet, wanted):
+        # intersect the smallest bitmaps first
+        bitmaps = self._facet(facet)
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        return sum(len(bitmaps[x]) for x in wanted if x in bitmaps)
+
+    def nct_ids(self, filters=None):
+        """
+        Get the NCT IDs matching a filter set
+        :param dict filters: the filters (see match)
+        :rtype: list(str)
+        """
+        return [self._nct_ids[row] for row in self.match(filters)]
+
+    def counts(self, filters=None, facets=None):
+        """
+        Count the values of each facet over the studies matching a filter set
+        :param dict filters: the filters (see match)
+        :param tuple facets: the facets counted (default, all)
+        :rtype: dict
+        :return: facet: {value: count}, leaving out the values with no matches
+        """
+        with metrics.timer("facets.counts"):
+            selected = self.match(filters)
+            counts = {}
+            for facet in facets or self.facets:
+                counts[facet] = {}
+                for value, bitmap in self._facet(facet).items():
+                    count = selected.intersection_count(bitmap)
+                    if count:
+                        counts[facet][value] = count
+        return counts
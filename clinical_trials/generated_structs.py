@@ -0,0 +1,2687 @@
+"""
+Slotted structs for every complex type of the clinicaltrials.gov schema, each with a from_dict
+specialized to the elements and attributes of the type (the shape of schema.to_dict); the keys
+the schema does not declare are ignored
+
+Generated by clinical_trials.codegen; do not edit
+"""
+
+SCHEMA_VERSION = "2020.05.08"
+
+
+# an empty element of a complex type decodes to None, and is kept as None
+
+def _one(cls, value):
+    return None if value is None else cls.from_dict(value)
+
+
+def _many(cls, values):
+    return [None if x is None else cls.from_dict(x) for x in values] if values else []
+
+
+class SchemaStruct(object):
+    __slots__ = ()
+
+    # (attribute, key, struct class name or None, repeated) for each field
+    FIELDS = ()
+    # the type has simple content (the text is the '$' key, or the whole value with no attributes)
+    SIMPLE = False
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, x[0]) == getattr(other, x[0]) for x in self.FIELDS)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        values = ((x[0], getattr(self, x[0])) for x in self.FIELDS)
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(name, value) for name, value in values if value is not None and value != []))
+
+    def to_dict(self):
+        """
+        Get the struct in the shape of schema.to_dict (an empty element, decoded as None, is left
+        out unless it is repeated)
+        :rtype: dict
+        """
+        document = {}
+        for name, key, struct, repeated in self.FIELDS:
+            value = getattr(self, name)
+            if value is None or (repeated and not value):
+                continue
+            if struct is not None:
+                value = [None if x is None else x.to_dict() for x in value] if repeated else value.to_dict()
+            document[key] = value
+        if self.SIMPLE and list(document) == ["$"]:
+            return document["$"]
+        return document
+
+
+class VariableDateStruct(SchemaStruct):
+    """
+    variable_date_struct
+    """
+
+    __slots__ = ("type", "text")
+    FIELDS = (
+        ("type", "@type", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, type=None, text=None):
+        self.type = type
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@type"),
+            get("$"),
+        )
+
+
+class RequiredHeaderStruct(SchemaStruct):
+    """
+    required_header_struct
+    """
+
+    __slots__ = ("download_date", "link_text", "url")
+    FIELDS = (
+        ("download_date", "download_date", None, False),
+        ("link_text", "link_text", None, False),
+        ("url", "url", None, False),
+    )
+
+    def __init__(self, download_date=None, link_text=None, url=None):
+        self.download_date = download_date
+        self.link_text = link_text
+        self.url = url
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("download_date"),
+            get("link_text"),
+            get("url"),
+        )
+
+
+class IdInfoStruct(SchemaStruct):
+    """
+    id_info_struct
+    """
+
+    __slots__ = ("org_study_id", "secondary_id", "nct_id", "nct_alias")
+    FIELDS = (
+        ("org_study_id", "org_study_id", None, False),
+        ("secondary_id", "secondary_id", None, True),
+        ("nct_id", "nct_id", None, False),
+        ("nct_alias", "nct_alias", None, True),
+    )
+
+    def __init__(self, org_study_id=None, secondary_id=None, nct_id=None, nct_alias=None):
+        self.org_study_id = org_study_id
+        self.secondary_id = [] if secondary_id is None else secondary_id
+        self.nct_id = nct_id
+        self.nct_alias = [] if nct_alias is None else nct_alias
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("org_study_id"),
+            list(get("secondary_id", ())),
+            get("nct_id"),
+            list(get("nct_alias", ())),
+        )
+
+
+class SponsorStruct(SchemaStruct):
+    """
+    sponsor_struct
+    """
+
+    __slots__ = ("agency", "agency_class")
+    FIELDS = (
+        ("agency", "agency", None, False),
+        ("agency_class", "agency_class", None, False),
+    )
+
+    def __init__(self, agency=None, agency_class=None):
+        self.agency = agency
+        self.agency_class = agency_class
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("agency"),
+            get("agency_class"),
+        )
+
+
+class SponsorsStruct(SchemaStruct):
+    """
+    sponsors_struct
+    """
+
+    __slots__ = ("lead_sponsor", "collaborator")
+    FIELDS = (
+        ("lead_sponsor", "lead_sponsor", "SponsorStruct", False),
+        ("collaborator", "collaborator", "SponsorStruct", True),
+    )
+
+    def __init__(self, lead_sponsor=None, collaborator=None):
+        self.lead_sponsor = lead_sponsor
+        self.collaborator = [] if collaborator is None else collaborator
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(SponsorStruct, get("lead_sponsor")),
+            _many(SponsorStruct, get("collaborator")),
+        )
+
+
+class OversightInfoStruct(SchemaStruct):
+    """
+    oversight_info_struct
+    """
+
+    __slots__ = (
+        "has_dmc",
+        "is_fda_regulated_drug",
+        "is_fda_regulated_device",
+        "is_unapproved_device",
+        "is_ppsd",
+        "is_us_export",
+    )
+    FIELDS = (
+        ("has_dmc", "has_dmc", None, False),
+        ("is_fda_regulated_drug", "is_fda_regulated_drug", None, False),
+        ("is_fda_regulated_device", "is_fda_regulated_device", None, False),
+        ("is_unapproved_device", "is_unapproved_device", None, False),
+        ("is_ppsd", "is_ppsd", None, False),
+        ("is_us_export", "is_us_export", None, False),
+    )
+
+    def __init__(
+        self,
+        has_dmc=None,
+        is_fda_regulated_drug=None,
+        is_fda_regulated_device=None,
+        is_unapproved_device=None,
+        is_ppsd=None,
+        is_us_export=None,
+    ):
+        self.has_dmc = has_dmc
+        self.is_fda_regulated_drug = is_fda_regulated_drug
+        self.is_fda_regulated_device = is_fda_regulated_device
+        self.is_unapproved_device = is_unapproved_device
+        self.is_ppsd = is_ppsd
+        self.is_us_export = is_us_export
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("has_dmc"),
+            get("is_fda_regulated_drug"),
+            get("is_fda_regulated_device"),
+            get("is_unapproved_device"),
+            get("is_ppsd"),
+            get("is_us_export"),
+        )
+
+
+class ExpandedAccessInfoStruct(SchemaStruct):
+    """
+    expanded_access_info_struct
+    """
+
+    __slots__ = (
+        "expanded_access_type_individual",
+        "expanded_access_type_intermediate",
+        "expanded_access_type_treatment",
+    )
+    FIELDS = (
+        ("expanded_access_type_individual", "expanded_access_type_individual", None, False),
+        ("expanded_access_type_intermediate", "expanded_access_type_intermediate", None, False),
+        ("expanded_access_type_treatment", "expanded_access_type_treatment", None, False),
+    )
+
+    def __init__(
+        self,
+        expanded_access_type_individual=None,
+        expanded_access_type_intermediate=None,
+        expanded_access_type_treatment=None,
+    ):
+        self.expanded_access_type_individual = expanded_access_type_individual
+        self.expanded_access_type_intermediate = expanded_access_type_intermediate
+        self.expanded_access_type_treatment = expanded_access_type_treatment
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("expanded_access_type_individual"),
+            get("expanded_access_type_intermediate"),
+            get("expanded_access_type_treatment"),
+        )
+
+
+class StudyDesignInfoStruct(SchemaStruct):
+    """
+    study_design_info_struct
+    """
+
+    __slots__ = (
+        "allocation",
+        "intervention_model",
+        "intervention_model_description",
+        "primary_purpose",
+        "observational_model",
+        "time_perspective",
+        "masking",
+        "masking_description",
+    )
+    FIELDS = (
+        ("allocation", "allocation", None, False),
+        ("intervention_model", "intervention_model", None, False),
+        ("intervention_model_description", "intervention_model_description", None, False),
+        ("primary_purpose", "primary_purpose", None, False),
+        ("observational_model", "observational_model", None, False),
+        ("time_perspective", "time_perspective", None, False),
+        ("masking", "masking", None, False),
+        ("masking_description", "masking_description", None, False),
+    )
+
+    def __init__(
+        self,
+        allocation=None,
+        intervention_model=None,
+        intervention_model_description=None,
+        primary_purpose=None,
+        observational_model=None,
+        time_perspective=None,
+        masking=None,
+        masking_description=None,
+    ):
+        self.allocation = allocation
+        self.intervention_model = intervention_model
+        self.intervention_model_description = intervention_model_description
+        self.primary_purpose = primary_purpose
+        self.observational_model = observational_model
+        self.time_perspective = time_perspective
+        self.masking = masking
+        self.masking_description = masking_description
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("allocation"),
+            get("intervention_model"),
+            get("intervention_model_description"),
+            get("primary_purpose"),
+            get("observational_model"),
+            get("time_perspective"),
+            get("masking"),
+            get("masking_description"),
+        )
+
+
+class ProtocolOutcomeStruct(SchemaStruct):
+    """
+    protocol_outcome_struct
+    """
+
+    __slots__ = ("measure", "time_frame", "description")
+    FIELDS = (
+        ("measure", "measure", None, False),
+        ("time_frame", "time_frame", None, False),
+        ("description", "description", None, False),
+    )
+
+    def __init__(self, measure=None, time_frame=None, description=None):
+        self.measure = measure
+        self.time_frame = time_frame
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("measure"),
+            get("time_frame"),
+            get("description"),
+        )
+
+
+class EnrollmentStruct(SchemaStruct):
+    """
+    enrollment_struct
+    """
+
+    __slots__ = ("type", "text")
+    FIELDS = (
+        ("type", "@type", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, type=None, text=None):
+        self.type = type
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@type"),
+            get("$"),
+        )
+
+
+class ArmGroupStruct(SchemaStruct):
+    """
+    arm_group_struct
+    """
+
+    __slots__ = ("arm_group_label", "arm_group_type", "description")
+    FIELDS = (
+        ("arm_group_label", "arm_group_label", None, False),
+        ("arm_group_type", "arm_group_type", None, False),
+        ("description", "description", None, False),
+    )
+
+    def __init__(self, arm_group_label=None, arm_group_type=None, description=None):
+        self.arm_group_label = arm_group_label
+        self.arm_group_type = arm_group_type
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("arm_group_label"),
+            get("arm_group_type"),
+            get("description"),
+        )
+
+
+class InterventionStruct(SchemaStruct):
+    """
+    intervention_struct
+    """
+
+    __slots__ = ("intervention_type", "intervention_name", "description", "arm_group_label", "other_name")
+    FIELDS = (
+        ("intervention_type", "intervention_type", None, False),
+        ("intervention_name", "intervention_name", None, False),
+        ("description", "description", None, False),
+        ("arm_group_label", "arm_group_label", None, True),
+        ("other_name", "other_name", None, True),
+    )
+
+    def __init__(
+        self,
+        intervention_type=None,
+        intervention_name=None,
+        description=None,
+        arm_group_label=None,
+        other_name=None,
+    ):
+        self.intervention_type = intervention_type
+        self.intervention_name = intervention_name
+        self.description = description
+        self.arm_group_label = [] if arm_group_label is None else arm_group_label
+        self.other_name = [] if other_name is None else other_name
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("intervention_type"),
+            get("intervention_name"),
+            get("description"),
+            list(get("arm_group_label", ())),
+            list(get("other_name", ())),
+        )
+
+
+class TextblockStruct(SchemaStruct):
+    """
+    textblock_struct
+    """
+
+    __slots__ = ("textblock",)
+    FIELDS = (
+        ("textblock", "textblock", None, False),
+    )
+
+    def __init__(self, textblock=None):
+        self.textblock = textblock
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("textblock"),
+        )
+
+
+class EligibilityStruct(SchemaStruct):
+    """
+    eligibility_struct
+    """
+
+    __slots__ = (
+        "study_pop",
+        "sampling_method",
+        "criteria",
+        "gender",
+        "gender_based",
+        "gender_description",
+        "minimum_age",
+        "maximum_age",
+        "healthy_volunteers",
+    )
+    FIELDS = (
+        ("study_pop", "study_pop", "TextblockStruct", False),
+        ("sampling_method", "sampling_method", None, False),
+        ("criteria", "criteria", "TextblockStruct", False),
+        ("gender", "gender", None, False),
+        ("gender_based", "gender_based", None, False),
+        ("gender_description", "gender_description", None, False),
+        ("minimum_age", "minimum_age", None, False),
+        ("maximum_age", "maximum_age", None, False),
+        ("healthy_volunteers", "healthy_volunteers", None, False),
+    )
+
+    def __init__(
+        self,
+        study_pop=None,
+        sampling_method=None,
+        criteria=None,
+        gender=None,
+        gender_based=None,
+        gender_description=None,
+        minimum_age=None,
+        maximum_age=None,
+        healthy_volunteers=None,
+    ):
+        self.study_pop = study_pop
+        self.sampling_method = sampling_method
+        self.criteria = criteria
+        self.gender = gender
+        self.gender_based = gender_based
+        self.gender_description = gender_description
+        self.minimum_age = minimum_age
+        self.maximum_age = maximum_age
+        self.healthy_volunteers = healthy_volunteers
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(TextblockStruct, get("study_pop")),
+            get("sampling_method"),
+            _one(TextblockStruct, get("criteria")),
+            get("gender"),
+            get("gender_based"),
+            get("gender_description"),
+            get("minimum_age"),
+            get("maximum_age"),
+            get("healthy_volunteers"),
+        )
+
+
+class ContactStruct(SchemaStruct):
+    """
+    contact_struct
+    """
+
+    __slots__ = ("first_name", "middle_name", "last_name", "degrees", "phone", "phone_ext", "email")
+    FIELDS = (
+        ("first_name", "first_name", None, False),
+        ("middle_name", "middle_name", None, False),
+        ("last_name", "last_name", None, False),
+        ("degrees", "degrees", None, False),
+        ("phone", "phone", None, False),
+        ("phone_ext", "phone_ext", None, False),
+        ("email", "email", None, False),
+    )
+
+    def __init__(
+        self,
+        first_name=None,
+        middle_name=None,
+        last_name=None,
+        degrees=None,
+        phone=None,
+        phone_ext=None,
+        email=None,
+    ):
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.last_name = last_name
+        self.degrees = degrees
+        self.phone = phone
+        self.phone_ext = phone_ext
+        self.email = email
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("first_name"),
+            get("middle_name"),
+            get("last_name"),
+            get("degrees"),
+            get("phone"),
+            get("phone_ext"),
+            get("email"),
+        )
+
+
+class InvestigatorStruct(SchemaStruct):
+    """
+    investigator_struct
+    """
+
+    __slots__ = ("first_name", "middle_name", "last_name", "degrees", "role", "affiliation")
+    FIELDS = (
+        ("first_name", "first_name", None, False),
+        ("middle_name", "middle_name", None, False),
+        ("last_name", "last_name", None, False),
+        ("degrees", "degrees", None, False),
+        ("role", "role", None, False),
+        ("affiliation", "affiliation", None, False),
+    )
+
+    def __init__(self, first_name=None, middle_name=None, last_name=None, degrees=None, role=None, affiliation=None):
+        self.first_name = first_name
+        self.middle_name = middle_name
+        self.last_name = last_name
+        self.degrees = degrees
+        self.role = role
+        self.affiliation = affiliation
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("first_name"),
+            get("middle_name"),
+            get("last_name"),
+            get("degrees"),
+            get("role"),
+            get("affiliation"),
+        )
+
+
+class AddressStruct(SchemaStruct):
+    """
+    address_struct
+    """
+
+    __slots__ = ("city", "state", "zip", "country")
+    FIELDS = (
+        ("city", "city", None, False),
+        ("state", "state", None, False),
+        ("zip", "zip", None, False),
+        ("country", "country", None, False),
+    )
+
+    def __init__(self, city=None, state=None, zip=None, country=None):
+        self.city = city
+        self.state = state
+        self.zip = zip
+        self.country = country
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("city"),
+            get("state"),
+            get("zip"),
+            get("country"),
+        )
+
+
+class FacilityStruct(SchemaStruct):
+    """
+    facility_struct
+    """
+
+    __slots__ = ("name", "address")
+    FIELDS = (
+        ("name", "name", None, False),
+        ("address", "address", "AddressStruct", False),
+    )
+
+    def __init__(self, name=None, address=None):
+        self.name = name
+        self.address = address
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("name"),
+            _one(AddressStruct, get("address")),
+        )
+
+
+class LocationStruct(SchemaStruct):
+    """
+    location_struct
+    """
+
+    __slots__ = ("facility", "status", "contact", "contact_backup", "investigator")
+    FIELDS = (
+        ("facility", "facility", "FacilityStruct", False),
+        ("status", "status", None, False),
+        ("contact", "contact", "ContactStruct", False),
+        ("contact_backup", "contact_backup", "ContactStruct", False),
+        ("investigator", "investigator", "InvestigatorStruct", True),
+    )
+
+    def __init__(self, facility=None, status=None, contact=None, contact_backup=None, investigator=None):
+        self.facility = facility
+        self.status = status
+        self.contact = contact
+        self.contact_backup = contact_backup
+        self.investigator = [] if investigator is None else investigator
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(FacilityStruct, get("facility")),
+            get("status"),
+            _one(ContactStruct, get("contact")),
+            _one(ContactStruct, get("contact_backup")),
+            _many(InvestigatorStruct, get("investigator")),
+        )
+
+
+class CountriesStruct(SchemaStruct):
+    """
+    countries_struct
+    """
+
+    __slots__ = ("country",)
+    FIELDS = (
+        ("country", "country", None, True),
+    )
+
+    def __init__(self, country=None):
+        self.country = [] if country is None else country
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            list(get("country", ())),
+        )
+
+
+class LinkStruct(SchemaStruct):
+    """
+    link_struct
+    """
+
+    __slots__ = ("url", "description")
+    FIELDS = (
+        ("url", "url", None, False),
+        ("description", "description", None, False),
+    )
+
+    def __init__(self, url=None, description=None):
+        self.url = url
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("url"),
+            get("description"),
+        )
+
+
+class ReferenceStruct(SchemaStruct):
+    """
+    reference_struct
+    """
+
+    __slots__ = ("citation", "PMID")
+    FIELDS = (
+        ("citation", "citation", None, False),
+        ("PMID", "PMID", None, False),
+    )
+
+    def __init__(self, citation=None, PMID=None):
+        self.citation = citation
+        self.PMID = PMID
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("citation"),
+            get("PMID"),
+        )
+
+
+class ResponsiblePartyStruct(SchemaStruct):
+    """
+    responsible_party_struct
+    """
+
+    __slots__ = (
+        "name_title",
+        "organization",
+        "responsible_party_type",
+        "investigator_affiliation",
+        "investigator_full_name",
+        "investigator_title",
+    )
+    FIELDS = (
+        ("name_title", "name_title", None, False),
+        ("organization", "organization", None, False),
+        ("responsible_party_type", "responsible_party_type", None, False),
+        ("investigator_affiliation", "investigator_affiliation", None, False),
+        ("investigator_full_name", "investigator_full_name", None, False),
+        ("investigator_title", "investigator_title", None, False),
+    )
+
+    def __init__(
+        self,
+        name_title=None,
+        organization=None,
+        responsible_party_type=None,
+        investigator_affiliation=None,
+        investigator_full_name=None,
+        investigator_title=None,
+    ):
+        self.name_title = name_title
+        self.organization = organization
+        self.responsible_party_type = responsible_party_type
+        self.investigator_affiliation = investigator_affiliation
+        self.investigator_full_name = investigator_full_name
+        self.investigator_title = investigator_title
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("name_title"),
+            get("organization"),
+            get("responsible_party_type"),
+            get("investigator_affiliation"),
+            get("investigator_full_name"),
+            get("investigator_title"),
+        )
+
+
+class BrowseStruct(SchemaStruct):
+    """
+    browse_struct
+    """
+
+    __slots__ = ("mesh_term",)
+    FIELDS = (
+        ("mesh_term", "mesh_term", None, True),
+    )
+
+    def __init__(self, mesh_term=None):
+        self.mesh_term = [] if mesh_term is None else mesh_term
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            list(get("mesh_term", ())),
+        )
+
+
+class PatientDataStruct(SchemaStruct):
+    """
+    patient_data_struct
+    """
+
+    __slots__ = ("sharing_ipd", "ipd_description", "ipd_info_type", "ipd_time_frame", "ipd_access_criteria", "ipd_url")
+    FIELDS = (
+        ("sharing_ipd", "sharing_ipd", None, False),
+        ("ipd_description", "ipd_description", None, False),
+        ("ipd_info_type", "ipd_info_type", None, True),
+        ("ipd_time_frame", "ipd_time_frame", None, False),
+        ("ipd_access_criteria", "ipd_access_criteria", None, False),
+        ("ipd_url", "ipd_url", None, False),
+    )
+
+    def __init__(
+        self,
+        sharing_ipd=None,
+        ipd_description=None,
+        ipd_info_type=None,
+        ipd_time_frame=None,
+        ipd_access_criteria=None,
+        ipd_url=None,
+    ):
+        self.sharing_ipd = sharing_ipd
+        self.ipd_description = ipd_description
+        self.ipd_info_type = [] if ipd_info_type is None else ipd_info_type
+        self.ipd_time_frame = ipd_time_frame
+        self.ipd_access_criteria = ipd_access_criteria
+        self.ipd_url = ipd_url
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("sharing_ipd"),
+            get("ipd_description"),
+            list(get("ipd_info_type", ())),
+            get("ipd_time_frame"),
+            get("ipd_access_criteria"),
+            get("ipd_url"),
+        )
+
+
+class StudyDocStruct(SchemaStruct):
+    """
+    study_doc_struct
+    """
+
+    __slots__ = ("doc_id", "doc_type", "doc_url", "doc_comment")
+    FIELDS = (
+        ("doc_id", "doc_id", None, False),
+        ("doc_type", "doc_type", None, False),
+        ("doc_url", "doc_url", None, False),
+        ("doc_comment", "doc_comment", None, False),
+    )
+
+    def __init__(self, doc_id=None, doc_type=None, doc_url=None, doc_comment=None):
+        self.doc_id = doc_id
+        self.doc_type = doc_type
+        self.doc_url = doc_url
+        self.doc_comment = doc_comment
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("doc_id"),
+            get("doc_type"),
+            get("doc_url"),
+            get("doc_comment"),
+        )
+
+
+class StudyDocsStruct(SchemaStruct):
+    """
+    study_docs_struct
+    """
+
+    __slots__ = ("study_doc",)
+    FIELDS = (
+        ("study_doc", "study_doc", "StudyDocStruct", True),
+    )
+
+    def __init__(self, study_doc=None):
+        self.study_doc = [] if study_doc is None else study_doc
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(StudyDocStruct, get("study_doc")),
+        )
+
+
+class ProvidedDocumentStruct(SchemaStruct):
+    """
+    provided_document_struct
+    """
+
+    __slots__ = (
+        "document_type",
+        "document_has_protocol",
+        "document_has_icf",
+        "document_has_sap",
+        "document_date",
+        "document_url",
+    )
+    FIELDS = (
+        ("document_type", "document_type", None, False),
+        ("document_has_protocol", "document_has_protocol", None, False),
+        ("document_has_icf", "document_has_icf", None, False),
+        ("document_has_sap", "document_has_sap", None, False),
+        ("document_date", "document_date", None, False),
+        ("document_url", "document_url", None, False),
+    )
+
+    def __init__(
+        self,
+        document_type=None,
+        document_has_protocol=None,
+        document_has_icf=None,
+        document_has_sap=None,
+        document_date=None,
+        document_url=None,
+    ):
+        self.document_type = document_type
+        self.document_has_protocol = document_has_protocol
+        self.document_has_icf = document_has_icf
+        self.document_has_sap = document_has_sap
+        self.document_date = document_date
+        self.document_url = document_url
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("document_type"),
+            get("document_has_protocol"),
+            get("document_has_icf"),
+            get("document_has_sap"),
+            get("document_date"),
+            get("document_url"),
+        )
+
+
+class ProvidedDocumentSectionStruct(SchemaStruct):
+    """
+    provided_document_section_struct
+    """
+
+    __slots__ = ("provided_document",)
+    FIELDS = (
+        ("provided_document", "provided_document", "ProvidedDocumentStruct", True),
+    )
+
+    def __init__(self, provided_document=None):
+        self.provided_document = [] if provided_document is None else provided_document
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(ProvidedDocumentStruct, get("provided_document")),
+        )
+
+
+class PendingResultsStruct(SchemaStruct):
+    """
+    pending_results_struct
+    """
+
+    __slots__ = ("submitted", "returned", "submission_canceled")
+    FIELDS = (
+        ("submitted", "submitted", "VariableDateStruct", True),
+        ("returned", "returned", "VariableDateStruct", True),
+        ("submission_canceled", "submission_canceled", "VariableDateStruct", True),
+    )
+
+    def __init__(self, submitted=None, returned=None, submission_canceled=None):
+        self.submitted = [] if submitted is None else submitted
+        self.returned = [] if returned is None else returned
+        self.submission_canceled = [] if submission_canceled is None else submission_canceled
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(VariableDateStruct, get("submitted")),
+            _many(VariableDateStruct, get("returned")),
+            _many(VariableDateStruct, get("submission_canceled")),
+        )
+
+
+class GroupStruct(SchemaStruct):
+    """
+    group_struct
+    """
+
+    __slots__ = ("group_id", "title", "description")
+    FIELDS = (
+        ("group_id", "@group_id", None, False),
+        ("title", "title", None, False),
+        ("description", "description", None, False),
+    )
+
+    def __init__(self, group_id=None, title=None, description=None):
+        self.group_id = group_id
+        self.title = title
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("@group_id"),
+            get("title"),
+            get("description"),
+        )
+
+
+class ParticipantsStruct(SchemaStruct):
+    """
+    participants_struct
+    """
+
+    __slots__ = ("group_id", "count", "text")
+    FIELDS = (
+        ("group_id", "@group_id", None, False),
+        ("count", "@count", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, group_id=None, count=None, text=None):
+        self.group_id = group_id
+        self.count = count
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@group_id"),
+            get("@count"),
+            get("$"),
+        )
+
+
+class MilestoneStruct(SchemaStruct):
+    """
+    milestone_struct
+    """
+
+    __slots__ = ("title", "participants_list")
+    FIELDS = (
+        ("title", "title", None, False),
+        ("participants_list", "participants_list", "MilestoneParticipantsList", False),
+    )
+
+    def __init__(self, title=None, participants_list=None):
+        self.title = title
+        self.participants_list = participants_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            _one(MilestoneParticipantsList, get("participants_list")),
+        )
+
+
+class MilestoneParticipantsList(SchemaStruct):
+    """
+    milestone_struct/participants_list
+    """
+
+    __slots__ = ("participants",)
+    FIELDS = (
+        ("participants", "participants", "ParticipantsStruct", True),
+    )
+
+    def __init__(self, participants=None):
+        self.participants = [] if participants is None else participants
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(ParticipantsStruct, get("participants")),
+        )
+
+
+class PeriodStruct(SchemaStruct):
+    """
+    period_struct
+    """
+
+    __slots__ = ("title", "milestone_list", "drop_withdraw_reason_list")
+    FIELDS = (
+        ("title", "title", None, False),
+        ("milestone_list", "milestone_list", "PeriodMilestoneList", False),
+        ("drop_withdraw_reason_list", "drop_withdraw_reason_list", "PeriodDropWithdrawReasonList", False),
+    )
+
+    def __init__(self, title=None, milestone_list=None, drop_withdraw_reason_list=None):
+        self.title = title
+        self.milestone_list = milestone_list
+        self.drop_withdraw_reason_list = drop_withdraw_reason_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            _one(PeriodMilestoneList, get("milestone_list")),
+            _one(PeriodDropWithdrawReasonList, get("drop_withdraw_reason_list")),
+        )
+
+
+class PeriodMilestoneList(SchemaStruct):
+    """
+    period_struct/milestone_list
+    """
+
+    __slots__ = ("milestone",)
+    FIELDS = (
+        ("milestone", "milestone", "MilestoneStruct", True),
+    )
+
+    def __init__(self, milestone=None):
+        self.milestone = [] if milestone is None else milestone
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MilestoneStruct, get("milestone")),
+        )
+
+
+class PeriodDropWithdrawReasonList(SchemaStruct):
+    """
+    period_struct/drop_withdraw_reason_list
+    """
+
+    __slots__ = ("drop_withdraw_reason",)
+    FIELDS = (
+        ("drop_withdraw_reason", "drop_withdraw_reason", "MilestoneStruct", True),
+    )
+
+    def __init__(self, drop_withdraw_reason=None):
+        self.drop_withdraw_reason = [] if drop_withdraw_reason is None else drop_withdraw_reason
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MilestoneStruct, get("drop_withdraw_reason")),
+        )
+
+
+class ParticipantFlowStruct(SchemaStruct):
+    """
+    participant_flow_struct
+    """
+
+    __slots__ = ("recruitment_details", "pre_assignment_details", "group_list", "period_list")
+    FIELDS = (
+        ("recruitment_details", "recruitment_details", None, False),
+        ("pre_assignment_details", "pre_assignment_details", None, False),
+        ("group_list", "group_list", "ParticipantFlowGroupList", False),
+        ("period_list", "period_list", "ParticipantFlowPeriodList", False),
+    )
+
+    def __init__(self, recruitment_details=None, pre_assignment_details=None, group_list=None, period_list=None):
+        self.recruitment_details = recruitment_details
+        self.pre_assignment_details = pre_assignment_details
+        self.group_list = group_list
+        self.period_list = period_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("recruitment_details"),
+            get("pre_assignment_details"),
+            _one(ParticipantFlowGroupList, get("group_list")),
+            _one(ParticipantFlowPeriodList, get("period_list")),
+        )
+
+
+class ParticipantFlowGroupList(SchemaStruct):
+    """
+    participant_flow_struct/group_list
+    """
+
+    __slots__ = ("group",)
+    FIELDS = (
+        ("group", "group", "GroupStruct", True),
+    )
+
+    def __init__(self, group=None):
+        self.group = [] if group is None else group
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(GroupStruct, get("group")),
+        )
+
+
+class ParticipantFlowPeriodList(SchemaStruct):
+    """
+    participant_flow_struct/period_list
+    """
+
+    __slots__ = ("period",)
+    FIELDS = (
+        ("period", "period", "PeriodStruct", True),
+    )
+
+    def __init__(self, period=None):
+        self.period = [] if period is None else period
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(PeriodStruct, get("period")),
+        )
+
+
+class MeasureCountStruct(SchemaStruct):
+    """
+    measure_count_struct
+    """
+
+    __slots__ = ("group_id", "value", "text")
+    FIELDS = (
+        ("group_id", "@group_id", None, False),
+        ("value", "@value", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, group_id=None, value=None, text=None):
+        self.group_id = group_id
+        self.value = value
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@group_id"),
+            get("@value"),
+            get("$"),
+        )
+
+
+class MeasureAnalyzedStruct(SchemaStruct):
+    """
+    measure_analyzed_struct
+    """
+
+    __slots__ = ("units", "scope", "count_list")
+    FIELDS = (
+        ("units", "units", None, False),
+        ("scope", "scope", None, False),
+        ("count_list", "count_list", "MeasureAnalyzedCountList", False),
+    )
+
+    def __init__(self, units=None, scope=None, count_list=None):
+        self.units = units
+        self.scope = scope
+        self.count_list = count_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("units"),
+            get("scope"),
+            _one(MeasureAnalyzedCountList, get("count_list")),
+        )
+
+
+class MeasureAnalyzedCountList(SchemaStruct):
+    """
+    measure_analyzed_struct/count_list
+    """
+
+    __slots__ = ("count",)
+    FIELDS = (
+        ("count", "count", "MeasureCountStruct", True),
+    )
+
+    def __init__(self, count=None):
+        self.count = [] if count is None else count
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureCountStruct, get("count")),
+        )
+
+
+class MeasurementStruct(SchemaStruct):
+    """
+    measurement_struct
+    """
+
+    __slots__ = ("group_id", "value", "spread", "lower_limit", "upper_limit", "text")
+    FIELDS = (
+        ("group_id", "@group_id", None, False),
+        ("value", "@value", None, False),
+        ("spread", "@spread", None, False),
+        ("lower_limit", "@lower_limit", None, False),
+        ("upper_limit", "@upper_limit", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, group_id=None, value=None, spread=None, lower_limit=None, upper_limit=None, text=None):
+        self.group_id = group_id
+        self.value = value
+        self.spread = spread
+        self.lower_limit = lower_limit
+        self.upper_limit = upper_limit
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@group_id"),
+            get("@value"),
+            get("@spread"),
+            get("@lower_limit"),
+            get("@upper_limit"),
+            get("$"),
+        )
+
+
+class MeasureCategoryStruct(SchemaStruct):
+    """
+    measure_category_struct
+    """
+
+    __slots__ = ("title", "measurement_list")
+    FIELDS = (
+        ("title", "title", None, False),
+        ("measurement_list", "measurement_list", "MeasureCategoryMeasurementList", False),
+    )
+
+    def __init__(self, title=None, measurement_list=None):
+        self.title = title
+        self.measurement_list = measurement_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            _one(MeasureCategoryMeasurementList, get("measurement_list")),
+        )
+
+
+class MeasureCategoryMeasurementList(SchemaStruct):
+    """
+    measure_category_struct/measurement_list
+    """
+
+    __slots__ = ("measurement",)
+    FIELDS = (
+        ("measurement", "measurement", "MeasurementStruct", True),
+    )
+
+    def __init__(self, measurement=None):
+        self.measurement = [] if measurement is None else measurement
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasurementStruct, get("measurement")),
+        )
+
+
+class MeasureClassStruct(SchemaStruct):
+    """
+    measure_class_struct
+    """
+
+    __slots__ = ("title", "analyzed_list", "category_list")
+    FIELDS = (
+        ("title", "title", None, False),
+        ("analyzed_list", "analyzed_list", "MeasureClassAnalyzedList", False),
+        ("category_list", "category_list", "MeasureClassCategoryList", False),
+    )
+
+    def __init__(self, title=None, analyzed_list=None, category_list=None):
+        self.title = title
+        self.analyzed_list = analyzed_list
+        self.category_list = category_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            _one(MeasureClassAnalyzedList, get("analyzed_list")),
+            _one(MeasureClassCategoryList, get("category_list")),
+        )
+
+
+class MeasureClassAnalyzedList(SchemaStruct):
+    """
+    measure_class_struct/analyzed_list
+    """
+
+    __slots__ = ("analyzed",)
+    FIELDS = (
+        ("analyzed", "analyzed", "MeasureAnalyzedStruct", True),
+    )
+
+    def __init__(self, analyzed=None):
+        self.analyzed = [] if analyzed is None else analyzed
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureAnalyzedStruct, get("analyzed")),
+        )
+
+
+class MeasureClassCategoryList(SchemaStruct):
+    """
+    measure_class_struct/category_list
+    """
+
+    __slots__ = ("category",)
+    FIELDS = (
+        ("category", "category", "MeasureCategoryStruct", True),
+    )
+
+    def __init__(self, category=None):
+        self.category = [] if category is None else category
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureCategoryStruct, get("category")),
+        )
+
+
+class MeasureStruct(SchemaStruct):
+    """
+    measure_struct
+    """
+
+    __slots__ = (
+        "title",
+        "description",
+        "population",
+        "units",
+        "param",
+        "dispersion",
+        "units_analyzed",
+        "analyzed_list",
+        "class_list",
+    )
+    FIELDS = (
+        ("title", "title", None, False),
+        ("description", "description", None, False),
+        ("population", "population", None, False),
+        ("units", "units", None, False),
+        ("param", "param", None, False),
+        ("dispersion", "dispersion", None, False),
+        ("units_analyzed", "units_analyzed", None, False),
+        ("analyzed_list", "analyzed_list", "MeasureAnalyzedList", False),
+        ("class_list", "class_list", "MeasureClassList", False),
+    )
+
+    def __init__(
+        self,
+        title=None,
+        description=None,
+        population=None,
+        units=None,
+        param=None,
+        dispersion=None,
+        units_analyzed=None,
+        analyzed_list=None,
+        class_list=None,
+    ):
+        self.title = title
+        self.description = description
+        self.population = population
+        self.units = units
+        self.param = param
+        self.dispersion = dispersion
+        self.units_analyzed = units_analyzed
+        self.analyzed_list = analyzed_list
+        self.class_list = class_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            get("description"),
+            get("population"),
+            get("units"),
+            get("param"),
+            get("dispersion"),
+            get("units_analyzed"),
+            _one(MeasureAnalyzedList, get("analyzed_list")),
+            _one(MeasureClassList, get("class_list")),
+        )
+
+
+class MeasureAnalyzedList(SchemaStruct):
+    """
+    measure_struct/analyzed_list
+    """
+
+    __slots__ = ("analyzed",)
+    FIELDS = (
+        ("analyzed", "analyzed", "MeasureAnalyzedStruct", True),
+    )
+
+    def __init__(self, analyzed=None):
+        self.analyzed = [] if analyzed is None else analyzed
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureAnalyzedStruct, get("analyzed")),
+        )
+
+
+class MeasureClassList(SchemaStruct):
+    """
+    measure_struct/class_list
+    """
+
+    __slots__ = ("class_",)
+    FIELDS = (
+        ("class_", "class", "MeasureClassStruct", True),
+    )
+
+    def __init__(self, class_=None):
+        self.class_ = [] if class_ is None else class_
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureClassStruct, get("class")),
+        )
+
+
+class BaselineStruct(SchemaStruct):
+    """
+    baseline_struct
+    """
+
+    __slots__ = ("population", "group_list", "analyzed_list", "measure_list")
+    FIELDS = (
+        ("population", "population", None, False),
+        ("group_list", "group_list", "BaselineGroupList", False),
+        ("analyzed_list", "analyzed_list", "BaselineAnalyzedList", False),
+        ("measure_list", "measure_list", "BaselineMeasureList", False),
+    )
+
+    def __init__(self, population=None, group_list=None, analyzed_list=None, measure_list=None):
+        self.population = population
+        self.group_list = group_list
+        self.analyzed_list = analyzed_list
+        self.measure_list = measure_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("population"),
+            _one(BaselineGroupList, get("group_list")),
+            _one(BaselineAnalyzedList, get("analyzed_list")),
+            _one(BaselineMeasureList, get("measure_list")),
+        )
+
+
+class BaselineGroupList(SchemaStruct):
+    """
+    baseline_struct/group_list
+    """
+
+    __slots__ = ("group",)
+    FIELDS = (
+        ("group", "group", "GroupStruct", True),
+    )
+
+    def __init__(self, group=None):
+        self.group = [] if group is None else group
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(GroupStruct, get("group")),
+        )
+
+
+class BaselineAnalyzedList(SchemaStruct):
+    """
+    baseline_struct/analyzed_list
+    """
+
+    __slots__ = ("analyzed",)
+    FIELDS = (
+        ("analyzed", "analyzed", "MeasureAnalyzedStruct", True),
+    )
+
+    def __init__(self, analyzed=None):
+        self.analyzed = [] if analyzed is None else analyzed
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureAnalyzedStruct, get("analyzed")),
+        )
+
+
+class BaselineMeasureList(SchemaStruct):
+    """
+    baseline_struct/measure_list
+    """
+
+    __slots__ = ("measure",)
+    FIELDS = (
+        ("measure", "measure", "MeasureStruct", True),
+    )
+
+    def __init__(self, measure=None):
+        self.measure = [] if measure is None else measure
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(MeasureStruct, get("measure")),
+        )
+
+
+class AnalysisStruct(SchemaStruct):
+    """
+    analysis_struct
+    """
+
+    __slots__ = (
+        "group_id_list",
+        "groups_desc",
+        "non_inferiority_type",
+        "non_inferiority_desc",
+        "p_value",
+        "p_value_desc",
+        "method",
+        "method_desc",
+        "param_type",
+        "param_value",
+        "dispersion_type",
+        "dispersion_value",
+        "ci_percent",
+        "ci_n_sides",
+        "ci_lower_limit",
+        "ci_upper_limit",
+        "ci_upper_limit_na_comment",
+        "estimate_desc",
+        "other_analysis_desc",
+    )
+    FIELDS = (
+        ("group_id_list", "group_id_list", "AnalysisGroupIdList", False),
+        ("groups_desc", "groups_desc", None, False),
+        ("non_inferiority_type", "non_inferiority_type", None, False),
+        ("non_inferiority_desc", "non_inferiority_desc", None, False),
+        ("p_value", "p_value", None, False),
+        ("p_value_desc", "p_value_desc", None, False),
+        ("method", "method", None, False),
+        ("method_desc", "method_desc", None, False),
+        ("param_type", "param_type", None, False),
+        ("param_value", "param_value", None, False),
+        ("dispersion_type", "dispersion_type", None, False),
+        ("dispersion_value", "dispersion_value", None, False),
+        ("ci_percent", "ci_percent", None, False),
+        ("ci_n_sides", "ci_n_sides", None, False),
+        ("ci_lower_limit", "ci_lower_limit", None, False),
+        ("ci_upper_limit", "ci_upper_limit", None, False),
+        ("ci_upper_limit_na_comment", "ci_upper_limit_na_comment", None, False),
+        ("estimate_desc", "estimate_desc", None, False),
+        ("other_analysis_desc", "other_analysis_desc", None, False),
+    )
+
+    def __init__(
+        self,
+        group_id_list=None,
+        groups_desc=None,
+        non_inferiority_type=None,
+        non_inferiority_desc=None,
+        p_value=None,
+        p_value_desc=None,
+        method=None,
+        method_desc=None,
+        param_type=None,
+        param_value=None,
+        dispersion_type=None,
+        dispersion_value=None,
+        ci_percent=None,
+        ci_n_sides=None,
+        ci_lower_limit=None,
+        ci_upper_limit=None,
+        ci_upper_limit_na_comment=None,
+        estimate_desc=None,
+        other_analysis_desc=None,
+    ):
+        self.group_id_list = group_id_list
+        self.groups_desc = groups_desc
+        self.non_inferiority_type = non_inferiority_type
+        self.non_inferiority_desc = non_inferiority_desc
+        self.p_value = p_value
+        self.p_value_desc = p_value_desc
+        self.method = method
+        self.method_desc = method_desc
+        self.param_type = param_type
+        self.param_value = param_value
+        self.dispersion_type = dispersion_type
+        self.dispersion_value = dispersion_value
+        self.ci_percent = ci_percent
+        self.ci_n_sides = ci_n_sides
+        self.ci_lower_limit = ci_lower_limit
+        self.ci_upper_limit = ci_upper_limit
+        self.ci_upper_limit_na_comment = ci_upper_limit_na_comment
+        self.estimate_desc = estimate_desc
+        self.other_analysis_desc = other_analysis_desc
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(AnalysisGroupIdList, get("group_id_list")),
+            get("groups_desc"),
+            get("non_inferiority_type"),
+            get("non_inferiority_desc"),
+            get("p_value"),
+            get("p_value_desc"),
+            get("method"),
+            get("method_desc"),
+            get("param_type"),
+            get("param_value"),
+            get("dispersion_type"),
+            get("dispersion_value"),
+            get("ci_percent"),
+            get("ci_n_sides"),
+            get("ci_lower_limit"),
+            get("ci_upper_limit"),
+            get("ci_upper_limit_na_comment"),
+            get("estimate_desc"),
+            get("other_analysis_desc"),
+        )
+
+
+class AnalysisGroupIdList(SchemaStruct):
+    """
+    analysis_struct/group_id_list
+    """
+
+    __slots__ = ("group_id",)
+    FIELDS = (
+        ("group_id", "group_id", None, True),
+    )
+
+    def __init__(self, group_id=None):
+        self.group_id = [] if group_id is None else group_id
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            list(get("group_id", ())),
+        )
+
+
+class ResultsOutcomeStruct(SchemaStruct):
+    """
+    results_outcome_struct
+    """
+
+    __slots__ = (
+        "type",
+        "title",
+        "description",
+        "time_frame",
+        "safety_issue",
+        "posting_date",
+        "population",
+        "group_list",
+        "measure",
+        "analysis_list",
+    )
+    FIELDS = (
+        ("type", "type", None, False),
+        ("title", "title", None, False),
+        ("description", "description", None, False),
+        ("time_frame", "time_frame", None, False),
+        ("safety_issue", "safety_issue", None, False),
+        ("posting_date", "posting_date", None, False),
+        ("population", "population", None, False),
+        ("group_list", "group_list", "ResultsOutcomeGroupList", False),
+        ("measure", "measure", "MeasureStruct", False),
+        ("analysis_list", "analysis_list", "ResultsOutcomeAnalysisList", False),
+    )
+
+    def __init__(
+        self,
+        type=None,
+        title=None,
+        description=None,
+        time_frame=None,
+        safety_issue=None,
+        posting_date=None,
+        population=None,
+        group_list=None,
+        measure=None,
+        analysis_list=None,
+    ):
+        self.type = type
+        self.title = title
+        self.description = description
+        self.time_frame = time_frame
+        self.safety_issue = safety_issue
+        self.posting_date = posting_date
+        self.population = population
+        self.group_list = group_list
+        self.measure = measure
+        self.analysis_list = analysis_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("type"),
+            get("title"),
+            get("description"),
+            get("time_frame"),
+            get("safety_issue"),
+            get("posting_date"),
+            get("population"),
+            _one(ResultsOutcomeGroupList, get("group_list")),
+            _one(MeasureStruct, get("measure")),
+            _one(ResultsOutcomeAnalysisList, get("analysis_list")),
+        )
+
+
+class ResultsOutcomeGroupList(SchemaStruct):
+    """
+    results_outcome_struct/group_list
+    """
+
+    __slots__ = ("group",)
+    FIELDS = (
+        ("group", "group", "GroupStruct", True),
+    )
+
+    def __init__(self, group=None):
+        self.group = [] if group is None else group
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(GroupStruct, get("group")),
+        )
+
+
+class ResultsOutcomeAnalysisList(SchemaStruct):
+    """
+    results_outcome_struct/analysis_list
+    """
+
+    __slots__ = ("analysis",)
+    FIELDS = (
+        ("analysis", "analysis", "AnalysisStruct", True),
+    )
+
+    def __init__(self, analysis=None):
+        self.analysis = [] if analysis is None else analysis
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(AnalysisStruct, get("analysis")),
+        )
+
+
+class VocabTermStruct(SchemaStruct):
+    """
+    vocab_term_struct
+    """
+
+    __slots__ = ("vocab", "text")
+    FIELDS = (
+        ("vocab", "@vocab", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, vocab=None, text=None):
+        self.vocab = vocab
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@vocab"),
+            get("$"),
+        )
+
+
+class EventCountsStruct(SchemaStruct):
+    """
+    event_counts_struct
+    """
+
+    __slots__ = ("group_id", "subjects_affected", "subjects_at_risk", "events", "text")
+    FIELDS = (
+        ("group_id", "@group_id", None, False),
+        ("subjects_affected", "@subjects_affected", None, False),
+        ("subjects_at_risk", "@subjects_at_risk", None, False),
+        ("events", "@events", None, False),
+        ("text", "$", None, False),
+    )
+    SIMPLE = True
+
+    def __init__(self, group_id=None, subjects_affected=None, subjects_at_risk=None, events=None, text=None):
+        self.group_id = group_id
+        self.subjects_affected = subjects_affected
+        self.subjects_at_risk = subjects_at_risk
+        self.events = events
+        self.text = text
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get if isinstance(data, dict) else {"$": data}.get
+        return cls(
+            get("@group_id"),
+            get("@subjects_affected"),
+            get("@subjects_at_risk"),
+            get("@events"),
+            get("$"),
+        )
+
+
+class EventStruct(SchemaStruct):
+    """
+    event_struct
+    """
+
+    __slots__ = ("sub_title", "assessment", "description", "counts")
+    FIELDS = (
+        ("sub_title", "sub_title", "VocabTermStruct", False),
+        ("assessment", "assessment", None, False),
+        ("description", "description", None, False),
+        ("counts", "counts", "EventCountsStruct", True),
+    )
+
+    def __init__(self, sub_title=None, assessment=None, description=None, counts=None):
+        self.sub_title = sub_title
+        self.assessment = assessment
+        self.description = description
+        self.counts = [] if counts is None else counts
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(VocabTermStruct, get("sub_title")),
+            get("assessment"),
+            get("description"),
+            _many(EventCountsStruct, get("counts")),
+        )
+
+
+class EventCategoryStruct(SchemaStruct):
+    """
+    event_category_struct
+    """
+
+    __slots__ = ("title", "event_list")
+    FIELDS = (
+        ("title", "title", None, False),
+        ("event_list", "event_list", "EventCategoryEventList", False),
+    )
+
+    def __init__(self, title=None, event_list=None):
+        self.title = title
+        self.event_list = event_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("title"),
+            _one(EventCategoryEventList, get("event_list")),
+        )
+
+
+class EventCategoryEventList(SchemaStruct):
+    """
+    event_category_struct/event_list
+    """
+
+    __slots__ = ("event",)
+    FIELDS = (
+        ("event", "event", "EventStruct", True),
+    )
+
+    def __init__(self, event=None):
+        self.event = [] if event is None else event
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(EventStruct, get("event")),
+        )
+
+
+class EventsStruct(SchemaStruct):
+    """
+    events_struct
+    """
+
+    __slots__ = ("frequency_threshold", "default_vocab", "default_assessment", "category_list")
+    FIELDS = (
+        ("frequency_threshold", "frequency_threshold", None, False),
+        ("default_vocab", "default_vocab", None, False),
+        ("default_assessment", "default_assessment", None, False),
+        ("category_list", "category_list", "EventsCategoryList", False),
+    )
+
+    def __init__(self, frequency_threshold=None, default_vocab=None, default_assessment=None, category_list=None):
+        self.frequency_threshold = frequency_threshold
+        self.default_vocab = default_vocab
+        self.default_assessment = default_assessment
+        self.category_list = category_list
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("frequency_threshold"),
+            get("default_vocab"),
+            get("default_assessment"),
+            _one(EventsCategoryList, get("category_list")),
+        )
+
+
+class EventsCategoryList(SchemaStruct):
+    """
+    events_struct/category_list
+    """
+
+    __slots__ = ("category",)
+    FIELDS = (
+        ("category", "category", "EventCategoryStruct", True),
+    )
+
+    def __init__(self, category=None):
+        self.category = [] if category is None else category
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(EventCategoryStruct, get("category")),
+        )
+
+
+class ReportedEventsStruct(SchemaStruct):
+    """
+    reported_events_struct
+    """
+
+    __slots__ = ("time_frame", "desc", "group_list", "serious_events", "other_events")
+    FIELDS = (
+        ("time_frame", "time_frame", None, False),
+        ("desc", "desc", None, False),
+        ("group_list", "group_list", "ReportedEventsGroupList", False),
+        ("serious_events", "serious_events", "EventsStruct", False),
+        ("other_events", "other_events", "EventsStruct", False),
+    )
+
+    def __init__(self, time_frame=None, desc=None, group_list=None, serious_events=None, other_events=None):
+        self.time_frame = time_frame
+        self.desc = desc
+        self.group_list = group_list
+        self.serious_events = serious_events
+        self.other_events = other_events
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("time_frame"),
+            get("desc"),
+            _one(ReportedEventsGroupList, get("group_list")),
+            _one(EventsStruct, get("serious_events")),
+            _one(EventsStruct, get("other_events")),
+        )
+
+
+class ReportedEventsGroupList(SchemaStruct):
+    """
+    reported_events_struct/group_list
+    """
+
+    __slots__ = ("group",)
+    FIELDS = (
+        ("group", "group", "GroupStruct", True),
+    )
+
+    def __init__(self, group=None):
+        self.group = [] if group is None else group
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(GroupStruct, get("group")),
+        )
+
+
+class CertainAgreementsStruct(SchemaStruct):
+    """
+    certain_agreements_struct
+    """
+
+    __slots__ = ("pi_employee", "restrictive_agreement")
+    FIELDS = (
+        ("pi_employee", "pi_employee", None, False),
+        ("restrictive_agreement", "restrictive_agreement", None, False),
+    )
+
+    def __init__(self, pi_employee=None, restrictive_agreement=None):
+        self.pi_employee = pi_employee
+        self.restrictive_agreement = restrictive_agreement
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("pi_employee"),
+            get("restrictive_agreement"),
+        )
+
+
+class PointOfContactStruct(SchemaStruct):
+    """
+    point_of_contact_struct
+    """
+
+    __slots__ = ("name_or_title", "organization", "phone", "email")
+    FIELDS = (
+        ("name_or_title", "name_or_title", None, False),
+        ("organization", "organization", None, False),
+        ("phone", "phone", None, False),
+        ("email", "email", None, False),
+    )
+
+    def __init__(self, name_or_title=None, organization=None, phone=None, email=None):
+        self.name_or_title = name_or_title
+        self.organization = organization
+        self.phone = phone
+        self.email = email
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("name_or_title"),
+            get("organization"),
+            get("phone"),
+            get("email"),
+        )
+
+
+class ClinicalResultsStruct(SchemaStruct):
+    """
+    clinical_results_struct
+    """
+
+    __slots__ = (
+        "participant_flow",
+        "baseline",
+        "outcome_list",
+        "reported_events",
+        "certain_agreements",
+        "limitations_and_caveats",
+        "point_of_contact",
+    )
+    FIELDS = (
+        ("participant_flow", "participant_flow", "ParticipantFlowStruct", False),
+        ("baseline", "baseline", "BaselineStruct", False),
+        ("outcome_list", "outcome_list", "ClinicalResultsOutcomeList", False),
+        ("reported_events", "reported_events", "ReportedEventsStruct", False),
+        ("certain_agreements", "certain_agreements", "CertainAgreementsStruct", False),
+        ("limitations_and_caveats", "limitations_and_caveats", None, False),
+        ("point_of_contact", "point_of_contact", "PointOfContactStruct", False),
+    )
+
+    def __init__(
+        self,
+        participant_flow=None,
+        baseline=None,
+        outcome_list=None,
+        reported_events=None,
+        certain_agreements=None,
+        limitations_and_caveats=None,
+        point_of_contact=None,
+    ):
+        self.participant_flow = participant_flow
+        self.baseline = baseline
+        self.outcome_list = outcome_list
+        self.reported_events = reported_events
+        self.certain_agreements = certain_agreements
+        self.limitations_and_caveats = limitations_and_caveats
+        self.point_of_contact = point_of_contact
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _one(ParticipantFlowStruct, get("participant_flow")),
+            _one(BaselineStruct, get("baseline")),
+            _one(ClinicalResultsOutcomeList, get("outcome_list")),
+            _one(ReportedEventsStruct, get("reported_events")),
+            _one(CertainAgreementsStruct, get("certain_agreements")),
+            get("limitations_and_caveats"),
+            _one(PointOfContactStruct, get("point_of_contact")),
+        )
+
+
+class ClinicalResultsOutcomeList(SchemaStruct):
+    """
+    clinical_results_struct/outcome_list
+    """
+
+    __slots__ = ("outcome",)
+    FIELDS = (
+        ("outcome", "outcome", "ResultsOutcomeStruct", True),
+    )
+
+    def __init__(self, outcome=None):
+        self.outcome = [] if outcome is None else outcome
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            _many(ResultsOutcomeStruct, get("outcome")),
+        )
+
+
+class ClinicalStudyRecord(SchemaStruct):
+    """
+    clinical_study
+    """
+
+    __slots__ = (
+        "rank",
+        "required_header",
+        "id_info",
+        "brief_title",
+        "acronym",
+        "official_title",
+        "sponsors",
+        "source",
+        "oversight_info",
+        "brief_summary",
+        "detailed_description",
+        "overall_status",
+        "last_known_status",
+        "why_stopped",
+        "start_date",
+        "completion_date",
+        "primary_completion_date",
+        "phase",
+        "study_type",
+        "has_expanded_access",
+        "expanded_access_info",
+        "study_design_info",
+        "target_duration",
+        "primary_outcome",
+        "secondary_outcome",
+        "other_outcome",
+        "number_of_arms",
+        "number_of_groups",
+        "enrollment",
+        "condition",
+        "arm_group",
+        "intervention",
+        "biospec_retention",
+        "biospec_descr",
+        "eligibility",
+        "overall_official",
+        "overall_contact",
+        "overall_contact_backup",
+        "location",
+        "location_countries",
+        "removed_countries",
+        "link",
+        "reference",
+        "results_reference",
+        "verification_date",
+        "study_first_submitted",
+        "study_first_submitted_qc",
+        "study_first_posted",
+        "results_first_submitted",
+        "results_first_submitted_qc",
+        "results_first_posted",
+        "disposition_first_submitted",
+        "disposition_first_submitted_qc",
+        "disposition_first_posted",
+        "last_update_submitted",
+        "last_update_submitted_qc",
+        "last_update_posted",
+        "responsible_party",
+        "keyword",
+        "condition_browse",
+        "intervention_browse",
+        "patient_data",
+        "study_docs",
+        "provided_document_section",
+        "pending_results",
+        "clinical_results",
+    )
+    FIELDS = (
+        ("rank", "@rank", None, False),
+        ("required_header", "required_header", "RequiredHeaderStruct", False),
+        ("id_info", "id_info", "IdInfoStruct", False),
+        ("brief_title", "brief_title", None, False),
+        ("acronym", "acronym", None, False),
+        ("official_title", "official_title", None, False),
+        ("sponsors", "sponsors", "SponsorsStruct", False),
+        ("source", "source", None, False),
+        ("oversight_info", "oversight_info", "OversightInfoStruct", False),
+        ("brief_summary", "brief_summary", "TextblockStruct", False),
+        ("detailed_description", "detailed_description", "TextblockStruct", False),
+        ("overall_status", "overall_status", None, False),
+        ("last_known_status", "last_known_status", None, False),
+        ("why_stopped", "why_stopped", None, False),
+        ("start_date", "start_date", "VariableDateStruct", False),
+        ("completion_date", "completion_date", "VariableDateStruct", False),
+        ("primary_completion_date", "primary_completion_date", "VariableDateStruct", False),
+        ("phase", "phase", None, False),
+        ("study_type", "study_type", None, False),
+        ("has_expanded_access", "has_expanded_access", None, False),
+        ("expanded_access_info", "expanded_access_info", "ExpandedAccessInfoStruct", False),
+        ("study_design_info", "study_design_info", "StudyDesignInfoStruct", False),
+        ("target_duration", "target_duration", None, False),
+        ("primary_outcome", "primary_outcome", "ProtocolOutcomeStruct", True),
+        ("secondary_outcome", "secondary_outcome", "ProtocolOutcomeStruct", True),
+        ("other_outcome", "other_outcome", "ProtocolOutcomeStruct", True),
+        ("number_of_arms", "number_of_arms", None, False),
+        ("number_of_groups", "number_of_groups", None, False),
+        ("enrollment", "enrollment", "EnrollmentStruct", False),
+        ("condition", "condition", None, True),
+        ("arm_group", "arm_group", "ArmGroupStruct", True),
+        ("intervention", "intervention", "InterventionStruct", True),
+        ("biospec_retention", "biospec_retention", None, False),
+        ("biospec_descr", "biospec_descr", "TextblockStruct", False),
+        ("eligibility", "eligibility", "EligibilityStruct", False),
+        ("overall_official", "overall_official", "InvestigatorStruct", True),
+        ("overall_contact", "overall_contact", "ContactStruct", False),
+        ("overall_contact_backup", "overall_contact_backup", "ContactStruct", False),
+        ("location", "location", "LocationStruct", True),
+        ("location_countries", "location_countries", "CountriesStruct", False),
+        ("removed_countries", "removed_countries", "CountriesStruct", False),
+        ("link", "link", "LinkStruct", True),
+        ("reference", "reference", "ReferenceStruct", True),
+        ("results_reference", "results_reference", "ReferenceStruct", True),
+        ("verification_date", "verification_date", None, False),
+        ("study_first_submitted", "study_first_submitted", None, False),
+        ("study_first_submitted_qc", "study_first_submitted_qc", None, False),
+        ("study_first_posted", "study_first_posted", "VariableDateStruct", False),
+        ("results_first_submitted", "results_first_submitted", None, False),
+        ("results_first_submitted_qc", "results_first_submitted_qc", None, False),
+        ("results_first_posted", "results_first_posted", "VariableDateStruct", False),
+        ("disposition_first_submitted", "disposition_first_submitted", None, False),
+        ("disposition_first_submitted_qc", "disposition_first_submitted_qc", None, False),
+        ("disposition_first_posted", "disposition_first_posted", "VariableDateStruct", False),
+        ("last_update_submitted", "last_update_submitted", None, False),
+        ("last_update_submitted_qc", "last_update_submitted_qc", None, False),
+        ("last_update_posted", "last_update_posted", "VariableDateStruct", False),
+        ("responsible_party", "responsible_party", "ResponsiblePartyStruct", False),
+        ("keyword", "keyword", None, True),
+        ("condition_browse", "condition_browse", "BrowseStruct", False),
+        ("intervention_browse", "intervention_browse", "BrowseStruct", False),
+        ("patient_data", "patient_data", "PatientDataStruct", False),
+        ("study_docs", "study_docs", "StudyDocsStruct", False),
+        ("provided_document_section", "provided_document_section", "ProvidedDocumentSectionStruct", False),
+        ("pending_results", "pending_results", "PendingResultsStruct", False),
+        ("clinical_results", "clinical_results", "ClinicalResultsStruct", False),
+    )
+
+    def __init__(
+        self,
+        rank=None,
+        required_header=None,
+        id_info=None,
+        brief_title=None,
+        acronym=None,
+        official_title=None,
+        sponsors=None,
+        source=None,
+        oversight_info=None,
+        brief_summary=None,
+        detailed_description=None,
+        overall_status=None,
+        last_known_status=None,
+        why_stopped=None,
+        start_date=None,
+        completion_date=None,
+        primary_completion_date=None,
+        phase=None,
+        study_type=None,
+        has_expanded_access=None,
+        expanded_access_info=None,
+        study_design_info=None,
+        target_duration=None,
+        primary_outcome=None,
+        secondary_outcome=None,
+        other_outcome=None,
+        number_of_arms=None,
+        number_of_groups=None,
+        enrollment=None,
+        condition=None,
+        arm_group=None,
+        intervention=None,
+        biospec_retention=None,
+        biospec_descr=None,
+        eligibility=None,
+        overall_official=None,
+        overall_contact=None,
+        overall_contact_backup=None,
+        location=None,
+        location_countries=None,
+        removed_countries=None,
+        link=None,
+        reference=None,
+        results_reference=None,
+        verification_date=None,
+        study_first_submitted=None,
+        study_first_submitted_qc=None,
+        study_first_posted=None,
+        results_first_submitted=None,
+        results_first_submitted_qc=None,
+        results_first_posted=None,
+        disposition_first_submitted=None,
+        disposition_first_submitted_qc=None,
+        disposition_first_posted=None,
+        last_update_submitted=None,
+        last_update_submitted_qc=None,
+        last_update_posted=None,
+        responsible_party=None,
+        keyword=None,
+        condition_browse=None,
+        intervention_browse=None,
+        patient_data=None,
+        study_docs=None,
+        provided_document_section=None,
+        pending_results=None,
+        clinical_results=None,
+    ):
+        self.rank = rank
+        self.required_header = required_header
+        self.id_info = id_info
+        self.brief_title = brief_title
+        self.acronym = acronym
+        self.official_title = official_title
+        self.sponsors = sponsors
+        self.source = source
+        self.oversight_info = oversight_info
+        self.brief_summary = brief_summary
+        self.detailed_description = detailed_description
+        self.overall_status = overall_status
+        self.last_known_status = last_known_status
+        self.why_stopped = why_stopped
+        self.start_date = start_date
+        self.completion_date = completion_date
+        self.primary_completion_date = primary_completion_date
+        self.phase = phase
+        self.study_type = study_type
+        self.has_expanded_access = has_expanded_access
+        self.expanded_access_info = expanded_access_info
+        self.study_design_info = study_design_info
+        self.target_duration = target_duration
+        self.primary_outcome = [] if primary_outcome is None else primary_outcome
+        self.secondary_outcome = [] if secondary_outcome is None else secondary_outcome
+        self.other_outcome = [] if other_outcome is None else other_outcome
+        self.number_of_arms = number_of_arms
+        self.number_of_groups = number_of_groups
+        self.enrollment = enrollment
+        self.condition = [] if condition is None else condition
+        self.arm_group = [] if arm_group is None else arm_group
+        self.intervention = [] if intervention is None else intervention
+        self.biospec_retention = biospec_retention
+        self.biospec_descr = biospec_descr
+        self.eligibility = eligibility
+        self.overall_official = [] if overall_official is None else overall_official
+        self.overall_contact = overall_contact
+        self.overall_contact_backup = overall_contact_backup
+        self.location = [] if location is None else location
+        self.location_countries = location_countries
+        self.removed_countries = removed_countries
+        self.link = [] if link is None else link
+        self.reference = [] if reference is None else reference
+        self.results_reference = [] if results_reference is None else results_reference
+        self.verification_date = verification_date
+        self.study_first_submitted = study_first_submitted
+        self.study_first_submitted_qc = study_first_submitted_qc
+        self.study_first_posted = study_first_posted
+        self.results_first_submitted = results_first_submitted
+        self.results_first_submitted_qc = results_first_submitted_qc
+        self.results_first_posted = results_first_posted
+        self.disposition_first_submitted = disposition_first_submitted
+        self.disposition_first_submitted_qc = disposition_first_submitted_qc
+        self.disposition_first_posted = disposition_first_posted
+        self.last_update_submitted = last_update_submitted
+        self.last_update_submitted_qc = last_update_submitted_qc
+        self.last_update_posted = last_update_posted
+        self.responsible_party = responsible_party
+        self.keyword = [] if keyword is None else keyword
+        self.condition_browse = condition_browse
+        self.intervention_browse = intervention_browse
+        self.patient_data = patient_data
+        self.study_docs = study_docs
+        self.provided_document_section = provided_document_section
+        self.pending_results = pending_results
+        self.clinical_results = clinical_results
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return cls(
+            get("@rank"),
+            _one(RequiredHeaderStruct, get("required_header")),
+            _one(IdInfoStruct, get("id_info")),
+            get("brief_title"),
+            get("acronym"),
+            get("official_title"),
+            _one(SponsorsStruct, get("sponsors")),
+            get("source"),
+            _one(OversightInfoStruct, get("oversight_info")),
+            _one(TextblockStruct, get("brief_summary")),
+            _one(TextblockStruct, get("detailed_description")),
+            get("overall_status"),
+            get("last_known_status"),
+            get("why_stopped"),
+            _one(VariableDateStruct, get("start_date")),
+            _one(VariableDateStruct, get("completion_date")),
+            _one(VariableDateStruct, get("primary_completion_date")),
+            get("phase"),
+            get("study_type"),
+            get("has_expanded_access"),
+            _one(ExpandedAccessInfoStruct, get("expanded_access_info")),
+            _one(StudyDesignInfoStruct, get("study_design_info")),
+            get("target_duration"),
+            _many(ProtocolOutcomeStruct, get("primary_outcome")),
+            _many(ProtocolOutcomeStruct, get("secondary_outcome")),
+            _many(ProtocolOutcomeStruct, get("other_outcome")),
+            get("number_of_arms"),
+            get("number_of_groups"),
+            _one(EnrollmentStruct, get("enrollment")),
+            list(get("condition", ())),
+            _many(ArmGroupStruct, get("arm_group")),
+            _many(InterventionStruct, get("intervention")),
+            get("biospec_retention"),
+            _one(TextblockStruct, get("biospec_descr")),
+            _one(EligibilityStruct, get("eligibility")),
+            _many(InvestigatorStruct, get("overall_official")),
+            _one(ContactStruct, get("overall_contact")),
+            _one(ContactStruct, get("overall_contact_backup")),
+            _many(LocationStruct, get("location")),
+            _one(CountriesStruct, get("location_countries")),
+            _one(CountriesStruct, get("removed_countries")),
+            _many(LinkStruct, get("link")),
+            _many(ReferenceStruct, get("reference")),
+            _many(ReferenceStruct, get("results_reference")),
+            get("verification_date"),
+            get("study_first_submitted"),
+            get("study_first_submitted_qc"),
+            _one(VariableDateStruct, get("study_first_posted")),
+            get("results_first_submitted"),
+            get("results_first_submitted_qc"),
+            _one(VariableDateStruct, get("results_first_posted")),
+            get("disposition_first_submitted"),
+            get("disposition_first_submitted_qc"),
+            _one(VariableDateStruct, get("disposition_first_posted")),
+            get("last_update_submitted"),
+            get("last_update_submitted_qc"),
+            _one(VariableDateStruct, get("last_update_posted")),
+            _one(ResponsiblePartyStruct, get("responsible_party")),
+            list(get("keyword", ())),
+            _one(BrowseStruct, get("condition_browse")),
+            _one(BrowseStruct, get("intervention_browse")),
+            _one(PatientDataStruct, get("patient_data")),
+            _one(StudyDocsStruct, get("study_docs")),
+            _one(ProvidedDocumentSectionStruct, get("provided_document_section")),
+            _one(PendingResultsStruct, get("pending_results")),
+            _one(ClinicalResultsStruct, get("clinical_results")),
+        )
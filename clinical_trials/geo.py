@@ -0,0 +1,538 @@
+"""
+Geospatial index over the study locations, with an offline gazetteer for geocoding addresses
+"""
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# ClinicalTrials.gov country names to ISO 3166 codes (as used by the GeoNames dumps)
+COUNTRY_CODES = {
+    "Argentina": "AR",
+    "Australia": "AU",
+    "Austria": "AT",
+    "Belarus": "BY",
+    "Belgium": "BE",
+    "Brazil": "BR",
+    "Bulgaria": "BG",
+    "Canada": "CA",
+    "Chile": "CL",
+    "China": "CN",
+    "Colombia": "CO",
+    "Croatia": "HR",
+    "Czech Republic": "CZ",
+    "Czechia": "CZ",
+    "Denmark": "DK",
+    "Egypt": "EG",
+    "Estonia": "EE",
+    "Finland": "FI",
+    "France": "FR",
+    "Georgia": "GE",
+    "Germany": "DE",
+    "Greece": "GR",
+    "Hong Kong": "HK",
+    "Hungary": "HU",
+    "India": "IN",
+    "Ireland": "IE",
+    "Israel": "IL",
+    "Italy": "IT",
+    "Japan": "JP",
+    "Korea, Republic of": "KR",
+    "Latvia": "LV",
+    "Lithuania": "LT",
+    "Malaysia": "MY",
+    "Mexico": "MX",
+    "Netherlands": "NL",
+    "New Zealand": "NZ",
+    "Norway": "NO",
+    "Peru": "PE",
+    "Philippines": "PH",
+    "Poland": "PL",
+    "Portugal": "PT",
+    "Puerto Rico": "PR",
+    "Romania": "RO",
+    "Russian Federation": "RU",
+    "Serbia": "RS",
+    "Singapore": "SG",
+    "Slovakia": "SK",
+    "Slovenia": "SI",
+    "South Africa": "ZA",
+    "Spain": "ES",
+    "Sweden": "SE",
+    "Switzerland": "CH",
+    "Taiwan": "TW",
+    "Thailand": "TH",
+    "Turkey": "TR",
+    "Ukraine": "UA",
+    "United Kingdom": "GB",
+    "United States": "US",
+    "Vietnam": "VN",
+}
+
+# zero padded postal codes that lose their leading zeros in some records
+POSTAL_CODE_LENGTHS = dict(US=5, DE=5, FR=5, IT=5, ES=5)
+
+PLACE_SUFFIX = re.compile(r"\s+cedex(?:\s+\d+)?$|\s+\d+$")
+PLACE_PUNCTUATION = re.compile(r"[^a-z0-9]+")
+
+
+def country_code(country):
+    """
+    Get the ISO 3166 code for a country
+    :param str country: country name (or code)
+    :rtype: str
+    """
+    if country is None:
+        return None
+    country = country.strip()
+    if len(country) == 2 and country.isupper():
+        return country
+    return COUNTRY_CODES.get(country)
+
+
+def normalize_place(name):
+    """
+    Normalize a place name for lookup, eg 'Paris Cedex 10' -> 'paris', 'Göttingen' -> 'gottingen'
+    :param str name: place name
+    :rtype: str
+    """
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower().strip()
+    name = PLACE_SUFFIX.sub("", name)
+    return PLACE_PUNCTUATION.sub(" ", name).strip()
+
+
+def postal_code_keys(code, postal_code):
+    """
+    The candidate lookup keys for a postal code
+    :param str code: ISO 3166 country code
+    :param str postal_code: the postal code
+    :rtype: list(str)
+    """
+    if not postal_code:
+        return []
+    postal_code = postal_code.strip().upper()
+    keys = [postal_code]
+    if code == "US":
+        keys = [postal_code.split("-")[0]]
+    elif code == "CA":
+        keys.append(postal_code.replace(" ", "").replace("-", "")[:3])
+    if code in POSTAL_CODE_LENGTHS and keys[0].isdigit():
+        keys.append(keys[0].zfill(POSTAL_CODE_LENGTHS[code]))
+    return keys
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Great circle distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Gazetteer(object):
+    """
+    Offline place and postal code lookup; loads the GeoNames postal code dump format
+    (tab separated: country code, postal code, place name, admin name1, admin code1, admin name2,
+    admin code2, admin name3, admin code3, latitude, longitude, accuracy)
+    """
+
+    def __init__(self):
+        self._postal_codes = {}
+        self._places = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Load a gazetteer file
+        :param str filename: path to the file
+        :rtype: Gazetteer
+        """
+        gazetteer = cls()
+        with open(filename, encoding="utf-8") as fh:
+            for line in fh:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) < 11:
+                    continue
+                try:
+                    latitude, longitude = float(fields[9]), float(fields[10])
+                except ValueError:
+                    continue
+                gazetteer.add(fields[0], fields[1], fields[2], fields[3], latitude, longitude)
+        return gazetteer
+
+    def add(self, code, postal_code, place_name, admin_name, latitude, longitude):
+        """
+        Add an entry; the first entry for a postal code or place wins
+        """
+        point = (latitude, longitude)
+        self._count += 1
+        if postal_code:
+            for key in postal_code_keys(code, postal_code):
+                self._postal_codes.setdefault((code, key), point)
+        place = normalize_place(place_name)
+        if place:
+            self._places.setdefault((code, place, normalize_place(admin_name)), point)
+            self._places.setdefault((code, place, None), point)
+
+    def lookup_postal_code(self, country, postal_code):
+        """
+        Get the coordinates for a postal code
+        :param str country: country name or code
+        :param str postal_code: the postal code
+        :rtype: tuple(float, float)
+        """
+        code = country_code(country)
+        for key in postal_code_keys(code, postal_code):
+            if (code, key) in self._postal_codes:
+                return self._postal_codes[(code, key)]
+        return None
+
+    def lookup_place(self, country, city, state=None):
+        """
+        Get the coordinates for a place
+        :param str country: country name or code
+        :param str city: the city
+        :param str state: the state/region, if known
+        :rtype: tuple(float, float)
+        """
+        code = country_code(country)
+        place = normalize_place(city)
+        if state:
+            point = self._places.get((code, place, normalize_place(state)))
+            if point is not None:
+                return point
+        return self._places.get((code, place, None))
+
+    def geocode(self, address):
+        """
+        Get the coordinates for an address, by postal code and then by place
+        :param clinical_trials.structs.Address address: the address
+        :rtype: tuple(float, float)
+        """
+        if address is None:
+            return None
+        point = self.lookup_postal_code(address.country, address.zip)
+        if point is None:
+            point = self.lookup_place(address.country, address.city, address.state)
+        return point
+
+
+def get_local_gazetteer():
+    """
+    Get the gazetteer from a local store
+    :rtype: Gazetteer
+    """
+    if os.path.exists(os.path.join(sys.prefix, 'config', 'gazetteer.txt')):
+        gazetteer = Gazetteer.from_file(os.path.join(sys.prefix, 'config', 'gazetteer.txt'))
+    elif os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'doc', 'gazetteer', 'gazetteer.txt')):
+        gazetteer = Gazetteer.from_file(os.path.join(os.path.dirname(__file__), '..', 'doc', 'gazetteer',
+                                                     'gazetteer.txt'))
+    else:
+        raise ValueError("Unable to locate gazetteer document")
+    return gazetteer
+
+
+class LocationHit(object):
+    """
+    A location matched by a spatial query
+    """
+
+    __slots__ = ("nct_id", "location", "status", "latitude", "longitude", "distance")
+
+    def __init__(self, nct_id, location, status, latitude, longitude, distance=None):
+        self.nct_id = nct_id
+        # offset of the location in ClinicalStudy.locations
+        self.location = location
+        self.status = status
+        self.latitude = latitude
+        self.longitude = longitude
+        self.distance = distance
+
+    def __repr__(self):
+        return "LocationHit({!r}, {!r}, {!r}, {!r})".format(self.nct_id, self.location, self.status, self.distance)
+
+
+class LocationIndex(object):
+    """
+    Grid index over the geocoded study locations.  Points are sorted by grid cell, so a query
+    is a bisect per grid row followed by an exact distance check.  The index is saved as flat
+    arrays and loaded through mmap, so it can be shared between processes without a load step
+    """
+
+    MAGIC = b"CTGEOIDX"
+    HEADER = struct.Struct("<8sdQQQ")
+    HEADER_SIZE = 64
+
+    def __init__(self, cells, latitudes, longitudes, studies, locations, statuses, nct_ids, status_names,
+                 cell_size=1.0, mapped=None):
+        self._cells = cells
+        self._latitudes = latitudes
+        self._longitudes = longitudes
+        self._studies = studies
+        self._locations = locations
+        self._statuses = statuses
+        self.nct_ids = nct_ids
+        self.status_names = status_names
+        self.cell_size = cell_size
+        self._rows = int(math.ceil(180.0 / cell_size))
+        self._columns = int(math.ceil(360.0 / cell_size))
+        self._mapped = mapped
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._mapped is not None:
+            fh, buffer, views = self._mapped
+            for view in views:
+                view.release()
+            buffer.close()
+            fh.close()
+            self._mapped = None
+
+    def _row(self, latitude):
+        return min(max(int((latitude + 90.0) // self.cell_size), 0), self._rows - 1)
+
+    def _column(self, longitude):
+        return int(((longitude + 180.0) % 360.0) // self.cell_size) % self._columns
+
+    def _cell(self, latitude, longitude):
+        return self._row(latitude) * self._columns + self._column(longitude)
+
+    @classmethod
+    def build(cls, studies, gazetteer=None, cell_size=1.0):
+        """
+        Bulk build the index from the study locations
+        :param iterable studies: the studies (ClinicalStudy)
+        :param Gazetteer gazetteer: used to geocode the addresses (default, the bundled gazetteer)
+        :param float cell_size: grid cell size in degrees
+        :rtype: LocationIndex
+        """
+        builder = LocationIndexBuilder(gazetteer, cell_size)
+        for study in studies:
+            builder.add_study(study)
+        return builder.build()
+
+    def save(self, filename):
+        """
+        Write the index
+        :param str filename: path to the index file
+        """
+        meta = json.dumps(dict(nct_ids=self.nct_ids, statuses=self.status_names,
+                               byteorder=sys.byteorder)).encode("utf-8")
+        columns = (self._cells, self._latitudes, self._longitudes, self._studies, self._locations, self._statuses)
+        size = sum(len(column) * column.itemsize for column in columns)
+        with open(filename, "wb") as fh:
+            header = self.HEADER.pack(self.MAGIC, self.cell_size, len(self), self.HEADER_SIZE + size, len(meta))
+            fh.write(header.ljust(self.HEADER_SIZE, b"\0"))
+            for column in columns:
+                fh.write(memoryview(column).cast("B"))
+            fh.write(meta)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Memory map a saved index
+        :param str filename: path to the index file
+        :rtype: LocationIndex
+        """
+        fh = open(filename, "rb")
+        buffer = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, cell_size, count, meta_offset, meta_length = cls.HEADER.unpack_from(buffer, 0)
+        if magic != cls.MAGIC:
+            buffer.close()
+            fh.close()
+            raise ValueError("{} is not a location index".format(filename))
+        meta = json.loads(buffer[meta_offset:meta_offset + meta_length].decode("utf-8"))
+        if meta["byteorder"] != sys.byteorder:
+            buffer.close()
+            fh.close()
+            raise ValueError("{} was written on a {} endian machine".format(filename, meta["byteorder"]))
+        view = memoryview(buffer)
+        views = [view]
+        offset = cls.HEADER_SIZE
+        columns = []
+        for typecode, itemsize in (("q", 8), ("d", 8), ("d", 8), ("i", 4), ("i", 4), ("b", 1)):
+            column = view[offset:offset + count * itemsize].cast(typecode)
+            views.insert(0, column)
+            columns.append(column)
+            offset += count * itemsize
+        return cls(*columns, nct_ids=meta["nct_ids"], status_names=meta["statuses"], cell_size=cell_size,
+                   mapped=(fh, buffer, views))
+
+    def _status_filter(self, statuses):
+        if statuses is None:
+            return None
+        if isinstance(statuses, str):
+            statuses = [statuses]
+        return set(code for code, name in enumerate(self.status_names) if name in statuses)
+
+    def _column_ranges(self, min_longitude, max_longitude):
+        if max_longitude - min_longitude >= 360.0:
+            return [(0, self._columns - 1)]
+        first, last = self._column(min_longitude), self._column(max_longitude)
+        if first <= last:
+            return [(first, last)]
+        # crosses the antimeridian
+        return [(first, self._columns - 1), (0, last)]
+
+    def _candidates(self, min_latitude, min_longitude, max_latitude, max_longitude, statuses):
+        codes = self._status_filter(statuses)
+        column_ranges = self._column_ranges(min_longitude, max_longitude)
+        for row in range(self._row(min_latitude), self._row(max_latitude) + 1):
+            for first, last in column_ranges:
+                start = bisect_left(self._cells, row * self._columns + first)
+                stop = bisect_right(self._cells, row * self._columns + last)
+                for position in range(start, stop):
+                    if codes is None or self._statuses[position] in codes:
+                        yield position
+
+    def _hit(self, position, distance=None):
+        return LocationHit(self.nct_ids[self._studies[position]],
+                           self._locations[position],
+                           self.status_names[self._statuses[position]],
+                           self._latitudes[position],
+                           self._longitudes[position],
+                           distance)
+
+    def within_bbox(self, min_latitude, min_longitude, max_latitude, max_longitude, statuses=None):
+        """
+        Get the locations in a bounding box
+        :param float min_latitude: southern edge
+        :param float min_longitude: western edge (may be greater than max_longitude across the antimeridian)
+        :param float max_latitude: northern edge
+        :param float max_longitude: eastern edge
+        :param list statuses: only include locations with these recruitment statuses
+        :rtype: list(LocationHit)
+        """
+        crosses = min_longitude > max_longitude
+        hits = []
+        for position in self._candidates(min_latitude, min_longitude, max_latitude, max_longitude, statuses):
+            latitude, longitude = self._latitudes[position], self._longitudes[position]
+            if not min_latitude <= latitude <= max_latitude:
+                continue
+            if crosses:
+                if not (longitude >= min_longitude or longitude <= max_longitude):
+                    continue
+            elif not min_longitude <= longitude <= max_longitude:
+                continue
+            hits.append(self._hit(position))
+        return hits
+
+    def within_radius(self, latitude, longitude, radius_km, statuses=None):
+        """
+        Get the locations within a distance of a point, nearest first
+        :param float latitude: latitude of the point
+        :param float longitude: longitude of the point
+        :param float radius_km: the distance in kilometres
+        :param list statuses: only include locations with these recruitment statuses
+        :rtype: list(LocationHit)
+        """
+        delta_latitude = radius_km / KM_PER_DEGREE
+        min_latitude, max_latitude = max(latitude - delta_latitude, -90.0), min(latitude + delta_latitude, 90.0)
+        widest = max(abs(min_latitude), abs(max_latitude))
+        if widest >= 89.0:
+            delta_longitude = 360.0
+        else:
+            delta_longitude = min(radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest))), 360.0)
+        hits = []
+        for position in self._candidates(min_latitude, longitude - delta_longitude,
+                                         max_latitude, longitude + delta_longitude, statuses):
+            distance = haversine(latitude, longitude, self._latitudes[position], self._longitudes[position])
+            if distance <= radius_km:
+                hits.append(self._hit(position, distance))
+        hits.sort(key=lambda hit: hit.distance)
+        return hits
+
+    def studies_within_radius(self, latitude, longitude, radius_km, statuses=None):
+        """
+        Get the studies with a location within a distance of a point
+        :rtype: list(tuple(str, float))
+        :return: (NCT ID, distance to the nearest location) pairs, nearest first
+        """
+        studies = []
+        seen = set()
+        for hit in self.within_radius(latitude, longitude, radius_km, statuses):
+            if hit.nct_id not in seen:
+                seen.add(hit.nct_id)
+                studies.append((hit.nct_id, hit.distance))
+        return studies
+
+
+class LocationIndexBuilder(object):
+    """
+    Collects the geocoded points of the study locations as the studies are added, so a stream of
+    studies can be indexed without holding them until the index is built
+    """
+
+    def __init__(self, gazetteer=None, cell_size=1.0):
+        """
+        :param Gazetteer gazetteer: used to geocode the addresses (default, the bundled gazetteer)
+        :param float cell_size: grid cell size in degrees
+        """
+        self.gazetteer = gazetteer if gazetteer is not None else get_local_gazetteer()
+        self._index = LocationIndex(None, None, None, None, None, None, [], [], cell_size)
+        self._status_codes = {}
+        self._points = []
+
+    def add_study(self, study):
+        """
+        Add the locations of a study
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        index = self._index
+        ordinal = len(index.nct_ids)
+        index.nct_ids.append(study.nct_id)
+        for offset, location in enumerate(study.locations or []):
+            if location.facility is None:
+                continue
+            point = self.gazetteer.geocode(location.facility.address)
+            if point is None:
+                continue
+            status = location.status or ""
+            if status not in self._status_codes:
+                self._status_codes[status] = len(index.status_names)
+                index.status_names.append(status)
+            self._points.append((index._cell(*point), point[0], point[1], ordinal, offset,
+                                 self._status_codes[status]))
+
+    def build(self):
+        """
+        Sort the points collected into the index
+        :rtype: LocationIndex
+        """
+        index, points = self._index, self._points
+        points.sort()
+        index._cells = array("q", (x[0] for x in points))
+        index._latitudes = array("d", (x[1] for x in points))
+        index._longitudes = array("d", (x[2] for x in points))
+        index._studies = array("i", (x[3] for x in points))
+        index._locations = array("i", (x[4] for x in points))
+        index._statuses = array("b", (x[5] for x in points))
+        self._points = []
+        return index
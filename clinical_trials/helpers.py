@@ -1,5 +1,12 @@
+import re
+
 from six import string_types
 
+# a line break along with the indentation (and any blank lines) that follow it
+LINE_BREAK = re.compile(r"\n[ \t\r\n]*")
+# as above, also consuming any trailing whitespace before the break
+PADDED_LINE_BREAK = re.compile(r"[ \t\r]*\n\s*")
+
 
 def process_eligibility(content):
     """
@@ -12,29 +19,57 @@ def process_eligibility(content):
     cleaned = [x.strip() for x in lines]
     stack = []
     contents = dict(inclusion=[], exclusion=[])
-    gather = None
+    # criteria without section headers are treated as inclusion criteria
+    gather = "inclusion"
     for line in cleaned:
-        if "Inclusion Criteria" in line:
-            gather = "inclusion"
-            continue
-        elif "Exclusion Criteria" in line:
-            gather = "exclusion"
-        elif line == "":
+        if "Inclusion Criteria" in line or "Exclusion Criteria" in line or line == "":
+            # a criterion ends at a blank line, a section header or the end of the block
             if stack:
                 contents[gather].append(" ".join(stack))
                 stack = []
+            if "Inclusion Criteria" in line:
+                gather = "inclusion"
+            elif "Exclusion Criteria" in line:
+                gather = "exclusion"
         else:
             stack.append(line)
+    if stack:
+        contents[gather].append(" ".join(stack))
     return contents
 
 
+def _paragraph_break(match):
+    return "\n\n" if match.group(0).count("\n") > 1 else " "
+
+
+def normalize_textblock(textblock, paragraphs=False):
+    """
+    Collapses the line breaks and indentation in a text block
+    :param str textblock: content of the block
+    :param bool paragraphs: keep the paragraph breaks (blank lines) as a double newline
+    :rtype: str
+    :return:
+    """
+    if not textblock:
+        return ""
+    if paragraphs:
+        # the padded pattern backtracks on every run of spaces, only use it if needed
+        if " \n" in textblock or "\t\n" in textblock or "\r" in textblock:
+            pattern = PADDED_LINE_BREAK
+        else:
+            pattern = LINE_BREAK
+        return pattern.sub(_paragraph_break, textblock).strip()
+    # stripping the lines in C (map/str.strip) outpaces a regex pass on CPython
+    return " ".join([line for line in map(str.strip, textblock.split("\n")) if line])
+
+
 def process_textblock(textblock):
     """
     Deblocks a a text block
     :param str textblock: content of the block
     :return:
     """
-    return (" ".join(x.strip() for x in textblock.split("\n") if x)).strip()
+    return normalize_textblock(textblock)
 
 
 def yes_no_enum(content):
@@ -49,3 +84,35 @@ def yes_no_enum(content):
         return False
     else:
         raise ValueError("Unable to process value of type {0!s}".format(type(content)))
+
+
+AGE_UNITS = {
+    "year": 1.0,
+    "month": 1.0 / 12,
+    "week": 7.0 / 365.25,
+    "day": 1.0 / 365.25,
+    "hour": 1.0 / (365.25 * 24),
+    "minute": 1.0 / (365.25 * 24 * 60),
+}
+
+
+def parse_age(content):
+    """
+    Maps an age_pattern (eg '18 Years', '6 Months', 'N/A') to a number of years
+    :param str content: content of element
+    :rtype: float
+    :return: age in years, or None if not specified
+    """
+    if not content:
+        return None
+    parts = content.strip().split()
+    if len(parts) != 2:
+        return None
+    value, unit = parts
+    unit = unit.lower().rstrip("s")
+    if unit not in AGE_UNITS:
+        return None
+    try:
+        return float(value) * AGE_UNITS[unit]
+    except ValueError:
+        return None
@@ -0,0 +1,78 @@
+"""
+Interning of the repeated values in decoded records; the enumerated values and the place names
+are shared between all the records decoded with the same table
+"""
+from xmlschema.validators import XsdElement
+
+# free text elements that repeat heavily across a corpus
+PLACE_ELEMENTS = ("country", "city", "state")
+
+
+def enum_elements(schema):
+    """
+    Get the names of the elements with an enumerated (*_enum) type
+    :param xmlschema.XMLSchema schema: the schema
+    :rtype: set(str)
+    """
+    names = set()
+    for component in schema.iter_components():
+        if isinstance(component, XsdElement) and component.type.name:
+            if component.type.local_name.endswith("_enum"):
+                names.add(component.local_name)
+    return names
+
+
+class InternTable(object):
+    """
+    Shared table of interned values; pass the same table when decoding the records in a corpus
+    """
+
+    def __init__(self, schema=None, elements=None):
+        """
+        :param xmlschema.XMLSchema schema: the schema, used to find the enumerated elements
+        :param iterable elements: the element names to intern (default, the enumerated elements and places)
+        """
+        if elements is None:
+            elements = set(PLACE_ELEMENTS)
+            if schema is not None:
+                elements.update(enum_elements(schema))
+        self.elements = frozenset(elements)
+        self._table = {}
+        self.lookups = 0
+
+    def __len__(self):
+        return len(self._table)
+
+    def __contains__(self, value):
+        return value in self._table
+
+    def intern(self, value):
+        """
+        Get the shared copy of a value
+        :param str value: the value
+        :rtype: str
+        """
+        self.lookups += 1
+        return self._table.setdefault(value, value)
+
+    def intern_record(self, data):
+        """
+        Replace the values of the interned elements in a decoded record, in place
+        :param dict data: the decoded record (or a section of it)
+        :rtype: dict
+        """
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key in self.elements:
+                    if isinstance(value, str):
+                        data[key] = self.intern(value)
+                    elif isinstance(value, list):
+                        data[key] = [self.intern(x) if isinstance(x, str) else self.intern_record(x) for x in value]
+                    else:
+                        self.intern_record(value)
+                elif isinstance(value, (dict, list)):
+                    self.intern_record(value)
+        elif isinstance(data, list):
+            for value in data:
+                self.intern_record(value)
+        return data
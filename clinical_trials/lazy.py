@@ -0,0 +1,171 @@
+"""
+Section-on-demand decoding of a study record; the top level elements are indexed by byte offset
+and each is only decoded through the schema when it is first accessed
+"""
+import re
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+from clinical_trials import metrics
+from clinical_trials.stream import RESULTS_MARKER
+
+# a start tag; the attribute values are matched as quoted strings, as they may hold a '>'
+START_TAG = re.compile(br"""<[^\s/>]+(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|'[^']*'))*\s*(/?)>""")
+
+
+def index_sections(content, comments=None):
+    """
+    Index the top level elements of a study record
+    :param bytes content: the XML content
+    :param list comments: when given, the text of each comment is appended to it
+    :rtype: tuple(dict, dict)
+    :return: the root attributes and the (start, end) byte offsets for each top level element name
+    """
+    parser = expat.ParserCreate()
+    attributes = {}
+    sections = {}
+    state = dict(depth=0, start=None, empty=None)
+
+    def start_element(name, attrs):
+        if state["depth"] == 0:
+            attributes.update(("@{}".format(key), value) for key, value in attrs.items())
+        elif state["depth"] == 1:
+            state["start"] = parser.CurrentByteIndex
+            tag = START_TAG.match(content, state["start"])
+            state["empty"] = tag.end() if tag.group(1) else None
+        state["depth"] += 1
+
+    def end_element(name):
+        state["depth"] -= 1
+        if state["depth"] == 1:
+            if state["empty"] is not None:
+                end = state["empty"]
+            else:
+                # the byte index is at the start of the end tag
+                end = content.index(b">", parser.CurrentByteIndex) + 1
+            sections.setdefault(name, []).append((state["start"], end))
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    if comments is not None:
+        parser.CommentHandler = comments.append
+    parser.Parse(content, True)
+    return attributes, sections
+
+
+class LazyStudyData(dict):
+    """
+    The decoded study record, in the shape of schema.to_dict; a top level element is decoded
+    the first time its key is read
+    """
+
+    def __init__(self, content, schema, root="clinical_study", intern_table=None):
+        """
+        :param bytes content: the XML content
+        :param xmlschema.XMLSchema schema: the schema
+        :param str root: the root element name
+        :param clinical_trials.interning.InternTable intern_table: intern the decoded values
+        """
+        with metrics.timer("parse.index") as timer:
+            timer.size = len(content)
+            comments = []
+            attributes, sections = index_sections(content, comments)
+        super(LazyStudyData, self).__init__(attributes)
+        self._content = content
+        self._schema = schema
+        self._root = root
+        self._sections = sections
+        self._declarations = None
+        self._materialized = False
+        self._intern_table = intern_table
+        # taken from the comments, as for a parsed record (see clinical_trials.stream)
+        self.has_results = any(RESULTS_MARKER in x for x in comments)
+
+    def _declaration(self, name):
+        if self._declarations is None:
+            group = self._schema.elements[self._root].type.content
+            self._declarations = dict((element.name, element) for element in group.iter_elements())
+        return self._declarations[name]
+
+    def _decode(self, name):
+        declaration = self._declaration(name)
+        with metrics.timer("parse.section") as timer:
+            timer.size = sum(end - start for start, end in self._sections[name])
+            values = [declaration.decode(ElementTree.fromstring(self._content[start:end]))
+                      for start, end in self._sections[name]]
+        value = values[0] if declaration.max_occurs == 1 else values
+        if self._intern_table is not None:
+            value = self._intern_table.intern_record({name: value})[name]
+        return value
+
+    def __missing__(self, key):
+        if key not in self._sections:
+            raise KeyError(key)
+        value = self._decode(key)
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self._sections or super(LazyStudyData, self).__contains__(key)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    @property
+    def sections(self):
+        """
+        The top level elements present in the record
+        :rtype: list(str)
+        """
+        return list(self._sections)
+
+    @property
+    def decoded(self):
+        """
+        The top level elements decoded so far
+        :rtype: list(str)
+        """
+        return [key for key in dict.keys(self) if not key.startswith("@")]
+
+    def materialize(self):
+        """
+        Decode all the remaining sections, in document order
+        :rtype: LazyStudyData
+        """
+        if not self._materialized:
+            decoded = dict(dict.items(self))
+            dict.clear(self)
+            dict.update(self, ((key, value) for key, value in decoded.items() if key.startswith("@")))
+            for name in self._sections:
+                dict.__setitem__(self, name, decoded[name] if name in decoded else self._decode(name))
+            self._materialized = True
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self.materialize())
+
+    def __len__(self):
+        return dict.__len__(self.materialize())
+
+    def keys(self):
+        self.materialize()
+        return super(LazyStudyData, self).keys()
+
+    def values(self):
+        self.materialize()
+        return super(LazyStudyData, self).values()
+
+    def items(self):
+        self.materialize()
+        return super(LazyStudyData, self).items()
+
+    def __eq__(self, other):
+        return dict(self.items()) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "LazyStudyData(sections={!r}, decoded={!r})".format(self.sections, self.decoded)
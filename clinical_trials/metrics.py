@@ -0,0 +1,292 @@
+"""
+Opt-in instrumentation of the connector, schema, parse and struct layers.  Nothing is recorded
+until a sink is installed with set_sink; while disabled each instrumented call costs one check
+"""
+import functools
+import threading
+import time
+
+from clinical_trials import logger
+
+_sink = None
+
+
+def set_sink(sink):
+    """
+    Install a sink, enabling the instrumentation (None disables it)
+    :param Sink sink: the sink
+    :return: the previous sink
+    """
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def get_sink():
+    return _sink
+
+
+def enabled():
+    return _sink is not None
+
+
+def record(stage, elapsed, size=0):
+    """
+    Record a timed call of a stage
+    :param str stage: the stage name, eg 'connector.get_study'
+    :param float elapsed: the time taken (seconds)
+    :param int size: the bytes processed
+    """
+    sink = _sink
+    if sink is not None:
+        sink.record(stage, elapsed, size)
+
+
+def cache_lookup(cache, hit):
+    """
+    Record a cache lookup
+    :param str cache: the cache name
+    :param bool hit: the value was cached
+    """
+    sink = _sink
+    if sink is not None:
+        sink.cache(cache, hit)
+
+
+class _Timer(object):
+    __slots__ = ("stage", "size", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.size = 0
+        self.started = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        record(self.stage, time.perf_counter() - self.started, self.size)
+
+
+class _NullTimer(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    @property
+    def size(self):
+        return 0
+
+    @size.setter
+    def size(self, value):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def timer(stage):
+    """
+    Time a block; set the bytes processed on the returned timer with timer.size = ...
+    :param str stage: the stage name
+    """
+    if _sink is None:
+        return NULL_TIMER
+    return _Timer(stage)
+
+
+def timed(stage):
+    """
+    Decorator timing each call of a function as a stage
+    :param str stage: the stage name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _sink is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stage, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class Sink(object):
+    """
+    Receives the measurements
+    """
+
+    def record(self, stage, elapsed, size):
+        raise NotImplementedError
+
+    def cache(self, cache, hit):
+        raise NotImplementedError
+
+
+class StageStats(object):
+    """
+    Aggregated timings for a stage
+    """
+
+    __slots__ = ("count", "total", "minimum", "maximum", "size")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.size = 0
+
+    def add(self, elapsed, size):
+        self.count += 1
+        self.total += elapsed
+        self.size += size
+        if self.minimum is None or elapsed < self.minimum:
+            self.minimum = elapsed
+        if self.maximum is None or elapsed > self.maximum:
+            self.maximum = elapsed
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return dict(count=self.count, total=self.total, mean=self.mean, min=self.minimum, max=self.maximum,
+                    bytes=self.size)
+
+
+class MemorySink(Sink):
+    """
+    In memory aggregates per stage and per cache
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.caches = {}
+
+    def record(self, stage, elapsed, size):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = StageStats()
+            self.stages[stage].add(elapsed, size)
+
+    def cache(self, cache, hit):
+        with self._lock:
+            counts = self.caches.setdefault(cache, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def hit_ratio(self, cache):
+        """
+        The fraction of lookups that were hits
+        :param str cache: the cache name
+        :rtype: float
+        """
+        hits, misses = self.caches.get(cache, (0, 0))
+        return hits / float(hits + misses) if hits + misses else 0.0
+
+    def snapshot(self):
+        """
+        The current aggregates
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(
+                stages=dict((name, stats.to_dict()) for name, stats in self.stages.items()),
+                caches=dict((name, dict(hits=hits, misses=misses, ratio=self.hit_ratio(name)))
+                            for name, (hits, misses) in self.caches.items()),
+            )
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.caches = {}
+
+
+class LoggingSink(Sink):
+    """
+    Logs each measurement
+    """
+
+    def __init__(self, log=None, level=10):
+        """
+        :param logging.Logger log: the logger (default, the package logger)
+        :param int level: the logging level (default, DEBUG)
+        """
+        self.log = log or logger
+        self.level = level
+
+    def record(self, stage, elapsed, size):
+        self.log.log(self.level, "%s took %.6fs (%d bytes)", stage, elapsed, size)
+
+    def cache(self, cache, hit):
+        self.log.log(self.level, "%s cache %s", cache, "hit" if hit else "miss")
+
+
+class PrometheusSink(MemorySink):
+    """
+    In memory aggregates, rendered in the Prometheus text exposition format
+    """
+
+    def __init__(self, namespace="clinical_trials"):
+        super(PrometheusSink, self).__init__()
+        self.namespace = namespace
+
+    @staticmethod
+    def _label(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def render(self):
+        """
+        The metrics in the text exposition format
+        :rtype: str
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for metric, kind, help_text, key, labels in (
+                ("stage_seconds_total", "counter", "Time spent in each stage", "total", "stages"),
+                ("stage_calls_total", "counter", "Calls of each stage", "count", "stages"),
+                ("stage_bytes_total", "counter", "Bytes processed by each stage", "bytes", "stages"),
+                ("cache_hits_total", "counter", "Cache hits", "hits", "caches"),
+                ("cache_misses_total", "counter", "Cache misses", "misses", "caches"),
+        ):
+            name = "{}_{}".format(self.namespace, metric)
+            lines.append("# HELP {} {}".format(name, help_text))
+            lines.append("# TYPE {} {}".format(name, kind))
+            label = "stage" if labels == "stages" else "cache"
+            for value_name, values in sorted(snapshot[labels].items()):
+                lines.append('{}{{{}="{}"}} {}'.format(name, label, self._label(value_name), values[key]))
+        return "\n".join(lines) + "\n"
+
+    def write(self, filename):
+        """
+        Write the metrics for a textfile collector
+        :param str filename: path to the file
+        """
+        with open(filename, "w") as fh:
+            fh.write(self.render())
+
+
+class MultiSink(Sink):
+    """
+    Sends each measurement to several sinks
+    """
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def record(self, stage, elapsed, size):
+        for sink in self.sinks:
+            sink.record(stage, elapsed, size)
+
+    def cache(self, cache, hit):
+        for sink in self.sinks:
+            sink.cache(cache, hit)
@@ -0,0 +1,129 @@
+"""
+Field projection for bulk extraction; only the sections that the requested fields touch are decoded
+"""
+import inspect
+
+from glom import glom
+
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.lazy import LazyStudyData
+from clinical_trials.schema import get_schema, get_local_schema
+
+
+# the ClinicalStudy methods usable as fields; they take no arguments and do not change the study
+# (the add_* methods also take none, but they fill in the study)
+FIELD_METHODS = ("conditions", "to_dict")
+
+
+class Projection(object):
+    """
+    A fixed set of fields extracted from each study record.  A field is either a ClinicalStudy
+    property (or one of the FIELD_METHODS), eg 'nct_id', or a glom path into the decoded record,
+    eg 'sponsors.lead_sponsor.agency'
+    """
+
+    def __init__(self, fields, schema=None, local_schema=False):
+        """
+        :param list fields: the property names or paths
+        :param xmlschema.XMLSchema schema: the schema (fetched if not supplied)
+        :param bool local_schema: Use the local copy of the public.xsd document
+        """
+        if schema is None:
+            schema = get_local_schema() if local_schema else get_schema()
+        self.schema = schema
+        self.fields = tuple(fields)
+        elements = set(element.name for element in schema.elements["clinical_study"].type.content.iter_elements())
+        self._getters = []
+        for field in self.fields:
+            attribute = inspect.getattr_static(ClinicalStudy, field, None)
+            if isinstance(attribute, property):
+                self._getters.append(self._property(field))
+            elif field in FIELD_METHODS:
+                self._getters.append(self._method(field))
+            elif field.split(".")[0] in elements:
+                self._getters.append(self._path(field))
+            else:
+                raise ValueError("Unknown field {}".format(field))
+
+    @staticmethod
+    def _property(name):
+        return lambda study: getattr(study, name)
+
+    @staticmethod
+    def _method(name):
+        return lambda study: getattr(study, name)()
+
+    @staticmethod
+    def _path(path):
+        return lambda study: glom(study._data, path, default=None)
+
+    @property
+    def columns(self):
+        return self.fields
+
+    def study(self, content):
+        """
+        Get the lazily decoded study for a record
+        :param bytes content: the XML content
+        :rtype: clinical_trials.ClinicalStudy
+        """
+        data = LazyStudyData(content, self.schema)
+        return ClinicalStudy(data, data.has_results)
+
+    def extract(self, content):
+        """
+        Extract the fields from a record
+        :param bytes content: the XML content
+        :rtype: tuple
+        """
+        return self.values(self.study(content))
+
+    def values(self, study):
+        """
+        Extract the fields from a study
+        :param clinical_trials.ClinicalStudy study: the study
+        :rtype: tuple
+        """
+        return tuple(getter(study) for getter in self._getters)
+
+    def extract_dict(self, content):
+        """
+        Extract the fields from a record
+        :param bytes content: the XML content
+        :rtype: dict
+        """
+        return dict(zip(self.fields, self.extract(content)))
+
+    def iter_tuples(self, contents):
+        """
+        Extract the fields from a stream of records
+        :param iterable contents: the XML content for each record
+        :rtype: generator
+        """
+        for content in contents:
+            yield self.extract(content)
+
+    def iter_dicts(self, contents):
+        """
+        Extract the fields from a stream of records
+        :param iterable contents: the XML content for each record
+        :rtype: generator
+        """
+        for content in contents:
+            yield self.extract_dict(content)
+
+
+def project(contents, fields, schema=None, local_schema=False, as_dict=False):
+    """
+    Extract a set of fields from a stream of records
+    :param iterable contents: the XML content for each record
+    :param list fields: the ClinicalStudy property names or glom paths
+    :param xmlschema.XMLSchema schema: the schema (fetched if not supplied)
+    :param bool local_schema: Use the local copy of the public.xsd document
+    :param bool as_dict: yield dicts rather than tuples
+    :rtype: generator
+    """
+    projection = Projection(fields, schema=schema, local_schema=local_schema)
+    if as_dict:
+        return projection.iter_dicts(contents)
+    return projection.iter_tuples(contents)
@@ -0,0 +1,315 @@
+"""
+Corpus level registry of the facilities and investigators; resolves the variant records to
+shared canonical objects with stable identifiers
+"""
+import hashlib
+from collections import defaultdict
+
+from clinical_trials.geo import country_code, normalize_place
+from clinical_trials.structs import Facility, Investigator
+
+# abbreviations expanded before matching facility names
+FACILITY_ABBREVIATIONS = {
+    "univ": "university",
+    "hosp": "hospital",
+    "ctr": "center",
+    "cntr": "center",
+    "centre": "center",
+    "centro": "center",
+    "med": "medical",
+    "inst": "institute",
+    "dept": "department",
+    "st": "saint",
+    "mt": "mount",
+    "natl": "national",
+    "hopital": "hospital",
+    "ospedale": "hospital",
+    "hospitalier": "hospital",
+    "universitaire": "university",
+    "universitario": "university",
+    "universitaria": "university",
+}
+
+# tokens that carry no information for matching facility names
+FACILITY_STOPWORDS = frozenset(
+    ["the", "of", "and", "at", "for", "in", "de", "la", "le", "du", "des", "di", "del", "der", "und", "site",
+     "research", "clinical", "inc", "llc", "ltd"]
+)
+
+# name tokens that are degrees or honorifics rather than names
+PERSON_TITLES = frozenset(
+    ["dr", "prof", "professor", "mr", "mrs", "ms", "md", "phd", "mbbs", "mb", "bs", "do", "rn", "mph", "msc", "frcp",
+     "frcpc", "mrcp", "facp", "jr", "sr", "ii", "iii"]
+)
+
+def _digest(*parts):
+    return hashlib.sha1("|".join(part or "" for part in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def facility_tokens(name, city=None):
+    """
+    The matching tokens for a facility name; the city is dropped from the name
+    :param str name: facility name
+    :param str city: facility city
+    :rtype: frozenset(str)
+    """
+    city_tokens = set(normalize_place(city).split())
+    tokens = set()
+    for token in normalize_place(name).split():
+        token = FACILITY_ABBREVIATIONS.get(token, token)
+        if token not in FACILITY_STOPWORDS and token not in city_tokens:
+            tokens.add(token)
+    return frozenset(tokens)
+
+
+def jaccard(first, second):
+    """
+    Jaccard similarity of two sets
+    :rtype: float
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / float(len(first | second))
+
+
+def parse_person_name(contact):
+    """
+    Get the (first, middle, last) name tokens for a contact; ClinicalTrials.gov records mostly
+    put the full name and degrees in the last_name, eg 'Jan Willem Greve, MD'
+    :param clinical_trials.structs.StudyContact contact: the contact or investigator
+    :rtype: tuple(str, str, str)
+    """
+    if contact.first_name:
+        first = normalize_place(contact.first_name)
+        middle = normalize_place(contact.middle_name)
+        last = normalize_place((contact.last_name or "").split(",")[0])
+    else:
+        tokens = [token for token in normalize_place((contact.last_name or "").split(",")[0]).split()
+                  if token not in PERSON_TITLES]
+        if not tokens:
+            return "", "", ""
+        if len(tokens) == 1:
+            return "", "", tokens[0]
+        first, middle, last = tokens[0], " ".join(tokens[1:-1]), tokens[-1]
+    return first, middle, last
+
+
+def _compatible(first, second):
+    # names match when equal or when one is the initial of the other
+    if not first or not second:
+        return True
+    return first == second or (len(first) == 1 and second.startswith(first)) or (
+        len(second) == 1 and first.startswith(second))
+
+
+class Site(object):
+    """
+    A resolved facility
+    """
+
+    def __init__(self, site_id, facility, tokens):
+        self.site_id = site_id
+        self.facility = facility
+        self.tokens = tokens
+        self.names = set([facility.name])
+        self.count = 0
+
+
+class Person(object):
+    """
+    A resolved investigator
+    """
+
+    def __init__(self, investigator_id, first, middle, last):
+        self.investigator_id = investigator_id
+        self.first = first
+        self.middle = middle
+        self.last = last
+        self.count = 0
+        # canonical Investigator for each (role, affiliation)
+        self.records = {}
+
+    @property
+    def name(self):
+        return " ".join(x for x in (self.first, self.middle, self.last) if x)
+
+
+class EntityRegistry(object):
+    """
+    Resolves the facility and investigator records across a corpus.  Records are grouped by a
+    blocking key (country and city for facilities, surname and initial for people) and only
+    compared within the block, so resolution is near linear in the number of records.
+
+    The identifiers are digests of the first variant registered for a site (with the country and
+    city) or a person, so a name resolved first always gets the same identifier, and they are never
+    changed once handed out: a later variant joins the site or person it matches without re-keying
+    it.  Matching is greedy against that first variant, so how the variants of a corpus are grouped,
+    and so which identifiers they share, can depend on the order its records are resolved in
+    """
+
+    def __init__(self, threshold=0.75):
+        """
+        :param float threshold: minimum token Jaccard similarity for facility names to match
+        """
+        self.threshold = threshold
+        self._addresses = {}
+        self._site_blocks = defaultdict(list)
+        self._person_blocks = defaultdict(list)
+        self.sites = {}
+        self.people = {}
+
+    @staticmethod
+    def address_key(address):
+        return (country_code(address.country) or normalize_place(address.country),
+                normalize_place(address.state),
+                normalize_place(address.city),
+                (address.zip or "").replace(" ", "").upper())
+
+    def intern_address(self, address):
+        """
+        Get the canonical Address
+        :param clinical_trials.structs.Address address: the address
+        :rtype: clinical_trials.structs.Address
+        """
+        if address is None:
+            return None
+        return self._addresses.setdefault(self.address_key(address), address)
+
+    def resolve_facility(self, facility):
+        """
+        Get the Site for a facility, registering a new one when it matches no known site
+        :param clinical_trials.structs.Facility facility: the facility
+        :rtype: Site
+        """
+        address = self.intern_address(facility.address)
+        if address is not None:
+            country, _, city, _ = self.address_key(address)
+        else:
+            country, city = "", ""
+        block = self._site_blocks[(country, city)]
+        tokens = facility_tokens(facility.name, address.city if address else None)
+        best, score = None, 0.0
+        for site in block:
+            similarity = jaccard(tokens, site.tokens)
+            if similarity > score:
+                best, score = site, similarity
+        if best is None or score < self.threshold:
+            site_id = _digest(country, city, " ".join(sorted(tokens)))
+            canonical = Facility(name=facility.name)
+            canonical.address = address
+            best = Site(site_id, canonical, tokens)
+            canonical.site_id = site_id
+            block.append(best)
+            self.sites[site_id] = best
+        best.names.add(facility.name)
+        best.count += 1
+        return best
+
+    def intern_facility(self, facility):
+        """
+        Get the canonical Facility
+        :param clinical_trials.structs.Facility facility: the facility
+        :rtype: clinical_trials.structs.Facility
+        """
+        if facility is None:
+            return None
+        return self.resolve_facility(facility).facility
+
+    def resolve_person(self, contact):
+        """
+        Get the Person for an investigator, registering a new one when it matches no known person
+        :param clinical_trials.structs.StudyContact contact: the investigator
+        :rtype: Person
+        """
+        first, middle, last = parse_person_name(contact)
+        if not last:
+            # nothing to match on
+            person = Person(_digest(contact.last_name, getattr(contact, "affiliation", None)), first, middle, last)
+            person = self.people.setdefault(person.investigator_id, person)
+            person.count += 1
+            return person
+        block = self._person_blocks[(last, first[:1])]
+        for person in block:
+            if _compatible(first, person.first) and _compatible(middle, person.middle):
+                # keep the most complete form of the name (the identifier is not changed)
+                if len(first) > len(person.first):
+                    person.first = first
+                if len(middle) > len(person.middle):
+                    person.middle = middle
+                break
+        else:
+            person = Person(_digest(last, first, middle), first, middle, last)
+            block.append(person)
+            self.people[person.investigator_id] = person
+        person.count += 1
+        return person
+
+    def intern_investigator(self, investigator):
+        """
+        Get the canonical Investigator, shared by all the records for the same person, role and affiliation
+        :param clinical_trials.structs.Investigator investigator: the investigator
+        :rtype: clinical_trials.structs.Investigator
+        """
+        if investigator is None:
+            return None
+        person = self.resolve_person(investigator)
+        key = (investigator.role, investigator.affiliation)
+        if key not in person.records:
+            canonical = Investigator(first_name=investigator.first_name,
+                                     middle_name=investigator.middle_name,
+                                     last_name=investigator.last_name,
+                                     degrees=investigator.degrees,
+                                     role=investigator.role,
+                                     affiliation=investigator.affiliation)
+            canonical.investigator_id = person.investigator_id
+            person.records[key] = canonical
+        return person.records[key]
+
+    def intern_study(self, study):
+        """
+        Replace the facilities and investigators in a study with the canonical objects
+        :param clinical_trials.ClinicalStudy study: the study
+        :rtype: clinical_trials.ClinicalStudy
+        """
+        for location in study.locations or []:
+            location.facility = self.intern_facility(location.facility)
+            location.investigators = [self.intern_investigator(x) for x in location.investigators]
+        study._officials = [self.intern_investigator(x) for x in study.overall_officials]
+        # rebuilt from the interned objects
+        study._people = None
+        return study
+
+    def intern_studies(self, studies):
+        """
+        Intern a corpus of studies
+        :param iterable studies: the studies (ClinicalStudy)
+        :rtype: generator
+        """
+        for study in studies:
+            yield self.intern_study(study)
+
+    def site_id(self, facility):
+        """
+        Get the stable site identifier for a facility
+        :param clinical_trials.structs.Facility facility: the facility
+        :rtype: str
+        """
+        if facility is None:
+            return None
+        site_id = getattr(facility, "site_id", None)
+        if site_id is None:
+            site_id = self.resolve_facility(facility).site_id
+        return site_id
+
+    def investigator_id(self, investigator):
+        """
+        Get the stable identifier for an investigator
+        :param clinical_trials.structs.StudyContact investigator: the investigator
+        :rtype: str
+        """
+        if investigator is None:
+            return None
+        investigator_id = getattr(investigator, "investigator_id", None)
+        if investigator_id is None:
+            investigator_id = self.resolve_person(investigator).investigator_id
+        return investigator_id
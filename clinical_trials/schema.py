@@ -1,11 +1,26 @@
+import bisect
+import datetime
+import glob
 import os
+import re
 import sys
 
 import xmlschema
 
+from clinical_trials import metrics
+
 SCHEMA_LOCATION = "https://clinicaltrials.gov/ct2/html/images/info/public.xsd"
 
+# the bytes read from the head of a document for the version or the required_header
+HEADER_BYTES = 4096
+
+SCHEMA_VERSION_LINE = re.compile(br"Version:\s*(\d{4}\.\d{2}\.\d{2})")
+
+DOWNLOAD_DATE = re.compile(
+    br"<download_date>\s*ClinicalTrials\.gov processed this data on\s+([A-Za-z]+)\s+(\d{1,2}),\s*(\d{4})")
 
+
+@metrics.timed("schema.get_schema")
 def get_schema():
     """
     Get the schema
@@ -16,16 +31,185 @@ def get_schema():
     return schema
 
 
+def local_schema_location():
+    """
+    Get the path of the local copy of the schema
+    :rtype: str
+    """
+    if os.path.exists(os.path.join(sys.prefix, 'config', 'public.xsd')):
+        return os.path.join(sys.prefix, 'config', 'public.xsd')
+    elif os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'doc', 'schema', 'public.xsd')):
+        return os.path.join(os.path.dirname(__file__), '..', 'doc', 'schema', 'public.xsd')
+    raise ValueError("Unable to locate schema document")
+
+
+@metrics.timed("schema.get_local_schema")
 def get_local_schema():
     """
     Get the schema from a local store
     :rtype: xmlschema.XMLSchema
     :return:
     """
-    if os.path.exists(os.path.join(sys.prefix, 'config', 'public.xsd')):
-        schema = xmlschema.XMLSchema(os.path.join(sys.prefix, 'config', 'public.xsd'))
-    elif os.path.exists(os.path.join(os.path.dirname(__file__), '..', 'doc', 'schema', 'public.xsd')):
-        schema = xmlschema.XMLSchema(os.path.join(os.path.dirname(__file__), '..', 'doc', 'schema', 'public.xsd'))
-    else:
-        raise ValueError("Unable to locate schema document")
-    return schema
+    return xmlschema.XMLSchema(local_schema_location())
+
+
+def schema_version(location):
+    """
+    Get the version of a schema document, from the Version line of its header comment
+    :param str location: the path of the document
+    :rtype: str
+    :return: the version, eg 2020.05.08
+    """
+    with open(location, "rb") as fh:
+        match = SCHEMA_VERSION_LINE.search(fh.read(HEADER_BYTES))
+    if match is None:
+        raise ValueError("No version in the header of {}".format(location))
+    return match.group(1).decode("ascii")
+
+
+def document_version(schema):
+    """
+    Get the version of the local document a schema was built from (see schema_version)
+    :param xmlschema.XMLSchema schema: the schema, built from a path or a file object
+    :rtype: str
+    """
+    # the name of the file object, for a schema built from one
+    location = schema.source.filepath or getattr(schema.source.source, "name", None)
+    if not isinstance(location, str) or not os.path.exists(location):
+        raise ValueError("The schema was not built from a local document")
+    return schema_version(location)
+
+
+def version_date(version):
+    """
+    The date of a schema version
+    :param str version: the version, eg 2020.05.08
+    :rtype: datetime.date
+    """
+    return datetime.datetime.strptime(version, "%Y.%m.%d").date()
+
+
+def record_date(content):
+    """
+    Get the date clinicaltrials.gov processed a record, from the required_header at the head of the
+    content (only the first HEADER_BYTES are read)
+    :param content: the XML content (bytes or a buffer)
+    :rtype: datetime.date
+    :return: the date, or None when the header does not give it
+    """
+    head = content[:HEADER_BYTES]
+    match = DOWNLOAD_DATE.search(head.encode("utf-8") if isinstance(head, str) else bytes(head))
+    if match is None:
+        return None
+    try:
+        return datetime.datetime.strptime(" ".join(x.decode("ascii") for x in match.groups()), "%B %d %Y").date()
+    except ValueError:
+        return None
+
+
+class SchemaRegistry(object):
+    """
+    The schema revisions by version, each compiled the first time a record needs it.  A record is
+    routed to the newest revision published on or before the day clinicaltrials.gov processed it
+    (see record_date); the records with no date, or older than every revision, go to the newest
+    and the oldest revision respectively
+    """
+
+    def __init__(self, locations=()):
+        """
+        :param iterable locations: the schema documents, each registered under the version in its header
+        """
+        self._locations = {}
+        self._schemas = {}
+        self._dates = []
+        for location in locations:
+            self.register(location)
+
+    def __len__(self):
+        return len(self._locations)
+
+    def __contains__(self, version):
+        return version in self._locations
+
+    def register(self, location, version=None, schema=None):
+        """
+        Add a schema revision; a version registered before is replaced
+        :param str location: the schema document
+        :param str version: the version (read from the document header if not given)
+        :param xmlschema.XMLSchema schema: the compiled schema, if already built
+        :return: the version
+        """
+        version = version or schema_version(location)
+        self._locations[version] = location
+        self._schemas.pop(version, None)
+        if schema is not None:
+            self._schemas[version] = schema
+        self._dates = sorted((version_date(x), x) for x in self._locations)
+        return version
+
+    @property
+    def versions(self):
+        """
+        The registered versions, oldest first
+        :rtype: list(str)
+        """
+        return [version for _, version in self._dates]
+
+    @property
+    def latest(self):
+        """
+        The newest version
+        :rtype: str
+        """
+        if not self._dates:
+            raise ValueError("No schema is registered")
+        return self._dates[-1][1]
+
+    def get(self, version=None):
+        """
+        Get the compiled schema for a version
+        :param str version: the version (default, the newest)
+        :rtype: xmlschema.XMLSchema
+        """
+        version = version or self.latest
+        if version not in self._locations:
+            raise ValueError("Unknown schema version {}".format(version))
+        if version not in self._schemas:
+            with metrics.timer("schema.compile"):
+                self._schemas[version] = xmlschema.XMLSchema(self._locations[version])
+        return self._schemas[version]
+
+    def version_for(self, content):
+        """
+        Get the schema version a record was written against, from its header
+        :param content: the XML content
+        :rtype: str
+        """
+        processed = record_date(content)
+        if processed is None:
+            return self.latest
+        position = bisect.bisect_right([day for day, _ in self._dates], processed)
+        return self._dates[max(position - 1, 0)][1]
+
+    def schema_for(self, content):
+        """
+        Get the compiled schema for a record
+        :param content: the XML content
+        :rtype: tuple(str, xmlschema.XMLSchema)
+        :return: the version and the schema
+        """
+        version = self.version_for(content)
+        return version, self.get(version)
+
+
+def get_registry():
+    """
+    Get a registry of the local schema and the archived revisions stored next to it as
+    public-<version>.xsd
+    :rtype: SchemaRegistry
+    """
+    location = local_schema_location()
+    registry = SchemaRegistry([location])
+    for archived in sorted(glob.glob(os.path.join(os.path.dirname(location), "public-*.xsd"))):
+        registry.register(archived)
+    return registry
@@ -0,0 +1,203 @@
+"""
+Embedded full-text index over the study text, backed by SQLite FTS5
+"""
+import sqlite3
+
+from glom import glom
+
+from clinical_trials.helpers import normalize_textblock
+
+# indexed fields, in column order
+FIELDS = (
+    "brief_title",
+    "official_title",
+    "brief_summary",
+    "detailed_description",
+    "outcomes",
+    "criteria",
+    "conditions",
+    "keywords",
+)
+
+# default BM25 column weights
+DEFAULT_BOOSTS = dict(
+    brief_title=10.0,
+    official_title=5.0,
+    brief_summary=2.0,
+    detailed_description=1.0,
+    outcomes=1.0,
+    criteria=0.5,
+    conditions=8.0,
+    keywords=4.0,
+)
+
+
+def study_document(study):
+    """
+    Get the indexed text for a study
+    :param clinical_trials.ClinicalStudy study: the study
+    :rtype: dict
+    :return: the text for each of the FIELDS
+    """
+    outcomes = []
+    for outcome in study.outcomes.primary + study.outcomes.secondary + study.outcomes.other:
+        outcomes.extend(x for x in (outcome.measure, outcome.description) if x)
+    if glom(study._data, "eligibility", default=None):
+        criteria = normalize_textblock(study.eligibility.criteria)
+    else:
+        criteria = ""
+    return dict(
+        brief_title=study.brief_title,
+        official_title=study.official_title,
+        brief_summary=study.brief_summary,
+        detailed_description=study.detailed_description,
+        outcomes="\n".join(outcomes),
+        criteria=criteria,
+        conditions="\n".join(study.conditions()),
+        keywords="\n".join(study.keywords),
+    )
+
+
+def phrase(content):
+    """
+    Quote content as an FTS5 phrase
+    :param str content: the phrase
+    :rtype: str
+    """
+    return '"{}"'.format(content.replace('"', '""'))
+
+
+class StudySearchIndex(object):
+    """
+    Full-text index over the study text, ranked by BM25.  Entries are keyed by NCT ID; adding a
+    study that is already indexed replaces it
+    """
+
+    def __init__(self, path=":memory:"):
+        """
+        :param str path: the database file (an in-memory database by default)
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS study (rowid INTEGER PRIMARY KEY, nct_id TEXT UNIQUE NOT NULL);
+            CREATE VIRTUAL TABLE IF NOT EXISTS study_text USING fts5({}, tokenize='porter unicode61');
+            """.format(", ".join(FIELDS))
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT count(*) FROM study").fetchone()[0]
+
+    def __contains__(self, nct_id):
+        return self._rowid(nct_id) is not None
+
+    def close(self):
+        self._connection.close()
+
+    def _rowid(self, nct_id):
+        row = self._connection.execute("SELECT rowid FROM study WHERE nct_id = ?", (nct_id,)).fetchone()
+        return row[0] if row else None
+
+    def _add(self, nct_id, document):
+        rowid = self._rowid(nct_id)
+        if rowid is None:
+            rowid = self._connection.execute("INSERT INTO study (nct_id) VALUES (?)", (nct_id,)).lastrowid
+        else:
+            self._connection.execute("DELETE FROM study_text WHERE rowid = ?", (rowid,))
+        self._connection.execute(
+            "INSERT INTO study_text (rowid, {}) VALUES (?, {})".format(", ".join(FIELDS), ", ".join("?" * len(FIELDS))),
+            [rowid] + [document.get(field) or "" for field in FIELDS],
+        )
+
+    def add_document(self, nct_id, document):
+        """
+        Index the text for a study
+        :param str nct_id: the NCT ID
+        :param dict document: the text for each of the FIELDS
+        """
+        with self._connection:
+            self._add(nct_id, document)
+
+    def add_study(self, study):
+        """
+        Index a study
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        self.add_document(study.nct_id, study_document(study))
+
+    def add_studies(self, studies, batch_size=1000):
+        """
+        Bulk index studies, committing every batch_size studies
+        :param iterable studies: the studies (ClinicalStudy)
+        :param int batch_size: studies per transaction
+        :return: the number of studies indexed
+        """
+        count = 0
+        batch = []
+        for study in studies:
+            batch.append((study.nct_id, study_document(study)))
+            if len(batch) >= batch_size:
+                count += self._add_batch(batch)
+                batch = []
+        if batch:
+            count += self._add_batch(batch)
+        return count
+
+    def _add_batch(self, batch):
+        with self._connection:
+            for nct_id, document in batch:
+                self._add(nct_id, document)
+        return len(batch)
+
+    def remove(self, nct_id):
+        """
+        Remove a study from the index
+        :param str nct_id: the NCT ID
+        """
+        rowid = self._rowid(nct_id)
+        if rowid is not None:
+            with self._connection:
+                self._connection.execute("DELETE FROM study_text WHERE rowid = ?", (rowid,))
+                self._connection.execute("DELETE FROM study WHERE rowid = ?", (rowid,))
+
+    def optimize(self):
+        """
+        Merge the index segments, call after a bulk load
+        """
+        with self._connection:
+            self._connection.execute("INSERT INTO study_text (study_text) VALUES ('optimize')")
+
+    def search(self, query, limit=20, boosts=None, fields=None, exact_phrase=False):
+        """
+        Search the index
+        :param str query: FTS5 query (terms, "quoted phrases", AND/OR/NOT, prefix*)
+        :param int limit: maximum number of results
+        :param dict boosts: BM25 weight per field, overriding DEFAULT_BOOSTS
+        :param list fields: restrict the match to these fields
+        :param bool exact_phrase: match the query as a single phrase
+        :rtype: list(tuple(str, float))
+        :return: (NCT ID, score) pairs, best first
+        """
+        weights = dict(DEFAULT_BOOSTS)
+        weights.update(boosts or {})
+        if exact_phrase:
+            query = phrase(query)
+        if fields:
+            unknown = set(fields) - set(FIELDS)
+            if unknown:
+                raise ValueError("Unknown fields: {}".format(", ".join(sorted(unknown))))
+            query = "{{{}}}: ({})".format(" ".join(fields), query)
+        rows = self._connection.execute(
+            "SELECT study.nct_id, bm25(study_text, {}) AS score FROM study_text "
+            "JOIN study ON study.rowid = study_text.rowid "
+            "WHERE study_text MATCH ? ORDER BY score LIMIT ?".format(", ".join("?" * len(FIELDS))),
+            [float(weights[field]) for field in FIELDS] + [query, limit],
+        )
+        # bm25 scores are negative, lower is better
+        return [(nct_id, -score) for nct_id, score in rows]
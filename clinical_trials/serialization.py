@@ -0,0 +1,148 @@
+"""
+JSON and JSONL output for studies and structs; orjson is used when it is installed
+"""
+import datetime
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+BACKENDS = ("orjson", "json")
+
+
+def get_backend(backend=None):
+    """
+    Resolve a backend name
+    :param str backend: 'orjson', 'json' or None for the fastest available
+    :rtype: str
+    """
+    if backend is None:
+        return "orjson" if orjson is not None else "json"
+    if backend not in BACKENDS:
+        raise ValueError("Unknown backend {}".format(backend))
+    if backend == "orjson" and orjson is None:
+        raise ValueError("The orjson backend needs orjson (pip install clinical_trials[orjson])")
+    return backend
+
+
+def default(value):
+    """
+    Convert the values the JSON encoders do not handle natively
+    """
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def dumps_bytes(value, backend=None):
+    """
+    Serialize to compact UTF-8 JSON
+    :param value: the value (studies and structs are converted with to_dict)
+    :param str backend: the backend (see get_backend)
+    :rtype: bytes
+    """
+    if get_backend(backend) == "orjson":
+        return orjson.dumps(value, default=default)
+    return json.dumps(value, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(value, backend=None, indent=False):
+    """
+    Serialize to JSON
+    :param value: the value (studies and structs are converted with to_dict)
+    :param str backend: the backend (see get_backend)
+    :param bool indent: pretty print, with an indent of two
+    :rtype: str
+    """
+    if get_backend(backend) == "orjson":
+        return orjson.dumps(value, default=default, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    if indent:
+        return json.dumps(value, default=default, ensure_ascii=False, indent=2)
+    return json.dumps(value, default=default, ensure_ascii=False, separators=(",", ":"))
+
+
+class JSONLWriter(object):
+    """
+    Streams studies (or structs) to a JSON lines file, one document per line; each study is
+    converted and written as it arrives, so memory does not grow with the corpus
+    """
+
+    def __init__(self, target, backend=None, append=False):
+        """
+        :param target: a path, or a binary file object
+        :param str backend: the backend (see get_backend)
+        :param bool append: append to an existing file
+        """
+        self.backend = get_backend(backend)
+        if hasattr(target, "write"):
+            self._fh, self._owned = target, False
+        else:
+            self._fh, self._owned = open(target, "ab" if append else "wb"), True
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, value):
+        """
+        Write a document
+        :param value: a ClinicalStudy, struct or JSON compatible value
+        """
+        if hasattr(value, "to_dict"):
+            value = value.to_dict()
+        self._fh.write(dumps_bytes(value, self.backend) + b"\n")
+        self.count += 1
+
+    def write_all(self, values):
+        """
+        Write a stream of documents
+        :param iterable values: the studies, structs or values
+        :return: the number of documents written
+        """
+        for value in values:
+            self.write(value)
+        return self.count
+
+    def close(self):
+        if self._owned:
+            self._fh.close()
+        else:
+            self._fh.flush()
+
+
+def write_jsonl(target, studies, backend=None):
+    """
+    Write a corpus as JSON lines
+    :param target: a path, or a binary file object
+    :param iterable studies: the studies (ClinicalStudy)
+    :param str backend: the backend (see get_backend)
+    :return: the number of studies written
+    """
+    with JSONLWriter(target, backend) as writer:
+        return writer.write_all(studies)
+
+
+def iter_jsonl(source):
+    """
+    Read back a JSON lines file
+    :param str source: the path
+    :rtype: generator
+    :return: the documents
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(source, "rb") as fh:
+        for line in fh:
+            if line.strip():
+                yield loads(line)
@@ -0,0 +1,68 @@
+"""
+Incremental parsing of study records.  The content is fed to the XML parser a chunk at a time
+from a file object or a buffer (bytes, memoryview, mmap), so no decoded copy of the record is
+made; the tree is handed to the schema as is.  Whether the study has results is taken from the
+comments met while parsing
+"""
+from xml.etree import ElementTree
+
+# the comment clinicaltrials.gov adds to the records of studies with results
+RESULTS_MARKER = "Results are available for this study"
+
+CHUNK_SIZE = 1 << 16
+
+
+class StudyTreeBuilder(object):
+    """
+    Parser target building the element tree, noting the results comment on the way
+    """
+
+    def __init__(self):
+        builder = ElementTree.TreeBuilder()
+        # the builder's own methods, so the element events are not routed through Python code
+        self.start = builder.start
+        self.end = builder.end
+        self.data = builder.data
+        self.close = builder.close
+        self.has_results = False
+
+    def comment(self, text):
+        if RESULTS_MARKER in text:
+            self.has_results = True
+
+
+def parse_stream(stream, chunk_size=CHUNK_SIZE):
+    """
+    Parse a record from a file object
+    :param stream: the file object, read chunk_size at a time
+    :param int chunk_size: the bytes per read
+    :rtype: tuple(xml.etree.ElementTree.Element, bool)
+    :return: the root element, and whether the study has results
+    """
+    builder = StudyTreeBuilder()
+    parser = ElementTree.XMLParser(target=builder)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    return parser.close(), builder.has_results
+
+
+def parse_buffer(buffer, chunk_size=CHUNK_SIZE):
+    """
+    Parse a record from a buffer, fed to the parser as chunk_size slices of a memoryview (no
+    copy of the buffer is made)
+    :param buffer: the content (bytes, bytearray, memoryview or mmap.mmap)
+    :param int chunk_size: the bytes per slice
+    :rtype: tuple(xml.etree.ElementTree.Element, bool)
+    :return: the root element, and whether the study has results
+    """
+    builder = StudyTreeBuilder()
+    parser = ElementTree.XMLParser(target=builder)
+    with memoryview(buffer) as view:
+        if view.format != "B" or view.ndim != 1:
+            view = view.cast("B")
+        for start in range(0, view.nbytes, chunk_size):
+            parser.feed(view[start:start + chunk_size])
+    return parser.close(), builder.has_results
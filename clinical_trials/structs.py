@@ -1,13 +1,63 @@
 import datetime
+import inspect
 import os
 
 import requests
 from six import string_types
 
-from clinical_trials import logger
+from clinical_trials import logger, serialization
 from clinical_trials.errors import StudyDefinitionInvalid
 from clinical_trials.helpers import process_textblock, process_eligibility, yes_no_enum
 
+# public property names, by struct class
+_PROPERTIES = {}
+
+# constructor keyword arguments, by struct class
+_FIELDS = {}
+
+
+def public_properties(cls):
+    """
+    Get the names of the public properties of a class (including those inherited)
+    :rtype: tuple(str)
+    """
+    if cls not in _PROPERTIES:
+        names = []
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, property) and not name.startswith("_") and name not in names:
+                    names.append(name)
+        _PROPERTIES[cls] = tuple(names)
+    return _PROPERTIES[cls]
+
+
+def declared_fields(cls):
+    """
+    Get the names of the keyword arguments declared by the constructor of a class, None if it takes
+    any keyword
+    :rtype: frozenset(str)
+    """
+    if cls not in _FIELDS:
+        parameters = list(inspect.signature(cls.__init__).parameters.values())
+        if any(x.kind == x.VAR_KEYWORD for x in parameters):
+            _FIELDS[cls] = None
+        else:
+            _FIELDS[cls] = frozenset(x.name for x in parameters[1:] if x.kind != x.VAR_POSITIONAL)
+    return _FIELDS[cls]
+
+
+def serialize(value):
+    """
+    Convert a value to JSON compatible types; structs with to_dict, dates as ISO 8601 strings
+    """
+    if value is None or isinstance(value, (string_types, bool, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [serialize(x) for x in value]
+    if isinstance(value, dict):
+        return dict((key, serialize(x)) for key, x in value.items())
+    return serialize(serialization.default(value))
+
 
 def parse_date(field):
     if field is None:
@@ -40,7 +90,31 @@ class CTStruct(object):
 
     @classmethod
     def from_dict(cls, dict_data):
-        return cls(**dict_data)
+        # drop the elements the struct does not declare (eg added in a later schema version)
+        fields = declared_fields(cls)
+        if fields is None:
+            return cls(**dict_data)
+        return cls(**dict((key, value) for key, value in dict_data.items() if key in fields))
+
+    def to_dict(self):
+        """
+        Get the struct as JSON compatible values; the public attributes and properties, with the
+        values as typed by the struct (booleans for the yes/no flags, parsed dates, processed text)
+        :rtype: dict
+        """
+        document = dict((name, serialize(value)) for name, value in vars(self).items() if not name.startswith("_"))
+        for name in public_properties(type(self)):
+            document[name] = serialize(getattr(self, name))
+        return document
+
+    def to_json(self, backend=None, indent=False):
+        """
+        Get the struct as JSON
+        :param str backend: 'orjson', 'json' or None for the fastest available
+        :param bool indent: pretty print
+        :rtype: str
+        """
+        return serialization.dumps(self.to_dict(), backend, indent)
 
 
 class Outcome(CTStruct):
@@ -185,6 +259,8 @@ class Facility(CTStruct):
     def __init__(self, name=None, address=None):
         self.name = name
         self.address = Address.from_dict(address) if address is not None else None
+        # assigned by the EntityRegistry
+        self.site_id = None
 
 
 class Location(CTStruct):
@@ -272,6 +348,8 @@ class Investigator(StudyContact):
         super(Investigator, self).__init__(first_name, middle_name, last_name, degrees)
         self.role = role
         self.affiliation = affiliation
+        # assigned by the EntityRegistry
+        self.investigator_id = None
 
 
 class StudyEligibility(CTStruct):
@@ -310,6 +388,7 @@ class StudyEligibility(CTStruct):
         self.healty_volunteers = healthy_volunteers
         self._inclusion_criteria = None
         self._exclusion_criteria = None
+        self._study_pop_text = None
 
     @property
     def gender_based(self):
@@ -317,24 +396,31 @@ class StudyEligibility(CTStruct):
 
     @property
     def study_pop(self):
-        return process_textblock(self._study_pop.get("textblock", ""))
+        if self._study_pop_text is None:
+            if self._study_pop is None:
+                self._study_pop_text = ""
+            else:
+                self._study_pop_text = process_textblock(self._study_pop.get("textblock", ""))
+        return self._study_pop_text
 
     @property
     def inclusion_criteria(self):
         if self._inclusion_criteria is None:
-            processed = process_eligibility(self.criteria)
+            processed = process_eligibility(self.criteria) if self.criteria else {}
             self._inclusion_criteria = processed.get("inclusion", [])
         return self._inclusion_criteria
 
     @property
     def exclusion_criteria(self):
         if self._exclusion_criteria is None:
-            processed = process_eligibility(self.criteria)
+            processed = process_eligibility(self.criteria) if self.criteria else {}
             self._exclusion_criteria = processed.get("exclusion", [])
         return self._exclusion_criteria
 
     @property
     def criteria(self):
+        if self._criteria is None:
+            return None
         return self._criteria.get("textblock")
 
 
@@ -418,7 +504,7 @@ class StudyDocument(CTStruct):
         self.doc_comment = doc_comment
 
 
-class StudyTrail:
+class StudyTrail(CTStruct):
     def __init__(
         self,
         study_first_submitted=None,
@@ -494,7 +580,7 @@ class ProtocolOutcomeStruct(CTStruct):
         self.description = description
 
 
-class StudyOutcomes:
+class StudyOutcomes(CTStruct):
     """
     results_outcome_struct
     """
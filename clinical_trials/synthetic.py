@@ -0,0 +1,281 @@
+"""
+Seeded generator of schema valid study records, for running the bulk paths and benchmarks at scale
+"""
+import random
+import zipfile
+from xml.etree import ElementTree
+
+from xmlschema.validators import XsdAtomicBuiltin, XsdElement, XsdUnion
+
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December")
+
+AGE_UNITS = ("Years", "Months", "Weeks", "Days")
+
+WORDS = (
+    "patients", "study", "treatment", "dose", "safety", "efficacy", "randomized", "placebo", "controlled", "trial",
+    "cancer", "leukemia", "diabetes", "hypertension", "cohort", "response", "survival", "adverse", "events",
+    "baseline", "week", "month", "oral", "intravenous", "daily", "therapy", "clinical", "outcome", "measure",
+    "participants", "inclusion", "exclusion", "criteria", "informed", "consent", "laboratory", "assessment",
+    "primary", "secondary", "endpoint", "phase", "open", "label", "blinded", "arm", "group", "tumor", "renal",
+    "hepatic", "function", "performance", "status", "prior", "chemotherapy", "pregnancy", "women", "men", "adult",
+)
+
+CITIES = (
+    ("Boston", "Massachusetts", "02115", "United States"),
+    ("Houston", "Texas", "77030", "United States"),
+    ("Rochester", "Minnesota", "55905", "United States"),
+    ("Toronto", "Ontario", "M5G 2C4", "Canada"),
+    ("London", None, "SE1 9RT", "United Kingdom"),
+    ("Paris", None, "75013", "France"),
+    ("Berlin", None, "10117", "Germany"),
+    ("Madrid", None, "28041", "Spain"),
+    ("Tokyo", None, "104-0045", "Japan"),
+    ("Seoul", None, "03080", "Korea, Republic of"),
+    ("Sydney", "New South Wales", "2050", "Australia"),
+    ("Singapore", None, "768828", "Singapore"),
+)
+
+FIRST_NAMES = ("Anna", "James", "Maria", "Wei", "Fatima", "John", "Sofia", "Kenji", "Olga", "David")
+LAST_NAMES = ("Smith", "Garcia", "Chen", "Muller", "Rossi", "Kim", "Ivanova", "Tanaka", "Brown", "Okafor")
+
+
+class SizeProfile(object):
+    """
+    The size distributions for the generated records.  Each size is an int, a (low, high)
+    range or a callable taking the random.Random and returning an int
+    """
+
+    def __init__(self, locations=(1, 20), primary_outcomes=(1, 3), secondary_outcomes=(0, 8),
+                 other_outcomes=(0, 2), arms=(1, 4), interventions=(1, 4), groups=(1, 4), results=0.3,
+                 text_words=(20, 300), optional=0.7, repeats=(1, 3)):
+        """
+        :param locations: locations per study
+        :param primary_outcomes: primary outcomes per study
+        :param secondary_outcomes: secondary outcomes per study
+        :param other_outcomes: other outcomes per study
+        :param arms: arm groups per study
+        :param interventions: interventions per study
+        :param groups: result groups per study
+        :param float results: fraction of studies with a results section
+        :param text_words: words per textblock
+        :param float optional: chance that an optional element is present
+        :param repeats: occurrences of any other repeated element
+        """
+        self.sizes = dict(
+            location=locations,
+            primary_outcome=primary_outcomes,
+            secondary_outcome=secondary_outcomes,
+            other_outcome=other_outcomes,
+            arm_group=arms,
+            intervention=interventions,
+            group=groups,
+            textblock=text_words,
+        )
+        self.results = results
+        self.optional = optional
+        self.repeats = repeats
+
+    @staticmethod
+    def draw(size, rng):
+        if callable(size):
+            return size(rng)
+        if isinstance(size, int):
+            return size
+        return rng.randint(*size)
+
+
+def _builtin(xsd_type):
+    while not isinstance(xsd_type, XsdAtomicBuiltin):
+        xsd_type = xsd_type.base_type
+    return xsd_type.local_name
+
+
+def _enumeration(xsd_type):
+    if isinstance(xsd_type, XsdUnion):
+        values = []
+        for member in xsd_type.member_types:
+            values.extend(_enumeration(member) or [])
+        return values
+    return getattr(xsd_type, "enumeration", None)
+
+
+class StudyGenerator(object):
+    """
+    Generates study records by walking the clinical_study declaration in the schema; record
+    i for a given seed is always the same, whatever order the records are generated in
+    """
+
+    def __init__(self, schema, profile=None, seed=0):
+        """
+        :param xmlschema.XMLSchema schema: the schema
+        :param SizeProfile profile: the size distributions
+        :param int seed: the random seed
+        """
+        self.schema = schema
+        self.profile = profile or SizeProfile()
+        self.seed = seed
+
+    @staticmethod
+    def nct_id(index):
+        """
+        The NCT ID for record index
+        :rtype: str
+        """
+        return "NCT{:08d}".format(index + 1)
+
+    def generate(self, index):
+        """
+        Generate a record
+        :param int index: the record index
+        :rtype: bytes
+        """
+        state = dict(
+            rng=random.Random(self.seed * 1000003 + index),
+            nct_id=self.nct_id(index),
+            groups=0,
+            group_index=0,
+        )
+        state["groups"] = SizeProfile.draw(self.profile.sizes["group"], state["rng"])
+        declaration = self.schema.elements["clinical_study"]
+        root = self._element(declaration, state)
+        return ElementTree.tostring(root, encoding="UTF-8")
+
+    def _occurrences(self, particle, state):
+        rng = state["rng"]
+        name = particle.name if isinstance(particle, XsdElement) else None
+        if name == "clinical_results":
+            return 1 if rng.random() < self.profile.results else 0
+        if name == "group" and particle.max_occurs is None:
+            return state["groups"]
+        if name in self.profile.sizes and name != "textblock":
+            count = SizeProfile.draw(self.profile.sizes[name], rng)
+        elif particle.max_occurs is None or particle.max_occurs > 1:
+            count = SizeProfile.draw(self.profile.repeats, rng)
+        elif particle.min_occurs == 0:
+            count = 1 if rng.random() < self.profile.optional else 0
+        else:
+            count = 1
+        count = max(count, particle.min_occurs)
+        if particle.max_occurs is not None:
+            count = min(count, particle.max_occurs)
+        return count
+
+    def _group(self, group, parent, state):
+        for _ in range(self._occurrences(group, state)):
+            if group.model == "choice":
+                particles = [state["rng"].choice(list(group))]
+            else:
+                particles = list(group)
+            for particle in particles:
+                if isinstance(particle, XsdElement):
+                    for _ in range(self._occurrences(particle, state)):
+                        parent.append(self._element(particle, state))
+                else:
+                    self._group(particle, parent, state)
+
+    def _element(self, declaration, state):
+        element = ElementTree.Element(declaration.local_name)
+        xsd_type = declaration.type
+        if declaration.local_name == "group_list":
+            state["group_index"] = 0
+        if declaration.local_name == "address":
+            # the city, state, zip and country of an address are of the same place
+            state["place"] = state["rng"].choice(CITIES)
+        for name, attribute in getattr(xsd_type, "attributes", {}).items():
+            if attribute.use == "required" or state["rng"].random() < self.profile.optional:
+                element.set(name, self._attribute(name, attribute, declaration, state))
+        if xsd_type.is_simple():
+            element.text = self._value(declaration.local_name, xsd_type, state)
+        elif xsd_type.has_simple_content():
+            element.text = self._value(declaration.local_name, xsd_type.content, state)
+        else:
+            self._group(xsd_type.content, element, state)
+        if declaration.local_name == "address":
+            state["place"] = None
+        return element
+
+    def _attribute(self, name, attribute, declaration, state):
+        rng = state["rng"]
+        if name == "group_id":
+            if declaration.local_name == "group":
+                state["group_index"] += 1
+                return "G{}".format(state["group_index"])
+            # references one of the groups in the enclosing list
+            return "G{}".format(rng.randint(1, state["groups"]))
+        return self._value(name, attribute.type, state)
+
+    def _words(self, low, high, state):
+        rng = state["rng"]
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+    def _value(self, name, xsd_type, state):
+        rng = state["rng"]
+        values = _enumeration(xsd_type)
+        if values:
+            return rng.choice(values)
+        type_name = xsd_type.local_name if xsd_type.name else None
+        if type_name == "variable_date_type":
+            if rng.random() < 0.5:
+                return "{} {}".format(rng.choice(MONTHS), rng.randint(1995, 2020))
+            return "{} {}, {}".format(rng.choice(MONTHS), rng.randint(1, 28), rng.randint(1995, 2020))
+        if type_name == "age_pattern":
+            return "N/A" if rng.random() < 0.2 else "{} {}".format(rng.randint(1, 90), rng.choice(AGE_UNITS))
+        if type_name == "posting_date_type":
+            return "{:02d}/{}".format(rng.randint(1, 12), rng.randint(1995, 2020))
+        builtin = _builtin(xsd_type)
+        if builtin in ("integer", "int", "long", "nonNegativeInteger", "positiveInteger"):
+            return str(rng.randint(1, 500))
+        if builtin in ("decimal", "float", "double"):
+            return "{:.2f}".format(rng.uniform(0, 100))
+        return self._string(name, state)
+
+    def _string(self, name, state):
+        rng = state["rng"]
+        if name == "nct_id":
+            return state["nct_id"]
+        if name == "textblock":
+            size = SizeProfile.draw(self.profile.sizes["textblock"], rng)
+            return "\n        " + self._words(size, size, state) + "\n      "
+        if name == "url":
+            return "https://clinicaltrials.gov/show/{}".format(state["nct_id"])
+        if name == "email":
+            return "{}@example.org".format(rng.choice(LAST_NAMES).lower())
+        if name == "download_date":
+            return "ClinicalTrials.gov processed this data on {} {}, {}".format(
+                rng.choice(MONTHS), rng.randint(1, 28), rng.randint(2018, 2020))
+        if name in ("city", "state", "zip", "country"):
+            city = state.get("place") or rng.choice(CITIES)
+            value = dict(city=city[0], state=city[1], zip=city[2], country=city[3])[name]
+            return value or city[0]
+        if name in ("first_name", "last_name"):
+            return rng.choice(FIRST_NAMES if name == "first_name" else LAST_NAMES)
+        if name in ("title", "brief_title", "official_title", "measure", "name", "agency"):
+            return self._words(3, 12, state).capitalize()
+        return self._words(1, 8, state)
+
+
+def archive_name(nct_id):
+    """
+    The path for a record in the archive, following the official export (NCT0123xxxx/NCT01234567.xml)
+    :param str nct_id: the NCT ID
+    :rtype: str
+    """
+    return "{}xxxx/{}.xml".format(nct_id[:7], nct_id)
+
+
+def write_zip(filename, count, schema, profile=None, seed=0):
+    """
+    Write a synthetic corpus to a ZIP archive
+    :param str filename: path to the archive
+    :param int count: number of records
+    :param xmlschema.XMLSchema schema: the schema
+    :param SizeProfile profile: the size distributions
+    :param int seed: the random seed
+    :return: the number of records written
+    """
+    generator = StudyGenerator(schema, profile=profile, seed=seed)
+    with zipfile.ZipFile(filename, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index in range(count):
+            archive.writestr(archive_name(generator.nct_id(index)), generator.generate(index))
+    return count
@@ -0,0 +1,276 @@
+"""
+Persisted cross-reference index between NCT IDs and the other identifiers of a study (sponsor
+protocol IDs, secondary IDs such as EudraCT numbers, NCT aliases and PubMed IDs), backed by SQLite
+and looked up in both directions
+"""
+import csv
+import re
+import sqlite3
+
+from glom import glom
+
+# identifier kinds
+ORG_STUDY_ID = "org_study_id"
+SECONDARY_ID = "secondary_id"
+EUDRACT = "eudract"
+NCT_ALIAS = "nct_alias"
+PUBMED = "pmid"
+RESULTS_PUBMED = "results_pmid"
+
+KINDS = (ORG_STUDY_ID, SECONDARY_ID, EUDRACT, NCT_ALIAS, PUBMED, RESULTS_PUBMED)
+
+# graph node prefix of each kind; kinds with the same prefix name the same thing, eg a PubMed ID
+# given as a reference by one study and as a results reference by another (NCT aliases are
+# NCT ID nodes, with no prefix)
+NAMESPACES = {
+    ORG_STUDY_ID: "ID:",
+    SECONDARY_ID: "ID:",
+    EUDRACT: "EudraCT:",
+    NCT_ALIAS: "",
+    PUBMED: "PMID:",
+    RESULTS_PUBMED: "PMID:",
+}
+
+EUDRACT_NUMBER = re.compile(r"\b(\d{4}-\d{6}-\d{2})\b")
+
+# identifiers per statement in a batched lookup (below the SQLite variable limit)
+LOOKUP_BATCH = 500
+
+
+def normalize(identifier):
+    """
+    The lookup key for an identifier: case and runs of whitespace are ignored, and a EudraCT
+    number is reduced to the number (so 'EudraCT 2011-005408-13' finds 2011-005408-13)
+    :param str identifier: the identifier
+    :rtype: str
+    """
+    match = EUDRACT_NUMBER.search(identifier)
+    if match:
+        return match.group(1)
+    return " ".join(identifier.split()).upper()
+
+
+def node(kind, identifier):
+    """
+    The graph node for an identifier
+    :param str kind: the kind (see KINDS)
+    :param str identifier: the identifier
+    :rtype: str
+    """
+    return NAMESPACES[kind] + normalize(identifier)
+
+
+def study_identifiers(study):
+    """
+    Get the identifiers of a study
+    :param clinical_trials.ClinicalStudy study: the study
+    :rtype: list(tuple(str, str))
+    :return: (kind, identifier) pairs
+    """
+    identifiers = []
+    if study.study_id:
+        identifiers.append((ORG_STUDY_ID, study.study_id))
+    for identifier in study.secondary_id:
+        if isinstance(identifier, dict):
+            identifier = identifier.get("secondary_id") or identifier.get("$")
+        if identifier:
+            identifiers.append((EUDRACT if EUDRACT_NUMBER.search(identifier) else SECONDARY_ID, identifier))
+    for alias in glom(study._data, "id_info.nct_alias", default=[]):
+        identifiers.append((NCT_ALIAS, alias))
+    for kind, references in ((PUBMED, study.references), (RESULTS_PUBMED, study.results_references)):
+        for reference in references:
+            if reference.pubmed_id:
+                identifiers.append((kind, str(reference.pubmed_id)))
+    return identifiers
+
+
+class CrossReferenceIndex(object):
+    """
+    Identifier <-> NCT ID index.  Entries are keyed by NCT ID; adding a study that is already
+    indexed replaces its identifiers
+    """
+
+    def __init__(self, path=":memory:"):
+        """
+        :param str path: the database file (an in-memory database by default)
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS xref (
+                nct_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                identifier TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                PRIMARY KEY (nct_id, kind, normalized)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS xref_normalized ON xref (normalized, kind);
+            """
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT count(DISTINCT nct_id) FROM xref").fetchone()[0]
+
+    def __contains__(self, nct_id):
+        row = self._connection.execute("SELECT 1 FROM xref WHERE nct_id = ? LIMIT 1", (nct_id,)).fetchone()
+        return row is not None
+
+    def close(self):
+        self._connection.close()
+
+    def _add(self, nct_id, identifiers):
+        self._connection.execute("DELETE FROM xref WHERE nct_id = ?", (nct_id,))
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO xref (nct_id, kind, identifier, normalized) VALUES (?, ?, ?, ?)",
+            [(nct_id, kind, identifier, normalize(identifier)) for kind, identifier in identifiers],
+        )
+
+    def add_study(self, study):
+        """
+        Index a study
+        :param clinical_trials.ClinicalStudy study: the study
+        """
+        with self._connection:
+            self._add(study.nct_id, study_identifiers(study))
+
+    def add_studies(self, studies, batch_size=1000):
+        """
+        Bulk index studies in one pass, committing every batch_size studies
+        :param iterable studies: the studies (ClinicalStudy)
+        :param int batch_size: studies per transaction
+        :return: the number of studies indexed
+        """
+        count = 0
+        batch = []
+        for study in studies:
+            batch.append((study.nct_id, study_identifiers(study)))
+            if len(batch) >= batch_size:
+                count += self._add_batch(batch)
+                batch = []
+        if batch:
+            count += self._add_batch(batch)
+        return count
+
+    def _add_batch(self, batch):
+        with self._connection:
+            for nct_id, identifiers in batch:
+                self._add(nct_id, identifiers)
+        return len(batch)
+
+    def remove(self, nct_id):
+        """
+        Remove a study from the index
+        :param str nct_id: the NCT ID
+        """
+        with self._connection:
+            self._connection.execute("DELETE FROM xref WHERE nct_id = ?", (nct_id,))
+
+    def lookup(self, identifier, kinds=None):
+        """
+        Get the studies with an identifier
+        :param str identifier: the identifier, eg a EudraCT number or a PubMed ID
+        :param list kinds: restrict the match to these kinds (see KINDS)
+        :rtype: list(str)
+        :return: the NCT IDs, in order
+        """
+        return self.lookup_many([identifier], kinds).get(identifier, [])
+
+    def lookup_many(self, identifiers, kinds=None):
+        """
+        Get the studies for many identifiers, LOOKUP_BATCH identifiers per statement
+        :param iterable identifiers: the identifiers
+        :param list kinds: restrict the match to these kinds (see KINDS)
+        :rtype: dict
+        :return: identifier: NCT IDs (in order), for the identifiers found
+        """
+        keys = {}
+        for identifier in identifiers:
+            keys.setdefault(normalize(identifier), []).append(identifier)
+        kind_filter, kind_values = "", []
+        if kinds:
+            unknown = set(kinds) - set(KINDS)
+            if unknown:
+                raise ValueError("Unknown kinds: {}".format(", ".join(sorted(unknown))))
+            kind_filter = " AND kind IN ({})".format(", ".join("?" * len(kinds)))
+            kind_values = list(kinds)
+        found = {}
+        normalized = list(keys)
+        for start in range(0, len(normalized), LOOKUP_BATCH):
+            batch = normalized[start:start + LOOKUP_BATCH]
+            rows = self._connection.execute(
+                "SELECT DISTINCT normalized, nct_id FROM xref WHERE normalized IN ({}){} "
+                "ORDER BY normalized, nct_id".format(", ".join("?" * len(batch)), kind_filter),
+                batch + kind_values,
+            )
+            for key, nct_id in rows:
+                for identifier in keys[key]:
+                    found.setdefault(identifier, []).append(nct_id)
+        return found
+
+    def identifiers(self, nct_id, kinds=None):
+        """
+        Get the identifiers of a study
+        :param str nct_id: the NCT ID
+        :param list kinds: restrict to these kinds (see KINDS)
+        :rtype: list(tuple(str, str))
+        :return: (kind, identifier) pairs
+        """
+        rows = self._connection.execute(
+            "SELECT kind, identifier FROM xref WHERE nct_id = ? ORDER BY kind, normalized", (nct_id,))
+        return [(kind, identifier) for kind, identifier in rows if not kinds or kind in kinds]
+
+    def linked_studies(self, nct_id, kinds=None):
+        """
+        Get the studies sharing an identifier with a study, eg a publication
+        :param str nct_id: the NCT ID
+        :param list kinds: only follow these kinds (see KINDS)
+        :rtype: dict
+        :return: NCT ID: the (kind, identifier) pairs shared
+        """
+        rows = self._connection.execute(
+            "SELECT other.nct_id, this.kind, this.identifier, other.kind FROM xref AS this "
+            "JOIN xref AS other ON other.normalized = this.normalized AND other.nct_id != this.nct_id "
+            "WHERE this.nct_id = ? ORDER BY other.nct_id, this.kind, this.normalized", (nct_id,))
+        linked = {}
+        for other, kind, identifier, other_kind in rows:
+            if NAMESPACES[kind] != NAMESPACES[other_kind] or (kinds and kind not in kinds):
+                continue
+            shared = linked.setdefault(other, [])
+            if (kind, identifier) not in shared:
+                shared.append((kind, identifier))
+        return linked
+
+    def edges(self, kinds=None):
+        """
+        The edges of the study / identifier graph
+        :param list kinds: only these kinds (see KINDS)
+        :rtype: generator
+        :return: (NCT ID, identifier node, kind) triples (see node)
+        """
+        rows = self._connection.execute("SELECT nct_id, kind, identifier FROM xref ORDER BY nct_id, kind, normalized")
+        for nct_id, kind, identifier in rows:
+            if not kinds or kind in kinds:
+                yield nct_id, node(kind, identifier), kind
+
+    def write_edge_list(self, filename, kinds=None):
+        """
+        Export the graph as a tab separated edge list (source, target, kind), as read by networkx
+        and Gephi
+        :param str filename: the path
+        :param list kinds: only these kinds (see KINDS)
+        :return: the number of edges written
+        """
+        count = 0
+        with open(filename, "w") as fh:
+            writer = csv.writer(fh, delimiter="\t", lineterminator="\n")
+            writer.writerow(("source", "target", "kind"))
+            for edge in self.edges(kinds):
+                writer.writerow(edge)
+                count += 1
+        return count
@@ -31,5 +31,7 @@ setup(
     author="glow-mdsol",
     author_email="glow@mdsol.com",
     description="A simple tool for processing CT.gov records",
-    data_files=[("config", ["doc/schema/public.xsd"])],
+    extras_require={"parquet": ["pyarrow"], "orjson": ["orjson"], "numpy": ["numpy"]},
+    entry_points={"console_scripts": ["clinical-trials=clinical_trials.cli:main"]},
+    data_files=[("config", ["doc/schema/public.xsd", "doc/gazetteer/gazetteer.txt"])],
 )
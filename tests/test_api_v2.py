@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import mock
+from six.moves.urllib.parse import parse_qs, urlparse
+
+from clinical_trials import api_v2
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.helpers import process_eligibility
+from tests.test_clinical_study import SchemaTestCase
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "api_v2")
+
+
+def make_study(nct_id, **modules):
+    study = dict(protocolSection=dict(identificationModule=dict(nctId=nct_id, briefTitle="Study {}".format(nct_id))),
+                 hasResults=False)
+    study["protocolSection"].update(modules)
+    return study
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves /api/v2/studies (filter.ids, pageSize and pageToken) and /api/v2/studies/<id> from
+    the studies of the server
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = dict((key, value[0]) for key, value in parse_qs(url.query).items())
+        self.server.requests.append((url.path, params))
+        studies = self.server.studies
+        if url.path.startswith("/api/v2/studies/"):
+            nct_id = url.path.rsplit("/", 1)[1]
+            if nct_id not in studies:
+                return self.send(404, {})
+            return self.send(200, studies[nct_id])
+        if "filter.ids" in params:
+            matched = [studies[x] for x in params["filter.ids"].split(",") if x in studies]
+        else:
+            matched = [studies[x] for x in sorted(studies)]
+        start = int(params.get("pageToken", 0))
+        size = int(params.get("pageSize", 10))
+        page = dict(studies=matched[start:start + size])
+        if start + size < len(matched):
+            page["nextPageToken"] = str(start + size)
+        self.send(200, page)
+
+    def send(self, status, document):
+        content = json.dumps(document).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class StubServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(("127.0.0.1", 0), StubHandler)
+        self.server.studies = {}
+        self.server.requests = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        patcher = mock.patch.object(api_v2, "API_URL", "http://127.0.0.1:{}/api/v2/".format(self.server.server_port))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def add_studies(self, count):
+        for number in range(count):
+            nct_id = "NCT{:08d}".format(number)
+            self.server.studies[nct_id] = make_study(nct_id)
+        return sorted(self.server.studies)
+
+
+class TestRetrieval(StubServerTestCase):
+
+    def test_get_study(self):
+        self.add_studies(1)
+        self.assertEqual("NCT00000000", api_v2.get_study_json("NCT00000000")["protocolSection"]
+                         ["identificationModule"]["nctId"])
+
+    def test_missing_study(self):
+        with self.assertRaises(ValueError):
+            api_v2.get_study_json("NCT99999999")
+
+    def test_batches(self):
+        nct_ids = self.add_studies(25)
+        studies = api_v2.iter_studies_json(nct_ids + ["NCT99999999"], batch_size=10)
+        found = [x["protocolSection"]["identificationModule"]["nctId"] for x in studies]
+        self.assertEqual(nct_ids, found)
+        self.assertEqual(3, len(self.server.requests))
+        self.assertEqual(10, len(self.server.requests[0][1]["filter.ids"].split(",")))
+
+    def test_pages(self):
+        nct_ids = self.add_studies(12)
+        found = list(api_v2.iter_studies_json(nct_ids, batch_size=100, page_size=5))
+        self.assertEqual(12, len(found))
+        self.assertEqual([None, "5", "10"], [params.get("pageToken") for _, params in self.server.requests])
+
+    def test_stream(self):
+        self.add_studies(12)
+        studies = api_v2.iter_studies_json(query="cancer", page_size=5)
+        next(studies)
+        # the later pages are only requested as the stream is read
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual("cancer", self.server.requests[0][1]["query.term"])
+        self.assertEqual(11, len(list(studies)))
+
+    def test_nothing_requested(self):
+        with self.assertRaises(ValueError):
+            list(api_v2.iter_studies_json())
+
+    def test_iter_from_api(self):
+        nct_ids = self.add_studies(3)
+        studies = list(ClinicalStudy.iter_from_api(nct_ids))
+        self.assertEqual(nct_ids, [x.nct_id for x in studies])
+        self.assertEqual(1, len(self.server.requests))
+
+
+class TestToLegacy(unittest.TestCase):
+
+    def test_values(self):
+        self.assertEqual("Active, not recruiting", api_v2._value("ACTIVE_NOT_RECRUITING", api_v2.STATUSES))
+        self.assertEqual("Parallel Assignment", api_v2._value("PARALLEL"))
+        self.assertEqual("Health Services Research", api_v2._value("HEALTH_SERVICES_RESEARCH"))
+        self.assertEqual("U.S. Fed", api_v2._agency_class("FED"))
+        self.assertEqual("Other", api_v2._agency_class("OTHER_GOV"))
+
+    def test_dates(self):
+        self.assertEqual("January 22, 2015", api_v2._date("2015-01-22"))
+        self.assertEqual("March 2015", api_v2._date("2015-03"))
+        self.assertEqual({"$": "April 2022", "@type": "Anticipated"},
+                         api_v2._date_struct(dict(date="2022-04", type="ESTIMATED")))
+        self.assertEqual({"$": "April 2022", "@type": "Estimate"},
+                         api_v2._date_struct(dict(date="2022-04", type="ESTIMATED"), "Estimate"))
+        self.assertEqual("April 2022", api_v2._date_struct(dict(date="2022-04")))
+
+    def test_design(self):
+        study = make_study(
+            "NCT00000001",
+            designModule=dict(studyType="INTERVENTIONAL", phases=["PHASE2", "PHASE3"],
+                              designInfo=dict(allocation="RANDOMIZED", interventionModel="PARALLEL",
+                                              primaryPurpose="TREATMENT",
+                                              maskingInfo=dict(masking="DOUBLE", whoMasked=["PARTICIPANT",
+                                                                                            "INVESTIGATOR"])),
+                              enrollmentInfo=dict(count=120, type="ESTIMATED")),
+            armsInterventionsModule=dict(armGroups=[dict(label="A", type="EXPERIMENTAL"),
+                                                    dict(label="B", type="PLACEBO_COMPARATOR")]),
+        )
+        data = api_v2.to_legacy(study)
+        self.assertEqual("Phase 2/Phase 3", data["phase"])
+        self.assertEqual(2, data["number_of_arms"])
+        self.assertNotIn("number_of_groups", data)
+        self.assertEqual({"$": 120, "@type": "Anticipated"}, data["enrollment"])
+        self.assertEqual("Double (Participant, Investigator)", data["study_design_info"]["masking"])
+        self.assertEqual("Placebo Comparator", data["arm_group"][1]["arm_group_type"])
+
+    def test_references(self):
+        study = make_study("NCT00000001", referencesModule=dict(references=[
+            dict(pmid="123", type="BACKGROUND", citation="One"),
+            dict(pmid="456", type="RESULT", citation="Two"),
+        ]))
+        data = api_v2.to_legacy(study)
+        self.assertEqual([dict(citation="One", PMID="123")], data["reference"])
+        self.assertEqual([dict(citation="Two", PMID="456")], data["results_reference"])
+
+    def test_criteria(self):
+        study = make_study("NCT00000001", eligibilityModule=dict(
+            eligibilityCriteria="Inclusion Criteria:\n\n* Age \\>= 18\n* ECOG 0-1\n\n"
+                                "Exclusion Criteria:\n\n* Pregnant"))
+        criteria = api_v2.to_legacy(study)["eligibility"]["criteria"]["textblock"]
+        self.assertEqual(dict(inclusion=["-  Age >= 18", "-  ECOG 0-1"], exclusion=["-  Pregnant"]),
+                         process_eligibility(criteria))
+
+    def test_criteria_continued(self):
+        study = make_study("NCT00000001", eligibilityModule=dict(
+            eligibilityCriteria="Inclusion Criteria:\n\n1. Creatinine <= 1.5 x ULN,\n   or CrCl >= 60 mL/min\n"
+                                "2. ECOG 0-1\nExclusion Criteria:\n* Pregnant"))
+        criteria = api_v2.to_legacy(study)["eligibility"]["criteria"]["textblock"]
+        self.assertEqual(dict(inclusion=["-  Creatinine <= 1.5 x ULN, or CrCl >= 60 mL/min", "-  ECOG 0-1"],
+                              exclusion=["-  Pregnant"]), process_eligibility(criteria))
+
+    def test_missing_modules(self):
+        data = api_v2.to_legacy(make_study("NCT00000001"))
+        self.assertEqual(dict(id_info=dict(nct_id="NCT00000001"), brief_title="Study NCT00000001"), data)
+
+
+class TestFromJSON(SchemaTestCase):
+
+    def setUp(self):
+        with open(os.path.join(FIXTURES, "NCT03723057.json")) as fh:
+            self.study = ClinicalStudy.from_json(json.load(fh))
+        self.legacy = self.get_study("NCT03723057")
+
+    def test_matches_xml(self):
+        legacy, document = self.legacy.to_dict(), self.study.to_dict()
+        for name in ("nct_id", "study_id", "brief_title", "official_title", "status", "study_type", "keywords",
+                     "conditions", "mesh_terms", "has_results", "has_expanded_access", "expanded_access_info",
+                     "sponsor", "source", "brief_summary", "locations", "countries", "interventions",
+                     "overall_contact", "verification_date", "responsible_parties"):
+            self.assertEqual(legacy[name], document[name], name)
+        # the criteria are not indented in the v2 documents
+        for name in ("gender", "minimum_age", "maximum_age", "inclusion_criteria", "exclusion_criteria"):
+            self.assertEqual(legacy["eligibility"][name], document["eligibility"][name], name)
+        self.assertEqual(3, len(document["eligibility"]["inclusion_criteria"]))
+        self.assertEqual(2, len(document["eligibility"]["exclusion_criteria"]))
+
+    def test_trail(self):
+        trail = self.study.trail
+        self.assertEqual("October 25, 2018", trail.study_first_submitted.raw_date_str)
+        self.assertEqual("Actual", trail.study_first_posted.date_type)
+        self.assertIsNone(trail.results_first_posted)
@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import mock
+
+from clinical_trials import backends
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.corpus_store import write_corpus
+from tests.test_clinical_study import SchemaTestCase
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class BackendTestCase(SchemaTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(BackendTestCase, cls).setUpClass()
+        cls.folder = tempfile.mkdtemp()
+        cls.records = os.path.join(cls.folder, "records")
+        os.makedirs(os.path.join(cls.records, "NCT0356xxxx"))
+        cls.archive = os.path.join(cls.folder, "AllPublicXML.zip")
+        with zipfile.ZipFile(cls.archive, "w") as archive:
+            for nct_id in sorted(cls.cache):
+                filename = os.path.join(FIXTURES, "{}.xml".format(nct_id))
+                shutil.copy(filename, cls.records)
+                archive.write(filename, "{}xxxx/{}.xml".format(nct_id[:7], nct_id))
+        shutil.move(os.path.join(cls.records, "NCT03211546.xml"), os.path.join(cls.records, "NCT0356xxxx"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.folder)
+
+    def setUp(self):
+        self.addCleanup(backends.set_backend, backends.set_backend(None))
+
+    def assertSameStudy(self, expected, study):
+        self.assertEqual(expected.nct_id, study.nct_id)
+        self.assertEqual(expected.has_results, study.has_results)
+        self.assertEqual(expected.to_dict(), study.to_dict())
+
+
+class TestOpenBackend(BackendTestCase):
+
+    def test_kinds(self):
+        corpus = os.path.join(self.folder, "corpus.bin")
+        write_corpus(corpus, [self.get_study("NCT03211546")])
+        for source, kind in ((None, backends.HTTPBackend), ("http", backends.HTTPBackend),
+                             ("v2", backends.APIv2Backend), (self.records, backends.DirectoryBackend),
+                             (self.archive, backends.ZipBackend), (corpus, backends.CorpusBackend)):
+            with backends.open_backend(source) as backend:
+                self.assertIsInstance(backend, kind)
+
+    def test_unknown_source(self):
+        with self.assertRaises(ValueError):
+            backends.open_backend(os.path.join(FIXTURES, "NCT03211546.xml"))
+
+    def test_environment(self):
+        with mock.patch.dict(os.environ, {backends.ENVIRONMENT_VARIABLE: self.records}):
+            with mock.patch.object(backends, "_configured", False):
+                self.assertIsInstance(backends.get_backend(), backends.DirectoryBackend)
+
+    def test_default(self):
+        self.assertIsNone(backends.get_backend())
+
+
+class TestOfflineBackends(BackendTestCase):
+
+    def check_backend(self, backend):
+        self.assertEqual(sorted(self.cache), backend.nct_ids())
+        self.assertIn("NCT03211546", backend)
+        self.assertNotIn("NCT99999999", backend)
+        expected = dict((nct_id, self.get_study(nct_id.upper())) for nct_id in ("NCT03211546", "nct01565668"))
+        backends.set_backend(backend)
+        with mock.patch("clinical_trials.connector.requests") as requests:
+            for nct_id, study in expected.items():
+                self.assertSameStudy(study, ClinicalStudy.from_nctid(nct_id))
+            self.assertEqual([], ClinicalStudy.from_nctid("NCT03211546").study_documents)
+            with self.assertRaises(ValueError):
+                ClinicalStudy.from_nctid("NCT99999999")
+        self.assertFalse(requests.get.called)
+
+    def test_directory(self):
+        with backends.DirectoryBackend(self.records) as backend:
+            self.check_backend(backend)
+            self.assertEqual(os.path.join(self.records, "NCT0356xxxx", "NCT03211546.xml"),
+                             backend._index["NCT03211546"])
+
+    def test_zip(self):
+        with backends.ZipBackend(self.archive) as backend:
+            self.check_backend(backend)
+
+    def test_corpus(self):
+        corpus = os.path.join(self.folder, "corpus.bin")
+        write_corpus(corpus, (self.get_study(x) for x in self.cache))
+        with backends.CorpusBackend(corpus) as backend:
+            self.check_backend(backend)
+            with self.assertRaises(ValueError):
+                backend.get_study("NCT03211546")
+
+
+class TestLiveBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(backends.set_backend, backends.set_backend(None))
+
+    def test_http(self):
+        backends.set_backend(backends.HTTPBackend())
+        with mock.patch("clinical_trials.backends.connector") as connector:
+            with open(os.path.join(FIXTURES, "NCT03211546.xml"), "rb") as fh:
+                connector.get_study.return_value = fh.read()
+            connector.get_study_documents.return_value = {"Study Protocol": "/ProvidedDocs/46/NCT03211546/Prot.pdf"}
+            study = ClinicalStudy.from_nctid("NCT03211546", local_schema=True)
+            self.assertEqual("NCT03211546", study.nct_id)
+            self.assertEqual(["Study Protocol"], [x.doc_type for x in study.study_documents])
+        connector.get_study.assert_called_once_with("NCT03211546")
+
+    def test_v2(self):
+        backend = backends.APIv2Backend()
+        backends.set_backend(backend)
+        document = dict(protocolSection=dict(identificationModule=dict(nctId="NCT00000001")), hasResults=True)
+        with mock.patch("clinical_trials.backends.api_v2.get_study_json") as get_study_json:
+            get_study_json.return_value = document
+            study = ClinicalStudy.from_nctid("NCT00000001")
+        self.assertEqual("NCT00000001", study.nct_id)
+        self.assertTrue(study.has_results)
+        backend.close()
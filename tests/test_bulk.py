@@ -0,0 +1,371 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+
+import mock
+
+from clinical_trials import bulk, cli
+from clinical_trials.corpus_store import CorpusStore
+from clinical_trials.errors import RecordFailed
+from clinical_trials.geo import LocationIndex
+from clinical_trials.search import StudySearchIndex
+from clinical_trials.xref import CrossReferenceIndex
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+NCT_IDS = sorted(os.path.splitext(x)[0] for x in os.listdir(FIXTURE_DIR) if x.endswith(".xml"))
+
+
+class BulkTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def archive(self):
+        path = self.path("records.zip")
+        with zipfile.ZipFile(path, "w") as archive:
+            for nct_id in NCT_IDS:
+                archive.write(os.path.join(FIXTURE_DIR, "{}.xml".format(nct_id)),
+                              "{}xxxx/{}.xml".format(nct_id[:7], nct_id))
+        return path
+
+
+class TestIterRecords(BulkTestCase):
+
+    def test_directory(self):
+        records = list(bulk.iter_records(FIXTURE_DIR))
+        self.assertEqual(NCT_IDS, [nct_id for nct_id, _ in records])
+        self.assertTrue(all(b"<clinical_study" in content for _, content in records))
+
+    def test_zip(self):
+        self.assertEqual(NCT_IDS, [nct_id for nct_id, _ in bulk.iter_records(self.archive())])
+
+    def test_missing(self):
+        with self.assertRaises(ValueError):
+            list(bulk.iter_records(self.path("missing")))
+
+
+class TestCheckpoint(BulkTestCase):
+
+    def test_resume(self):
+        checkpoint = bulk.Checkpoint(self.path("checkpoint"))
+        checkpoint.mark(["NCT00985114", "NCT01565668"])
+        checkpoint.mark(["NCT01565668"])
+        checkpoint.close()
+        checkpoint = bulk.Checkpoint(self.path("checkpoint"))
+        self.assertEqual(2, len(checkpoint))
+        self.assertIn("NCT00985114", checkpoint)
+        self.assertNotIn("NCT02041234", checkpoint)
+        checkpoint.close()
+
+    def test_uncommitted_batch(self):
+        with open(self.path("checkpoint"), "w") as fh:
+            fh.write("NCT00985114\n@120\nNCT01565668\n@")
+        checkpoint = bulk.Checkpoint(self.path("checkpoint"))
+        self.assertEqual({"NCT00985114"}, checkpoint.completed)
+        self.assertEqual(120, checkpoint.position)
+        checkpoint.mark(["NCT02041234"], 240)
+        checkpoint.close()
+        with open(self.path("checkpoint")) as fh:
+            self.assertEqual("NCT00985114\n@120\nNCT02041234\n@240\n", fh.read())
+
+    def test_disabled(self):
+        checkpoint = bulk.Checkpoint(None)
+        checkpoint.mark(["NCT00985114"])
+        self.assertIn("NCT00985114", checkpoint)
+        checkpoint.close()
+
+
+class TestDecode(BulkTestCase):
+
+    def test_studies(self):
+        studies = list(bulk.iter_studies(FIXTURE_DIR))
+        self.assertEqual(NCT_IDS, [study.nct_id for _, study in studies])
+
+    def test_fields_in_pool(self):
+        rows = list(bulk.iter_studies(self.archive(), workers=2, fields=["nct_id", "phase"],
+                                      skip={"NCT00985114"}))
+        self.assertEqual(NCT_IDS[1:], [row[0] for _, row in rows])
+
+    def test_fetch_records(self):
+        with mock.patch("clinical_trials.bulk.get_study") as get_study:
+            get_study.side_effect = lambda nct_id: nct_id.encode() if nct_id != "NCT2" else ValueError("nope")
+            results = list(bulk.fetch_records(["NCT1", "NCT2", "NCT3"], concurrency=2))
+        self.assertEqual(["NCT1", "NCT2", "NCT3"], [nct_id for nct_id, _ in results])
+        self.assertEqual(b"NCT1", results[0][1])
+        self.assertIsInstance(results[1][1], ValueError)
+
+    def test_parquet_needs_pyarrow(self):
+        with mock.patch("clinical_trials.bulk.pyarrow", None):
+            with self.assertRaises(ValueError):
+                bulk.open_writer("parquet", self.path("studies.parquet"))
+
+
+@unittest.skipIf(bulk.pyarrow is None, "pyarrow is not installed")
+class TestParquet(BulkTestCase):
+
+    def test_typed_columns(self):
+        writer = bulk.ParquetWriter(self.path("studies.parquet"), ["nct_id", "enrollment", "has_results", "keywords"])
+        writer.write("NCT1", ("NCT1", None, True, ["a", "b"]))
+        writer.write("NCT2", ("NCT2", 120, False, None))
+        writer.close()
+        table = bulk.pyarrow.parquet.read_table(self.path("studies.parquet"))
+        self.assertEqual(["string", "int64", "bool", "string"], [str(x.type) for x in table.schema])
+        rows = table.to_pydict()
+        self.assertEqual([None, 120], rows["enrollment"])
+        self.assertEqual([True, False], rows["has_results"])
+        self.assertEqual(["a", "b"], json.loads(rows["keywords"][0]))
+
+
+class Crash(KeyboardInterrupt):
+    pass
+
+
+class CrashingWriter(bulk.JSONLWriter):
+
+    def __init__(self, filename, fields=None, after=None):
+        super(CrashingWriter, self).__init__(filename, fields)
+        self.after = after
+
+    def write(self, nct_id, value):
+        if self.after is not None and self.after == 0:
+            self.flush()
+            raise Crash()
+        if self.after is not None:
+            self.after -= 1
+        super(CrashingWriter, self).write(nct_id, value)
+
+
+class TestPipeline(BulkTestCase):
+
+    def source(self):
+        source = self.path("source")
+        shutil.copytree(FIXTURE_DIR, source)
+        with open(os.path.join(source, "NCT99999998.xml"), "wb") as fh:
+            fh.write(b"<clinical_study><id_info>")
+        with open(os.path.join(source, "NCT99999999.xml"), "wb") as fh:
+            fh.write(b"<clinical_study><unexpected/></clinical_study>")
+        return source
+
+    def test_quarantine(self):
+        quarantine = bulk.Quarantine(self.path("quarantine"))
+        output = self.path("studies.jsonl")
+        stats = bulk.run_pipeline(self.source(), bulk.JSONLWriter(output, ["nct_id"]), quarantine=quarantine,
+                                  fields=["nct_id"])
+        self.assertEqual(len(NCT_IDS), stats.written)
+        self.assertEqual(2, stats.quarantined)
+        errors = list(quarantine.errors())
+        self.assertEqual(["NCT99999998", "NCT99999999"], [error["nct_id"] for error in errors])
+        # the projection only decodes the sections it needs, so the missing id_info is found by the struct
+        self.assertEqual(["decode", "struct"], [error["stage"] for error in errors])
+        with open(os.path.join(quarantine.directory, "NCT99999998.xml"), "rb") as fh:
+            self.assertEqual(b"<clinical_study><id_info>", fh.read())
+        # the quarantine directory is itself a source
+        self.assertEqual(["NCT99999998", "NCT99999999"], [x for x, _ in bulk.iter_records(quarantine.directory)])
+
+    def test_schema_invalid(self):
+        quarantine = bulk.Quarantine(self.path("quarantine"))
+        stats = bulk.run_pipeline(self.source(), bulk.JSONLWriter(self.path("studies.jsonl")), quarantine=quarantine)
+        self.assertEqual((len(NCT_IDS), 2), (stats.written, stats.quarantined))
+        self.assertEqual(["decode", "decode"], [x["stage"] for x in quarantine.errors()])
+
+    def test_failure_raised_without_quarantine(self):
+        with self.assertRaises(RecordFailed) as context:
+            bulk.run_pipeline(self.source(), bulk.JSONLWriter(self.path("studies.jsonl")), workers=2)
+        self.assertEqual("NCT99999998", context.exception.nct_id)
+
+    def test_struct_failure(self):
+        quarantine = bulk.Quarantine(self.path("quarantine"))
+        with mock.patch("clinical_trials.bulk.build_structs") as build_structs:
+            build_structs.side_effect = lambda study: study.nct_id == "NCT02348489" and {}["missing"]
+            stats = bulk.run_pipeline(FIXTURE_DIR, bulk.JSONLWriter(self.path("studies.jsonl")),
+                                      quarantine=quarantine, strict=True)
+        self.assertEqual(1, stats.quarantined)
+        self.assertEqual([("NCT02348489", "struct", "KeyError")],
+                         [(x["nct_id"], x["stage"], x["error_type"]) for x in quarantine.errors()])
+
+    def test_write_failure_keeps_content(self):
+        quarantine = bulk.Quarantine(self.path("quarantine"))
+        to_dict = bulk.ClinicalStudy.to_dict
+
+        def failing(study):
+            if study.nct_id == "NCT02348489":
+                raise TypeError("unexpected keyword argument")
+            return to_dict(study)
+
+        with mock.patch.object(bulk.ClinicalStudy, "to_dict", failing):
+            stats = bulk.run_pipeline(FIXTURE_DIR, bulk.JSONLWriter(self.path("studies.jsonl")),
+                                      quarantine=quarantine)
+        self.assertEqual((len(NCT_IDS) - 1, 1), (stats.written, stats.quarantined))
+        with open(os.path.join(quarantine.directory, "NCT02348489.xml"), "rb") as fh, \
+                open(os.path.join(FIXTURE_DIR, "NCT02348489.xml"), "rb") as original:
+            self.assertEqual(original.read(), fh.read())
+
+    def test_aborted_run_closes_writer(self):
+        writer = CrashingWriter(self.path("studies.jsonl"), ["nct_id"], after=2)
+        with self.assertRaises(Crash):
+            bulk.run_pipeline(FIXTURE_DIR, writer, checkpoint=bulk.Checkpoint(self.path("checkpoint")),
+                              fields=["nct_id"])
+        self.assertTrue(writer._fh.closed)
+
+    def test_strict_offline(self):
+        # building the structs makes no request: the records without study_docs are not looked up
+        quarantine = bulk.Quarantine(self.path("quarantine"))
+        with mock.patch("socket.socket.connect") as connect:
+            connect.side_effect = OSError("network blocked")
+            stats = bulk.run_pipeline(FIXTURE_DIR, bulk.JSONLWriter(self.path("studies.jsonl")),
+                                      quarantine=quarantine, strict=True)
+        self.assertEqual((len(NCT_IDS), 0), (stats.written, stats.quarantined))
+        self.assertFalse(connect.called)
+
+    def test_resume_exactly_once(self):
+        output, checkpoint = self.path("studies.jsonl"), self.path("checkpoint")
+        source, quarantine = self.source(), bulk.Quarantine(self.path("quarantine"))
+        with self.assertRaises(Crash):
+            bulk.run_pipeline(source, CrashingWriter(output, ["nct_id"], after=5),
+                              checkpoint=bulk.Checkpoint(checkpoint), quarantine=quarantine, fields=["nct_id"],
+                              batch_size=3)
+        with open(output) as fh:
+            self.assertEqual(5, len(fh.readlines()))
+        stats = bulk.run_pipeline(source, bulk.JSONLWriter(output, ["nct_id"]), checkpoint=bulk.Checkpoint(checkpoint),
+                                  quarantine=quarantine, fields=["nct_id"], batch_size=3)
+        self.assertEqual(3, stats.skipped)
+        with open(output) as fh:
+            self.assertEqual(NCT_IDS, [json.loads(line)["nct_id"] for line in fh])
+        self.assertEqual(2, len(quarantine))
+        stats = bulk.run_pipeline(source, bulk.JSONLWriter(output, ["nct_id"]), checkpoint=bulk.Checkpoint(checkpoint),
+                                  quarantine=quarantine, fields=["nct_id"])
+        self.assertEqual((0, len(NCT_IDS) + 2), (stats.written, stats.skipped))
+        with open(output) as fh:
+            self.assertEqual(len(NCT_IDS), len(fh.readlines()))
+
+    def test_new_checkpoint_keeps_output(self):
+        output, checkpoint = self.path("studies.jsonl"), self.path("checkpoint")
+        with open(output, "w") as fh:
+            fh.write('{"nct_id": "NCT00000000"}\n')
+        source, quarantine = self.source(), bulk.Quarantine(self.path("quarantine"))
+        # the first batch is cut short
+        with self.assertRaises(Crash):
+            bulk.run_pipeline(source, CrashingWriter(output, ["nct_id"], after=2),
+                              checkpoint=bulk.Checkpoint(checkpoint), quarantine=quarantine, fields=["nct_id"],
+                              batch_size=3)
+        bulk.run_pipeline(source, bulk.JSONLWriter(output, ["nct_id"]), checkpoint=bulk.Checkpoint(checkpoint),
+                          quarantine=quarantine, fields=["nct_id"], batch_size=3)
+        with open(output) as fh:
+            self.assertEqual(["NCT00000000"] + NCT_IDS, [json.loads(line)["nct_id"] for line in fh])
+
+    def test_duplicates(self):
+        archive = self.archive()
+        with zipfile.ZipFile(archive, "a") as fh:
+            fh.write(os.path.join(FIXTURE_DIR, "NCT01565668.xml"), "updates/NCT01565668.xml")
+        stats = bulk.run_pipeline(archive, bulk.JSONLWriter(self.path("studies.jsonl"), ["nct_id"]),
+                                  fields=["nct_id"])
+        self.assertEqual((len(NCT_IDS), 1), (stats.written, stats.duplicates))
+
+    def test_not_resumable(self):
+        writer = bulk.CorpusStoreWriter(self.path("corpus.bin"))
+        with self.assertRaises(ValueError):
+            bulk.run_pipeline(FIXTURE_DIR, writer, checkpoint=bulk.Checkpoint(self.path("checkpoint")))
+        writer.close()
+
+
+class TestCommandLine(BulkTestCase):
+
+    def run_cli(self, *argv):
+        return cli.main(["--progress", "0"] + list(argv))
+
+    def test_export_jsonl_resumes(self):
+        output, checkpoint = self.path("studies.jsonl"), self.path("checkpoint")
+        with open(checkpoint, "w") as fh:
+            fh.write("NCT00985114\n@0\n")
+        self.assertEqual(0, self.run_cli("export", FIXTURE_DIR, "--output", output, "--checkpoint", checkpoint,
+                                         "--fields", "nct_id", "status", "--batch-size", "3"))
+        with open(output) as fh:
+            rows = [json.loads(line) for line in fh]
+        self.assertEqual(NCT_IDS[1:], [row["nct_id"] for row in rows])
+        # a rerun has nothing left to do
+        self.assertEqual(0, self.run_cli("export", FIXTURE_DIR, "--output", output, "--checkpoint", checkpoint))
+        with open(output) as fh:
+            self.assertEqual(len(NCT_IDS) - 1, len(fh.readlines()))
+
+    def test_export_sqlite(self):
+        output = self.path("studies.db")
+        self.assertEqual(0, self.run_cli("export", FIXTURE_DIR, "--format", "sqlite", "--output", output,
+                                         "--fields", "status", "conditions", "sponsors.lead_sponsor.agency"))
+        connection = sqlite3.connect(output)
+        rows = connection.execute("SELECT nct_id, status, conditions, sponsors_lead_sponsor_agency FROM studies "
+                                  "WHERE nct_id = 'NCT01565668'").fetchall()
+        connection.close()
+        self.assertEqual(1, len(rows))
+        self.assertEqual("Daiichi Sankyo, Inc.", rows[0][3])
+        self.assertIsInstance(json.loads(rows[0][2]), list)
+
+    def test_corpus_not_resumable(self):
+        self.assertEqual(2, self.run_cli("export", FIXTURE_DIR, "--format", "corpus", "--output",
+                                         self.path("corpus.bin"), "--checkpoint", self.path("checkpoint")))
+
+    def test_ingest_and_index(self):
+        corpus = self.path("corpus.bin")
+        self.assertEqual(0, self.run_cli("ingest", self.archive(), "--output", corpus))
+        with CorpusStore(corpus) as store:
+            self.assertEqual(NCT_IDS, list(store.nct_ids()))
+        search, locations = self.path("search.db"), self.path("locations.idx")
+        self.assertEqual(0, self.run_cli("index", corpus, "--search", search, "--locations", locations))
+        with StudySearchIndex(search) as index:
+            self.assertEqual(len(NCT_IDS), len(index))
+        with LocationIndex.load(locations) as index:
+            self.assertEqual(NCT_IDS, sorted(index.nct_ids))
+
+    def test_index_xref(self):
+        xref = self.path("xref.db")
+        self.assertEqual(0, self.run_cli("index", FIXTURE_DIR, "--xref", xref, "--batch-size", "5"))
+        with CrossReferenceIndex(xref) as index:
+            self.assertEqual(["NCT01565668"], index.lookup("2011-005408-13"))
+
+    def test_fetch(self):
+        ids = self.path("ids.txt")
+        with open(ids, "w") as fh:
+            fh.write("# studies\nnct00985114\nNCT01565668\n")
+        output = self.path("records")
+        os.makedirs(output)
+        with open(os.path.join(output, "NCT01565668.xml"), "wb") as fh:
+            fh.write(b"<clinical_study/>")
+        with mock.patch("clinical_trials.bulk.get_study") as get_study:
+            get_study.return_value = b"<clinical_study/>"
+            self.assertEqual(0, self.run_cli("fetch", ids, "--output", output))
+        get_study.assert_called_once_with("NCT00985114")
+        self.assertEqual(["NCT00985114.xml", "NCT01565668.xml"], sorted(os.listdir(output)))
+
+    def test_export_quarantine(self):
+        source = self.path("source")
+        os.makedirs(source)
+        shutil.copy(os.path.join(FIXTURE_DIR, "NCT01565668.xml"), source)
+        with open(os.path.join(source, "NCT99999999.xml"), "wb") as fh:
+            fh.write(b"not xml")
+        self.assertEqual(2, self.run_cli("export", source, "--output", self.path("studies.jsonl")))
+        self.assertEqual(0, self.run_cli("export", source, "--output", self.path("studies.jsonl"),
+                                         "--quarantine", self.path("quarantine")))
+        self.assertEqual(["NCT99999999.error.json", "NCT99999999.xml"], sorted(os.listdir(self.path("quarantine"))))
+
+    def test_metrics(self):
+        output = self.path("metrics.json")
+        self.assertEqual(0, self.run_cli("--metrics-json", output, "--prometheus", self.path("metrics.prom"),
+                                         "export", FIXTURE_DIR, "--output", self.path("studies.jsonl")))
+        with open(output) as fh:
+            self.assertEqual(len(NCT_IDS), json.load(fh)["stages"]["parse.to_dict"]["count"])
+        with open(self.path("metrics.prom")) as fh:
+            self.assertIn("clinical_trials_stage_calls_total", fh.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
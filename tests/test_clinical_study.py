@@ -672,6 +672,25 @@ class TestVerificationDate(SchemaTestCase):
         self.assertEqual(study.verification_date.date, datetime.date(month=12, day=1, year=2017))
 
 
+class TestUndeclaredElements(unittest.TestCase):
+
+    def test_undeclared_elements(self):
+        # elements added to the schema after the structs were written are dropped
+        study = ClinicalStudy(dict(
+            intervention=[dict(intervention_type="Drug", intervention_name="AG-221", dose="100 mg")],
+            arm_group=[dict(arm_group_label="A", arm_group_type="Experimental", enrollment=12)],
+            location=[dict(facility=dict(name="Massachusetts General Hospital", address=dict(city="Boston"),
+                                         facility_type="Hospital"),
+                           investigator=[dict(last_name="Greve", role="Principal Investigator", orcid="0000")],
+                           status="Recruiting", location_type="Site")],
+        ))
+        self.assertEqual(["AG-221"], [x.intervention_name for x in study.interventions])
+        self.assertEqual(["A"], [x.arm_group_label for x in study.arms])
+        self.assertEqual(["Massachusetts General Hospital"], [x.facility.name for x in study.locations])
+        self.assertEqual(["Boston"], study.cities)
+        self.assertEqual(["Greve"], [x.last_name for x in study.locations[0].investigators])
+
+
 class TestPatientData(SchemaTestCase):
     def test_patient_data_as_declared(self):
         study_id = 'NCT00985114'
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+
+from clinical_trials import cli, codegen, generated_structs
+from clinical_trials.generated_structs import ClinicalStudyRecord, MeasurementStruct, VariableDateStruct
+from clinical_trials.schema import local_schema_location, schema_version
+from clinical_trials.synthetic import SizeProfile, StudyGenerator
+from tests.test_clinical_study import SchemaTestCase
+
+
+def without_empty(value):
+    # the empty elements (None) are left out by to_dict
+    if isinstance(value, dict):
+        return dict((key, without_empty(x)) for key, x in value.items() if x is not None)
+    if isinstance(value, list):
+        return [without_empty(x) for x in value]
+    return value
+
+
+class TestGenerate(SchemaTestCase):
+
+    def test_current(self):
+        # tagged with the Version line of the public.xsd header
+        self.assertEqual(schema_version(local_schema_location()), generated_structs.SCHEMA_VERSION)
+        self.assertTrue(codegen.is_current(self.schema))
+        self.assertFalse(codegen.is_current(self.schema, version="2019.02.14"))
+
+    def test_every_complex_type(self):
+        names = [x.name for x in codegen.struct_types(self.schema)]
+        for xsd_type in self.schema.types.values():
+            if xsd_type.is_complex():
+                self.assertIn(codegen.class_name(xsd_type.local_name), names)
+        for name in names:
+            self.assertTrue(issubclass(getattr(generated_structs, name), generated_structs.SchemaStruct))
+        self.assertIn("ParticipantFlowGroupList", names)
+        self.assertEqual("ClinicalStudyRecord", names[-1])
+
+    def test_cli(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, "structs.py")
+        self.assertEqual(1, cli.main(["--progress", "0", "codegen", "--output", filename, "--check"]))
+        self.assertEqual(0, cli.main(["--progress", "0", "codegen", "--output", filename]))
+        self.assertEqual(0, cli.main(["--progress", "0", "codegen", "--output", filename, "--check"]))
+        with open(filename) as fh:
+            self.assertIn('SCHEMA_VERSION = "{}"'.format(schema_version(local_schema_location())), fh.read())
+
+
+class TestStructs(SchemaTestCase):
+
+    def test_round_trip(self):
+        records = [content.decode("utf-8") for content in self.cache.values()]
+        generator = StudyGenerator(self.schema, SizeProfile(results=1.0), seed=0)
+        records.extend(generator.generate(x) for x in range(5))
+        for content in records:
+            data = self.schema.to_dict(content)
+            record = ClinicalStudyRecord.from_dict(data)
+            self.assertEqual(without_empty(data), record.to_dict())
+            self.assertEqual(record, ClinicalStudyRecord.from_dict(record.to_dict()))
+        self.assertIsNotNone(record.clinical_results.baseline)
+
+    def test_study_record(self):
+        study = self.get_study("NCT01565668")
+        self.assertIs(study.record, study.record)
+        self.assertEqual("NCT01565668", study.record.id_info.nct_id)
+        self.assertEqual(["AC220 Dose Level 1", "AC220 Dose Level 2"],
+                         [x.arm_group_label for x in study.record.arm_group])
+        self.assertEqual(study.sponsor.get("agency"), study.record.sponsors.lead_sponsor.agency)
+
+    def test_unknown_keys(self):
+        record = ClinicalStudyRecord.from_dict(dict(id_info=dict(nct_id="NCT00000001", registry="X"), colour="blue"))
+        self.assertEqual("NCT00000001", record.id_info.nct_id)
+        self.assertEqual({"id_info": {"nct_id": "NCT00000001"}}, record.to_dict())
+        self.assertEqual([], record.location)
+
+    def test_simple_content(self):
+        self.assertEqual("May 2019", VariableDateStruct.from_dict("May 2019").text)
+        date = VariableDateStruct.from_dict({"$": "May 2019", "@type": "Actual"})
+        self.assertEqual(("Actual", "May 2019"), (date.type, date.text))
+        self.assertEqual("May 2019", VariableDateStruct(text="May 2019").to_dict())
+        measurement = MeasurementStruct.from_dict({"@group_id": "B1", "@value": "12"})
+        self.assertEqual(("B1", "12", None), (measurement.group_id, measurement.value, measurement.text))
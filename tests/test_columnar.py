@@ -0,0 +1,90 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from clinical_trials import columnar
+from clinical_trials.columnar import ColumnarCorpus
+from clinical_trials.corpus_store import CorpusStore, write_corpus
+from tests.test_clinical_study import SchemaTestCase
+
+
+@unittest.skipIf(columnar.numpy is None, "numpy is not installed")
+class TestColumnarCorpus(SchemaTestCase):
+
+    def setUp(self):
+        self.studies = dict((nct_id, self.get_study(nct_id)) for nct_id in sorted(self.cache))
+        self.corpus = ColumnarCorpus.build(self.studies.values(), loader=self.studies.get)
+
+    def scan(self, predicate):
+        return [nct_id for nct_id, study in self.studies.items() if predicate(study)]
+
+    def test_columns(self):
+        self.assertEqual(len(self.studies), len(self.corpus))
+        self.assertEqual([x.status for x in self.studies.values()], self.corpus.column("status").tolist())
+        self.assertEqual("datetime64[D]", str(self.corpus.columns["start_date"].dtype))
+        # eight studies to a byte
+        self.assertEqual((len(self.studies) + 7) // 8, len(self.corpus.columns["has_dmc"]))
+
+    def test_categorical(self):
+        self.assertEqual(self.scan(lambda x: x.status == "Recruiting"), self.corpus.nct_ids(status="Recruiting"))
+        self.assertEqual(self.scan(lambda x: x.phase in ("Phase 2", "Phase 3")),
+                         self.corpus.nct_ids(phase=["Phase 2", "Phase 3"]))
+        self.assertEqual([], self.corpus.nct_ids(phase="Phase 9"))
+
+    def test_enrollment(self):
+        def enrollment(study):
+            value = study._data.get("enrollment")
+            return value["$"] if isinstance(value, dict) else value
+
+        self.assertEqual(self.scan(lambda x: enrollment(x) is not None and enrollment(x) >= 100),
+                         self.corpus.nct_ids(enrollment=(100, None)))
+        self.assertEqual(["NCT02348489"], self.corpus.nct_ids(enrollment=815))
+
+    def test_dates(self):
+        def started(study):
+            value = study._data.get("start_date")
+            date = columnar._date(value)
+            return date is not None and datetime.date(2015, 1, 1) <= date < datetime.date(2018, 1, 1)
+
+        self.assertEqual(self.scan(started), self.corpus.nct_ids(start_date=("2015-01-01", "2017-12-31")))
+        self.assertEqual(self.corpus.nct_ids(start_date=("2015-01-01", "2017-12-31")),
+                         self.corpus.nct_ids(start_date=(datetime.date(2015, 1, 1), datetime.date(2017, 12, 31))))
+
+    def test_flags(self):
+        def has_dmc(study):
+            return study._data.get("oversight_info", {}).get("has_dmc")
+
+        self.assertEqual(self.scan(lambda x: has_dmc(x) == "Yes"), self.corpus.nct_ids(has_dmc=True))
+        self.assertEqual(self.scan(lambda x: has_dmc(x) == "No"), self.corpus.nct_ids(has_dmc=False))
+        self.assertEqual(self.scan(lambda x: has_dmc(x) is None), self.corpus.nct_ids(has_dmc=None))
+        self.assertEqual(self.scan(lambda x: x.has_results), self.corpus.nct_ids(has_results=True))
+
+    def test_combined(self):
+        mask = self.corpus.mask(status="Completed") | self.corpus.mask(status="Recruiting")
+        expected = self.scan(lambda x: x.status in ("Completed", "Recruiting") and x.study_type == "Interventional")
+        self.assertEqual(expected, self.corpus.nct_ids(mask, study_type="Interventional"))
+        self.assertEqual(len(expected), self.corpus.count(mask, study_type="Interventional"))
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.corpus.mask(colour="red")
+
+    def test_studies(self):
+        studies = self.corpus.studies(status="Recruiting")
+        self.assertEqual(self.corpus.nct_ids(status="Recruiting"), [x.nct_id for x in studies])
+        with self.assertRaises(ValueError):
+            list(ColumnarCorpus.build(self.studies.values()).studies())
+
+    def test_store(self):
+        folder = tempfile.mkdtemp()
+        write_corpus(os.path.join(folder, "corpus.bin"), self.studies.values())
+        with CorpusStore(os.path.join(folder, "corpus.bin")) as store:
+            corpus = ColumnarCorpus.from_store(store)
+            self.assertEqual(self.corpus.nct_ids(status="Completed"), corpus.nct_ids(status="Completed"))
+            self.assertEqual("Completed", next(corpus.studies(status="Completed")).status)
+            corpus.save(os.path.join(folder, "columns.npz"))
+        loaded = ColumnarCorpus.load(os.path.join(folder, "columns.npz"))
+        self.assertEqual(self.corpus.categories, loaded.categories)
+        self.assertEqual(self.corpus.nct_ids(has_dmc=True, enrollment=(50, None)),
+                         loaded.nct_ids(has_dmc=True, enrollment=(50, None)))
@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+
+from clinical_trials import cli
+from clinical_trials.conformance import ConformanceReport, Violation, check_corpus, check_record, check_records
+from tests.test_clinical_study import SchemaTestCase
+
+
+def broken(content):
+    content = content.replace(b"<overall_status>Recruiting</overall_status>", b"<overall_status>Maybe</overall_status>")
+    return content.replace(b"<city>", b"<town>").replace(b"</city>", b"</town>")
+
+
+class TestCheckRecord(SchemaTestCase):
+
+    def test_valid(self):
+        for nct_id, content in self.cache.items():
+            self.assertEqual([], check_record(content, self.schema), nct_id)
+
+    def test_all_errors(self):
+        content = self.cache["NCT03211546"]
+        violations = check_record(broken(content), self.schema)
+        locations = content.count(b"<city>")
+        self.assertEqual(1 + locations, len(violations))
+        self.assertEqual(Violation("/clinical_study/overall_status", "EnumerationFacets", violations[0].reason),
+                         violations[0])
+        self.assertEqual("/clinical_study/location[2]/facility/address", violations[2].path)
+        self.assertEqual("/clinical_study/location/facility/address: Group", violations[2].error_class)
+
+    def test_malformed(self):
+        violations = check_record(b"<clinical_study><id_info>", self.schema)
+        self.assertEqual(["/: Malformed"], [x.error_class for x in violations])
+
+
+class TestConformanceReport(SchemaTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for nct_id, content in self.cache.items():
+            with open(os.path.join(self.directory, "{}.xml".format(nct_id)), "wb") as fh:
+                fh.write(broken(content) if nct_id in ("NCT03211546", "NCT02348489") else content)
+
+    def test_report(self):
+        report = ConformanceReport()
+        for nct_id, version, violations in check_records(sorted(self.cache.items())):
+            report.add(nct_id, violations, version)
+        report.add("NCT00000001", check_record(broken(self.cache["NCT03211546"]), self.schema))
+        self.assertEqual((len(self.cache) + 1, len(self.cache), 1), (report.records, report.valid, report.invalid))
+        # the classes in as many records are ranked by the errors
+        (first, _), (second, counts) = report.top(2)
+        self.assertEqual("/clinical_study/location/facility/address: Group", first)
+        self.assertEqual("/clinical_study/overall_status: EnumerationFacets", second)
+        self.assertEqual(dict(errors=1, records=1, examples=["NCT00000001"]),
+                         dict((key, counts[key]) for key in ("errors", "records", "examples")))
+
+    def test_pool(self):
+        records = sorted(self.cache.items())
+        self.assertEqual(list(check_records(records)), list(check_records(records, workers=2, chunksize=2)))
+
+    def test_corpus(self):
+        errors = os.path.join(self.directory, "errors.jsonl")
+        report = check_corpus(self.directory, workers=2, errors=errors)
+        self.assertEqual((len(self.cache), 2), (report.records, report.invalid))
+        classes = dict(report.top())
+        self.assertEqual(2, classes["/clinical_study/location/facility/address: Group"]["records"])
+        with open(errors) as fh:
+            rows = [json.loads(line) for line in fh]
+        self.assertEqual(["NCT02348489", "NCT03211546"], sorted(row["nct_id"] for row in rows))
+        self.assertEqual(report.errors, sum(len(row["errors"]) for row in rows))
+
+    def test_cli(self):
+        output = os.path.join(self.directory, "report.json")
+        self.assertEqual(1, cli.main(["--progress", "0", "validate", self.directory, "--output", output]))
+        with open(output) as fh:
+            report = json.load(fh)
+        self.assertEqual(2, report["invalid"])
+        self.assertEqual(len(self.cache) - 2, report["valid"])
+        self.assertEqual(0, cli.main(["--progress", "0", "validate", os.path.join(self.directory, "NCT01565668.xml")]))
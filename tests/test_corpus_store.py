@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from clinical_trials.corpus_store import CorpusStore, CorpusWriter, nct_number, write_corpus
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestNCTNumber(unittest.TestCase):
+
+    def test_number(self):
+        self.assertEqual(1565668, nct_number("NCT01565668"))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            nct_number("ISRCTN12345")
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), "corpus.bin")
+        data = dict(text="naïve", count=-300, big=2 ** 70, flag=True, missing=None, ratio=0.25,
+                    amount=Decimal("1.50"), items=[dict(text="naïve"), [], {}])
+        with CorpusWriter(path) as writer:
+            writer.add_data("NCT00000001", data, has_results=True)
+        with CorpusStore(path) as store:
+            self.assertEqual(data, store.data("NCT00000001"))
+            self.assertTrue(store["NCT00000001"].has_results)
+
+    def test_rejects_other_files(self):
+        path = os.path.join(tempfile.mkdtemp(), "corpus.bin")
+        with open(path, "wb") as fh:
+            fh.write(b"\0" * 128)
+        with self.assertRaises(ValueError):
+            CorpusStore(path)
+
+
+class TestCorpusStore(SchemaTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestCorpusStore, cls).setUpClass()
+        cls.path = os.path.join(tempfile.mkdtemp(), "corpus.bin")
+
+    def setUp(self):
+        self.studies = dict((nct_id, self.get_study(nct_id)) for nct_id in self.cache)
+        write_corpus(self.path, self.studies.values())
+        self.store = CorpusStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_index(self):
+        self.assertEqual(len(self.cache), len(self.store))
+        self.assertEqual(sorted(self.cache), list(self.store.nct_ids()))
+        self.assertIn('NCT01565668', self.store)
+        self.assertNotIn('NCT99999999', self.store)
+        self.assertNotIn('junk', self.store)
+        self.assertIsNone(self.store.get('NCT99999999'))
+
+    def test_round_trip(self):
+        for nct_id, study in self.studies.items():
+            self.assertEqual(study._data, self.store.data(nct_id))
+            self.assertEqual(study.has_results, self.store[nct_id].has_results)
+
+    def test_study(self):
+        study = self.store['NCT03211546']
+        self.assertEqual(self.studies['NCT03211546'].brief_title, study.brief_title)
+        self.assertEqual(len(self.studies['NCT03211546'].locations), len(study.locations))
+
+    def test_shared_strings(self):
+        first = self.store.data('NCT03211546')
+        second = self.store.data('NCT03211546')
+        self.assertIs(first["overall_status"], second["overall_status"])
+
+    def test_iterate(self):
+        self.assertEqual(sorted(self.cache), [study.nct_id for study in self.store])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from clinical_trials.design import EDGE_FIELDS, DesignGraph, iter_design_edges, normalize_label
+from clinical_trials.structs import StudyArm, StudyIntervention
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestDesignGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.arms = [StudyArm("Arm A: Drug", "Experimental"), StudyArm("Placebo", "Placebo Comparator")]
+        self.drug = StudyIntervention("Drug", "Drug X", arm_group_label=["arm a:  drug", "ARM A: DRUG"])
+        self.placebo = StudyIntervention("Drug", "Placebo", arm_group_label=["Placebo ", "Arm B"])
+        self.graph = DesignGraph(self.arms, [self.drug, self.placebo])
+
+    def test_normalize_label(self):
+        self.assertEqual("arm a: drug", normalize_label("  Arm   A:\nDrug "))
+        self.assertEqual("", normalize_label(None))
+
+    def test_arms(self):
+        self.assertIs(self.arms[0], self.graph.arm("ARM A: drug"))
+        self.assertIsNone(self.graph.arm("Arm C"))
+        self.assertEqual("Placebo Comparator", self.graph.arm_type("placebo"))
+
+    def test_adjacency(self):
+        self.assertEqual([self.drug], self.graph.interventions_for("Arm A: Drug"))
+        self.assertEqual([self.placebo], self.graph.interventions_for("placebo"))
+        self.assertEqual([self.arms[0]], self.graph.arms_for(self.drug))
+        self.assertEqual([self.arms[1]], self.graph.arms_for("Placebo"))
+        self.assertEqual([(self.arms[0], self.drug), (self.arms[1], self.placebo)], list(self.graph.edges()))
+
+    def test_unmatched(self):
+        self.assertEqual(["Arm B"], self.graph.unmatched)
+
+
+class TestStudyDesign(SchemaTestCase):
+
+    def test_cached(self):
+        study = self.get_study("NCT01565668")
+        self.assertIs(study.design, study.design)
+        self.assertEqual("AC220 Dose Level 2", study.get_arm_by_label(" ac220 dose level 2").arm_group_label)
+        self.assertIsNone(study.get_arm_by_label("AC220 Dose Level 3"))
+        intervention = study.interventions[0]
+        self.assertEqual(study.arms, study.design.arms_for(intervention))
+
+    def test_no_arms(self):
+        study = self.get_study("NCT03723057")
+        self.assertEqual({}, study.design.arms)
+        self.assertEqual([], study.design.arms_for(study.interventions[0]))
+
+    def test_corpus_edges(self):
+        studies = [self.get_study(nct_id) for nct_id in sorted(self.cache)]
+        rows = list(iter_design_edges(studies))
+        self.assertIn(("NCT01565668", "AC220 Dose Level 1", "Experimental", "Drug", "AC220"), rows)
+        self.assertTrue(all(len(row) == len(EDGE_FIELDS) for row in rows))
+        expected = []
+        for study in studies:
+            for arm, intervention in study.design.edges():
+                expected.append((study.nct_id, arm.arm_group_type, intervention.intervention_name))
+        self.assertEqual(expected, [(row[0], row[2], row[4]) for row in rows if row[0] not in
+                                    set(x.nct_id for x in studies if x.design.unmatched)])
@@ -0,0 +1,249 @@
+import unittest
+
+from clinical_trials.eligibility import (
+    EXCLUSION,
+    INCLUSION,
+    EligibilityIndex,
+    EligibilityConstraints,
+    LabThreshold,
+    PatientProfile,
+    PerformanceStatus,
+    PregnancyExclusion,
+    PriorTherapyExclusion,
+    alternatives,
+    extract_constraints,
+    extract_lab_thresholds,
+    extract_performance_status,
+    extract_pregnancy_exclusion,
+    extract_prior_therapy_exclusion,
+)
+from clinical_trials.structs import StudyEligibility
+from tests.test_clinical_study import SchemaTestCase
+
+CRITERIA = """
+        Inclusion Criteria:
+
+          -  Serum creatinine <= 1.5 x ULN or creatinine clearance >= 60 mL/min
+
+          -  Negative pregnancy test or not of childbearing potential
+
+          -  ANC >= 1.5 x 10^9/L
+
+        Exclusion Criteria:
+
+          -  Pregnant or breastfeeding
+"""
+
+
+class TestLabThresholds(unittest.TestCase):
+
+    def test_anc_per_mm3(self):
+        thresholds = extract_lab_thresholds("ANC ≥ 1500/mm3")
+        self.assertEqual(1, len(thresholds))
+        threshold = thresholds[0]
+        self.assertEqual("ANC", threshold.analyte)
+        self.assertEqual(">=", threshold.operator)
+        self.assertEqual(1500, threshold.value)
+        self.assertEqual(1.5, threshold.normalized_value)
+        self.assertEqual("10^9/L", threshold.normalized_unit)
+
+    def test_multiple_analytes(self):
+        thresholds = extract_lab_thresholds("Absolute neutrophil count ≥ 1.5 x 10^9/L, "
+                                            "platelets ≥ 100,000/µL and hemoglobin > 9 g/dL")
+        self.assertEqual(["ANC", "PLT", "HGB"], [x.analyte for x in thresholds])
+        self.assertEqual([1.5, 100.0, 9.0], [x.normalized_value for x in thresholds])
+
+    def test_lost_superscript(self):
+        thresholds = extract_lab_thresholds("platelet count ≥ 100 x 109/L")
+        self.assertEqual(100.0, thresholds[0].normalized_value)
+
+    def test_uln_multiple(self):
+        thresholds = extract_lab_thresholds("Total bilirubin ≤ 1.5 x ULN")
+        self.assertEqual(1.5, thresholds[0].normalized_value)
+        self.assertEqual("xULN", thresholds[0].normalized_unit)
+
+    def test_glycated_hemoglobin(self):
+        thresholds = extract_lab_thresholds("Glycated hemoglobin ≤ 8%, Hgb A1c < 9% and hemoglobin ≥ 9 g/dL")
+        self.assertEqual([("HGB", 9.0), ("HBA1C", 8.0), ("HBA1C", 9.0)], [(x.analyte, x.value) for x in thresholds])
+        thresholds = extract_lab_thresholds("hemoglobin A1c ≤ 10%")
+        self.assertEqual([("HBA1C", 10.0)], [(x.analyte, x.value) for x in thresholds])
+
+    def test_range_shares_unit(self):
+        thresholds = extract_lab_thresholds("Subjects with an HbA1c level > 7.5 and ≤ 10.0%")
+        self.assertEqual([(">", 7.5), ("<=", 10.0)], [(x.operator, x.normalized_value) for x in thresholds])
+
+
+class TestPerformanceStatus(unittest.TestCase):
+
+    def test_range(self):
+        status = extract_performance_status("ECOG performance status of 0 to 2")[0]
+        self.assertEqual(("ECOG", 0, 2), (status.scale, status.minimum, status.maximum))
+
+    def test_bound(self):
+        status = extract_performance_status("ECOG performance status ≤ 1")[0]
+        self.assertEqual((0, 1), (status.minimum, status.maximum))
+
+    def test_list(self):
+        status = extract_performance_status("ECOG 0, 1 or 2")[0]
+        self.assertEqual((0, 2), (status.minimum, status.maximum))
+
+    def test_karnofsky(self):
+        status = extract_performance_status("Karnofsky performance status of at least 70%")[0]
+        self.assertEqual(("KARNOFSKY", 70, 100), (status.scale, status.minimum, status.maximum))
+
+
+class TestExclusions(unittest.TestCase):
+
+    def test_pregnancy_exclusion(self):
+        self.assertIsNotNone(extract_pregnancy_exclusion("Pregnancy and breastfeeding", EXCLUSION))
+
+    def test_negative_pregnancy_test(self):
+        self.assertIsNotNone(extract_pregnancy_exclusion("Women must have a negative pregnancy test"))
+
+    def test_pregnancy_inclusion(self):
+        self.assertIsNone(extract_pregnancy_exclusion("Pregnant women aged 18 or over"))
+
+    def test_prior_therapy(self):
+        exclusion = extract_prior_therapy_exclusion("Prior treatment with decitabine or azacitidine.", EXCLUSION)
+        self.assertEqual(["decitabine", "azacitidine"], exclusion.therapies)
+
+    def test_prior_therapy_inclusion(self):
+        self.assertIsNone(extract_prior_therapy_exclusion("Prior treatment with decitabine"))
+
+
+class TestAlternatives(unittest.TestCase):
+
+    def test_enumerated_block(self):
+        criteria = ["Age ≥ 18", "At least 1 of the following:", "1. LVEF ≤ 50%", "2. ANC < 1000/mm3",
+                    "ECOG 0-2"]
+        self.assertEqual({2, 3}, alternatives(criteria))
+
+    def test_nested_block_ends_at_enumerator(self):
+        criteria = ["1. Age ≥ 18", "2. Either of:", "a. LVEF ≤ 50%", "b. ANC < 1000/mm3", "3. ECOG 0-2"]
+        self.assertEqual({2, 3}, alternatives(criteria))
+
+    def test_trailing_or(self):
+        self.assertEqual({0, 1}, alternatives(["≥75 years of age OR", "LVEF ≤ 50%", "ECOG 0-2"]))
+
+
+class TestStudyConstraints(SchemaTestCase):
+
+    def test_constraints_668(self):
+        study = self.get_study('NCT01565668')
+        constraints = study.eligibility_constraints
+        self.assertEqual(18.0, constraints.minimum_age)
+        self.assertIsNone(constraints.maximum_age)
+        self.assertEqual(1, len(constraints.performance_status))
+        self.assertEqual((0, 2), (constraints.performance_status[0].minimum,
+                                  constraints.performance_status[0].maximum))
+        self.assertTrue(constraints.excludes_pregnancy)
+        self.assertEqual(["ac220"], constraints.excluded_therapies)
+
+    def test_constraints_alternatives(self):
+        # LVEF ≤50% and transaminases >3 × ULN are alternatives; the creatinine clearance criterion
+        # has an 'or' ("Cockroft-Gault (C-G) or other medically acceptable formulas") so it is not enforced
+        study = self.get_study('NCT02348489')
+        thresholds = study.eligibility_constraints.lab_thresholds
+        self.assertEqual([("LVEF", True), ("TRANSAMINASES", True), ("CRCL", True)],
+                         [(x.analyte, x.alternative) for x in thresholds])
+        index = EligibilityIndex()
+        index.add_study(study)
+        self.assertEqual({'NCT02348489'}, index.candidates(PatientProfile(labs=dict(LVEF=60.0))))
+        self.assertEqual({'NCT02348489'}, index.candidates(PatientProfile(uln_multiples=dict(TRANSAMINASES=1.0))))
+        self.assertEqual({'NCT02348489'}, index.candidates(PatientProfile(labs=dict(CRCL=20.0))))
+
+    def test_constraints_disjunctive_criterion(self):
+        eligibility = StudyEligibility(
+            criteria=dict(textblock=CRITERIA), gender="All", minimum_age="18 Years", maximum_age="N/A"
+        )
+        constraints = extract_constraints(eligibility)
+        self.assertEqual([("CRCL", True), ("CREAT", True), ("ANC", False)],
+                         [(x.analyte, x.alternative) for x in constraints.lab_thresholds])
+        # the negative pregnancy test is one way in, the exclusion still applies on its own
+        self.assertEqual([(INCLUSION, True), (EXCLUSION, False)],
+                         [(x.criterion_type, x.alternative) for x in constraints.pregnancy_exclusions])
+        self.assertTrue(constraints.excludes_pregnancy)
+        index = EligibilityIndex()
+        index.add('NCT00000001', constraints)
+        # creatinine 2 × ULN fails the first branch but creatinine clearance 70 mL/min passes the second
+        patient = PatientProfile(labs=dict(CRCL=70.0, ANC=2.0), uln_multiples=dict(CREAT=2.0))
+        self.assertEqual({'NCT00000001'}, index.candidates(patient))
+        self.assertEqual(set(), index.candidates(PatientProfile(labs=dict(ANC=1.0))))
+
+    def test_constraints_disjunctive_pregnancy(self):
+        eligibility = StudyEligibility(
+            criteria=dict(textblock="""
+        Inclusion Criteria:
+
+          -  Negative pregnancy test or not of childbearing potential
+"""), gender="All", minimum_age="18 Years", maximum_age="N/A"
+        )
+        constraints = extract_constraints(eligibility)
+        self.assertEqual([True], [x.alternative for x in constraints.pregnancy_exclusions])
+        self.assertFalse(constraints.excludes_pregnancy)
+
+    def test_constraints_cached(self):
+        study = self.get_study('NCT01565668')
+        self.assertIs(study.eligibility_constraints, study.eligibility_constraints)
+
+    def test_constraints_no_criteria(self):
+        study = self.get_study('NCT03744546')
+        constraints = study.eligibility_constraints
+        self.assertEqual(40.0, constraints.minimum_age)
+        self.assertEqual([], constraints.lab_thresholds)
+
+
+class TestEligibilityIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = EligibilityIndex()
+        self.index.add("NCT00000001", EligibilityConstraints(
+            minimum_age=18.0, gender="All",
+            lab_thresholds=[LabThreshold(analyte="ANC", operator=">=", value=1500, unit="/mm3",
+                                         normalized_value=1.5, normalized_unit="10^9/L")],
+            performance_status=[PerformanceStatus(scale="ECOG", minimum=0, maximum=1)],
+            pregnancy_exclusions=[PregnancyExclusion(criterion_type=EXCLUSION)],
+        ))
+        self.index.add("NCT00000002", EligibilityConstraints(
+            minimum_age=18.0, maximum_age=65.0, gender="Female",
+            prior_therapy_exclusions=[PriorTherapyExclusion(therapies=["decitabine"])],
+        ))
+        self.index.add("NCT00000003", EligibilityConstraints(
+            maximum_age=16.0, gender="All",
+        ))
+
+    def test_no_attributes(self):
+        self.assertEqual(3, len(self.index.candidates(PatientProfile())))
+
+    def test_age_and_gender(self):
+        candidates = self.index.candidates(PatientProfile(age=70, gender="Male"))
+        self.assertEqual({"NCT00000001"}, candidates)
+        candidates = self.index.candidates(PatientProfile(age=40, gender="Female"))
+        self.assertEqual({"NCT00000001", "NCT00000002"}, candidates)
+
+    def test_lab_threshold(self):
+        self.assertIn("NCT00000001", self.index.candidates(PatientProfile(age=40, labs=dict(ANC=1.8))))
+        self.assertNotIn("NCT00000001", self.index.candidates(PatientProfile(age=40, labs=dict(ANC=1.2))))
+
+    def test_performance_status(self):
+        self.assertIn("NCT00000001", self.index.candidates(PatientProfile(ecog=1)))
+        candidates = self.index.candidates(PatientProfile(ecog=2))
+        self.assertEqual({"NCT00000002", "NCT00000003"}, candidates)
+
+    def test_pregnancy_and_prior_therapy(self):
+        candidates = self.index.candidates(PatientProfile(age=30, pregnant=True, prior_therapies=["Decitabine"]))
+        self.assertEqual(set(), candidates)
+
+    def test_remove(self):
+        self.index.remove("NCT00000001")
+        self.assertNotIn("NCT00000001", self.index)
+        self.assertEqual({"NCT00000002"}, self.index.candidates(PatientProfile(age=40, gender="Female")))
+
+    def test_replace(self):
+        self.index.add("NCT00000001", EligibilityConstraints(minimum_age=80.0))
+        self.assertEqual(3, len(self.index))
+        self.assertNotIn("NCT00000001", self.index.candidates(PatientProfile(age=70, ecog=4)))
+
+
+if __name__ == '__main__':
+    unittest.main()
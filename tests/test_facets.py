@@ -0,0 +1,100 @@
+import random
+import unittest
+
+from clinical_trials.bitmap import ARRAY_LIMIT, Bitmap
+from clinical_trials.facets import FacetIndex, facet_values
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestBitmap(unittest.TestCase):
+
+    def test_operations(self):
+        generator = random.Random(0)
+        # sparse and dense chunks, across several chunks
+        for count in (10, ARRAY_LIMIT * 3, 100000):
+            left = set(generator.randrange(200000) for _ in range(count))
+            right = set(generator.randrange(200000) for _ in range(count // 2))
+            first, second = Bitmap(left), Bitmap(right)
+            self.assertEqual(sorted(left), list(first))
+            self.assertEqual(len(left), len(first))
+            self.assertEqual(sorted(left & right), list(first & second))
+            self.assertEqual(sorted(left | right), list(first | second))
+            self.assertEqual(sorted(left - right), list(first - second))
+            self.assertEqual(len(left & right), first.intersection_count(second))
+
+    def test_add_discard(self):
+        bitmap = Bitmap()
+        for value in range(ARRAY_LIMIT + 10):
+            bitmap.add(value * 2)
+        self.assertIsInstance(bitmap._chunks[0], int)
+        for value in range(20):
+            bitmap.discard(value * 2)
+        self.assertNotIsInstance(bitmap._chunks[0], int)
+        self.assertNotIn(2, bitmap)
+        self.assertIn(40, bitmap)
+        self.assertEqual(ARRAY_LIMIT - 10, len(bitmap))
+
+    def test_range(self):
+        bitmap = Bitmap.range(70000)
+        self.assertEqual(70000, len(bitmap))
+        self.assertIn(69999, bitmap)
+        self.assertNotIn(70000, bitmap)
+
+    def test_no_sharing(self):
+        first = Bitmap([1, 2])
+        union = first | Bitmap([3])
+        union.add(4)
+        self.assertEqual([1, 2], list(first))
+
+
+class TestFacetIndex(SchemaTestCase):
+
+    def setUp(self):
+        self.studies = dict((nct_id, self.get_study(nct_id)) for nct_id in sorted(self.cache))
+        self.index = FacetIndex.build(self.studies.values())
+
+    def scan(self, filters):
+        matched = []
+        for nct_id, study in self.studies.items():
+            values = facet_values(study)
+            if all(values[facet].intersection([wanted] if isinstance(wanted, str) else wanted)
+                   for facet, wanted in filters.items()):
+                matched.append(nct_id)
+        return matched
+
+    def scan_counts(self, filters):
+        counts = dict((facet, {}) for facet in self.index.facets)
+        for nct_id in self.scan(filters):
+            for facet, values in facet_values(self.studies[nct_id]).items():
+                for value in values:
+                    counts[facet][value] = counts[facet].get(value, 0) + 1
+        return counts
+
+    def test_counts(self):
+        for filters in ({}, dict(status="Completed"), dict(phase=["Phase 2", "Phase 3"], agency_class="Other"),
+                        dict(country="United States", intervention_type="Drug"), dict(status="Withdrawn")):
+            self.assertEqual(self.scan_counts(filters), self.index.counts(filters))
+            self.assertEqual(self.scan(filters), self.index.nct_ids(filters))
+
+    def test_values(self):
+        self.assertIn("Recruiting", self.index.values("status"))
+        with self.assertRaises(ValueError):
+            self.index.values("colour")
+
+    def test_update(self):
+        study = self.studies["NCT03211546"]
+        self.assertIn("NCT03211546", self.index.nct_ids(dict(status="Recruiting")))
+        study._data["overall_status"] = "Completed"
+        self.index.add_study(study)
+        self.assertEqual(len(self.studies), len(self.index))
+        self.assertNotIn("NCT03211546", self.index.nct_ids(dict(status="Recruiting")))
+        self.assertEqual(self.scan_counts({}), self.index.counts())
+
+    def test_remove(self):
+        self.index.remove_study("NCT03211546")
+        del self.studies["NCT03211546"]
+        self.assertNotIn("NCT03211546", self.index)
+        self.assertEqual(self.scan_counts({}), self.index.counts())
+        self.assertEqual(self.scan({}), self.index.nct_ids())
+        with self.assertRaises(KeyError):
+            self.index.remove_study("NCT03211546")
@@ -0,0 +1,146 @@
+import gc
+import os
+import tempfile
+import unittest
+import weakref
+
+from clinical_trials.geo import (Gazetteer, LocationIndex, LocationIndexBuilder, country_code, get_local_gazetteer,
+                                 haversine, normalize_place)
+from clinical_trials.structs import Address
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_country_code(self):
+        self.assertEqual("US", country_code("United States"))
+        self.assertEqual("KR", country_code("Korea, Republic of"))
+        self.assertEqual("DE", country_code("DE"))
+        self.assertIsNone(country_code("Atlantis"))
+
+    def test_normalize_place(self):
+        self.assertEqual("paris", normalize_place("Paris Cedex 10"))
+        self.assertEqual("gottingen", normalize_place("Göttingen"))
+        self.assertEqual("st louis", normalize_place("St. Louis"))
+
+    def test_haversine(self):
+        # London to Paris
+        self.assertAlmostEqual(343.5, haversine(51.5074, -0.1278, 48.8566, 2.3522), delta=1.0)
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = get_local_gazetteer()
+
+    def test_postal_code(self):
+        self.assertIsNotNone(self.gazetteer.lookup_postal_code("United States", "02115-1234"))
+        # leading zero dropped in the record
+        self.assertEqual(self.gazetteer.lookup_postal_code("Germany", "01307"),
+                         self.gazetteer.lookup_postal_code("Germany", "1307"))
+        # Canadian forward sortation area
+        self.assertIsNotNone(self.gazetteer.lookup_postal_code("Canada", "K1H 8L1"))
+
+    def test_place(self):
+        self.assertIsNotNone(self.gazetteer.lookup_place("Switzerland", "Zürich"))
+        self.assertIsNone(self.gazetteer.lookup_place("Switzerland", "Atlantis"))
+
+    def test_geocode_falls_back_to_place(self):
+        address = Address.from_dict(dict(city="Tübingen", country="Germany", zip="00000"))
+        self.assertIsNotNone(self.gazetteer.geocode(address))
+
+    def test_from_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "gazetteer.txt")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("FR\t75010\tParis\tÎle-de-France\t\t\t\t\t\t48.8760\t2.3590\t4\n")
+            fh.write("malformed\n")
+        gazetteer = Gazetteer.from_file(path)
+        self.assertEqual(1, len(gazetteer))
+        self.assertEqual((48.876, 2.359), gazetteer.lookup_place("France", "Paris Cedex 10"))
+
+
+class TestLocationIndex(SchemaTestCase):
+
+    def setUp(self):
+        self.index = LocationIndex.build(self.get_study(nct_id) for nct_id in sorted(self.cache))
+
+    def test_radius(self):
+        # Boston
+        hits = self.index.within_radius(42.3601, -71.0589, 50)
+        self.assertIn('NCT03211546', [hit.nct_id for hit in hits])
+        distances = [hit.distance for hit in hits]
+        self.assertEqual(sorted(distances), distances)
+        self.assertTrue(all(distance <= 50 for distance in distances))
+
+    def test_radius_matches_scan(self):
+        gazetteer = get_local_gazetteer()
+        expected = set()
+        for nct_id in self.cache:
+            for offset, location in enumerate(self.get_study(nct_id).locations or []):
+                point = gazetteer.geocode(location.facility.address)
+                if point and haversine(50.0, 10.0, point[0], point[1]) <= 500:
+                    expected.add((nct_id, offset))
+        hits = self.index.within_radius(50.0, 10.0, 500)
+        self.assertTrue(expected)
+        self.assertEqual(expected, set((hit.nct_id, hit.location) for hit in hits))
+
+    def test_status_filter(self):
+        # Ottawa is recruiting, Toronto is not yet
+        hits = self.index.within_radius(45.4215, -75.6972, 400, statuses=["Recruiting"])
+        self.assertEqual(['NCT03211546'], [hit.nct_id for hit in hits])
+        self.assertEqual(4, hits[0].location)
+        hits = self.index.within_radius(45.4215, -75.6972, 400, statuses="Not yet recruiting")
+        self.assertTrue(hits)
+        self.assertTrue(all(hit.status == "Not yet recruiting" for hit in hits))
+
+    def test_bbox(self):
+        hits = self.index.within_bbox(45.0, 5.0, 48.0, 11.0)
+        self.assertEqual({'Bern', 'Zürich'},
+                         set(self.get_study(hit.nct_id).locations[hit.location].facility.address.city
+                             for hit in hits if hit.nct_id == 'NCT03211546'))
+
+    def test_bbox_antimeridian(self):
+        self.assertEqual([], self.index.within_bbox(-60.0, 170.0, 60.0, -170.0))
+        hits = self.index.within_bbox(-90.0, 0.0, 90.0, -0.0001)
+        self.assertEqual(len(self.index.within_bbox(-90.0, -180.0, 90.0, 180.0)), len(hits))
+
+    def test_studies_within_radius(self):
+        studies = self.index.studies_within_radius(51.0, 10.0, 1000)
+        nct_ids = [nct_id for nct_id, _ in studies]
+        self.assertEqual(len(set(nct_ids)), len(nct_ids))
+        self.assertIn('NCT03211546', nct_ids)
+
+    def test_save_and_load(self):
+        path = os.path.join(tempfile.mkdtemp(), "locations.idx")
+        self.index.save(path)
+        with LocationIndex.load(path) as loaded:
+            self.assertEqual(len(self.index), len(loaded))
+            expected = [(hit.nct_id, hit.location, hit.distance) for hit in self.index.within_radius(50.0, 10.0, 800)]
+            actual = [(hit.nct_id, hit.location, hit.distance) for hit in loaded.within_radius(50.0, 10.0, 800)]
+            self.assertEqual(expected, actual)
+
+    def test_builder(self):
+        builder = LocationIndexBuilder()
+        for nct_id in sorted(self.cache):
+            study = self.get_study(nct_id)
+            reference = weakref.ref(study)
+            builder.add_study(study)
+            del study
+            gc.collect()
+            # only the points of the study are kept
+            self.assertIsNone(reference())
+        index = builder.build()
+        self.assertEqual(self.index.nct_ids, index.nct_ids)
+        self.assertEqual([(hit.nct_id, hit.location) for hit in self.index.within_radius(50.0, 10.0, 800)],
+                         [(hit.nct_id, hit.location) for hit in index.within_radius(50.0, 10.0, 800)])
+
+    def test_load_rejects_other_files(self):
+        path = os.path.join(tempfile.mkdtemp(), "locations.idx")
+        with open(path, "wb") as fh:
+            fh.write(b"\0" * 128)
+        with self.assertRaises(ValueError):
+            LocationIndex.load(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ import unittest
 import mock
 
 from clinical_trials.clinical_study import ClinicalStudy
-from clinical_trials.helpers import process_eligibility, yes_no_enum
+from clinical_trials.helpers import normalize_textblock, parse_age, process_eligibility, process_textblock, yes_no_enum
 from tests.test_clinical_study import SchemaTestCase
 
 
@@ -24,6 +24,41 @@ class TestYesNoEnum(SchemaTestCase):
         self.assertEqual(str(exc.exception), "Unable to process value of type <class 'int'>")
 
 
+class TestNormalizeTextblock(unittest.TestCase):
+
+    def test_collapses_lines(self):
+        content = "\n      Para one\n      continues   \n\n      Para two\r\n      ends\n    "
+        self.assertEqual("Para one continues Para two ends", normalize_textblock(content))
+
+    def test_whitespace_only_lines(self):
+        # process_textblock used to join the stripped lines, so a line of spaces between two lines
+        # left a double space ('Para one  Para two'); those lines are dropped now
+        content = "\n      Para one\n      \n      Para two\n    "
+        self.assertEqual("Para one Para two", normalize_textblock(content))
+        self.assertEqual("Para one Para two", process_textblock(content))
+
+    def test_paragraphs(self):
+        content = "\n      Para one\n      continues   \n\n   \n      Para two\r\n      ends\n    "
+        self.assertEqual("Para one continues\n\nPara two ends", normalize_textblock(content, paragraphs=True))
+
+    def test_empty(self):
+        self.assertEqual("", normalize_textblock(""))
+        self.assertEqual("", normalize_textblock(None))
+
+
+class TestParseAge(unittest.TestCase):
+
+    def test_years(self):
+        self.assertEqual(18.0, parse_age("18 Years"))
+
+    def test_months(self):
+        self.assertEqual(2.5, parse_age("30 Months"))
+
+    def test_not_applicable(self):
+        self.assertIsNone(parse_age("N/A"))
+        self.assertIsNone(parse_age(None))
+
+
 class TestEligibility(SchemaTestCase):
     def test_parsed_inclusion_668(self):
         with mock.patch('clinical_trials.clinical_study.get_schema') as donk:
@@ -100,6 +135,11 @@ class TestEligibility(SchemaTestCase):
             self.assertEqual(8, len(processed.get('inclusion')))
             self.assertEqual(5, len(processed.get('exclusion')))
 
+    def test_parsed_unterminated(self):
+        # no blank line before the exclusion header or at the end of the block
+        processed = process_eligibility("Inclusion Criteria:\n- Age >= 18\nExclusion Criteria:\n- Pregnant")
+        self.assertEqual(dict(inclusion=["- Age >= 18"], exclusion=["- Pregnant"]), processed)
+
 
 class TestTextBlock(SchemaTestCase):
 
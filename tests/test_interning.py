@@ -0,0 +1,59 @@
+import unittest
+
+import mock
+
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.interning import InternTable, enum_elements
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestEnumElements(SchemaTestCase):
+
+    def test_enum_elements(self):
+        elements = enum_elements(self.schema)
+        self.assertTrue({"overall_status", "phase", "study_type", "status", "intervention_type", "agency_class",
+                         "gender", "sampling_method"} <= elements)
+        self.assertNotIn("brief_title", elements)
+
+
+class TestInternTable(SchemaTestCase):
+
+    def decode(self, nct_id, table, lazy=False):
+        with mock.patch('clinical_trials.clinical_study.get_schema') as donk:
+            donk.return_value = self.schema
+            return ClinicalStudy.from_content(self.cache.get(nct_id), lazy=lazy, intern_table=table)
+
+    def test_shared_values(self):
+        table = InternTable(self.schema)
+        first = self.decode('NCT03211546', table)
+        second = self.decode('NCT03211546', table)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.locations[0].status, second.locations[0].status)
+        self.assertIs(first.locations[0].facility.address.country, second.locations[0].facility.address.country)
+
+    def test_unchanged_values(self):
+        table = InternTable(self.schema)
+        for nct_id in self.cache:
+            self.assertEqual(self.get_study(nct_id)._data, self.decode(nct_id, table)._data)
+
+    def test_lazy(self):
+        table = InternTable(self.schema)
+        first = self.decode('NCT03211546', table, lazy=True)
+        second = self.decode('NCT03211546', table)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.locations[1].facility.address.city, second.locations[1].facility.address.city)
+
+    def test_free_text_not_interned(self):
+        table = InternTable(self.schema)
+        self.decode('NCT03211546', table)
+        self.assertNotIn(self.get_study('NCT03211546').brief_title, table)
+
+    def test_explicit_elements(self):
+        table = InternTable(elements=["country"])
+        data = table.intern_record(dict(location=[dict(facility=dict(address=dict(country="Germany", city="Ulm")))]))
+        self.assertEqual(1, len(table))
+        self.assertIn("Germany", table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+import mock
+
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.lazy import LazyStudyData, index_sections
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestIndexSections(unittest.TestCase):
+
+    def test_offsets(self):
+        content = b'<?xml version="1.0"?>\n<root rank="1">\n  <a>x<b/></a>\n  <c/>\n  <a>y</a>\n</root>'
+        attributes, sections = index_sections(content)
+        self.assertEqual({"@rank": "1"}, attributes)
+        self.assertEqual(["a", "c"], list(sections))
+        self.assertEqual([b"<a>x<b/></a>", b"<a>y</a>"], [content[start:end] for start, end in sections["a"]])
+        self.assertEqual([b"<c/>"], [content[start:end] for start, end in sections["c"]])
+
+    def test_gt_in_attribute(self):
+        content = b"""<root>\n  <a note="1 > 0" alt='x/>'/>\n  <b note="a>b">t</b>\n  <c\n    k = "v" />\n</root>"""
+        _, sections = index_sections(content)
+        self.assertEqual(dict(a=[b"""<a note="1 > 0" alt='x/>'/>"""], b=[b'<b note="a>b">t</b>'],
+                              c=[b'<c\n    k = "v" />']),
+                         dict((name, [content[start:end] for start, end in spans]) for name, spans in sections.items()))
+
+
+class TestLazyStudyData(SchemaTestCase):
+
+    def test_matches_full_decode(self):
+        for nct_id, content in self.cache.items():
+            self.assertEqual(self.schema.to_dict(content.decode("utf-8")), LazyStudyData(content, self.schema),
+                             nct_id)
+
+    def test_document_order(self):
+        content = self.cache.get('NCT03211546')
+        data = LazyStudyData(content, self.schema)
+        data["location"]
+        self.assertEqual(list(self.schema.to_dict(content.decode("utf-8"))), list(data))
+
+    def test_decodes_on_access(self):
+        data = LazyStudyData(self.cache.get('NCT02348489'), self.schema)
+        self.assertEqual([], data.decoded)
+        self.assertIn("location", data)
+        self.assertEqual([], data.decoded)
+        self.assertEqual("Active, not recruiting", data["overall_status"])
+        self.assertEqual(["overall_status"], data.decoded)
+        self.assertIsNone(data.get("why_stopped"))
+        with self.assertRaises(KeyError):
+            data["why_stopped"]
+
+    def test_study_properties(self):
+        full = self.get_study('NCT02348489')
+        with mock.patch('clinical_trials.clinical_study.get_schema') as donk:
+            donk.return_value = self.schema
+            study = ClinicalStudy.from_content(self.cache.get('NCT02348489'), lazy=True)
+        self.assertIsInstance(study._data, LazyStudyData)
+        self.assertEqual(full.nct_id, study.nct_id)
+        self.assertEqual(full.status, study.status)
+        self.assertEqual(full.phase, study.phase)
+        self.assertEqual(full.trail.last_update_posted, study.trail.last_update_posted)
+        self.assertNotIn("location", study._data.decoded)
+        self.assertNotIn("clinical_results", study._data.decoded)
+        self.assertEqual(len(full.locations), len(study.locations))
+        self.assertIn("location", study._data.decoded)
+
+
+if __name__ == '__main__':
+    unittest.main()
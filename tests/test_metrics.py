@@ -0,0 +1,143 @@
+import logging
+import unittest
+
+import mock
+import requests_mock
+
+from clinical_trials import metrics
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.connector import get_study
+from tests.test_clinical_study import SchemaTestCase
+
+
+class MetricsTestCase(SchemaTestCase):
+
+    def setUp(self):
+        self.sink = metrics.MemorySink()
+        self.previous = metrics.set_sink(self.sink)
+
+    def tearDown(self):
+        metrics.set_sink(self.previous)
+
+
+class TestDisabled(unittest.TestCase):
+
+    def test_null_timer(self):
+        previous = metrics.set_sink(None)
+        try:
+            self.assertFalse(metrics.enabled())
+            with metrics.timer("stage") as timer:
+                timer.size = 10
+            self.assertIs(metrics.NULL_TIMER, timer)
+            metrics.record("stage", 1.0)
+            metrics.cache_lookup("cache", True)
+        finally:
+            metrics.set_sink(previous)
+
+    def test_timed_preserves_function(self):
+        @metrics.timed("stage")
+        def add(a, b):
+            """adds"""
+            return a + b
+
+        self.assertEqual(3, add(1, 2))
+        self.assertEqual("add", add.__name__)
+        self.assertEqual("adds", add.__doc__)
+
+
+class TestMemorySink(MetricsTestCase):
+
+    def test_stages(self):
+        with metrics.timer("stage") as timer:
+            timer.size = 10
+        metrics.record("stage", 0.5, 5)
+        stats = self.sink.snapshot()["stages"]["stage"]
+        self.assertEqual(2, stats["count"])
+        self.assertEqual(15, stats["bytes"])
+        self.assertEqual(0.5, stats["max"])
+
+    def test_timed_records_failures(self):
+        @metrics.timed("failing")
+        def fail():
+            raise ValueError("nope")
+
+        with self.assertRaises(ValueError):
+            fail()
+        self.assertEqual(1, self.sink.stages["failing"].count)
+
+    def test_hit_ratio(self):
+        for hit in (True, True, True, False):
+            metrics.cache_lookup("cache", hit)
+        self.assertEqual(0.75, self.sink.hit_ratio("cache"))
+        self.assertEqual(0.0, self.sink.hit_ratio("unknown"))
+
+    def test_reset(self):
+        metrics.record("stage", 0.5)
+        self.sink.reset()
+        self.assertEqual({}, self.sink.snapshot()["stages"])
+
+
+class TestInstrumentation(MetricsTestCase):
+
+    def test_parse_and_struct(self):
+        study = self.get_study('NCT03211546')
+        study.locations
+        study.brief_summary
+        study.brief_summary
+        snapshot = self.sink.snapshot()
+        self.assertEqual(len(self.cache.get('NCT03211546')), snapshot["stages"]["parse.to_dict"]["bytes"])
+        self.assertEqual(1, snapshot["stages"]["struct.locations"]["count"])
+        self.assertEqual(0.5, snapshot["caches"]["textblock"]["ratio"])
+
+    def test_lazy(self):
+        with mock.patch('clinical_trials.clinical_study.get_schema') as donk:
+            donk.return_value = self.schema
+            study = ClinicalStudy.from_content(self.cache.get('NCT03211546'), lazy=True)
+        study.status
+        snapshot = self.sink.snapshot()["stages"]
+        self.assertEqual(1, snapshot["parse.index"]["count"])
+        self.assertEqual(1, snapshot["parse.section"]["count"])
+        self.assertNotIn("parse.to_dict", snapshot)
+
+    def test_connector(self):
+        with requests_mock.Mocker() as m:
+            m.get("https://clinicaltrials.gov/ct2/show/NCT03211546?displayxml=True",
+                  content=self.cache.get('NCT03211546'))
+            get_study('NCT03211546')
+        stats = self.sink.snapshot()["stages"]["connector.get_study"]
+        self.assertEqual(len(self.cache.get('NCT03211546')), stats["bytes"])
+
+
+class TestSinks(unittest.TestCase):
+
+    def test_prometheus(self):
+        sink = metrics.PrometheusSink()
+        sink.record("parse.to_dict", 0.25, 100)
+        sink.record("parse.to_dict", 0.25, 100)
+        sink.cache('text"block', False)
+        text = sink.render()
+        self.assertIn("# TYPE clinical_trials_stage_seconds_total counter", text)
+        self.assertIn('clinical_trials_stage_seconds_total{stage="parse.to_dict"} 0.5', text)
+        self.assertIn('clinical_trials_stage_bytes_total{stage="parse.to_dict"} 200', text)
+        self.assertIn('clinical_trials_cache_misses_total{cache="text\\"block"} 1', text)
+
+    def test_logging(self):
+        log = logging.getLogger("tests.metrics")
+        with mock.patch.object(log, "log") as logged:
+            sink = metrics.LoggingSink(log, logging.INFO)
+            sink.record("stage", 0.5, 10)
+            sink.cache("cache", True)
+        self.assertEqual(2, logged.call_count)
+        self.assertEqual(logging.INFO, logged.call_args_list[0][0][0])
+
+    def test_multi(self):
+        first, second = metrics.MemorySink(), metrics.MemorySink()
+        sink = metrics.MultiSink(first, second)
+        sink.record("stage", 0.5, 10)
+        sink.cache("cache", True)
+        self.assertEqual(1, first.stages["stage"].count)
+        self.assertEqual(1.0, second.hit_ratio("cache"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from clinical_trials.projection import Projection, project
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestProjection(SchemaTestCase):
+
+    FIELDS = ["nct_id", "status", "phase", "conditions", "sponsors.lead_sponsor.agency", "last_update_posted"]
+
+    def test_extract(self):
+        projection = Projection(self.FIELDS, schema=self.schema)
+        study = self.get_study('NCT02348489')
+        row = projection.extract(self.cache.get('NCT02348489'))
+        self.assertEqual((study.nct_id, study.status, study.phase, study.conditions(),
+                          study._data["sponsors"]["lead_sponsor"]["agency"]), row[:5])
+        self.assertEqual(study._data["last_update_posted"], row[5])
+
+    def test_extract_dict(self):
+        projection = Projection(["nct_id", "id_info.org_study_id", "why_stopped"], schema=self.schema)
+        study = self.get_study('NCT02348489')
+        self.assertEqual({"nct_id": 'NCT02348489', "id_info.org_study_id": study.study_id, "why_stopped": "N/A"},
+                         projection.extract_dict(self.cache.get('NCT02348489')))
+
+    def test_only_needed_sections_decoded(self):
+        projection = Projection(["nct_id", "status"], schema=self.schema)
+        study = projection.study(self.cache.get('NCT02348489'))
+        projection._getters[0](study)
+        projection._getters[1](study)
+        self.assertEqual(["id_info", "overall_status"], study._data.decoded)
+
+    def test_missing_path(self):
+        projection = Projection(["why_stopped", "patient_data.sharing_ipd"], schema=self.schema)
+        self.assertEqual(("N/A", None), projection.extract(self.cache.get('NCT02348489')))
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            Projection(["colour"], schema=self.schema)
+        with self.assertRaises(ValueError):
+            Projection(["_data"], schema=self.schema)
+        for field in ("from_file", "iter_from_api", "get_arm_by_label", "to_json", "add_locations", "add_outcomes",
+                      "add_responsible_parties", "add_study_trail"):
+            with self.assertRaises(ValueError):
+                Projection([field], schema=self.schema)
+
+    def test_method_field(self):
+        projection = Projection(["conditions", "to_dict"], schema=self.schema)
+        study = self.get_study('NCT02348489')
+        self.assertEqual((study.conditions(), study.to_dict()), projection.extract(self.cache.get('NCT02348489')))
+
+    def test_project(self):
+        contents = [self.cache.get(nct_id) for nct_id in sorted(self.cache)]
+        rows = list(project(contents, ["nct_id", "status"], schema=self.schema))
+        self.assertEqual(sorted(self.cache), [nct_id for nct_id, _ in rows])
+        rows = list(project(contents, ["nct_id"], schema=self.schema, as_dict=True))
+        self.assertEqual(sorted(self.cache), [row["nct_id"] for row in rows])
+
+
+if __name__ == '__main__':
+    unittest.main()
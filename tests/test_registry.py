@@ -0,0 +1,137 @@
+import unittest
+
+from clinical_trials.registry import EntityRegistry, facility_tokens, parse_person_name
+from clinical_trials.structs import Facility, Investigator
+from tests.test_clinical_study import SchemaTestCase
+
+
+def facility(name, city="Boston", state="Massachusetts", zip="02114", country="United States"):
+    return Facility(name=name, address=dict(city=city, state=state, zip=zip, country=country))
+
+
+class TestHelpers(unittest.TestCase):
+
+    def test_facility_tokens(self):
+        self.assertEqual(facility_tokens("Massachusetts General Hosp.", "Boston"),
+                         facility_tokens("The Massachusetts General Hospital, Boston", "Boston"))
+
+    def test_parse_person_name(self):
+        self.assertEqual(("jan", "willem", "greve"),
+                         parse_person_name(Investigator(last_name="Jan Willem Greve, MD")))
+        self.assertEqual(("guy", "", "gammon"),
+                         parse_person_name(Investigator(last_name="Dr. Guy Gammon, MB, BS, MRCP")))
+        self.assertEqual(("anna", "", "smith"),
+                         parse_person_name(Investigator(first_name="Anna", last_name="Smith")))
+
+
+class TestEntityRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = EntityRegistry()
+
+    def test_facility_variants(self):
+        first = self.registry.intern_facility(facility("Massachusetts General Hospital"))
+        second = self.registry.intern_facility(facility("Massachusetts General Hosp., Boston"))
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.registry.sites))
+        site = self.registry.sites[first.site_id]
+        self.assertEqual(2, site.count)
+        self.assertEqual(2, len(site.names))
+
+    def test_distinct_facilities(self):
+        first = self.registry.intern_facility(facility("Massachusetts General Hospital"))
+        second = self.registry.intern_facility(facility("Dana-Farber Cancer Institute"))
+        self.assertIsNot(first, second)
+        self.assertNotEqual(first.site_id, second.site_id)
+
+    def test_blocked_by_city(self):
+        first = self.registry.intern_facility(facility("Mayo Clinic", city="Rochester", state="Minnesota"))
+        second = self.registry.intern_facility(facility("Mayo Clinic", city="Jacksonville", state="Florida"))
+        self.assertNotEqual(first.site_id, second.site_id)
+
+    def test_stable_ids(self):
+        site_id = self.registry.intern_facility(facility("Massachusetts General Hospital")).site_id
+        other = EntityRegistry()
+        other.intern_facility(facility("Dana-Farber Cancer Institute"))
+        self.assertEqual(site_id, other.site_id(facility("Massachusetts General Hospital")))
+
+    def test_ids_permanent(self):
+        # the second name joins the site of the first, the third would match the second but not the
+        # first (a site is matched on its first variant) so it makes a site of its own
+        names = ["Alpha Bravo Charlie Delta", "Alpha Bravo Charlie Delta Echo",
+                 "Alpha Bravo Charlie Delta Echo Foxtrot"]
+        facilities = [self.registry.intern_facility(facility(name)) for name in names]
+        site_ids = [x.site_id for x in facilities]
+        self.assertIs(facilities[0], facilities[1])
+        self.assertEqual(2, len(set(site_ids)))
+        # variants resolved later join a site without changing the identifier already handed out
+        self.registry.intern_facility(facility("Alpha Bravo Charlie"))
+        self.assertEqual(site_ids, [x.site_id for x in facilities])
+        self.assertEqual(sorted(set(site_ids)), sorted(self.registry.sites))
+        first = self.registry.intern_investigator(Investigator(last_name="J Greve", role="Principal Investigator"))
+        investigator_id = first.investigator_id
+        second = self.registry.intern_investigator(Investigator(last_name="Jan Willem Greve",
+                                                                role="Principal Investigator"))
+        self.assertIs(first, second)
+        self.assertEqual(investigator_id, second.investigator_id)
+        self.assertEqual([investigator_id], list(self.registry.people))
+        self.assertEqual("jan willem greve", self.registry.people[investigator_id].name)
+
+    def test_shared_address(self):
+        first = self.registry.intern_address(facility("A").address)
+        second = self.registry.intern_address(facility("B").address)
+        self.assertIs(first, second)
+
+    def test_investigator_variants(self):
+        first = self.registry.intern_investigator(Investigator(last_name="Jan Willem Greve, MD",
+                                                               role="Principal Investigator"))
+        second = self.registry.intern_investigator(Investigator(first_name="J", last_name="Greve",
+                                                                role="Principal Investigator"))
+        self.assertIs(first, second)
+        self.assertEqual(first.investigator_id, self.registry.investigator_id(Investigator(last_name="Jan Greve")))
+        self.assertEqual(1, len(self.registry.people))
+
+    def test_investigator_roles(self):
+        first = self.registry.intern_investigator(Investigator(last_name="Su Chi Lim, MBBS",
+                                                               role="Principal Investigator"))
+        second = self.registry.intern_investigator(Investigator(last_name="Su Chi Lim, MBBS",
+                                                                role="Sub-Investigator"))
+        self.assertIsNot(first, second)
+        self.assertEqual(first.investigator_id, second.investigator_id)
+
+    def test_count_without_surname(self):
+        for _ in range(2):
+            person = self.registry.resolve_person(Investigator(last_name="MD"))
+        self.assertEqual(2, person.count)
+
+    def test_different_people(self):
+        first = self.registry.investigator_id(Investigator(last_name="Chee Fang Sum"))
+        second = self.registry.investigator_id(Investigator(last_name="Chun Hai Sum"))
+        self.assertNotEqual(first, second)
+
+
+class TestInternStudy(SchemaTestCase):
+
+    def test_intern_corpus(self):
+        registry = EntityRegistry()
+        studies = list(registry.intern_studies(self.get_study(nct_id) for nct_id in sorted(self.cache)))
+        facilities = [location.facility for study in studies for location in study.locations or []]
+        self.assertTrue(all(facility.site_id in registry.sites for facility in facilities))
+        self.assertLessEqual(len(registry.sites), len(facilities))
+        for study in studies:
+            for official in study.overall_officials:
+                self.assertIn(official.investigator_id, registry.people)
+
+    def test_repeat_study_shares_objects(self):
+        registry = EntityRegistry()
+        first = registry.intern_study(self.get_study('NCT03211546'))
+        second = registry.intern_study(self.get_study('NCT03211546'))
+        for left, right in zip(first.locations, second.locations):
+            self.assertIs(left.facility, right.facility)
+            self.assertIs(left.facility.address, right.facility.address)
+        for left, right in zip(first.overall_officials, second.overall_officials):
+            self.assertIs(left, right)
+
+
+if __name__ == '__main__':
+    unittest.main()
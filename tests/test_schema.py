@@ -1,8 +1,24 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
+from xmlschema import XMLSchema
 
-from clinical_trials.schema import get_local_schema
+from clinical_trials import bulk
+from clinical_trials.schema import (
+    SchemaRegistry,
+    document_version,
+    get_local_schema,
+    get_registry,
+    local_schema_location,
+    record_date,
+    schema_version,
+)
+from tests.test_clinical_study import warmup_cache
 
 
 class TestGetLocalSchema(unittest.TestCase):
@@ -13,3 +29,85 @@ class TestGetLocalSchema(unittest.TestCase):
                 schema = get_local_schema()
             self.assertEqual("Unable to locate schema document", str(exc.exception))
 
+
+class TestSchemaRegistry(unittest.TestCase):
+
+    VERSIONS = ("2015.01.01", "2017.01.01", "2018.06.01", "2020.05.08")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache = warmup_cache()
+        cls.directory = tempfile.mkdtemp()
+        with open(local_schema_location()) as fh:
+            document = fh.read()
+        cls.locations = {}
+        for version in cls.VERSIONS:
+            name = "public.xsd" if version == cls.VERSIONS[-1] else "public-{}.xsd".format(version)
+            cls.locations[version] = os.path.join(cls.directory, name)
+            with open(cls.locations[version], "w") as fh:
+                fh.write(document.replace("Version: 2020.05.08", "Version: {}".format(version), 1))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def registry(self):
+        with mock.patch("clinical_trials.schema.local_schema_location") as location:
+            location.return_value = self.locations[self.VERSIONS[-1]]
+            return get_registry()
+
+    def test_schema_version(self):
+        self.assertEqual("2020.05.08", schema_version(local_schema_location()))
+        self.assertEqual("2017.01.01", schema_version(self.locations["2017.01.01"]))
+
+    def test_document_version(self):
+        self.assertEqual("2020.05.08", document_version(get_local_schema()))
+        with open(self.locations["2017.01.01"]) as fh:
+            self.assertEqual("2017.01.01", document_version(XMLSchema(fh)))
+        with self.assertRaises(ValueError):
+            document_version(XMLSchema(io.StringIO(get_local_schema().source.get_text())))
+
+    def test_record_date(self):
+        self.assertEqual(datetime.date(2018, 5, 11), record_date(self.cache["NCT01565668"]))
+        # the header laid out over several lines
+        self.assertEqual(datetime.date(2019, 6, 11), record_date(memoryview(self.cache["NCT03982511"])))
+        self.assertIsNone(record_date(b"<clinical_study><required_header/></clinical_study>"))
+
+    def test_versions(self):
+        registry = self.registry()
+        self.assertEqual(list(self.VERSIONS), registry.versions)
+        self.assertEqual("2020.05.08", registry.latest)
+        self.assertIn("2015.01.01", registry)
+        with self.assertRaises(ValueError):
+            registry.get("2016.01.01")
+        with self.assertRaises(ValueError):
+            SchemaRegistry().latest
+
+    def test_version_for(self):
+        registry = self.registry()
+        # older than every revision but the first
+        self.assertEqual("2017.01.01", registry.version_for(self.cache["NCT01565668"]))
+        self.assertEqual("2018.06.01", registry.version_for(self.cache["NCT03211546"]))
+        self.assertEqual("2018.06.01", registry.version_for(self.cache["NCT03982511"]))
+        self.assertEqual("2020.05.08", registry.version_for(b"<clinical_study/>"))
+        registry = SchemaRegistry([self.locations["2018.06.01"]])
+        self.assertEqual("2018.06.01", registry.version_for(self.cache["NCT01565668"]))
+
+    def test_compiled_once(self):
+        registry = SchemaRegistry([self.locations["2020.05.08"]])
+        schema = registry.get()
+        version, routed = registry.schema_for(self.cache["NCT03211546"])
+        self.assertEqual("2020.05.08", version)
+        self.assertIs(schema, routed)
+        registry.register(self.locations["2020.05.08"], schema=schema)
+        self.assertIs(schema, registry.get("2020.05.08"))
+
+    def test_bulk_routing(self):
+        registry = self.registry()
+        with mock.patch("clinical_trials.bulk.get_registry") as get:
+            get.return_value = registry
+            decoded = dict(bulk.decode_records(sorted(self.cache.items())))
+        self.assertEqual(sorted(self.cache), sorted(decoded))
+        self.assertEqual("Recruiting", decoded["NCT03211546"].status)
+        # only the revisions the records need are compiled, and the newest for the projections
+        self.assertEqual(["2017.01.01", "2018.06.01", "2020.05.08"], sorted(registry._schemas))
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from clinical_trials.search import StudySearchIndex, study_document, phrase
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestStudyDocument(SchemaTestCase):
+
+    def test_document_fields(self):
+        study = self.get_study('NCT01565668')
+        document = study_document(study)
+        self.assertIn("Quizartinib", document["brief_title"])
+        self.assertIn("Leukemia, Myeloid, Acute", document["conditions"])
+        self.assertIn("ECOG performance status of 0 to 2", document["criteria"])
+        self.assertTrue(document["outcomes"])
+
+    def test_phrase(self):
+        self.assertEqual('"acute ""myeloid"" leukemia"', phrase('acute "myeloid" leukemia'))
+
+
+class TestStudySearchIndex(SchemaTestCase):
+
+    def setUp(self):
+        self.index = StudySearchIndex()
+        self.index.add_studies(self.get_study(nct_id) for nct_id in sorted(self.cache))
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_bulk_load(self):
+        self.assertEqual(len(self.cache), len(self.index))
+        self.assertIn('NCT01565668', self.index)
+
+    def test_search(self):
+        results = [nct_id for nct_id, _ in self.index.search("leukemia")]
+        self.assertEqual({'NCT01565668', 'NCT02348489', 'NCT03723057'}, set(results))
+
+    def test_ranking(self):
+        results = self.index.search("diabetes")
+        scores = [score for _, score in results]
+        self.assertEqual(sorted(scores, reverse=True), scores)
+
+    def test_phrase_query(self):
+        results = [nct_id for nct_id, _ in self.index.search("pulmonary hypertension", exact_phrase=True)]
+        self.assertEqual(['NCT02536534'], results)
+
+    def test_field_restriction(self):
+        results = [nct_id for nct_id, _ in self.index.search("pregnancy", fields=["brief_title"])]
+        self.assertEqual([], results)
+        results = [nct_id for nct_id, _ in self.index.search("pregnancy", fields=["criteria"])]
+        self.assertIn('NCT01565668', results)
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.index.search("pregnancy", fields=["colour"])
+
+    def test_boosts(self):
+        default = self.index.search("leukemia")
+        boosted = self.index.search("leukemia", boosts=dict(brief_title=0.0, conditions=0.0, official_title=0.0,
+                                                            detailed_description=100.0))
+        self.assertNotEqual(dict(default), dict(boosted))
+
+    def test_incremental_update(self):
+        self.index.add_document('NCT01565668', dict(brief_title="Zanzibar title"))
+        self.assertEqual(len(self.cache), len(self.index))
+        self.assertNotIn('NCT01565668', [nct_id for nct_id, _ in self.index.search("leukemia")])
+        self.assertEqual(['NCT01565668'], [nct_id for nct_id, _ in self.index.search("zanzibar")])
+
+    def test_remove(self):
+        self.index.remove('NCT02348489')
+        self.assertNotIn('NCT02348489', self.index)
+        self.assertNotIn('NCT02348489', [nct_id for nct_id, _ in self.index.search("leukemia")])
+
+
+class TestPersistence(SchemaTestCase):
+
+    def test_reopen(self):
+        path = os.path.join(tempfile.mkdtemp(), "search.db")
+        with StudySearchIndex(path) as index:
+            index.add_study(self.get_study('NCT02536534'))
+        with StudySearchIndex(path) as index:
+            self.assertEqual(1, len(index))
+            self.assertEqual(['NCT02536534'], [nct_id for nct_id, _ in index.search("fitbit")])
+
+
+if __name__ == '__main__':
+    unittest.main()
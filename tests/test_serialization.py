@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import mock
+
+from clinical_trials import serialization
+from clinical_trials.structs import OversightInfo, StudyEligibility, StudyTrail, VariableDateStruct
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestStructs(unittest.TestCase):
+
+    def test_oversight_flags(self):
+        info = OversightInfo(has_dmc="Yes", is_fda_regulated_drug="No")
+        self.assertEqual(dict(has_dmc=True, is_fda_regulated_drug=False, is_fda_regulated_device=None,
+                              is_unapproved_device=None, is_ppsd=None, is_us_export=None), info.to_dict())
+
+    def test_dates(self):
+        date = VariableDateStruct(date_str="January 22, 2015", date_type="Actual")
+        self.assertEqual(dict(date_type="Actual", raw_date_str="January 22, 2015", date="2015-01-22"),
+                         date.to_dict())
+        trail = StudyTrail(study_first_submitted="March 2016").to_dict()
+        self.assertEqual("2016-03-01", trail["study_first_submitted"]["date"])
+        self.assertIsNone(trail["results_first_posted"])
+        self.assertFalse(trail["has_results"])
+
+    def test_properties(self):
+        eligibility = StudyEligibility(criteria=dict(textblock="Inclusion Criteria:\n  adults\n"), gender_based="Yes")
+        document = eligibility.to_dict()
+        self.assertTrue(document["gender_based"])
+        self.assertEqual(["adults"], document["inclusion_criteria"])
+        self.assertNotIn("_criteria", document)
+
+    def test_no_criteria(self):
+        self.assertEqual([], StudyEligibility().to_dict()["inclusion_criteria"])
+
+    def test_to_json(self):
+        info = OversightInfo(has_dmc="No")
+        for backend in serialization.BACKENDS:
+            self.assertEqual(info.to_dict(), json.loads(info.to_json(backend)))
+        self.assertIn("\n", info.to_json(indent=True))
+
+
+class TestBackends(unittest.TestCase):
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            serialization.get_backend("yaml")
+
+    def test_missing_orjson(self):
+        with mock.patch("clinical_trials.serialization.orjson", None):
+            self.assertEqual("json", serialization.get_backend())
+            with self.assertRaises(ValueError):
+                serialization.get_backend("orjson")
+
+    def test_same_output(self):
+        value = dict(name="Zürich", date=VariableDateStruct("May 2019"), values=[1, 2.5, None])
+        self.assertEqual(json.loads(serialization.dumps(value, "json")), json.loads(serialization.dumps(value, "orjson")))
+
+
+class TestClinicalStudy(SchemaTestCase):
+
+    def test_to_dict(self):
+        study = self.get_study('NCT02348489')
+        document = study.to_dict()
+        self.assertEqual("NCT02348489", document["nct_id"])
+        self.assertTrue(document["oversight_info"]["has_dmc"])
+        self.assertEqual("2015-01-28", document["trail"]["study_first_posted"]["date"])
+        self.assertEqual(study.brief_summary, document["brief_summary"])
+        self.assertEqual(study.enrollment_info.count, document["enrollment_info"]["count"])
+        self.assertEqual(len(study.locations), len(document["locations"]))
+        self.assertEqual(study.conditions(), document["conditions"])
+        # study documents are not fetched
+        self.assertNotIn("study_documents", document)
+
+    def test_all_fixtures(self):
+        for nct_id in self.cache:
+            study = self.get_study(nct_id)
+            self.assertEqual(json.loads(study.to_json("json")), json.loads(study.to_json("orjson")))
+
+
+class TestJSONLWriter(SchemaTestCase):
+
+    def test_streaming(self):
+        path = os.path.join(tempfile.mkdtemp(), "studies.jsonl")
+        nct_ids = sorted(self.cache)
+        self.assertEqual(len(nct_ids), serialization.write_jsonl(path, (self.get_study(x) for x in nct_ids)))
+        documents = list(serialization.iter_jsonl(path))
+        self.assertEqual(nct_ids, [document["nct_id"] for document in documents])
+        with serialization.JSONLWriter(path, append=True) as writer:
+            writer.write(dict(nct_id="NCT00000000"))
+        self.assertEqual(len(nct_ids) + 1, len(list(serialization.iter_jsonl(path))))
+
+    def test_file_object(self):
+        buffer = io.BytesIO()
+        writer = serialization.JSONLWriter(buffer, backend="json")
+        writer.write(self.get_study('NCT03211546'))
+        writer.close()
+        self.assertFalse(buffer.closed)
+        self.assertEqual("NCT03211546", json.loads(buffer.getvalue().decode("utf-8"))["nct_id"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import mmap
+import os
+import tempfile
+import unittest
+
+import mock
+
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.lazy import LazyStudyData
+from clinical_trials.stream import parse_buffer, parse_stream
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestParse(unittest.TestCase):
+
+    def test_results_comment(self):
+        content = b'<root>\n  <a>x</a>\n  <!-- Results are available for this study -->\n</root>'
+        for chunk_size in (1, 7, 1024):
+            root, has_results = parse_buffer(content, chunk_size)
+            self.assertEqual("x", root.find("a").text)
+            self.assertTrue(has_results)
+            self.assertEqual(True, parse_stream(io.BytesIO(content), chunk_size)[1])
+
+    def test_marker_in_text(self):
+        # only a comment marks a study with results
+        content = b'<root><a>Results are available for this study</a></root>'
+        self.assertFalse(parse_buffer(content)[1])
+        self.assertFalse(parse_stream(io.BytesIO(content))[1])
+
+    def test_buffers(self):
+        content = b'<root><a>\xc3\xa9</a></root>'
+        for buffer in (content, bytearray(content), memoryview(content)):
+            self.assertEqual(u"\xe9", parse_buffer(buffer, 3)[0].find("a").text)
+
+
+class TestFromStream(SchemaTestCase):
+
+    def decode(self, method, source, **kwargs):
+        with mock.patch('clinical_trials.clinical_study.get_schema') as donk:
+            donk.return_value = self.schema
+            return getattr(ClinicalStudy, method)(source, **kwargs)
+
+    def test_matches_full_decode(self):
+        for nct_id, content in self.cache.items():
+            expected = self.schema.to_dict(content.decode("utf-8"))
+            has_results = b"Results are available for this study" in content
+            for study in (self.decode("from_stream", io.BytesIO(content), chunk_size=4096),
+                          self.decode("from_buffer", memoryview(content)),
+                          self.decode("from_content", content)):
+                self.assertEqual(expected, study._data, nct_id)
+                self.assertEqual(has_results, study.has_results, nct_id)
+            self.assertEqual(has_results, LazyStudyData(content, self.schema).has_results, nct_id)
+
+    def test_has_results(self):
+        self.assertTrue(self.decode("from_content", self.cache.get("NCT00985114")).has_results)
+        self.assertFalse(self.decode("from_content", self.cache.get("NCT03211546")).has_results)
+        self.assertTrue(self.decode("from_content", self.cache.get("NCT00985114"), lazy=True).has_results)
+
+    def test_mmap(self):
+        content = self.cache.get("NCT00985114")
+        handle, filename = tempfile.mkstemp(suffix=".xml")
+        self.addCleanup(os.remove, filename)
+        with os.fdopen(handle, "wb") as fh:
+            fh.write(content)
+        with open(filename, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            study = self.decode("from_buffer", mapped)
+            # no view of the map is left behind
+            mapped.close()
+        self.assertEqual("NCT00985114", study.nct_id)
+        self.assertTrue(study.has_results)
+        study = self.decode("from_file", filename)
+        self.assertEqual("NCT00985114", study.nct_id)
+        self.assertTrue(study.has_results)
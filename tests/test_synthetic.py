@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+import unittest
+import zipfile
+
+from clinical_trials.clinical_study import ClinicalStudy
+from clinical_trials.synthetic import CITIES, SizeProfile, StudyGenerator, archive_name, write_zip
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestSizeProfile(unittest.TestCase):
+
+    def test_draw(self):
+        rng = random.Random(1)
+        self.assertEqual(5, SizeProfile.draw(5, rng))
+        self.assertIn(SizeProfile.draw((2, 3), rng), (2, 3))
+        self.assertEqual(7, SizeProfile.draw(lambda r: 7, rng))
+
+
+class TestStudyGenerator(SchemaTestCase):
+
+    def test_schema_valid(self):
+        generator = StudyGenerator(self.schema, SizeProfile(results=0.5), seed=7)
+        for index in range(10):
+            content = generator.generate(index)
+            self.assertEqual([], [error.reason for error in self.schema.iter_errors(content.decode("utf-8"))])
+
+    def test_reproducible(self):
+        first = StudyGenerator(self.schema, seed=3)
+        second = StudyGenerator(self.schema, seed=3)
+        self.assertEqual(first.generate(4), second.generate(4))
+        # independent of generation order
+        second.generate(0)
+        self.assertEqual(first.generate(5), second.generate(5))
+        self.assertNotEqual(first.generate(4), StudyGenerator(self.schema, seed=4).generate(4))
+
+    def test_sizes(self):
+        profile = SizeProfile(locations=25, primary_outcomes=2, arms=3, results=0.0)
+        generator = StudyGenerator(self.schema, profile, seed=1)
+        study = ClinicalStudy(self.schema.to_dict(generator.generate(0).decode("utf-8")))
+        self.assertEqual("NCT00000001", study.nct_id)
+        self.assertEqual(25, len(study.locations))
+        self.assertEqual(2, len(study.outcomes.primary))
+        self.assertEqual(3, len(study.arms))
+        self.assertNotIn("clinical_results", study._data)
+
+    def test_results(self):
+        generator = StudyGenerator(self.schema, SizeProfile(results=1.0, groups=3), seed=1)
+        data = self.schema.to_dict(generator.generate(0).decode("utf-8"))
+        groups = data["clinical_results"]["baseline"]["group_list"]["group"]
+        self.assertEqual(["G1", "G2", "G3"], [group["@group_id"] for group in groups])
+
+    def test_address_is_one_place(self):
+        generator = StudyGenerator(self.schema, SizeProfile(locations=20), seed=1)
+        study = ClinicalStudy(self.schema.to_dict(generator.generate(0).decode("utf-8")))
+        places = dict((x[0], (x[0], x[1] or x[0], x[2], x[3])) for x in CITIES)
+        addresses = [x.facility.address for x in study.locations if x.facility and x.facility.address]
+        self.assertTrue(addresses)
+        for address in addresses:
+            place = places[address.city]
+            for value, expected in zip((address.city, address.state, address.zip, address.country), place):
+                self.assertIn(value, (None, expected))
+
+    def test_text_length(self):
+        generator = StudyGenerator(self.schema, SizeProfile(text_words=50), seed=1)
+        study = ClinicalStudy(self.schema.to_dict(generator.generate(0).decode("utf-8")))
+        self.assertEqual(50, len(study.brief_summary.split()))
+
+
+class TestWriteZip(SchemaTestCase):
+
+    def test_archive_name(self):
+        self.assertEqual("NCT0156xxxx/NCT01565668.xml", archive_name("NCT01565668"))
+
+    def test_write_zip(self):
+        path = os.path.join(tempfile.mkdtemp(), "synthetic.zip")
+        self.assertEqual(5, write_zip(path, 5, self.schema, SizeProfile(locations=(0, 3)), seed=2))
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            self.assertEqual(["NCT0000xxxx/NCT0000000{}.xml".format(x) for x in range(1, 6)], names)
+            content = archive.read(names[0])
+        self.assertEqual(StudyGenerator(self.schema, SizeProfile(locations=(0, 3)), seed=2).generate(0), content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from clinical_trials import xref
+from clinical_trials.xref import CrossReferenceIndex, normalize, study_identifiers
+from tests.test_clinical_study import SchemaTestCase
+
+
+class TestIdentifiers(unittest.TestCase):
+
+    def test_normalize(self):
+        self.assertEqual("2011-005408-13", normalize("EudraCT 2011-005408-13"))
+        self.assertEqual("DBOX 2014/00466", normalize("  dbox   2014/00466 "))
+
+    def test_node(self):
+        self.assertEqual(xref.node(xref.PUBMED, "123"), xref.node(xref.RESULTS_PUBMED, "123"))
+        self.assertEqual("EudraCT:2011-005408-13", xref.node(xref.EUDRACT, "EudraCT 2011-005408-13"))
+
+
+class TestCrossReferenceIndex(SchemaTestCase):
+
+    def setUp(self):
+        self.studies = dict((nct_id, self.get_study(nct_id)) for nct_id in sorted(self.cache))
+        self.index = CrossReferenceIndex()
+        self.assertEqual(len(self.studies), self.index.add_studies(self.studies.values(), batch_size=5))
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_study_identifiers(self):
+        self.assertEqual([(xref.ORG_STUDY_ID, "2689-CL-2004"), (xref.EUDRACT, "2011-005408-13")],
+                         study_identifiers(self.studies["NCT01565668"]))
+        identifiers = study_identifiers(self.studies["NCT02041234"])
+        self.assertIn((xref.PUBMED, "19370590"), identifiers)
+
+    def test_lookup(self):
+        self.assertEqual(["NCT01565668"], self.index.lookup("2011-005408-13"))
+        self.assertEqual(["NCT01565668"], self.index.lookup("EUDRACT 2011-005408-13", kinds=[xref.EUDRACT]))
+        self.assertEqual(["NCT02536534"], self.index.lookup("dbox 2014/00466"))
+        self.assertEqual(["NCT02041234"], self.index.lookup("19370590", kinds=[xref.PUBMED, xref.RESULTS_PUBMED]))
+        self.assertEqual([], self.index.lookup("19370590", kinds=[xref.ORG_STUDY_ID]))
+        self.assertEqual([], self.index.lookup("nothing"))
+        with self.assertRaises(ValueError):
+            self.index.lookup("19370590", kinds=["doi"])
+
+    def test_lookup_many(self):
+        identifiers = ["RA0098", "19370590", "nothing"] + [str(x) for x in range(xref.LOOKUP_BATCH)] + ["AG-221"]
+        found = self.index.lookup_many(identifiers)
+        self.assertEqual(dict(RA0098=["NCT03357471"], **{"19370590": ["NCT02041234"], "AG-221": ["NCT03723057"]}),
+                         found)
+
+    def test_reverse(self):
+        self.assertEqual([(xref.EUDRACT, "2011-005408-13"), (xref.ORG_STUDY_ID, "2689-CL-2004")],
+                         self.index.identifiers("NCT01565668"))
+        self.assertEqual([(xref.EUDRACT, "2011-005408-13")],
+                         self.index.identifiers("NCT01565668", kinds=[xref.EUDRACT]))
+
+    def test_incremental(self):
+        study = self.studies["NCT01565668"]
+        study._data["id_info"]["secondary_id"] = ["2012-000001-01"]
+        self.index.add_study(study)
+        self.assertEqual([], self.index.lookup("2011-005408-13"))
+        self.assertEqual(["NCT01565668"], self.index.lookup("2012-000001-01"))
+        self.index.remove("NCT01565668")
+        self.assertNotIn("NCT01565668", self.index)
+        self.assertEqual(len(self.studies) - 1, len(self.index))
+
+    def test_linked_studies(self):
+        study = self.studies["NCT03735485"]
+        study._data["results_reference"] = [dict(citation="Shared", PMID="19370590")]
+        study._data["id_info"]["secondary_id"] = ["19370590"]
+        self.index.add_study(study)
+        self.assertEqual({"NCT03735485": [(xref.PUBMED, "19370590")]}, self.index.linked_studies("NCT02041234"))
+        self.assertEqual({}, self.index.linked_studies("NCT03723057"))
+
+    def test_edge_list(self):
+        path = os.path.join(tempfile.mkdtemp(), "edges.tsv")
+        count = self.index.write_edge_list(path)
+        with open(path) as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual("source\ttarget\tkind", lines[0])
+        self.assertEqual(count + 1, len(lines))
+        self.assertIn("NCT01565668\tEudraCT:2011-005408-13\teudract", lines)
+        self.assertEqual(8, len(list(self.index.edges(kinds=[xref.PUBMED])))
+                         - len([x for x in study_identifiers(self.studies["NCT03735485"]) if x[0] == xref.PUBMED]))
+
+    def test_persisted(self):
+        path = os.path.join(tempfile.mkdtemp(), "xref.db")
+        with CrossReferenceIndex(path) as index:
+            index.add_studies(self.studies.values())
+        with CrossReferenceIndex(path) as index:
+            self.assertEqual(len(self.studies), len(index))
+            self.assertEqual(["NCT03982511"], index.lookup("R21HD093944"))